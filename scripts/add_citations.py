@@ -16,6 +16,8 @@ import os
 import re
 import sys
 
+from site_build import match_paths, transform
+
 CITATION_BLOCK = '''<div style="margin-top:40px;padding:24px;background:rgba(255,255,255,0.03);border-radius:12px;border:1px solid rgba(255,255,255,0.06);">
   <p style="font-size:0.8rem;color:var(--text-secondary,#999);line-height:1.8;margin:0;">
     <strong style="color:var(--text-heading,#e8e6e3);">参考文献・出典</strong><br>
@@ -38,14 +40,11 @@ INSERTION_PATTERNS = [
 ]
 
 
-def process_file(filepath):
-    """Process a single HTML file. Returns (success, reason)."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
+def insert_citation(content):
+    """出典ブロックを挿入した content を返す。挿入しない場合は (None, 理由)"""
     # Skip if already has citation
     if '参考文献' in content or '出典' in content:
-        return False, 'already has citation'
+        return None, 'already has citation'
 
     # Try each insertion pattern in priority order
     for pattern, label in INSERTION_PATTERNS:
@@ -73,13 +72,33 @@ def process_file(filepath):
 
             # Insert citation before the matched element
             new_content = content[:insert_pos] + '\n' + indented_citation + '\n\n' + content[insert_pos:]
+            return new_content, f'inserted before {label}'
+
+    return None, 'no insertion point found'
+
+
+def process_file(filepath):
+    """Process a single HTML file. Returns (success, reason)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content, reason = insert_citation(content)
+    if new_content is None:
+        return False, reason
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    return True, reason
 
-            return True, f'inserted before {label}'
 
-    return False, 'no insertion point found'
+@transform("citations", match_paths("lp/job-seeker/guide/*.html", "blog/*.html",
+                                    exclude={"index.html"}))
+def citations_transform(page):
+    new_content, reason = insert_citation(page.text)
+    if new_content is None:
+        return None
+    page.text = new_content
+    return [reason]
 
 
 def main():
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
-"""Add cross-links from blog articles to related guide pages."""
+"""Add cross-links from blog articles to related guide pages.
 
+blog_to_guide lists the articles to link and pins their guides. With
+--graph-fallback (LINK_GRAPH_FALLBACK=1) articles without a pin also get the
+most similar guide pages from link_graph (deterministic top-k).
+"""
+
+import argparse
 import os
 import re
 
+from link_graph import (BLOG_PREFIX, GUIDE_PREFIX, enable_fallback, fallback_enabled,
+                        get_graph, is_blog, is_guide)
+from site_build import match_paths, transform
+
 BLOG_DIR = os.path.expanduser("~/robby-the-match/blog")
 
 blog_to_guide = {
@@ -59,11 +69,31 @@ guide_titles = {
 }
 
 
+CROSSLINK_COUNT = 3
+
+
+def guides_for(blog_file, count=CROSSLINK_COUNT):
+    """Guide pages to link from a blog article: the pinned list, else (opt-in) the most similar guides."""
+    if blog_file in blog_to_guide:
+        return blog_to_guide[blog_file]
+    if not fallback_enabled():
+        return []
+    hits = get_graph().related(BLOG_PREFIX + blog_file, count, where=is_guide)
+    return [rel[len(GUIDE_PREFIX):] for _, rel in hits]
+
+
+def guide_title(gf):
+    title = guide_titles.get(gf)
+    if title:
+        return title
+    return get_graph().title(GUIDE_PREFIX + gf) or gf.replace(".html", "").replace("-", " ").title()
+
+
 def build_crosslink_block(guide_files):
     """Build the HTML block for cross-links."""
     li_items = []
     for gf in guide_files:
-        title = guide_titles.get(gf, gf.replace(".html", "").replace("-", " ").title())
+        title = guide_title(gf)
         li_items.append(
             f'    <li><a href="/lp/job-seeker/guide/{gf}" '
             f'style="color:var(--accent,#a8dadc);font-size:0.9rem;text-decoration:none;">'
@@ -80,6 +110,27 @@ def build_crosslink_block(guide_files):
     )
 
 
+CROSSLINK_ANCHOR = re.compile(
+    r'(※掲載情報は執筆時点のものであり、最新の状況と異なる場合があります。具体的な条件は各医療機関にご確認ください。\s*</p>\s*</div>)\s*(<div class="related-articles")'
+)
+
+
+def insert_crosslinks(content, guide_files):
+    """Return (new_content, None) or (None, reason) if the block is not inserted."""
+    # Skip if already has cross-links
+    if "もっと詳しく知る" in content:
+        return None, "already has cross-links"
+
+    # Find the insertion point: after the sources section closing </div>, before related-articles
+    # Pattern: closing </div> of sources section, then whitespace, then <div class="related-articles">
+    match = CROSSLINK_ANCHOR.search(content)
+    if not match:
+        return None, "pattern not found"
+
+    block = build_crosslink_block(guide_files)
+    return content[:match.end(1)] + "\n" + block + "\n" + content[match.start(2):], None
+
+
 def process_file(filename, guide_files):
     """Insert cross-link block into a blog article."""
     filepath = os.path.join(BLOG_DIR, filename)
@@ -90,23 +141,12 @@ def process_file(filename, guide_files):
     with open(filepath, "r", encoding="utf-8") as f:
         content = f.read()
 
-    # Skip if already has cross-links
-    if "もっと詳しく知る" in content:
-        print(f"  SKIP (already has cross-links): {filename}")
-        return False
-
-    # Find the insertion point: after the sources section closing </div>, before related-articles
-    # Pattern: closing </div> of sources section, then whitespace, then <div class="related-articles">
-    pattern = r'(※掲載情報は執筆時点のものであり、最新の状況と異なる場合があります。具体的な条件は各医療機関にご確認ください。\s*</p>\s*</div>)\s*(<div class="related-articles")'
-
-    match = re.search(pattern, content)
-    if not match:
-        print(f"  WARNING (pattern not found): {filename}")
+    new_content, reason = insert_crosslinks(content, guide_files)
+    if new_content is None:
+        label = "WARNING" if reason == "pattern not found" else "SKIP"
+        print(f"  {label} ({reason}): {filename}")
         return False
 
-    block = build_crosslink_block(guide_files)
-    new_content = content[:match.end(1)] + "\n" + block + "\n" + content[match.start(2):]
-
     with open(filepath, "w", encoding="utf-8") as f:
         f.write(new_content)
 
@@ -114,16 +154,49 @@ def process_file(filename, guide_files):
     return True
 
 
+_pinned = match_paths(*(BLOG_PREFIX + name for name in blog_to_guide))
+_any_blog = match_paths(BLOG_PREFIX + "*.html", exclude={"index.html"})
+
+
+def _applies(rel):
+    return _pinned(rel) or (fallback_enabled() and _any_blog(rel))
+
+
+@transform("crosslinks", _applies, key=lambda: f"fallback={fallback_enabled()}")
+def crosslinks_transform(page):
+    if "もっと詳しく知る" in page.text:
+        return None
+    guides = guides_for(page.name)
+    if not guides:
+        return None
+    new_content, _ = insert_crosslinks(page.text, guides)
+    if new_content is None:
+        return None
+    page.text = new_content
+    return [f"added {len(guides)} guide links"]
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Add cross-links from blog articles to guide pages")
+    parser.add_argument("--graph-fallback", action="store_true",
+                        help="also link articles missing from blog_to_guide by similarity")
+    args = parser.parse_args()
+    if args.graph_fallback:
+        enable_fallback()
+
     print("Adding cross-links from blog articles to guide pages...")
     print(f"Blog directory: {BLOG_DIR}")
     print()
 
     success = 0
     fail = 0
-    for blog_file, guides in blog_to_guide.items():
+    blog_files = set(blog_to_guide)
+    if fallback_enabled():
+        blog_files |= {rel[len(BLOG_PREFIX):] for rel in get_graph().vectors if is_blog(rel)}
+    for blog_file in sorted(blog_files):
         print(f"Processing: {blog_file}")
-        if process_file(blog_file, guides):
+        guides = guides_for(blog_file)
+        if guides and process_file(blog_file, guides):
             success += 1
         else:
             fail += 1
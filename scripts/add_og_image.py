@@ -12,6 +12,8 @@ import os
 import re
 import glob
 
+from site_build import match_paths, transform
+
 OG_IMAGE_URL = "https://quads-nurse.com/assets/ogp.png"
 BASE_DIR = os.path.expanduser("~/robby-the-match")
 
@@ -59,6 +61,18 @@ def add_og_image(content):
     return '\n'.join(lines)
 
 
+@transform("og_image", match_paths("lp/job-seeker/area/*.html", "lp/job-seeker/guide/*.html",
+                                   "blog/*.html"))
+def og_image_transform(page):
+    if has_og_image(page.text):
+        return None
+    new_content = add_og_image(page.text)
+    if new_content is None:
+        return None
+    page.text = new_content
+    return ["og:image added"]
+
+
 def main():
     files_found = []
     for pattern in PATTERNS:
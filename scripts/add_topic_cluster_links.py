@@ -2,11 +2,18 @@
 """
 トピッククラスター相互リンク追加スクリプト
 各ガイドページに同クラスター内リンク(3-5個) + クロスクラスターリンク(1-2個) を追加する。
+
+リンク先は link_graph のページ類似度で決める（決定的な上位k件）。
+対象ページ・リンク先は CLUSTERS に登録したガイドだけで、クラスター間の関連度は重心の類似度から計算する。
+--graph-fallback（LINK_GRAPH_FALLBACK=1）の時だけ、未登録のガイドも最も近いクラスターに入れて扱う。
 """
 
+import argparse
 import os
 import re
-import random
+
+from link_graph import GUIDE_PREFIX, enable_fallback, fallback_enabled, get_graph, is_guide
+from site_build import match_paths, transform
 
 GUIDE_DIR = os.path.expanduser("~/robby-the-match/lp/job-seeker/guide")
 
@@ -66,15 +73,6 @@ CLUSTERS = {
     ],
 }
 
-# クロスクラスター関連性マップ: 各クラスターに対して関連性の高い他クラスター
-CROSS_CLUSTER_AFFINITY = {
-    "salary": ["process", "general"],
-    "process": ["salary", "career"],
-    "career": ["workstyle", "process"],
-    "workstyle": ["career", "general"],
-    "general": ["workstyle", "process"],
-}
-
 # ファイル→クラスター逆引き辞書を作る
 FILE_TO_CLUSTER = {}
 FILE_TO_TITLE = {}
@@ -83,31 +81,44 @@ for cluster_name, pages in CLUSTERS.items():
         FILE_TO_CLUSTER[filename] = cluster_name
         FILE_TO_TITLE[filename] = title
 
+SEED_CLUSTERS = {GUIDE_PREFIX + f: c for f, c in FILE_TO_CLUSTER.items()}
 
-def get_same_cluster_links(filename, max_links=5):
-    """同クラスター内の他ページへのリンクを返す（自分自身を除外）"""
-    cluster = FILE_TO_CLUSTER[filename]
-    candidates = [(f, t) for f, t in CLUSTERS[cluster] if f != filename]
-    # クラスターのサイズが5以下ならそのまま全部、6以上なら5個選ぶ
-    if len(candidates) <= max_links:
-        return candidates
-    # ランダムではなく先頭から5個（安定した結果のため）
-    return candidates[:max_links]
 
+def assigned_clusters():
+    """{rel: クラスター名}（--graph-fallback 時は未登録のガイドも最も近いクラスターへ）"""
+    if fallback_enabled():
+        return get_graph().clusters(SEED_CLUSTERS)
+    return SEED_CLUSTERS
 
-def get_cross_cluster_links(filename, count=2):
-    """別クラスターから関連性の高いリンクを返す"""
-    cluster = FILE_TO_CLUSTER[filename]
-    affinity_clusters = CROSS_CLUSTER_AFFINITY[cluster]
 
-    candidates = []
-    for aff_cluster in affinity_clusters:
-        candidates.extend(CLUSTERS[aff_cluster])
+def cluster_of(filename):
+    """ガイドのクラスター（未登録なら None。--graph-fallback 時は類似度で最も近いクラスター）"""
+    return assigned_clusters().get(GUIDE_PREFIX + filename)
 
-    # ファイル固有のシードで安定した選択をする
-    random.seed(filename)
-    selected = random.sample(candidates, min(count, len(candidates)))
-    return selected
+
+def _link(rel):
+    filename = rel[len(GUIDE_PREFIX):]
+    return filename, FILE_TO_TITLE.get(filename) or get_graph().title(rel)
+
+
+def get_same_cluster_links(filename, max_links=5):
+    """同クラスター内で類似度の高いページへのリンクを返す（自分自身を除外）"""
+    graph = get_graph()
+    cluster = cluster_of(filename)
+    assigned = assigned_clusters()
+    hits = graph.related(GUIDE_PREFIX + filename, max_links,
+                         where=lambda r: is_guide(r) and assigned.get(r) == cluster)
+    return [_link(rel) for _, rel in hits]
+
+
+def get_cross_cluster_links(filename, count=2):
+    """関連度の高い別クラスターから、類似度の高いリンクを返す"""
+    graph = get_graph()
+    affinity = set(graph.cluster_affinity(cluster_of(filename), SEED_CLUSTERS))
+    assigned = assigned_clusters()
+    hits = graph.related(GUIDE_PREFIX + filename, count,
+                         where=lambda r: is_guide(r) and assigned.get(r) in affinity)
+    return [_link(rel) for _, rel in hits]
 
 
 def generate_related_section(filename):
@@ -168,25 +179,33 @@ def find_insertion_point(html):
     return footer_pos
 
 
-def insert_related_section(filepath, filename):
-    """ファイルに関連セクションを挿入する"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        html = f.read()
-
+def add_related_section(html, filename):
+    """関連セクションを挿入した HTML を返す。挿入しない場合は (None, 理由)"""
     # 既に related-guides が存在する場合はスキップ
     if 'class="related-guides"' in html:
-        print(f"  SKIP (already has related-guides): {filename}")
-        return False
-
-    section_html = generate_related_section(filename)
+        return None, "already has related-guides"
 
     insertion_pos = find_insertion_point(html)
     if insertion_pos is None:
-        print(f"  ERROR: Could not find insertion point in {filename}")
-        return False
+        return None, "no insertion point"
 
     # 挿入位置にセクションを追加
-    new_html = html[:insertion_pos] + "\n\n    " + section_html + "\n" + html[insertion_pos:]
+    section_html = generate_related_section(filename)
+    return html[:insertion_pos] + "\n\n    " + section_html + "\n" + html[insertion_pos:], None
+
+
+def insert_related_section(filepath, filename):
+    """ファイルに関連セクションを挿入する"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    new_html, reason = add_related_section(html, filename)
+    if new_html is None:
+        if reason == "no insertion point":
+            print(f"  ERROR: Could not find insertion point in {filename}")
+        else:
+            print(f"  SKIP ({reason}): {filename}")
+        return False
 
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(new_html)
@@ -194,14 +213,40 @@ def insert_related_section(filepath, filename):
     return True
 
 
+_registered = match_paths(*(GUIDE_PREFIX + name for name in FILE_TO_CLUSTER))
+_any_guide = match_paths(GUIDE_PREFIX + "*.html", exclude={"index.html"})
+
+
+def _applies(rel):
+    return _registered(rel) or (fallback_enabled() and _any_guide(rel))
+
+
+@transform("topic_cluster", _applies, key=lambda: f"fallback={fallback_enabled()}")
+def topic_cluster_transform(page):
+    if 'class="related-guides"' in page.text or page.rel not in get_graph():
+        return None
+    new_html, _ = add_related_section(page.text, page.name)
+    if new_html is None:
+        return None
+    page.text = new_html
+    return [f"related-guides ({cluster_of(page.name)})"]
+
+
 def main():
+    parser = argparse.ArgumentParser(description="トピッククラスター相互リンク追加")
+    parser.add_argument("--graph-fallback", action="store_true",
+                        help="CLUSTERS に無いガイドも類似度で最も近いクラスターに入れて処理する")
+    args = parser.parse_args()
+    if args.graph_fallback:
+        enable_fallback()
+
     print("=== トピッククラスター相互リンク追加 ===\n")
 
     success_count = 0
     skip_count = 0
     error_count = 0
 
-    all_files = sorted(FILE_TO_CLUSTER.keys())
+    all_files = sorted(rel[len(GUIDE_PREFIX):] for rel in assigned_clusters() if is_guide(rel))
 
     for filename in all_files:
         filepath = os.path.join(GUIDE_DIR, filename)
@@ -211,7 +256,7 @@ def main():
             error_count += 1
             continue
 
-        cluster = FILE_TO_CLUSTER[filename]
+        cluster = cluster_of(filename)
         same_links = get_same_cluster_links(filename)
         cross_links = get_cross_cluster_links(filename, 2)
 
@@ -12,6 +12,7 @@ Cloudflare Workers AI (Llama 3.3 70B, FREE) を使った完全自律型コンテ
   python3 scripts/ai_content_engine.py --schedule           # 投稿スケジュール設定
   python3 scripts/ai_content_engine.py --auto               # 全自動モード（plan→generate→review→schedule）
   python3 scripts/ai_content_engine.py --status             # 現状サマリ表示
+  python3 scripts/ai_content_engine.py --bench-startup      # 起動時間が予算内か確認（超過で exit 1）
 
 コスト: Cloudflare Workers AI は 10,000 neurons/day 無料。テキスト生成のみなのでほぼ無制限。
 """
@@ -22,12 +23,11 @@ import os
 import random
 import re
 import shutil
-import subprocess
 import sys
 import tempfile
 import time
-import traceback
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -52,6 +52,11 @@ except ImportError:
     ROBBY_LOADED = False
     print("[INFO] robby_character.py not found. Using default system prompt.")
 
+import hashtag_engine
+import slack_client
+from runtime_config import load_env, posting_schedule
+from template_selector import TemplateIndex, performance_weights
+
 # ============================================================
 # Constants & Configuration
 # ============================================================
@@ -63,7 +68,6 @@ PLAN_PATH = PROJECT_DIR / "data" / "content_plan.json"
 GENERATED_DIR = PROJECT_DIR / "content" / "generated"
 READY_DIR = PROJECT_DIR / "content" / "ready"
 LOG_DIR = PROJECT_DIR / "logs"
-ENV_FILE = PROJECT_DIR / ".env"
 
 # Cloudflare Workers AI endpoint (FREE)
 CF_AI_MODEL = "@cf/meta/llama-3.3-70b-instruct-fp8-fast"
@@ -142,42 +146,16 @@ HASHTAG_SETS = {
 # Hashtag Rotation & Validation (2026-02-28)
 # ============================================================
 
-BANNED_HASHTAGS = {"#AI", "#fyp", "#foryou", "#viral", "#foryoupage", "#AIやってみた"}
-
+# 禁止タグ・ローテーション表は hashtag_engine に集約（1回だけ読み込んで前計算）
 
 def get_rotated_hashtags():
-    """ハッシュタグローテーション（data/hashtag_rotation.json）"""
-    rotation_file = PROJECT_DIR / "data" / "hashtag_rotation.json"
-    if rotation_file.exists():
-        try:
-            with open(rotation_file, "r", encoding="utf-8") as f:
-                rotation = json.load(f)
-            combos = rotation.get("combos", [])
-            if combos:
-                day_idx = datetime.now().timetuple().tm_yday % len(combos)
-                combo = combos[day_idx]
-                return validate_hashtags(combo["tags"])
-        except Exception as e:
-            print(f"[WARN] Failed to load hashtag rotation: {e}")
-    # Fallback
-    return ["#看護師あるある", "#看護師の日常", "#神奈川看護師", "#ナースロビー"]
+    """今日のハッシュタグローテーション（data/hashtag_rotation.json）"""
+    return hashtag_engine.tags_for()
 
 
 def validate_hashtags(tags):
-    """禁止タグの除去 + 個数制限"""
-    # Load banned tags from rotation file if available
-    banned = set(BANNED_HASHTAGS)
-    rotation_file = PROJECT_DIR / "data" / "hashtag_rotation.json"
-    if rotation_file.exists():
-        try:
-            with open(rotation_file, "r", encoding="utf-8") as f:
-                rotation = json.load(f)
-            for tag in rotation.get("banned_tags", []):
-                banned.add(tag)
-        except Exception:
-            pass
-    clean = [t for t in tags if t not in banned]
-    return clean[:5]  # max 5 tags
+    """禁止タグの除去 + 個数制限（max 5）"""
+    return hashtag_engine.validate(tags)
 
 
 # Content stock ideas for planning context
@@ -237,8 +215,9 @@ CONTENT_STOCK_HINTS = {
 
 SCRIPT_WRITER_PROMPT_PATH = PROJECT_DIR / "data" / "prompts" / "script_writer.md"
 
-def _load_script_writer_prompt() -> str:
-    """Load anti-generic script writer prompt template."""
+@lru_cache(maxsize=1)
+def get_script_writer_prompt() -> str:
+    """Load anti-generic script writer prompt template (once, on first use)."""
     if SCRIPT_WRITER_PROMPT_PATH.exists():
         try:
             return SCRIPT_WRITER_PROMPT_PATH.read_text(encoding="utf-8")
@@ -246,8 +225,6 @@ def _load_script_writer_prompt() -> str:
             print(f"[WARN] Failed to load script writer prompt: {e}")
     return ""
 
-SCRIPT_WRITER_PROMPT = _load_script_writer_prompt()
-
 # Anti-generic rules injected into content generation
 ANTI_GENERIC_RULES = """
 ## アンチジェネリック・ルール（最重要）
@@ -281,8 +258,9 @@ ANTI_GENERIC_RULES = """
 
 TEMPLATES_PATH = PROJECT_DIR / "data" / "carousel_templates.json"
 
-def _load_templates() -> List[Dict]:
-    """Load carousel templates from JSON file."""
+@lru_cache(maxsize=1)
+def get_templates() -> List[Dict]:
+    """Load carousel templates from JSON file (once, on first use)."""
     if TEMPLATES_PATH.exists():
         try:
             with open(TEMPLATES_PATH, "r", encoding="utf-8") as f:
@@ -291,69 +269,50 @@ def _load_templates() -> List[Dict]:
             print(f"[WARN] Failed to load carousel templates: {e}")
     return []
 
-TEMPLATES = _load_templates()
 
-# Index templates by ID for quick lookup
-TEMPLATES_BY_ID = {t["id"]: t for t in TEMPLATES}
+@lru_cache(maxsize=1)
+def get_templates_by_id() -> Dict[str, Dict]:
+    """Index templates by ID for quick lookup."""
+    return {t["id"]: t for t in get_templates()}
 
-# Index templates by category + psychology combination
-TEMPLATES_BY_CATEGORY = {}
-for _t in TEMPLATES:
-    _cat = _t.get("category", "")
-    if _cat not in TEMPLATES_BY_CATEGORY:
-        TEMPLATES_BY_CATEGORY[_cat] = []
-    TEMPLATES_BY_CATEGORY[_cat].append(_t)
 
-PSYCHOLOGY_ALIASES = {
-    "behavioral_economics": ["行動経済学", "損失回避", "アンカリング", "フレーミング", "サンクコスト", "社会的証明", "デフォルト効果", "現状維持", "IKEA効果", "初頭効果", "ハロー効果", "メンタルアカウンティング", "機会費用", "時間的割引", "ゼロリスク"],
-    "positive_psychology": ["ポジティブ心理学", "PERMA", "成長マインドセット", "フロー理論", "VIA", "感謝介入", "希望理論", "自己決定理論", "ポジティブ加齢"],
-    "philosophy": ["哲学", "ストア", "実存主義", "サルトル", "アドラー", "ニーチェ", "禅仏教", "マインドフルネス", "功利主義"],
-}
+@lru_cache(maxsize=1)
+def get_templates_by_category() -> Dict[str, List[Dict]]:
+    """Index templates by category."""
+    by_category = {}
+    for t in get_templates():
+        by_category.setdefault(t.get("category", ""), []).append(t)
+    return by_category
+
+
+@lru_cache(maxsize=1)
+def get_template_index() -> TemplateIndex:
+    """転置インデックス（カテゴリ/心理学/CTA）。重みは投稿実績から（初回のみ構築）"""
+    weights = performance_weights(load_queue().get("posts", []))
+    return TemplateIndex(get_templates(), weights)
+
 
 def pick_template(category: str = None, psychology: str = None) -> Optional[Dict]:
-    """Pick a random template, optionally filtered by category or psychology."""
-    pool = TEMPLATES
-    if category:
-        pool = [t for t in pool if t.get("category") == category]
-    if psychology:
-        # Support English alias keys (e.g. "behavioral_economics")
-        keywords = PSYCHOLOGY_ALIASES.get(psychology, [psychology])
-        pool = [t for t in pool if any(kw in t.get("psychology", "") for kw in keywords)]
-    return random.choice(pool) if pool else None
+    """Pick a weighted random template, optionally filtered by category or psychology.
+
+    psychology は template_selector.PSYCHOLOGY_ALIASES のキー（例: "behavioral_economics"）か自由語。
+    """
+    return get_template_index().pick(category=category, psychology=psychology)
 
 def get_template_for_generation(category: str, cta_type: str = "soft") -> Optional[Dict]:
     """Get a template suitable for content generation, matching CTA type preference."""
-    candidates = TEMPLATES_BY_CATEGORY.get(category, [])
-    if not candidates:
+    index = get_template_index()
+    # pick() treats a falsy category as "any"; this helper needs a known category
+    if not category or category not in index.category:
         return None
     # Prefer templates matching the requested CTA type
-    matching_cta = [t for t in candidates if any(
-        s.get("cta_type") == cta_type for s in t.get("slides", []) if s.get("type") == "cta"
-    )]
-    if matching_cta:
-        return random.choice(matching_cta)
-    return random.choice(candidates)
+    return index.pick(category=category, cta=cta_type) or index.pick(category=category)
 
 
 # ============================================================
 # Environment & Utilities
 # ============================================================
 
-def load_env():
-    """Load .env file from PROJECT_DIR."""
-    if ENV_FILE.exists():
-        with open(ENV_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    key, _, value = line.partition("=")
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    os.environ.setdefault(key, value)
-
-
 def get_cf_credentials() -> Tuple[str, str]:
     """Get Cloudflare credentials from environment."""
     account_id = os.environ.get("CLOUDFLARE_ACCOUNT_ID", "")
@@ -378,19 +337,9 @@ def log_event(event_type: str, data: dict):
 
 
 def slack_notify(message: str):
-    """Send a Slack notification."""
-    try:
-        result = subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, text=True, timeout=30,
-        )
-        if result.returncode == 0:
-            print("  [SLACK] Notification sent")
-        else:
-            print(f"  [SLACK] Send failed (exit {result.returncode})")
-    except Exception as e:
-        print(f"  [SLACK] Error: {e}")
+    """Send a Slack notification (coalesced via slack_client)."""
+    slack_client.notify(message)
+    print("  [SLACK] Notification queued")
 
 
 def timestamp_str() -> str:
@@ -655,11 +604,7 @@ def analyze_queue_mix(queue: dict) -> Dict[str, int]:
 # System Prompt for Content Generation
 # ============================================================
 
-# SYSTEM_PROMPT: ロビー君キャラクターシステムが読み込まれていればそちらを使う
-if ROBBY_LOADED:
-    SYSTEM_PROMPT = get_robby_system_prompt()
-else:
-    SYSTEM_PROMPT = """あなたは医療×採用領域に特化したショート動画の脚本家だ。
+DEFAULT_SYSTEM_PROMPT = """あなたは医療×採用領域に特化したショート動画の脚本家だ。
 クライアントは「ナースロビー」——手数料10%で看護師と病院を直接つなぐサービス。
 
 ## あなたの敵＝ジェネリックAI出力
@@ -704,6 +649,30 @@ else:
 - 架空設定。患者情報触れない。実在施設の批判なし。ハッシュタグ4個厳守。"""
 
 
+@lru_cache(maxsize=1)
+def get_system_prompt() -> str:
+    """SYSTEM_PROMPT: ロビー君キャラクターシステムが読み込まれていればそちらを使う（初回のみ構築）"""
+    if ROBBY_LOADED:
+        return get_robby_system_prompt()
+    return DEFAULT_SYSTEM_PROMPT
+
+
+# 旧モジュール属性名の互換（参照された時点で遅延ロード）
+_LAZY_ATTRS = {
+    "TEMPLATES": get_templates,
+    "TEMPLATES_BY_ID": get_templates_by_id,
+    "TEMPLATES_BY_CATEGORY": get_templates_by_category,
+    "SCRIPT_WRITER_PROMPT": get_script_writer_prompt,
+    "SYSTEM_PROMPT": get_system_prompt,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # ============================================================
 # Phase 1: AI Content Planning (--plan)
 # ============================================================
@@ -878,7 +847,7 @@ JSON配列のみ出力。マークダウン記法や説明文は不要。
 ]"""
 
     print("\n[AI] Generating hook ideas via Cloudflare Workers AI...")
-    result = call_cloudflare_ai(prompt, SYSTEM_PROMPT, max_tokens=1500, temperature=0.8)
+    result = call_cloudflare_ai(prompt, get_system_prompt(), max_tokens=1500, temperature=0.8)
 
     if not result:
         print("[WARN] AI plan refinement failed. Using hint-based plan.")
@@ -911,6 +880,8 @@ def cmd_generate(count: int):
     Generate N complete carousel content sets using Cloudflare Workers AI.
     Creates slide JSON + carousel images, then adds to posting queue.
     """
+    import content_catalog
+
     if count < 1 or count > 20:
         print(f"[ERROR] Count must be 1-20, got {count}")
         sys.exit(1)
@@ -995,6 +966,9 @@ def cmd_generate(count: int):
         if not slide_paths:
             print(f"  [WARN] Carousel generation failed. Adding to queue anyway.")
             failed.append({"content_id": content_id, "category": category, "reason": "Carousel generation failed (queued)"})
+        else:
+            content_catalog.record(slide_dir, "generated", content_id=content_id,
+                                   batch=batch_name, json_path=json_path)
 
         # Step 4: Add to queue
         next_id = get_next_queue_id(queue)
@@ -1008,6 +982,8 @@ def cmd_generate(count: int):
             "hashtags": content_data.get("hashtags", []),
             "cta_type": cta_type,
             "content_type": CATEGORY_TO_CONTENT_TYPE.get(category, "aruaru"),
+            "hook_pattern": content_data.get("hook_pattern"),
+            "template_id": content_data.get("template_id"),
             "status": "pending",
             "video_path": None,
             "posted_at": None,
@@ -1118,6 +1094,7 @@ def _generate_content_with_ai(
 
     # ロビー君キャラクターシステムが利用可能な場合、追加コンテキストを注入
     robby_context = ""
+    hook_pattern = None
     if ROBBY_LOADED:
         hook_pattern = pick_hook_pattern(category)
         cta_template = pick_cta(cta_type)
@@ -1237,7 +1214,7 @@ JSON形式のみ出力。マークダウン記法、コードフェンス、説
             print(f"  [RETRY] Attempt {attempt + 1}/2")
 
         print(f"  [AI] Calling Cloudflare Workers AI...")
-        result = call_cloudflare_ai(prompt, SYSTEM_PROMPT, max_tokens=2000, temperature=0.75)
+        result = call_cloudflare_ai(prompt, get_system_prompt(), max_tokens=2000, temperature=0.75)
 
         if not result:
             print(f"  [WARN] AI returned no result (attempt {attempt + 1})")
@@ -1263,6 +1240,11 @@ JSON形式のみ出力。マークダウン記法、コードフェンス、説
             data["id"] = content_id
             data["category"] = category
             data["cta_type"] = cta_type
+            if hook_pattern:
+                data["hook_pattern"] = hook_pattern.get("id")
+            if template:
+                # 実績ウェイト（template_selector.performance_weights）の集計キー
+                data["template_id"] = template["id"]
 
             # ロビー君の口調バリデーション
             if ROBBY_LOADED:
@@ -1338,6 +1320,8 @@ def _generate_carousel_slides(content_data: dict, output_dir: str) -> Optional[L
     with open(temp_json, "w", encoding="utf-8") as f:
         json.dump(content_data, f, ensure_ascii=False, indent=2)
 
+    import subprocess
+
     try:
         print(f"  [CAROUSEL] Generating slides...")
         result = subprocess.run(
@@ -1473,7 +1457,7 @@ def cmd_review():
   "suggestion": "改善提案（1文）"
 }}"""
 
-        result = call_cloudflare_ai(prompt, SYSTEM_PROMPT, max_tokens=500, temperature=0.3)
+        result = call_cloudflare_ai(prompt, get_system_prompt(), max_tokens=500, temperature=0.3)
 
         if result:
             review_data = _parse_json_from_text(result)
@@ -1534,6 +1518,9 @@ def cmd_schedule():
     Pick next pending posts from queue, prepare them for posting.
     Sets optimal posting times and creates content/ready/ directory.
     """
+    import blob_store
+    import content_catalog
+
     print("=" * 60)
     print(f"[SCHEDULE] Content Scheduling - {timestamp_str()}")
     print("=" * 60)
@@ -1571,13 +1558,12 @@ def cmd_schedule():
         ready_subdir = READY_DIR / ready_name
         ready_subdir.mkdir(parents=True, exist_ok=True)
 
-        # Copy slides if they exist
+        # Link slides from the blob store (identical PNGs are stored once)
         slide_dir = PROJECT_DIR / post.get("slide_dir", "")
         slides_copied = 0
         if slide_dir.exists():
             for png in sorted(slide_dir.glob("*.png")):
-                dest = ready_subdir / png.name
-                shutil.copy2(str(png), str(dest))
+                blob_store.install(png, ready_subdir / png.name)
                 slides_copied += 1
 
         # Write caption.txt
@@ -1601,6 +1587,7 @@ def cmd_schedule():
         }
         with open(ready_subdir / "schedule.json", "w", encoding="utf-8") as f:
             json.dump(meta, f, ensure_ascii=False, indent=2)
+        content_catalog.record(ready_subdir, "ready", content_id=content_id, post_id=post_id)
 
         # Update queue
         post["status"] = "ready"
@@ -1866,6 +1853,8 @@ def cmd_feedback_loop():
     4. Generate content with adjusted ratios
     """
     global MIX_RATIOS
+    import subprocess
+    from post_analytics import PostFrame
 
     print("=" * 60)
     print(f"[FEEDBACK] Performance-Based Content Loop - {timestamp_str()}")
@@ -1890,44 +1879,24 @@ def cmd_feedback_loop():
     if len(posted) < 5:
         print(f"  Only {len(posted)} posted. Need 5+ for meaningful analysis. Using default MIX.")
     else:
-        category_stats = {}
-        for post in posted:
-            cat = post.get("content_type", "aruaru")
-            # Map back to Japanese category names
-            cat_name = None
-            for jp, en in CATEGORY_TO_CONTENT_TYPE.items():
-                if en == cat:
-                    cat_name = jp
-                    break
-            if not cat_name:
-                cat_name = "あるある"
-
-            perf = post.get("performance", {})
-            views = perf.get("views") if isinstance(perf, dict) else None
-            saves = perf.get("saves") if isinstance(perf, dict) else None
-
-            if cat_name not in category_stats:
-                category_stats[cat_name] = {"count": 0, "total_views": 0, "total_saves": 0, "has_data": 0}
-
-            category_stats[cat_name]["count"] += 1
-            if views is not None:
-                category_stats[cat_name]["total_views"] += views
-                category_stats[cat_name]["has_data"] += 1
-            if saves is not None:
-                category_stats[cat_name]["total_saves"] += saves
+        frame = PostFrame.from_queue(
+            queue, category_map={en: jp for jp, en in CATEGORY_TO_CONTENT_TYPE.items()},
+        )
+        stats = frame.analyze(dims=("category",), rows=frame.mask_status("posted"))
 
         # Calculate average performance per category
         adjustments = {}
         total_avg_views = 0
         cats_with_data = 0
 
-        for cat, stats in category_stats.items():
-            if stats["has_data"] > 0:
-                avg_views = stats["total_views"] / stats["has_data"]
+        for cat, cat_stats in stats["by"]["category"].items():
+            if cat_stats["with_data"] > 0:
+                avg_views = cat_stats["total_views"] / cat_stats["with_data"]
                 total_avg_views += avg_views
                 cats_with_data += 1
                 adjustments[cat] = avg_views
-                print(f"  {cat}: {stats['has_data']} posts with data, avg views={avg_views:.0f}")
+                print(f"  {cat}: {cat_stats['with_data']} posts with data, avg views={avg_views:.0f}, "
+                      f"save rate={cat_stats['save_rate']}%")
 
         # Adjust MIX_RATIOS: boost categories with above-average performance
         if cats_with_data >= 2 and total_avg_views > 0:
@@ -2010,10 +1979,8 @@ def cmd_calendar():
     schedule_idx = 0
 
     # Load posting schedule if exists
-    schedule_file = PROJECT_DIR / "data" / "posting_schedule.json"
-    if schedule_file.exists():
-        with open(schedule_file, encoding="utf-8") as f:
-            schedule_data = json.load(f)
+    schedule_data = posting_schedule()
+    if schedule_data:
         day_times = schedule_data.get("schedule", {})
     else:
         day_times = {"Mon": "17:30", "Tue": "12:00", "Wed": "21:00",
@@ -2077,6 +2044,85 @@ def cmd_calendar():
 # Main CLI
 # ============================================================
 
+# ============================================================
+# Startup Benchmark (--bench-startup)
+# ============================================================
+
+# 起動コストの予算。--status など生成しないコマンドのコールドスタートが
+# これを超えたら失敗扱いにする。重い依存（requests, PIL, generate_carousel.py）や
+# データファイル（テンプレート・プロンプト）は使う関数の中でだけ読み込むこと。
+STARTUP_IMPORT_BUDGET_MS = 60
+STATUS_BUDGET_MS = 250
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """-X importtime の出力を (モジュール名, self_us, cumulative_us) のリストにする"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # ヘッダー行
+        rows.append((parts[2].rstrip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def bench_startup(runs: int = 5, import_budget_ms: float = STARTUP_IMPORT_BUDGET_MS,
+                  status_budget_ms: float = STATUS_BUDGET_MS) -> bool:
+    """import と --status のコールドスタート時間を計測し、予算内なら True
+
+    それぞれ別プロセスで runs 回実行し最小値を採る（ノイズ除去）。
+    """
+    import subprocess
+
+    script = Path(__file__).resolve()
+    # 本番（cron）と同じく .pyc キャッシュありで測る
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    import_ms = []
+    slowest = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import ai_content_engine"],
+            capture_output=True, text=True, cwd=str(script.parent), env=env, timeout=60,
+        )
+        rows = _parse_importtime(result.stderr)
+        total = next((cum for name, _, cum in rows if name.strip() == "ai_content_engine"), None)
+        if result.returncode != 0 or total is None:
+            print(f"[BENCH] import failed:\n{result.stderr[-500:]}")
+            return False
+        if not import_ms or total / 1000 < min(import_ms):
+            slowest = sorted(rows, key=lambda r: -r[1])[:8]
+        import_ms.append(total / 1000)
+
+    status_ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(script), "--status"],
+            capture_output=True, text=True, env=env, timeout=60,
+        )
+        status_ms.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            print(f"[BENCH] --status failed:\n{result.stderr[-500:]}")
+            return False
+
+    import_best, status_best = min(import_ms), min(status_ms)
+    import_ok = import_best <= import_budget_ms
+    status_ok = status_best <= status_budget_ms
+    print("=" * 60)
+    print(f"[BENCH] Startup benchmark ({runs} runs, best)")
+    print("=" * 60)
+    print(f"  import ai_content_engine: {import_best:7.1f} ms "
+          f"(budget {import_budget_ms:.0f} ms) {'OK' if import_ok else 'OVER BUDGET'}")
+    print(f"  --status (wall clock):    {status_best:7.1f} ms "
+          f"(budget {status_budget_ms:.0f} ms) {'OK' if status_ok else 'OVER BUDGET'}")
+    print("\n  Slowest imports (self time):")
+    for name, self_us, cum_us in slowest:
+        print(f"    {self_us / 1000:6.2f} ms  (cum {cum_us / 1000:6.2f} ms)  {name.strip()}")
+    return import_ok and status_ok
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="AI Content Engine for Nurse Robby (Cloudflare Workers AI)",
@@ -2091,6 +2137,7 @@ Examples:
   %(prog)s --review            Quality-check all pending content
   %(prog)s --schedule          Schedule and prepare next posts
   %(prog)s --status            Show engine status
+  %(prog)s --bench-startup     Check cold-start time against budget
 
 Cost: Cloudflare Workers AI is FREE (10,000 neurons/day).
         """,
@@ -2112,9 +2159,14 @@ Cost: Cloudflare Workers AI is FREE (10,000 neurons/day).
                         help="Schedule and prepare posts for upload")
     parser.add_argument("--status", action="store_true",
                         help="Show engine status")
+    parser.add_argument("--bench-startup", action="store_true",
+                        help="Benchmark import/--status cold start; exit 1 if over budget")
 
     args = parser.parse_args()
 
+    if args.bench_startup:
+        sys.exit(0 if bench_startup() else 1)
+
     # Load environment
     load_env()
 
@@ -6,6 +6,7 @@ ROBBY THE MATCH パフォーマンス分析スクリプト
 使い方:
   python3 analyze_performance.py --analyze    # 全分析実行 + agent_state更新
   python3 analyze_performance.py --summary    # サマリ表示のみ
+  python3 analyze_performance.py --verify     # 差分集計を全件再計算と照合
 """
 
 import argparse
@@ -15,6 +16,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from kpi_store import open_store
+from post_analytics import DIMENSIONS, IncrementalAggregates, PostFrame
+
 PROJECT_DIR = Path(__file__).parent.parent
 QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 KPI_LOG = PROJECT_DIR / "data" / "kpi_log.csv"
@@ -31,14 +35,8 @@ def load_queue():
 
 
 def load_kpi_log():
-    if not KPI_LOG.exists():
-        return []
-    rows = []
-    with open(KPI_LOG) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
-    return rows
+    """KPIストアを開く（初回はkpi_log.csvから移行）"""
+    return open_store(csv_path=KPI_LOG)
 
 
 def load_stock():
@@ -52,15 +50,21 @@ def load_stock():
     return rows
 
 
-def analyze_content_performance(queue):
-    """投稿パフォーマンスを分析"""
-    posted = [p for p in queue["posts"] if p["status"] == "posted"]
-    if not posted:
+def analyze_content_performance(queue, aggregates=None):
+    """投稿パフォーマンスを分析
+
+    aggregates (IncrementalAggregates) を渡すと、全件集計の代わりに
+    フォールド済みの累積値から結果を組み立てる。
+    """
+    frame = PostFrame.from_queue(queue)
+    posted = frame.mask_status("posted")
+    n_posted = sum(posted)
+    if not n_posted:
         return {"total_posted": 0, "message": "投稿データなし"}
 
     results = {
-        "total_posted": len(posted),
-        "verified": sum(1 for p in posted if p.get("verified")),
+        "total_posted": n_posted,
+        "verified": sum(v for v, p in zip(frame.verified, posted) if p),
         "by_category": {},
         "by_cta_type": {},
         "best_performing": [],
@@ -70,80 +74,77 @@ def analyze_content_performance(queue):
         "avg_saves": 0,
     }
 
-    # パフォーマンスデータがある投稿を集計
-    with_data = []
-    for p in posted:
-        perf = p.get("performance", {})
-        views = perf.get("views")
-        if views is not None and views > 0:
-            with_data.append({
-                "content_id": p.get("content_id", "unknown"),
-                "caption": p.get("caption", "")[:50],
-                "views": views,
-                "likes": perf.get("likes", 0) or 0,
-                "saves": perf.get("saves", 0) or 0,
-                "comments": perf.get("comments", 0) or 0,
-                "cta_type": p.get("cta_type", "soft"),
-                "posted_at": p.get("posted_at", ""),
-            })
-
-    if with_data:
-        # ソート（views降順）
-        with_data.sort(key=lambda x: x["views"], reverse=True)
-        results["best_performing"] = with_data[:3]
-        results["worst_performing"] = with_data[-3:]
-
-        total_views = sum(d["views"] for d in with_data)
-        total_likes = sum(d["likes"] for d in with_data)
-        total_saves = sum(d["saves"] for d in with_data)
-        n = len(with_data)
-
-        results["avg_views"] = round(total_views / n)
-        results["avg_likes"] = round(total_likes / n)
-        results["avg_saves"] = round(total_saves / n)
+    # パフォーマンスデータがある投稿（views > 0）を1パスで集計
+    if aggregates is not None:
+        stats = aggregates.result()
+        ranked = aggregates.ranked_records()  # views降順
+    else:
+        with_data = frame.mask_has_views(min_views=1, base=posted)
+        stats = frame.analyze(rows=with_data, data_rows=with_data)
+        ranks = frame.percentile_ranks("views", rows=with_data)
+        order = frame.top("views", k=len(frame), rows=with_data)
+        ranked = [frame.record(i, ranks) for i in order]
+
+    if stats["with_data"]:
+        results["best_performing"] = ranked[:3]
+        results["worst_performing"] = ranked[-3:]
+
+        n = stats["with_data"]
+        results["avg_views"] = stats["avg_views"]
+        results["avg_likes"] = round(stats["total_likes"] / n)
+        results["avg_saves"] = round(stats["total_saves"] / n)
 
         # Save rate（保存率 = TikTokアルゴリズムの重要指標）
-        if total_views > 0:
-            results["save_rate"] = round(total_saves / total_views * 100, 2)
-            results["like_rate"] = round(total_likes / total_views * 100, 2)
-
-        # CTA種別分析
-        for d in with_data:
-            cta = d["cta_type"]
-            if cta not in results["by_cta_type"]:
-                results["by_cta_type"][cta] = {"count": 0, "total_views": 0}
-            results["by_cta_type"][cta]["count"] += 1
-            results["by_cta_type"][cta]["total_views"] += d["views"]
+        if stats["total_views"] > 0:
+            results["save_rate"] = stats["save_rate"]
+            results["like_rate"] = stats["like_rate"]
+
+        # ディメンション別分析（カテゴリ / CTA / フック / 曜日 / 時間帯）
+        for dim in DIMENSIONS:
+            results[f"by_{dim}"] = {
+                key: {
+                    "count": b["count"],
+                    "total_views": b["total_views"],
+                    "avg_views": b["avg_views"],
+                    "save_rate": b["save_rate"],
+                    "like_rate": b["like_rate"],
+                }
+                for key, b in stats["by"][dim].items()
+            }
     else:
         results["message"] = "パフォーマンスデータ未収集（tiktok_analytics.py --updateで収集）"
 
     return results
 
 
-def analyze_kpi_trend(kpi_rows):
-    """KPIトレンド分析"""
-    if len(kpi_rows) < 2:
-        return {"trend": "データ不足", "days": len(kpi_rows)}
+def analyze_kpi_trend(kpi_store):
+    """KPIトレンド分析（前日比 + 7日/28日変化）"""
+    trend = kpi_store.trend()
+    days = trend.get("days", 0)
+    if days < 2:
+        return {"trend": "データ不足", "days": days}
 
-    latest = kpi_rows[-1]
-    prev = kpi_rows[-2]
+    current = trend["current"]
+    change = trend["change"]
 
-    def diff(key):
-        try:
-            return int(latest.get(key, 0) or 0) - int(prev.get(key, 0) or 0)
-        except (ValueError, TypeError):
-            return 0
+    def diff(key, window=1):
+        return change[window].get(key) or 0
 
-    return {
-        "latest_date": latest.get("date", ""),
+    result = {
+        "latest_date": trend["latest_date"],
         "followers_change": diff("tiktok_followers"),
         "videos_change": diff("tiktok_videos"),
         "views_change": diff("tiktok_total_views"),
         "likes_change": diff("tiktok_total_likes"),
-        "current_followers": int(latest.get("tiktok_followers", 0) or 0),
-        "current_videos": int(latest.get("tiktok_videos", 0) or 0),
-        "days_tracked": len(kpi_rows),
+        "current_followers": current["tiktok_followers"],
+        "current_videos": current["tiktok_videos"],
+        "days_tracked": days,
     }
+    # 週次/4週の変化（基準日がない場合はNone）
+    for window in (7, 28):
+        result[f"followers_change_{window}d"] = change[window].get("tiktok_followers")
+        result[f"views_change_{window}d"] = change[window].get("tiktok_total_views")
+    return result
 
 
 def analyze_content_mix(stock_rows):
@@ -156,16 +157,12 @@ def analyze_content_mix(stock_rows):
         "トレンド": 10,
     }
 
-    actual = {}
-    posted_count = 0
-    for row in stock_rows:
-        cat = row.get("category", "other")
-        if cat not in actual:
-            actual[cat] = {"total": 0, "posted": 0}
-        actual[cat]["total"] += 1
-        if row.get("status") == "posted":
-            actual[cat]["posted"] += 1
-            posted_count += 1
+    stats = PostFrame.from_stock(stock_rows).analyze(dims=("category",))
+    actual = {
+        cat: {"total": b["count"], "posted": b["posted"]}
+        for cat, b in stats["by"]["category"].items()
+    }
+    posted_count = stats["posted"]
 
     mix_analysis = {}
     for cat, target_pct in target_mix.items():
@@ -228,6 +225,7 @@ def update_agent_memory(analysis):
 
     # content_creatorのメモリ更新
     memory = state.setdefault("agentMemory", {})
+    before = json.loads(json.dumps(memory))
     cc = memory.get("content_creator", {})
 
     content_perf = analysis.get("content_performance", {})
@@ -273,6 +271,10 @@ def update_agent_memory(analysis):
     sp["lastAnalysisDate"] = datetime.now().strftime("%Y-%m-%d")
     memory["sns_poster"] = sp
 
+    if memory == before:
+        print("[INFO] agent_state.json agentMemory 変更なし")
+        return
+
     state["agentMemory"] = memory
 
     with open(AGENT_STATE, "w") as f:
@@ -286,11 +288,20 @@ def run_analysis():
     print("=== ROBBY THE MATCH パフォーマンス分析 ===\n")
 
     queue = load_queue()
-    kpi_rows = load_kpi_log()
+    kpi_store = load_kpi_log()
     stock_rows = load_stock()
 
-    content_perf = analyze_content_performance(queue)
-    kpi_trend = analyze_kpi_trend(kpi_rows)
+    # 前回以降に変化した投稿だけを累積集計に反映
+    aggregates = IncrementalAggregates.load()
+    changed = aggregates.fold(PostFrame.from_queue(queue), queue.get("updated"))
+    if changed < 0:
+        print("[INFO] 投稿データ変更なし（前回の集計を再利用）")
+    else:
+        print(f"[INFO] 投稿データ差分反映: {changed}件")
+        aggregates.save()
+
+    content_perf = analyze_content_performance(queue, aggregates)
+    kpi_trend = analyze_kpi_trend(kpi_store)
     content_mix = analyze_content_mix(stock_rows)
     recommendations = generate_recommendations(content_perf, kpi_trend, content_mix)
 
@@ -337,6 +348,10 @@ def print_summary(analysis=None):
     print(f"\n--- KPIトレンド ---")
     print(f"  フォロワー: {kpi.get('current_followers', 0)} / 動画数: {kpi.get('current_videos', 0)}")
     print(f"  トラッキング日数: {kpi.get('days_tracked', 0)}")
+    for window in (7, 28):
+        change = kpi.get(f"followers_change_{window}d")
+        if change is not None:
+            print(f"  {window}日変化: フォロワー {change:+d} / 再生 {kpi.get(f'views_change_{window}d', 0):+d}")
 
     print(f"\n--- コンテンツMIX ---")
     print(f"  在庫: {mix['total_stock']}本 / 投稿済み: {mix['total_posted']}本")
@@ -353,9 +368,22 @@ def main():
     parser = argparse.ArgumentParser(description="パフォーマンス分析")
     parser.add_argument("--analyze", action="store_true", help="全分析実行")
     parser.add_argument("--summary", action="store_true", help="サマリ表示")
+    parser.add_argument("--verify", action="store_true", help="差分集計の整合性チェック")
     args = parser.parse_args()
 
-    if args.analyze:
+    if args.verify:
+        queue = load_queue()
+        frame = PostFrame.from_queue(queue)
+        aggregates = IncrementalAggregates.load()
+        aggregates.fold(frame, queue.get("updated"))
+        problems = aggregates.verify(frame)
+        if problems:
+            print(f"[NG] 差分集計と全件再計算が不一致 ({len(problems)}件)")
+            for p in problems:
+                print(f"  {p}")
+            sys.exit(1)
+        print("[OK] 差分集計は全件再計算と一致")
+    elif args.analyze:
         analysis = run_analysis()
         print_summary(analysis)
     elif args.summary:
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+areas_db.py - エリア・医療機関データベース（data/areas.json ⇄ data/areas.js）
+
+data/areas.json を正本とし、ブラウザ/Node.js 用の data/areas.js はそこから生成する。
+
+- areas.json: {"medicalRegions": [...], "areas": [{areaId, ..., majorFacilities: [...]}, ...]}
+  （キー順がそのまま areas.js の出力順になる）
+- areas.js の生成はエリア単位の断片をキャッシュし、内容が変わったエリアだけ再生成する
+- 既存の areas.js からの取り込み（--import）は js_data のパーサを使う
+
+Usage:
+    python3 scripts/areas_db.py --import   # areas.js → areas.json
+    python3 scripts/areas_db.py --build    # areas.json → areas.js
+    python3 scripts/areas_db.py --check    # areas.json と areas.js の一致を確認
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from js_data import parse_js_consts
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+AREAS_JS = PROJECT_DIR / "data" / "areas.js"
+AREAS_JSON = PROJECT_DIR / "data" / "areas.json"
+CACHE_DIR = PROJECT_DIR / "data" / ".cache"
+FRAGMENT_CACHE = CACHE_DIR / "areas_fragments.pkl"
+
+FRAGMENT_VERSION = 1
+
+
+# =============================================================================
+# areas.json の読み書き
+# =============================================================================
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def import_js(path=AREAS_JS) -> dict:
+    """既存の areas.js から DB 構造を作る"""
+    consts = parse_js_consts(Path(path).read_text(encoding="utf-8"),
+                             "MEDICAL_REGIONS", "AREA_DATABASE")
+    return {"medicalRegions": consts["MEDICAL_REGIONS"], "areas": consts["AREA_DATABASE"]}
+
+
+def load(path=AREAS_JSON) -> dict:
+    """areas.json を読む（まだ無ければ areas.js から取り込む）"""
+    path = Path(path)
+    if not path.exists():
+        return import_js()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def area_digest(area) -> str:
+    return hashlib.sha1(json.dumps(area, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def changed_areas(old, new) -> list:
+    """2つの DB で内容が異なるエリアID（追加・削除を含む）"""
+    before = {a["areaId"]: area_digest(a) for a in (old or {}).get("areas", [])}
+    after = {a["areaId"]: area_digest(a) for a in new.get("areas", [])}
+    ids = [aid for aid, h in after.items() if before.get(aid) != h]
+    ids += [aid for aid in before if aid not in after]
+    return ids
+
+
+def save(db, path=AREAS_JSON) -> list:
+    """areas.json を書き、前回から変わったエリアIDを返す"""
+    path = Path(path)
+    old = None
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            old = json.load(f)
+    changed = changed_areas(old, db)
+    if old is None or changed or old.get("medicalRegions") != db.get("medicalRegions"):
+        text = json.dumps(db, ensure_ascii=False, indent=2) + "\n"
+        _atomic_write(path, text.encode("utf-8"))
+    return changed
+
+
+def areas_by_id(db) -> dict:
+    return {a["areaId"]: a for a in db.get("areas", [])}
+
+
+# =============================================================================
+# areas.js の生成
+# =============================================================================
+
+HEADER = """\
+// ========================================
+// ナースロビー - エリア・医療機関データベース
+// 神奈川県西部10エリア 実データ（病床機能報告R5 + 医療情報ネット 2025.12）
+// 自動生成: 2026-02-25 merge_and_update_areas.py
+// ========================================
+
+// ==========================================
+// 医療圏マスターデータ（神奈川県二次保健医療圏）
+// ==========================================
+"""
+
+FOOTER = """\
+// ==========================================
+// エリア検索ヘルパー
+// ==========================================
+function findAreaByName(name) {
+  if (!name) return null;
+  return AREA_DATABASE.find(a =>
+    a.name.includes(name) || name.includes(a.name) ||
+    a.areaId === name.toLowerCase()
+  );
+}
+
+// 施設検索ヘルパー
+function findFacilitiesByArea(areaName) {
+  const area = findAreaByName(areaName);
+  return area ? area.majorFacilities : [];
+}
+
+// 全施設数サマリ
+function getDatabaseSummary() {
+  let totalFacilities = 0;
+  let totalBeds = 0;
+  let totalNurses = 0;
+  for (const area of AREA_DATABASE) {
+    totalFacilities += area.majorFacilities.length;
+    for (const f of area.majorFacilities) {
+      totalBeds += f.beds || 0;
+      totalNurses += f.nurseCount || 0;
+    }
+  }
+  return { areas: AREA_DATABASE.length, facilities: totalFacilities, beds: totalBeds, nurses: totalNurses };
+}
+
+// ==========================================
+// 医療圏ベース検索ヘルパー
+// ==========================================
+
+// 医療圏IDからエリア配列を返す
+function findAreasByRegion(regionId) {
+  const region = MEDICAL_REGIONS.find(r => r.regionId === regionId);
+  if (!region) return [];
+  return AREA_DATABASE.filter(a => region.areaIds.includes(a.areaId));
+}
+
+// 医療圏IDから施設配列をフラットに返す
+function findFacilitiesByRegion(regionId) {
+  const areas = findAreasByRegion(regionId);
+  const facilities = [];
+  for (const area of areas) {
+    for (const f of area.majorFacilities) {
+      facilities.push({ ...f, areaId: area.areaId, areaName: area.name });
+    }
+  }
+  return facilities;
+}
+
+// 全施設をフラット配列で返す（エリア情報付き）
+function getAllFacilities() {
+  const facilities = [];
+  for (const area of AREA_DATABASE) {
+    for (const f of area.majorFacilities) {
+      facilities.push({ ...f, areaId: area.areaId, areaName: area.name, medicalRegion: area.medicalRegion });
+    }
+  }
+  return facilities;
+}
+
+// ブラウザ・Node.js両対応エクスポート
+if (typeof module !== "undefined" && module.exports) {
+  module.exports = {
+    MEDICAL_REGIONS,
+    AREA_DATABASE,
+    findAreaByName,
+    findFacilitiesByArea,
+    getDatabaseSummary,
+    findAreasByRegion,
+    findFacilitiesByRegion,
+    getAllFacilities,
+  };
+}
+"""
+
+
+def js_str(s):
+    """Python文字列 → JS文字列リテラル"""
+    if s is None:
+        return "null"
+    return '"' + str(s).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def js_value(v):
+    """1行に収まる JS リテラル"""
+    if v is None:
+        return "null"
+    if v is True:
+        return "true"
+    if v is False:
+        return "false"
+    if isinstance(v, str):
+        return js_str(v)
+    if isinstance(v, float):
+        return str(round(v, 6))
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, dict):
+        if not v:
+            return "{}"
+        return "{ " + ", ".join(f"{k}: {js_value(x)}" for k, x in v.items()) + " }"
+    if not v:
+        return "[]"
+    return "[" + ", ".join(js_value(x) for x in v) + "]"
+
+
+def format_facility(f, indent="      "):
+    i = indent + "  "
+    lines = [f"{indent}{{"]
+    lines.extend(f"{i}{k}: {js_value(v)}," for k, v in f.items())
+    lines.append(f"{indent}}},")
+    return "\n".join(lines)
+
+
+def format_area(area):
+    i = "    "
+    lines = ["  {"]
+    for k, v in area.items():
+        if k == "majorFacilities":
+            lines.append(f"{i}majorFacilities: [")
+            lines.extend(format_facility(f) for f in v)
+            lines.append(f"{i}],")
+        elif isinstance(v, list) and len(v) != 1:
+            lines.append(f"{i}{k}: [")
+            lines.extend(f"{i}  {js_value(x)}," for x in v)
+            lines.append(f"{i}],")
+        else:
+            lines.append(f"{i}{k}: {js_value(v)},")
+    lines.append("  },")
+    return "\n".join(lines)
+
+
+def format_region(region):
+    lines = ["  {"]
+    lines.extend(f"    {k}: {js_value(v)}," for k, v in region.items())
+    lines.append("  },")
+    return "\n".join(lines)
+
+
+def _load_fragments():
+    if FRAGMENT_CACHE.exists():
+        try:
+            with open(FRAGMENT_CACHE, "rb") as f:
+                cache = pickle.load(f)
+            if cache.get("version") == FRAGMENT_VERSION:
+                return cache["fragments"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            pass
+    return {}
+
+
+def render_js(db, fragments=None):
+    """DB → areas.js のテキスト。fragments（{digest: text}）があれば再利用する
+
+    戻り値: (text, 再生成したエリアIDのリスト)
+    """
+    fragments = {} if fragments is None else fragments
+    rendered = []
+    parts = [HEADER, "const MEDICAL_REGIONS = [\n"]
+    parts.extend(format_region(r) + "\n" for r in db.get("medicalRegions", []))
+    parts.append("];\n\nconst AREA_DATABASE = [\n")
+    for area in db.get("areas", []):
+        digest = area_digest(area)
+        text = fragments.get(digest)
+        if text is None:
+            text = fragments[digest] = format_area(area)
+            rendered.append(area["areaId"])
+        parts.append(text + "\n")
+    parts.append("];\n\n")
+    parts.append(FOOTER)
+    return "".join(parts), rendered
+
+
+def write_js(db, out=AREAS_JS, verbose=True) -> list:
+    """areas.js を生成（変化がなければ書かない）。再生成したエリアIDを返す"""
+    t0 = time.perf_counter()
+    cached = _load_fragments()
+    pool = dict(cached)
+    text, rendered = render_js(db, pool)
+
+    # 今の DB に無いエリアの断片は捨てる
+    fragments = {d: pool[d] for d in (area_digest(a) for a in db.get("areas", []))}
+    if fragments.keys() != cached.keys():
+        _atomic_write(FRAGMENT_CACHE, pickle.dumps(
+            {"version": FRAGMENT_VERSION, "fragments": fragments}, protocol=pickle.HIGHEST_PROTOCOL))
+
+    out = Path(out)
+    data = text.encode("utf-8")
+    if not out.exists() or out.read_bytes() != data:
+        _atomic_write(out, data)
+        written = True
+    else:
+        written = False
+    if verbose:
+        print(f"  areas.js: {len(rendered)}/{len(db.get('areas', []))} areas rendered, "
+              f"{'written' if written else 'unchanged'} ({(time.perf_counter() - t0) * 1000:.0f}ms)")
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="areas.json ⇄ areas.js")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--import", dest="import_js", action="store_true",
+                       help="areas.js を取り込んで areas.json を作る")
+    group.add_argument("--build", action="store_true", help="areas.json から areas.js を生成")
+    group.add_argument("--check", action="store_true", help="areas.json と areas.js の一致を確認")
+    args = parser.parse_args()
+
+    if args.import_js:
+        db = import_js()
+        changed = save(db)
+        n = sum(len(a.get("majorFacilities", [])) for a in db["areas"])
+        print(f"{AREAS_JSON}: {len(db['areas'])} areas, {n} facilities ({len(changed)} changed)")
+        text, _ = render_js(db)
+        if text != AREAS_JS.read_text(encoding="utf-8"):
+            print("WARNING: 再生成した areas.js が現行ファイルと一致しません（--build で整形されます）")
+    elif args.build:
+        write_js(load())
+    else:
+        text, _ = render_js(load())
+        if text != AREAS_JS.read_text(encoding="utf-8"):
+            print("areas.js は areas.json と一致しません（--build で再生成してください）")
+            sys.exit(1)
+        print("OK: areas.js は areas.json と一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,14 +28,19 @@ import argparse
 import json
 import os
 import random
-import subprocess
 import sys
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import content_catalog
+import renditions
+import slack_client
+from runtime_config import load_env
+
 # ============================================================
 # Constants
 # ============================================================
@@ -46,13 +51,15 @@ READY_DIR = PROJECT_DIR / "content" / "ready"
 TEMP_DIR = PROJECT_DIR / "content" / "temp_instagram"
 SESSION_FILE = PROJECT_DIR / "data" / ".instagram_session.json"
 POST_LOG_FILE = PROJECT_DIR / "data" / "post_log.json"
-ENV_FILE = PROJECT_DIR / ".env"
 
 # Randomized intervals for anti-detection
 POST_INTERVAL_MIN = 180   # 3 minutes minimum between posts
 POST_INTERVAL_MAX = 600   # 10 minutes maximum
 PLATFORM_INTERVAL = 30
 
+# Feed posts (carousel/single) are capped at 4:5 by Instagram: (PNG, JPEG) rendition names
+FEED_RENDITIONS = ("feed_4x5", "feed_4x5_jpeg")
+
 # Day-of-week content format schedule for Instagram
 # 0=Mon, 1=Tue, 2=Wed, 3=Thu, 4=Fri, 5=Sat, 6=Sun
 INSTAGRAM_FORMAT_SCHEDULE = {
@@ -112,27 +119,9 @@ def atomic_json_write(filepath, data, indent=2):
         raise
 
 
-def load_env():
-    """Load .env file."""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 def slack_notify(message: str):
-    """Send Slack notification."""
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception as e:
-        print(f"[WARN] Slack notify failed: {e}")
+    """Send Slack notification (coalesced via slack_client)."""
+    slack_client.notify(message)
 
 
 def load_post_log() -> List[Dict]:
@@ -153,10 +142,8 @@ def save_post_log(log: List[Dict]):
 
 
 def get_ready_dirs() -> List[Path]:
-    """Get all content/ready/ directories sorted by name."""
-    if not READY_DIR.exists():
-        return []
-    return sorted([d for d in READY_DIR.iterdir() if d.is_dir()])
+    """Get all content/ready/ directories sorted by name (from content_catalog)."""
+    return content_catalog.ready_dirs()
 
 
 def get_next_unposted(platform: str) -> Optional[Path]:
@@ -169,7 +156,7 @@ def get_next_unposted(platform: str) -> Optional[Path]:
     }
 
     for d in get_ready_dirs():
-        if d.name not in posted_dirs:
+        if d.name not in posted_dirs and d.is_dir():
             return d
     return None
 
@@ -281,32 +268,38 @@ def post_engagement(cl, media_id: str, dry_run: bool = False):
         pass  # Non-critical
 
 
-def convert_to_jpeg(png_paths: List[Path], humanize: bool = True) -> List[str]:
-    """Convert PNG slides to JPEG with optional humanization for anti-AI detection."""
+def convert_to_jpeg(png_paths: List[Path], humanize: bool = True, feed: bool = False) -> List[str]:
+    """Convert PNG slides to JPEG with optional humanization for anti-AI detection.
+
+    Slides are processed in parallel. Plain conversions come from the rendition
+    cache next to each master (renditions.py); humanized copies are randomized
+    per post, so they are always rendered fresh into TEMP_DIR.
+    feed=True uses the 4:5 centre crop (FEED_RENDITIONS), the tallest aspect
+    the Instagram feed accepts; stories keep the 9:16 master.
+    """
+    png_name, jpeg_name = FEED_RENDITIONS if feed else (None, "jpeg")
+    if not humanize:
+        return [str(r[jpeg_name]) for r in renditions.render_many(png_paths, [jpeg_name])]
+    if png_name:
+        png_paths = [r[png_name] for r in renditions.render_many(png_paths, [png_name])]
+
     TEMP_DIR.mkdir(exist_ok=True)
-    jpeg_paths = []
 
-    for png in png_paths:
+    def _humanize(png: Path) -> str:
         jpeg_path = TEMP_DIR / png.name.replace(".png", ".jpg")
-
-        if humanize:
-            try:
-                from image_humanizer import humanize_image
-                info = humanize_image(str(png), str(jpeg_path), intensity="medium")
-                print(f"  [HUM] {png.name}: noise={info['noise_sigma']}, exif={info['exif_injected']}")
-            except ImportError:
-                print("[WARN] image_humanizer not available, using basic conversion")
-                from PIL import Image
-                img = Image.open(png).convert("RGB")
-                img.save(str(jpeg_path), "JPEG", quality=random.randint(89, 93))
-        else:
+        try:
+            from image_humanizer import humanize_image
+            info = humanize_image(str(png), str(jpeg_path), intensity="medium")
+            print(f"  [HUM] {png.name}: noise={info['noise_sigma']}, exif={info['exif_injected']}")
+        except ImportError:
+            print("[WARN] image_humanizer not available, using basic conversion")
             from PIL import Image
             img = Image.open(png).convert("RGB")
-            img.save(str(jpeg_path), "JPEG", quality=95)
-
-        jpeg_paths.append(str(jpeg_path))
+            img.save(str(jpeg_path), "JPEG", quality=random.randint(89, 93))
+        return str(jpeg_path)
 
-    return jpeg_paths
+    with ThreadPoolExecutor(max_workers=renditions.WORKERS) as pool:
+        return list(pool.map(_humanize, png_paths))
 
 
 def post_to_instagram(content_dir: Path, dry_run: bool = False,
@@ -344,8 +337,8 @@ def post_to_instagram(content_dir: Path, dry_run: bool = False,
         # Pre-posting warm-up (anti-bot)
         warm_up_session(cl, dry_run)
 
-        # Humanize images
-        jpeg_paths = convert_to_jpeg(slides, humanize=True)
+        # Humanize images (feed posts use the 4:5 rendition, stories the 9:16 master)
+        jpeg_paths = convert_to_jpeg(slides, humanize=True, feed=post_format != "story")
 
         # Upload based on format
         media = None
@@ -403,7 +396,7 @@ def post_to_instagram(content_dir: Path, dry_run: bool = False,
             time.sleep(wait_time)
             try:
                 cl = instagram_login()
-                jpeg_paths = convert_to_jpeg(slides, humanize=True)
+                jpeg_paths = convert_to_jpeg(slides, humanize=True, feed=True)
                 media = cl.album_upload(paths=jpeg_paths, caption=full_caption)
                 url = f"https://www.instagram.com/p/{media.code}/"
                 print(f"[IG] RETRY SUCCESS: {url}")
@@ -496,6 +489,8 @@ def post_next(platforms: List[str], dry_run: bool = False,
         }
         log.append(entry)
         results.append(entry)
+        if result.get("status") == "success":
+            content_catalog.mark_posted(content_dir, platform)
 
         # Randomized wait between platforms (anti-detection)
         if len(platforms) > 1:
@@ -542,6 +537,8 @@ def retry_failed(dry_run: bool = False) -> List[Dict]:
         }
         log.append(new_entry)
         results.append(new_entry)
+        if result.get("status") == "success":
+            content_catalog.mark_posted(content_dir, platform)
         time.sleep(POST_INTERVAL)
 
     save_post_log(log)
@@ -559,6 +556,7 @@ def mark_posted(dir_name: str, platform: str):
         "manual": True,
     })
     save_post_log(log)
+    content_catalog.mark_posted(READY_DIR / dir_name, platform)
     print(f"Marked {dir_name} as posted on {platform}")
 
 
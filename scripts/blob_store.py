@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+コンテンツアドレス型ブロブストア — ナースロビー
+
+スライドPNGを SHA-256 をキーに content/.blobs/ へ1つだけ置き、
+content/ready（と任意で content/generated）の各ファイルはそこへのハードリンクにする。
+ハードリンクできない場合（別デバイス等）は reflink、それも無理ならコピーにフォールバック。
+ディスク使用量とバックアップ（rsync -H）の転送量はコピー数ではなくユニークな画像数で増える。
+
+  - install(src, dest): shutil.copy2 の代わり。dest をブロブへのリンクとして置く
+  - dedupe(roots):      既存ファイルをブロブへ寄せる（同一内容のコピーを1つに）
+  - 参照カウント:        content/.blobs/refs.json（パス → ダイジェスト）
+    install / dedupe は登録・リンク・参照の記録まで、gc は数えて消すまでを
+    同じロック（content/.blobs/.lock）の中で行う（作ったばかりのブロブを gc が消さない）
+  - prune_posted(days): 投稿済みで days 日経った ready セットを削除 → gc()
+  - gc():               参照が無くなったブロブを削除
+  - report():           du 形式の論理サイズ / 実サイズ
+
+注意: リンクされたファイルを上書きすると全コピーが変わる。
+画像の書き出しは一時ファイル + os.replace で行うこと（ブロブ側は読み取り専用にしてある）。
+
+使い方:
+  python3 blob_store.py --report
+  python3 blob_store.py --dedupe [--include-generated]
+  python3 blob_store.py --prune-posted 30     # 投稿後30日経ったreadyセットを削除
+  python3 blob_store.py --gc
+"""
+
+import argparse
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import content_catalog
+
+PROJECT_DIR = Path(__file__).parent.parent
+CONTENT_DIR = PROJECT_DIR / "content"
+BLOB_DIR = CONTENT_DIR / ".blobs"
+REFS_FILE = BLOB_DIR / "refs.json"
+LOCK_FILE = BLOB_DIR / ".lock"
+
+DEDUPE_ROOTS = [CONTENT_DIR / "ready"]
+BLOB_SUFFIXES = (".png", ".jpg", ".jpeg")
+RETENTION_DAYS = 30
+CHUNK_SIZE = 1 << 20
+
+# Linux の FICLONE ioctl（btrfs / XFS / APFS相当の reflink）
+FICLONE = 0x40049409
+
+
+# ===================================================================
+# ブロブ
+# ===================================================================
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def blob_path(digest: str, suffix: str = ".png") -> Path:
+    return BLOB_DIR / digest[:2] / f"{digest}{suffix.lower()}"
+
+
+def _rel(path) -> str:
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(PROJECT_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if dest.exists():
+            dest.unlink()
+        return False
+
+
+def _materialize(blob: Path, dest: Path) -> str:
+    """blob を dest に置く（hardlink → reflink → copy）。一時名で作って os.replace"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+    os.close(fd)
+    os.unlink(tmp)
+    tmp = Path(tmp)
+    try:
+        try:
+            os.link(blob, tmp)
+            method = "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            if _reflink(blob, tmp):
+                method = "reflink"
+            else:
+                shutil.copy2(blob, tmp)
+                os.chmod(tmp, 0o644)
+                method = "copy"
+        os.replace(tmp, dest)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return method
+
+
+def put(src) -> Path:
+    """src の内容をブロブとして登録し、ブロブのパスを返す（既にあれば何もしない）
+
+    参照は記録しないので、残したいブロブは install() で置くこと（次の gc() で消える）。
+    """
+    return _put(src)[0]
+
+
+def _put(src):
+    """(ブロブのパス, 新規に作ったか)"""
+    src = Path(src)
+    blob = blob_path(file_digest(src), src.suffix)
+    if blob.exists():
+        return blob, False
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=blob.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmp)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, blob)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return blob, True
+
+
+# ===================================================================
+# 参照マニフェスト
+# ===================================================================
+
+@contextmanager
+def _refs():
+    """プロセス間ロックを取り refs.json（相対パス → ダイジェスト）を読み書きする"""
+    BLOB_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(REFS_FILE, "r", encoding="utf-8") as f:
+                    refs = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                refs = {}
+            yield refs
+            fd, tmp = tempfile.mkstemp(dir=BLOB_DIR, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(refs, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, REFS_FILE)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def install(src, dest) -> str:
+    """src を dest に置く（shutil.copy2 の置き換え）。使った方式を返す"""
+    with _refs() as refs:
+        blob = put(src)
+        method = _materialize(blob, Path(dest))
+        refs[_rel(dest)] = blob.stem
+    return method
+
+
+def dedupe(roots: Iterable[Path] = DEDUPE_ROOTS) -> Dict[str, int]:
+    """roots 以下の画像をブロブへ寄せる。{"files", "linked", "saved_bytes"} を返す"""
+    files = linked = saved = 0
+    with _refs() as refs:
+        for root in roots:
+            for path in sorted(Path(root).rglob("*")):
+                if path.suffix.lower() not in BLOB_SUFFIXES or not path.is_file():
+                    continue
+                files += 1
+                blob, created = _put(path)
+                st, bst = path.stat(), blob.stat()
+                if created:
+                    saved -= bst.st_size
+                if (st.st_dev, st.st_ino) != (bst.st_dev, bst.st_ino):
+                    if _materialize(blob, path) != "copy":
+                        saved += st.st_size
+                    linked += 1
+                refs[_rel(path)] = blob.stem
+    return {"files": files, "linked": linked, "saved_bytes": saved}
+
+
+def _blob_for(digest: str) -> Optional[Path]:
+    matches = list((BLOB_DIR / digest[:2]).glob(f"{digest}.*"))
+    return matches[0] if matches else None
+
+
+def refcounts() -> Dict[str, int]:
+    """ダイジェスト → 生きている参照数（ファイルが消えた・差し替えられた参照は数えない）"""
+    with _refs() as refs:
+        return _count(refs)
+
+
+def _count(refs: Dict[str, str]) -> Dict[str, int]:
+    """refcounts の本体（要ロック）。死んだ参照は refs から外す"""
+    counts = {}
+    for rel, digest in list(refs.items()):
+        path = PROJECT_DIR / rel
+        blob = _blob_for(digest)
+        if blob is None or not _same_content(path, blob):
+            del refs[rel]
+            continue
+        counts[digest] = counts.get(digest, 0) + 1
+    return counts
+
+
+def _same_content(path: Path, blob: Path) -> bool:
+    try:
+        st, bst = path.stat(), blob.stat()
+    except OSError:
+        return False
+    if (st.st_dev, st.st_ino) == (bst.st_dev, bst.st_ino):
+        return True
+    # reflink / copy は内容で確認
+    return st.st_size == bst.st_size and file_digest(path) == blob.stem
+
+
+def gc() -> Dict[str, int]:
+    """参照が無いブロブを削除する。{"removed", "freed_bytes"} を返す"""
+    removed = freed = 0
+    with _refs() as refs:
+        counts = _count(refs)
+        for blob in BLOB_DIR.glob("??/*"):
+            if blob.suffix.lower() not in BLOB_SUFFIXES:
+                continue
+            if counts.get(blob.stem, 0) == 0:
+                freed += blob.stat().st_size
+                os.chmod(blob, stat.S_IWUSR | stat.S_IRUSR)
+                blob.unlink()
+                removed += 1
+    return {"removed": removed, "freed_bytes": freed}
+
+
+def prune_posted(days: int = RETENTION_DAYS) -> List[str]:
+    """投稿済みで days 日以上経った ready セットを削除し、gc する。削除したディレクトリを返す
+
+    posted_at の無い（記録前に投稿された）セットは残す。
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    removed = []
+    for record in content_catalog.sets("ready"):
+        posted_at = record.get("posted_at")
+        if record.get("status") != "posted" or not posted_at or posted_at > cutoff:
+            continue
+        path = PROJECT_DIR / record["dir"]
+        shutil.rmtree(path, ignore_errors=True)
+        content_catalog.record(path, "ready")
+        removed.append(record["dir"])
+    gc()
+    return removed
+
+
+# ===================================================================
+# du 形式レポート
+# ===================================================================
+
+def usage(root: Path) -> Dict[str, int]:
+    """root 以下の論理サイズ（ファイル毎の合計）と実サイズ（inode単位）"""
+    logical = physical = files = 0
+    seen = set()
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            files += 1
+            logical += st.st_size
+            key = (st.st_dev, st.st_ino)
+            if key not in seen:
+                seen.add(key)
+                physical += st.st_size
+    return {"files": files, "logical": logical, "physical": physical, "inodes": seen}
+
+
+def report() -> List[Dict]:
+    """content/ 直下ごとの論理サイズ / 実サイズ（ブロブとの共有分は除く）"""
+    blob_inodes = usage(BLOB_DIR)["inodes"] if BLOB_DIR.exists() else set()
+    rows = []
+    for root in sorted(p for p in CONTENT_DIR.iterdir() if p.is_dir()):
+        u = usage(root)
+        rows.append({
+            "path": _rel(root),
+            "files": u["files"],
+            "logical": u["logical"],
+            "physical": u["physical"],
+            "shared": len(u["inodes"] & blob_inodes) if root != BLOB_DIR else 0,
+        })
+    return rows
+
+
+def _human(n: float) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if n < 1024 or unit == "G":
+            return f"{n:.1f}{unit}" if unit != "B" else f"{int(n)}B"
+        n /= 1024
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="コンテンツアドレス型ブロブストア")
+    parser.add_argument("--report", action="store_true", help="du 形式で使用量を表示")
+    parser.add_argument("--dedupe", action="store_true", help="既存ファイルをブロブへ寄せる")
+    parser.add_argument("--include-generated", action="store_true",
+                        help="--dedupe で content/generated も対象にする")
+    parser.add_argument("--prune-posted", type=int, metavar="DAYS",
+                        help="投稿後 DAYS 日経った ready セットを削除")
+    parser.add_argument("--gc", action="store_true", help="参照の無いブロブを削除")
+    args = parser.parse_args()
+
+    if args.dedupe:
+        roots = list(DEDUPE_ROOTS)
+        if args.include_generated:
+            roots.append(CONTENT_DIR / "generated")
+        result = dedupe(roots)
+        print(f"dedupe: {result['files']}ファイル中 {result['linked']}件をリンク化 "
+              f"（{_human(result['saved_bytes'])} 削減）")
+    if args.prune_posted is not None:
+        removed = prune_posted(args.prune_posted)
+        print(f"prune: {len(removed)}セット削除")
+        for d in removed:
+            print(f"  {d}")
+    if args.gc:
+        result = gc()
+        print(f"gc: {result['removed']}ブロブ削除（{_human(result['freed_bytes'])}）")
+
+    if args.report or not (args.dedupe or args.gc or args.prune_posted is not None):
+        rows = report()
+        print(f"{'論理':>8s} {'実体':>8s} {'ファイル':>6s} {'共有':>5s}  パス")
+        for row in rows:
+            print(f"{_human(row['logical']):>8s} {_human(row['physical']):>8s} "
+                  f"{row['files']:6d} {row['shared']:5d}  {row['path']}")
+        total_logical = sum(r["logical"] for r in rows if r["path"] != _rel(BLOB_DIR))
+        all_inodes = usage(CONTENT_DIR)
+        print(f"{_human(total_logical):>8s} {_human(all_inodes['physical']):>8s} "
+              f"{all_inodes['files']:6d} {'':5s}  合計（論理は .blobs を除く。実体はリンク共有を1回だけ数える）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+コンテンツカタログ — ナースロビー
+
+content/generated と content/ready のコンテンツセットを data/content_catalog.json に記録し、
+投稿・レポート系スクリプトはディレクトリを歩かずにここを引く。
+
+  - 生成・準備する側（ai_content_engine / content_pipeline / sns_workflow）が
+    書き込み直後に record() で1セット分だけ登録する
+  - 参照は runtime_config のキャッシュ + メモリ上の索引で O(1)
+    （get(dir) / by_content_id(cid) / sets("ready")）
+  - 投稿する側（auto_post / tiktok_carousel）は mark_posted() でプラットフォームを記録
+  - 記録漏れ・手作業の変更は rescan()（os.scandir を並列）で作り直せる。
+    カタログが無い時、またはセットのディレクトリ（各ルート・バッチ・セット）の
+    mtime がカタログに記録した値から変わった時は、参照時に自動的に rescan する
+    （record() を通らない generate_carousel --queue / generate_slides / 手作業の追加も拾う。
+    確認は REVALIDATE_INTERVAL 秒に1回まで）
+
+1セットの項目:
+  dir, kind(generated|ready), content_id, batch, json_path, slides, images, bytes,
+  status(generated|ready|posted), posted[プラットフォーム], posted_at, created, updated_at
+
+使い方:
+  python3 content_catalog.py              # 集計を表示
+  python3 content_catalog.py --rescan     # 全ディレクトリを走査して作り直す
+  python3 content_catalog.py --list ready
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import runtime_config
+
+PROJECT_DIR = Path(__file__).parent.parent
+CONTENT_DIR = PROJECT_DIR / "content"
+GENERATED_DIR = CONTENT_DIR / "generated"
+READY_DIR = CONTENT_DIR / "ready"
+CATALOG_FILE = PROJECT_DIR / "data" / "content_catalog.json"
+LOCK_FILE = PROJECT_DIR / "data" / ".content_catalog.lock"
+
+KINDS = {"generated": GENERATED_DIR, "ready": READY_DIR}
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+# ready セットの content_id はこの順にメタデータから読む
+META_FILES = ("meta.json", "schedule.json")
+RESCAN_WORKERS = 8
+
+
+def _rel(path) -> str:
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(PROJECT_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+
+def _empty() -> Dict:
+    return {"version": 1, "updated": None, "sets": {}, "dirs": {}}
+
+
+def _subdirs(path: Path) -> List[Path]:
+    try:
+        with os.scandir(path) as it:
+            return sorted(Path(e.path) for e in it if e.is_dir())
+    except OSError:
+        return []
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def dir_stamps() -> Dict[str, int]:
+    """カタログの元になるディレクトリ（ルート・その直下・generated のバッチ配下）の mtime"""
+    stamps = {}
+    for kind, root in KINDS.items():
+        mtime = _mtime_ns(root)
+        if mtime is None:
+            continue
+        stamps[_rel(root)] = mtime
+        for top in _subdirs(root):
+            stamps[_rel(top)] = _mtime_ns(top)
+            if kind == "generated":
+                for sub in _subdirs(top):
+                    stamps[_rel(sub)] = _mtime_ns(sub)
+    return stamps
+
+
+# ===================================================================
+# 1ディレクトリの走査
+# ===================================================================
+
+def _is_slide(name: str) -> bool:
+    return "slide_" in name and name.endswith(".png")
+
+
+def scan_set(path, kind: str, **fields) -> Optional[Dict]:
+    """1セット分のディレクトリを os.scandir 1回で調べる。画像が無ければ None"""
+    path = Path(path)
+    slides = images = size = 0
+    newest = 0
+    meta = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                size += st.st_size
+                newest = max(newest, st.st_mtime)
+                name = entry.name
+                if name.lower().endswith(IMAGE_SUFFIXES):
+                    images += 1
+                    if _is_slide(name):
+                        slides += 1
+                elif name in META_FILES and not meta:
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as f:
+                            meta = json.load(f)
+                    except (OSError, json.JSONDecodeError):
+                        meta = {}
+    except OSError:
+        return None
+    if not images:
+        return None
+
+    record = {
+        "dir": _rel(path),
+        "kind": kind,
+        "content_id": meta.get("content_id") or path.name,
+        "batch": None,
+        "json_path": None,
+        "slides": slides,
+        "images": images,
+        "bytes": size,
+        "status": kind,
+        "posted": [],
+        "created": datetime.fromtimestamp(newest).isoformat(timespec="seconds"),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    if meta.get("post_id") is not None:
+        record["post_id"] = meta["post_id"]
+    for key, value in fields.items():
+        if value is not None:
+            record[key] = _rel(value) if key == "json_path" else value
+    return record
+
+
+def _scan_generated_top(top: Path) -> List[Dict]:
+    """content/generated 直下の1ディレクトリ（単独セット or バッチ）を走査"""
+    records = []
+    own = scan_set(top, "generated", batch="standalone",
+                   json_path=_standalone_json(top))
+    if own:
+        records.append(own)
+    try:
+        with os.scandir(top) as it:
+            subdirs = sorted(e.path for e in it if e.is_dir())
+    except OSError:
+        return records
+    for sub in map(Path, subdirs):
+        json_file = top / f"{sub.name}.json"
+        record = scan_set(sub, "generated", batch=top.name,
+                          json_path=json_file if json_file.exists() else None)
+        if record:
+            records.append(record)
+    return records
+
+
+def _standalone_json(top: Path) -> Optional[Path]:
+    """単独セットに対応する台本JSON（tiktok_post の旧探索ルールと同じ）"""
+    for candidate in (GENERATED_DIR / f"{top.name}.json",
+                      GENERATED_DIR / f"test_script_{top.name.split('_')[-1]}.json"):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _scan_ready_top(top: Path) -> List[Dict]:
+    record = scan_set(top, "ready")
+    return [record] if record else []
+
+
+# ===================================================================
+# カタログ本体
+# ===================================================================
+
+class Catalog:
+    """カタログJSON1版分の読み取りビュー（索引つき）"""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.sets: Dict[str, Dict] = data.get("sets", {})
+        self._by_content_id: Dict[str, List[Dict]] = {}
+        self._by_kind: Dict[str, List[Dict]] = {kind: [] for kind in KINDS}
+        for key in sorted(self.sets):
+            record = self.sets[key]
+            self._by_content_id.setdefault(record.get("content_id"), []).append(record)
+            self._by_kind.setdefault(record.get("kind"), []).append(record)
+
+    def get(self, path) -> Optional[Dict]:
+        return self.sets.get(_rel(path))
+
+    def by_content_id(self, content_id: str) -> List[Dict]:
+        return self._by_content_id.get(content_id, [])
+
+    def of_kind(self, kind: str) -> List[Dict]:
+        """種類ごとのセット（dir 名順）"""
+        return self._by_kind.get(kind, [])
+
+
+_view = None
+_view_source = None
+_view_lock = threading.Lock()
+_dirs_checked = None
+
+
+def _dirs_changed(data: Dict) -> bool:
+    """ディレクトリが記録時から変わったか（REVALIDATE_INTERVAL 秒に1回だけ調べる）"""
+    global _dirs_checked
+    now = time.monotonic()
+    if _dirs_checked is not None and now - _dirs_checked < runtime_config.REVALIDATE_INTERVAL:
+        return False
+    _dirs_checked = now
+    return dir_stamps() != data.get("dirs")
+
+
+def load() -> Catalog:
+    """現在のカタログ（ファイルが変わった時だけ索引を作り直す）。無い・古ければ rescan"""
+    global _view, _view_source
+    data = runtime_config.read_json(CATALOG_FILE)
+    if data is None or _dirs_changed(data):
+        rescan()
+        data = runtime_config.read_json(CATALOG_FILE, _empty())
+    with _view_lock:
+        if _view is None or data is not _view_source:
+            _view = Catalog(data)
+            _view_source = data
+        return _view
+
+
+@contextmanager
+def _locked():
+    """プロセス間ロックを取り、最新のカタログを読んで渡す。抜ける時に保存"""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(CATALOG_FILE, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                data = _empty()
+            yield data
+            data["updated"] = datetime.now().isoformat(timespec="seconds")
+            runtime_config.save_json(CATALOG_FILE, data)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _touch_dirs(data: Dict, path: Path):
+    """record() で登録したセットとその親（ルートまで）の mtime をカタログに反映する"""
+    path = Path(path).resolve()
+    roots = {root.resolve() for root in KINDS.values()}
+    if not roots.intersection(path.parents):
+        return
+    dirs = data.setdefault("dirs", {})
+    for p in [path, *path.parents]:
+        mtime = _mtime_ns(p)
+        if mtime is not None:
+            dirs[_rel(p)] = mtime
+        if p in roots:
+            break
+
+
+def record(path, kind: str, **fields) -> Optional[Dict]:
+    """生成・準備したセットを1件登録（または更新）する。画像が無ければ登録を外す
+
+    fields: content_id, batch, json_path, post_id など。投稿済み情報は引き継ぐ。
+    """
+    entry = scan_set(path, kind, **fields)
+    key = _rel(path)
+    with _locked() as data:
+        _touch_dirs(data, path)
+        old = data["sets"].pop(key, None)
+        if entry:
+            if old and old.get("posted"):
+                entry.update(posted=old["posted"], status="posted")
+                if old.get("posted_at"):
+                    entry["posted_at"] = old["posted_at"]
+            data["sets"][key] = entry
+    return entry
+
+
+def mark_posted(path, platform: str):
+    """セットを投稿済みにする（プラットフォームごと）"""
+    key = _rel(path)
+    with _locked() as data:
+        entry = data["sets"].get(key)
+        if entry is None:
+            entry = scan_set(path, "ready")
+            if entry is None:
+                return
+            data["sets"][key] = entry
+        if platform not in entry["posted"]:
+            entry["posted"].append(platform)
+        entry["status"] = "posted"
+        entry.setdefault("posted_at", datetime.now().isoformat(timespec="seconds"))
+
+
+def rescan(workers: int = RESCAN_WORKERS) -> Dict:
+    """content/generated と content/ready を並列に走査してカタログを作り直す"""
+    # 走査前の mtime を記録する（走査中に増えた分は次の参照で拾い直す）
+    stamps = dir_stamps()
+    jobs = []
+    for kind, root in KINDS.items():
+        scan = _scan_generated_top if kind == "generated" else _scan_ready_top
+        jobs.extend((scan, top) for top in _subdirs(root))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda job: job[0](job[1]), jobs))
+
+    with _locked() as data:
+        old = data["sets"]
+        data["sets"] = {}
+        data["dirs"] = stamps
+        for records in results:
+            for entry in records:
+                previous = old.get(entry["dir"])
+                if previous and previous.get("posted"):
+                    entry.update(posted=previous["posted"], status="posted")
+                    if previous.get("posted_at"):
+                        entry["posted_at"] = previous["posted_at"]
+                data["sets"][entry["dir"]] = entry
+        return data
+
+
+# ===================================================================
+# よく使う問い合わせ
+# ===================================================================
+
+def get(path) -> Optional[Dict]:
+    return load().get(path)
+
+
+def by_content_id(content_id: str) -> List[Dict]:
+    return load().by_content_id(content_id)
+
+
+def sets(kind: str, min_slides: int = 0) -> List[Dict]:
+    return [r for r in load().of_kind(kind) if r.get("slides", 0) >= min_slides]
+
+
+def ready_dirs(min_slides: int = 0) -> List[Path]:
+    """content/ready のセットディレクトリ（名前順）"""
+    return [PROJECT_DIR / r["dir"] for r in sets("ready", min_slides)]
+
+
+def summary(kind: str, day: date = None) -> Dict:
+    """種類ごとのセット数・画像数（day 指定時はその日に作られた分も）"""
+    day_str = (day or date.today()).isoformat()
+    records = load().of_kind(kind)
+    today = [r for r in records if r.get("created", "").startswith(day_str)]
+    return {
+        "total_sets": len(records),
+        "today_sets": len(today),
+        "total_images": sum(r.get("images", 0) for r in records),
+        "today_images": sum(r.get("images", 0) for r in today),
+        "bytes": sum(r.get("bytes", 0) for r in records),
+    }
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="コンテンツカタログ")
+    parser.add_argument("--rescan", action="store_true", help="全ディレクトリを走査して作り直す")
+    parser.add_argument("--list", choices=sorted(KINDS), help="セット一覧を表示")
+    parser.add_argument("--workers", type=int, default=RESCAN_WORKERS)
+    args = parser.parse_args()
+
+    if args.rescan:
+        data = rescan(args.workers)
+        print(f"再構築: {len(data['sets'])}セット → {_rel(CATALOG_FILE)}")
+
+    if args.list:
+        for r in sets(args.list):
+            posted = f" 投稿済み: {','.join(r['posted'])}" if r.get("posted") else ""
+            print(f"  {r['dir']:55s} {r['slides']:2d}枚 {r['bytes'] / 1024:8.0f}KB{posted}")
+        return
+
+    for kind in KINDS:
+        s = summary(kind)
+        print(f"  {kind:10s} {s['total_sets']:4d}セット {s['total_images']:5d}枚 "
+              f"{s['bytes'] / 1024 / 1024:8.1f}MB（今日 {s['today_sets']}セット）")
+
+
+if __name__ == "__main__":
+    main()
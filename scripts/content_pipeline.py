@@ -11,7 +11,6 @@ Usage:
 import argparse
 import csv
 import json
-import os
 import re
 import subprocess
 import sys
@@ -19,6 +18,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import content_catalog
+import slack_client
+from runtime_config import agent_state, load_env
+
 # ============================================================
 # Constants
 # ============================================================
@@ -26,7 +29,6 @@ from typing import Dict, List, Optional
 PROJECT_DIR = Path(__file__).parent.parent
 
 QUEUE_PATH = PROJECT_DIR / "data" / "posting_queue.json"
-AGENT_STATE_PATH = PROJECT_DIR / "data" / "agent_state.json"
 STOCK_CSV_PATH = PROJECT_DIR / "content" / "stock.csv"
 PROMPT_TEMPLATE_PATH = PROJECT_DIR / "content" / "templates" / "prompt_template.md"
 GENERATED_DIR = PROJECT_DIR / "content" / "generated"
@@ -72,22 +74,6 @@ CLAUDE_TIMEOUT = 120
 # Helpers: File I/O
 # ============================================================
 
-def load_env():
-    """Load .env file from PROJECT_DIR."""
-    env_path = PROJECT_DIR / ".env"
-    if env_path.exists():
-        with open(env_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    key, _, value = line.partition("=")
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    os.environ.setdefault(key, value)
-
-
 def load_queue() -> dict:
     """Read posting_queue.json. Return full structure."""
     if not QUEUE_PATH.exists():
@@ -129,11 +115,7 @@ def save_stock(rows: List[Dict]):
 
 def load_agent_memory() -> dict:
     """Read agent_state.json -> agentMemory.content_creator."""
-    if not AGENT_STATE_PATH.exists():
-        return {}
-    with open(AGENT_STATE_PATH, "r", encoding="utf-8") as f:
-        state = json.load(f)
-    return state.get("agentMemory", {}).get("content_creator", {})
+    return agent_state().get("agentMemory", {}).get("content_creator", {})
 
 
 def load_prompt_template() -> str:
@@ -579,6 +561,9 @@ def run_pipeline(count: int):
             print(f"  [WARN] スライド生成失敗。キューには追加するが slides は不完全。")
             slide_dir = batch_dir / content_id
             failed.append({"content_id": content_id, "category": category, "reason": "スライド生成失敗(キューには追加)"})
+        else:
+            content_catalog.record(slide_dir, "generated", content_id=content_id,
+                                   batch=batch_name, json_path=json_path)
 
         generated.append({
             "data": data,
@@ -680,21 +665,10 @@ def notify_slack(generated: list, failed: list, batch_name: str):
 
     message = "\n".join(lines)
 
-    try:
-        result = subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"), "--message", message],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        if result.returncode == 0:
-            print("  [OK] Slack通知送信完了")
-        else:
-            print(f"  [WARN] Slack通知失敗 (exit {result.returncode})")
-            if result.stderr:
-                print(f"    {result.stderr[:300]}")
-    except Exception as e:
-        print(f"  [WARN] Slack通知例外: {e}")
+    if slack_client.notify(message, immediate=True):
+        print("  [OK] Slack通知送信完了")
+    else:
+        print("  [WARN] Slack通知失敗")
 
 
 # ============================================================
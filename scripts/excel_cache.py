@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+excel_cache.py - 公開データExcelの共通取り込みレイヤー
+
+病床機能報告・施設基準届出受理名簿などの大きな Excel を毎回 openpyxl で
+全行ストリームする代わりに、初回だけ列指向キャッシュへ変換して再利用する。
+
+- キャッシュは data/public_data/.cache/ に「ファイル名-SHA256先頭16桁-読込条件」で保存
+  （Excel が差し替われば自動的に別キーになる）
+- 都道府県コード・市区町村名の絞り込みは列単位のマスクで行う
+- 複数ファイルはプロセスプールで並列に変換する
+
+Usage:
+    python3 scripts/excel_cache.py FILE.xlsx [--min-row 7] [--sheet NAME]
+    python3 scripts/excel_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_DIR / "data" / "public_data" / ".cache"
+HASH_INDEX = CACHE_DIR / "hash_index.json"
+
+CACHE_VERSION = 1
+
+
+# =============================================================================
+# ファイルハッシュ
+# =============================================================================
+
+def file_hash(path) -> str:
+    """SHA-256（サイズとmtimeが前回と同じならインデックスの値を再利用）"""
+    path = Path(path)
+    st = path.stat()
+    key = str(path.resolve())
+    index = {}
+    if HASH_INDEX.exists():
+        try:
+            index = json.loads(HASH_INDEX.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            index = {}
+    entry = index.get(key)
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _atomic_write(HASH_INDEX, json.dumps(index, ensure_ascii=False, indent=1).encode("utf-8"))
+    return digest
+
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# =============================================================================
+# 列指向テーブル
+# =============================================================================
+
+def _norm(value) -> str:
+    """NFKC + strip した文字列（None は空文字）"""
+    if value is None:
+        return ""
+    return unicodedata.normalize("NFKC", str(value)).strip()
+
+
+class Table:
+    """Excel シートの列指向表現。
+
+    columns[j][i] が i 行目 j 列目の値（openpyxl の values_only と同じ型）。
+    マスクは bool のリストで、eq()/isin() 等の結果を both() で合成できる。
+    """
+
+    def __init__(self, columns, source=""):
+        self.columns = columns
+        self.source = source
+        self._norm_cache = {}
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def column(self, j):
+        if j >= len(self.columns):
+            return [None] * len(self)
+        return self.columns[j]
+
+    def normalized(self, j):
+        """NFKC正規化済み文字列列（列ごとにメモ化）"""
+        if j not in self._norm_cache:
+            self._norm_cache[j] = [_norm(v) for v in self.column(j)]
+        return self._norm_cache[j]
+
+    # --- マスク ---
+
+    def notnull(self, j):
+        """None / 空文字以外"""
+        return [bool(v) for v in self.column(j)]
+
+    def eq(self, j, value):
+        value = _norm(value)
+        return [v == value for v in self.normalized(j)]
+
+    def isin(self, j, values):
+        values = {_norm(v) for v in values}
+        return [v in values for v in self.normalized(j)]
+
+    def contains_any(self, j, needles):
+        """部分一致（住所に市名が含まれるか等）"""
+        needles = tuple(needles)
+        return [any(n in v for n in needles) for v in self.normalized(j)]
+
+    @staticmethod
+    def both(a, b):
+        return [x and y for x, y in zip(a, b)]
+
+    def count(self, mask):
+        return sum(mask)
+
+    # --- 行の取り出し ---
+
+    def rows(self, mask=None):
+        """行タプルを返す（mask 指定時は True の行のみ）"""
+        cols = self.columns
+        if mask is None:
+            return list(zip(*cols))
+        idx = [i for i, m in enumerate(mask) if m]
+        return [tuple(c[i] for c in cols) for i in idx]
+
+
+# =============================================================================
+# Excel → キャッシュ
+# =============================================================================
+
+def _cache_path(path: Path, digest: str, sheet, min_row, max_col, data_only) -> Path:
+    opts = f"{'' if sheet is None else sheet}|{min_row}|{max_col or ''}|{int(bool(data_only))}|v{CACHE_VERSION}"
+    opt_hash = hashlib.sha1(opts.encode("utf-8")).hexdigest()[:8]
+    return CACHE_DIR / f"{path.stem}-{digest[:16]}-{opt_hash}.pkl"
+
+
+def _read_workbook(path, sheet, min_row, max_col, data_only):
+    """openpyxl で全行を読み、列指向の list-of-lists に変換"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(str(path), read_only=True, data_only=data_only)
+    try:
+        if sheet is None:
+            ws = wb.active
+        elif isinstance(sheet, int):
+            ws = wb[wb.sheetnames[sheet]]
+        else:
+            ws = wb[sheet]
+        columns = []
+        n = 0
+        for row in ws.iter_rows(min_row=min_row, max_col=max_col, values_only=True):
+            if len(row) > len(columns):
+                columns.extend([None] * n for _ in range(len(row) - len(columns)))
+            for j, v in enumerate(row):
+                columns[j].append(v)
+            for j in range(len(row), len(columns)):
+                columns[j].append(None)
+            n += 1
+    finally:
+        wb.close()
+    return columns
+
+
+def load_table(path, sheet=None, min_row=1, max_col=None, data_only=True,
+               verbose=True) -> Table:
+    """Excel シートを Table として読み込む（キャッシュがあれば Excel は開かない）
+
+    sheet: シート名 / シート番号(int) / None(アクティブシート)
+    """
+    path = Path(path)
+    digest = file_hash(path)
+    cache = _cache_path(path, digest, sheet, min_row, max_col, data_only)
+
+    if cache.exists():
+        t0 = time.perf_counter()
+        with open(cache, "rb") as f:
+            columns = pickle.load(f)
+        if verbose:
+            print(f"  [cache] {path.name}: {len(columns[0]) if columns else 0} rows "
+                  f"({(time.perf_counter() - t0) * 1000:.0f}ms)")
+        return Table(columns, source=str(path))
+
+    t0 = time.perf_counter()
+    columns = _read_workbook(path, sheet, min_row, max_col, data_only)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _atomic_write(cache, pickle.dumps(columns, protocol=pickle.HIGHEST_PROTOCOL))
+    if verbose:
+        print(f"  [excel] {path.name}: {len(columns[0]) if columns else 0} rows "
+              f"({time.perf_counter() - t0:.1f}s, cached)")
+    return Table(columns, source=str(path))
+
+
+def _load_table_job(args):
+    path, kwargs = args
+    load_table(path, verbose=False, **kwargs)  # キャッシュを作るだけ（結果は親で読む）
+
+
+def load_tables(paths, max_workers=None, **kwargs) -> list:
+    """複数の Excel を並列に読み込む（キャッシュ済みのものは即座に返る）"""
+    paths = [Path(p) for p in paths]
+    missing = [p for p in paths
+               if not _cache_path(p, file_hash(p), kwargs.get("sheet"), kwargs.get("min_row", 1),
+                                  kwargs.get("max_col"), kwargs.get("data_only", True)).exists()]
+    if len(missing) > 1:
+        workers = max_workers or min(len(missing), os.cpu_count() or 1)
+        print(f"  [excel] {len(missing)} files → {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_load_table_job, [(p, kwargs) for p in missing]))
+    return [load_table(p, **kwargs) for p in paths]
+
+
+def clear_cache():
+    if not CACHE_DIR.exists():
+        return 0
+    n = 0
+    for f in CACHE_DIR.glob("*.pkl"):
+        f.unlink()
+        n += 1
+    if HASH_INDEX.exists():
+        HASH_INDEX.unlink()
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="公開データExcelキャッシュ")
+    parser.add_argument("files", nargs="*", help="変換するExcelファイル")
+    parser.add_argument("--sheet", default=None)
+    parser.add_argument("--min-row", type=int, default=1)
+    parser.add_argument("--clear", action="store_true", help="キャッシュを削除")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"Removed {clear_cache()} cache files from {CACHE_DIR}")
+        return
+    if not args.files:
+        parser.print_help()
+        sys.exit(1)
+    for t in load_tables(args.files, sheet=args.sheet, min_row=args.min_row):
+        print(f"{Path(t.source).name}: {len(t)} rows x {t.width} cols")
+
+
+if __name__ == "__main__":
+    main()
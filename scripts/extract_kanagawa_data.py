@@ -26,6 +26,8 @@ import sys
 from pathlib import Path
 from typing import Optional, Tuple
 
+from facility_matcher import FacilityIndex
+
 # --- パス設定 ---
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data" / "public_data"
@@ -184,55 +186,37 @@ def load_ward_data() -> dict:
         return json.load(f)
 
 
-def normalize_name(name: str) -> str:
-    """病院名の正規化（比較用）。"""
-    # 全角英数を半角に
-    name = name.translate(str.maketrans(
-        "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ０１２３４５６７８９",
-        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
-    ))
-    # 法人格を除去
-    for prefix in ["医療法人社団", "医療法人財団", "医療法人", "社会福祉法人",
-                    "社会医療法人", "公益社団法人", "独立行政法人", "国立研究開発法人",
-                    "地方独立行政法人", "学校法人", "国家公務員共済組合連合会",
-                    "特定医療法人", "一般社団法人", "一般財団法人", "公益財団法人"]:
-        name = name.replace(prefix, "")
-    # 法人名パターン除去（「XX会」など）
-    name = re.sub(r"[\s　]+", "", name)
-    # さらにスペース除去
-    name = name.strip()
-    return name
-
-
-def find_match(csv_name: str, enriched_names: dict, ward_names: dict) -> tuple[str | None, str | None]:
-    """CSV病院名がenriched/wardデータにマッチするか検索する。"""
-    norm_csv = normalize_name(csv_name)
-
-    # 1. 完全一致
-    if csv_name in enriched_names:
-        return csv_name, "enriched_exact"
-    if csv_name in ward_names:
-        return csv_name, "ward_exact"
-
-    # 2. 正規化後の一致
-    for en_name in enriched_names:
-        if normalize_name(en_name) == norm_csv:
-            return en_name, "enriched_normalized"
-    for wn_name in ward_names:
-        if normalize_name(wn_name) == norm_csv:
-            return wn_name, "ward_normalized"
-
-    # 3. 部分一致（CSV名がenriched名に含まれる or その逆）
-    for en_name in enriched_names:
-        norm_en = normalize_name(en_name)
-        if norm_csv in norm_en or norm_en in norm_csv:
-            return en_name, "enriched_partial"
-    for wn_name in ward_names:
-        norm_wn = normalize_name(wn_name)
-        if norm_csv in norm_wn or norm_wn in norm_csv:
-            return wn_name, "ward_partial"
-
-    return None, None
+# facility_matcher の判定方法 → 突合レポートの match_type 接尾辞
+_MATCH_KIND = {"exact": "normalized", "core": "normalized", "partial": "partial"}
+
+
+def build_indexes(enriched_names: dict, ward_names: dict) -> tuple[FacilityIndex, FacilityIndex]:
+    """enriched / ward の名前索引を作る（CSV全件の突合前に1回だけ）。"""
+    en_index = FacilityIndex.build((name, name) for name in enriched_names)
+    wd_index = FacilityIndex.build((name, name) for name in ward_names)
+    return en_index, wd_index
+
+
+def find_match(csv_name: str, en_index: FacilityIndex, wd_index: FacilityIndex) -> tuple[str | None, str | None]:
+    """CSV病院名がenriched/wardデータにマッチするか検索する。
+
+    優先順位は 完全一致 > 正規化一致 > 部分一致、同順位なら enriched > ward。
+    """
+    hits = []
+    for source, index in (("enriched", en_index), ("ward", wd_index)):
+        m = index.best(csv_name)
+        if not m:
+            continue
+        if m.name == csv_name:
+            kind, rank = "exact", 0
+        else:
+            kind = _MATCH_KIND[m.method]
+            rank = 1 if kind == "normalized" else 2
+        hits.append((rank, m.name, f"{source}_{kind}"))
+    if not hits:
+        return None, None
+    _, name, match_type = min(hits, key=lambda h: h[0])
+    return name, match_type
 
 
 def main():
@@ -281,8 +265,9 @@ def main():
     matched_ward = set()
     unmatched_csv = []
 
+    en_index, wd_index = build_indexes(enriched, ward_data)
     for h in west_hospitals:
-        match_name, match_type = find_match(h["name"], enriched, ward_data)
+        match_name, match_type = find_match(h["name"], en_index, wd_index)
         if match_name:
             h["enriched_match"] = match_name
             h["match_type"] = match_type
@@ -305,21 +290,13 @@ def main():
             print(f"    - {h['name']} ({h['city']}, {beds}床)")
 
     # Enriched/WardにあってCSVにない病院も確認
-    csv_west_names_norm = {normalize_name(h["name"]) for h in west_hospitals}
+    csv_west_index = FacilityIndex.build((h["name"], h["name"]) for h in west_hospitals)
 
     enriched_not_in_csv = []
     for name, data in enriched.items():
         city = data.get("cityName", "")
-        if city in WEST_CITIES:
-            if normalize_name(name) not in csv_west_names_norm:
-                # 部分一致もチェック
-                found = False
-                for csv_norm in csv_west_names_norm:
-                    if csv_norm in normalize_name(name) or normalize_name(name) in csv_norm:
-                        found = True
-                        break
-                if not found:
-                    enriched_not_in_csv.append((name, city))
+        if city in WEST_CITIES and csv_west_index.best(name) is None:
+            enriched_not_in_csv.append((name, city))
 
     if enriched_not_in_csv:
         print("\n    【Enrichedにあるが、CSVの西部データに見つからない病院】")
@@ -6,10 +6,11 @@ JSON形式で出力するスクリプト。
 """
 
 import json
-import re
 import csv
 import unicodedata
-import openpyxl
+
+from excel_cache import load_table
+from facility_matcher import FacilityIndex
 
 # ============================================================
 # 定数
@@ -117,80 +118,6 @@ def safe_float(val):
         return 0.0
 
 
-def clean_name(name):
-    """病院名の正規化（マッチング用）"""
-    if not name:
-        return ""
-    s = zen_to_han(str(name))
-    # スペース・全角スペースを除去
-    s = re.sub(r"[\s\u3000]+", "", s)
-    # 表記ゆれの統一: ヶ/ケ/ケ/ヵ → ヶ
-    s = s.replace("ケ", "ヶ").replace("ケ", "ヶ").replace("ヵ", "ヶ")
-    return s
-
-
-def extract_facility_suffix(name):
-    """施設名のサフィックス部分（例:「山内病院」「ピースハウス病院」）を抽出。
-    法人格や財団名を含まない、最も短い施設名を返す。"""
-    if not name:
-        return ""
-    s = clean_name(name)
-    # 「〜病院」「〜医院」等の末尾パターンを探す
-    suffixes = ["病院", "クリニック", "医院", "診療所", "メディカルセンター", "センター"]
-    for suffix in suffixes:
-        idx = s.rfind(suffix)
-        if idx < 0:
-            continue
-        end = idx + len(suffix)
-        # suffix の前の文字列から、施設名コア部分を逆方向に探す
-        # 法人名は「会」「団」「法人」等で終わるので、その直後からが施設名
-        before = s[:idx]
-        # 法人名区切りパターン: 会、団、法人、連、機構 等の直後
-        separators = ["会", "団", "法人", "連", "機構", "社"]
-        best_start = 0
-        for sep in separators:
-            sep_idx = before.rfind(sep)
-            if sep_idx >= 0 and sep_idx + len(sep) > best_start:
-                best_start = sep_idx + len(sep)
-        core = s[best_start:end]
-        if len(core) >= 3:  # 最低3文字（例: 「A病院」）
-            return core
-    return s
-
-
-def extract_core_name(name):
-    """法人格を除去した施設コア名を返す（後方互換）"""
-    return extract_facility_suffix(name)
-
-
-def name_match(excel_name, csv_name):
-    """施設名の部分一致マッチング"""
-    e = clean_name(excel_name)
-    c = clean_name(csv_name)
-    if not e or not c:
-        return False
-    # 完全一致
-    if e == c:
-        return True
-    # 短い方が長い方に含まれるか
-    if len(e) <= len(c):
-        if e in c:
-            return True
-    else:
-        if c in e:
-            return True
-    # 法人格を除去したコア名でも照合
-    e_core = extract_core_name(excel_name)
-    c_core = extract_core_name(csv_name)
-    if e_core and c_core:
-        if e_core == c_core:
-            return True
-        if len(e_core) >= 3 and len(c_core) >= 3:
-            if e_core in c_core or c_core in e_core:
-                return True
-    return False
-
-
 def determine_emergency_level(tertiary, secondary, designated):
     """救急レベルを判定"""
     t = zen_to_han(str(tertiary)).strip() if tertiary else ""
@@ -234,28 +161,20 @@ def has_flag(val):
 def load_excel_data():
     """Excelからの神奈川県西部病院データ抽出"""
     print("Loading Excel data...")
-    wb = openpyxl.load_workbook(EXCEL_PATH, read_only=True, data_only=True)
-    ws = wb[wb.sheetnames[0]]
+    # 実データは Excel 行7以降 (min_row=7)
+    table = load_table(EXCEL_PATH, sheet=0, min_row=7)
 
     hospitals = {}
-    row_count = 0
-    skip_count = 0
+    row_count = len(table)
 
-    # 実データは Excel 行7以降 (min_row=7)
-    for row in ws.iter_rows(min_row=7, values_only=True):
-        vals = list(row)
-        row_count += 1
-
-        # 都道府県コード確認
-        pref_code = zen_to_han(str(vals[3])).strip() if vals[3] else ""
-        if pref_code != KANAGAWA_PREF_CODE:
-            continue
+    # 都道府県コード・市区町村名を列マスクで絞り込み
+    kanagawa = table.eq(3, KANAGAWA_PREF_CODE)
+    target = table.both(kanagawa, table.isin(9, TARGET_CITIES))
+    skip_count = table.count(kanagawa) - table.count(target)
 
-        # 市区町村名確認
+    for row in table.rows(target):
+        vals = list(row)
         city_name = zen_to_han(str(vals[9])).strip() if vals[9] else ""
-        if city_name not in TARGET_CITIES:
-            skip_count += 1
-            continue
 
         name = zen_to_han(str(vals[2])).strip() if vals[2] else ""
         if not name:
@@ -323,7 +242,6 @@ def load_excel_data():
 
         hospitals[name] = hospital
 
-    wb.close()
     print(f"  Excel: {row_count} rows scanned, {len(hospitals)} Kanagawa-West hospitals found (skipped {skip_count} non-target cities)")
     return hospitals
 
@@ -373,19 +291,12 @@ def merge_data(excel_hospitals, csv_hospitals):
     matched = 0
     unmatched_names = []
 
+    # CSV側の名前索引（正規化・コア名は1回だけ計算）
+    csv_index = FacilityIndex.build((i, h["name"]) for i, h in enumerate(csv_hospitals))
+
     for name, hosp in excel_hospitals.items():
-        best_match = None
-        best_score = 0  # マッチの「良さ」（短い方の名前の長さ）
-
-        for csv_hosp in csv_hospitals:
-            if name_match(name, csv_hosp["name"]):
-                # より良いマッチを選ぶ（コア名の長さが近いものを優先）
-                e_clean = clean_name(name)
-                c_clean = clean_name(csv_hosp["name"])
-                score = min(len(e_clean), len(c_clean))
-                if score > best_score:
-                    best_score = score
-                    best_match = csv_hosp
+        m = csv_index.best(name)
+        best_match = csv_hospitals[m.key] if m else None
 
         if best_match:
             matched += 1
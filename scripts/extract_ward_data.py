@@ -12,7 +12,7 @@ import unicodedata
 from collections import OrderedDict
 from pathlib import Path
 
-import openpyxl
+from excel_cache import load_table
 
 # ── 設定 ──────────────────────────────────────────────
 INPUT_FILE = Path(__file__).resolve().parent.parent / "data" / "public_data" / "bed_function_ward_kanto.xlsx"
@@ -100,29 +100,20 @@ def is_closed_ward(function_str: str) -> bool:
 
 def main():
     print(f"入力ファイル: {INPUT_FILE}")
-    wb = openpyxl.load_workbook(str(INPUT_FILE), read_only=True, data_only=True)
-    ws = wb[SHEET_NAME]
+    # データ読み込み（ヘッダー行をスキップ、2回目以降はキャッシュから）
+    table = load_table(INPUT_FILE, sheet=SHEET_NAME, min_row=HEADER_ROWS + 1)
 
-    # データ読み込み（ヘッダー行をスキップ）
     facilities = {}  # medicalCode -> facility dict
 
-    row_count = 0
-    skip_count = 0
-    for i, row in enumerate(ws.iter_rows(min_row=HEADER_ROWS + 1, values_only=True)):
-        vals = list(row)
-
-        # 都道府県コードチェック
-        pref_code = str(vals[2]).strip() if vals[2] is not None else ""
-        if pref_code != PREF_CODE_KANAGAWA:
-            continue
+    # 都道府県コード・市区町村を列マスクで絞り込み
+    kanagawa = table.eq(2, PREF_CODE_KANAGAWA)
+    target = table.both(kanagawa, table.isin(8, TARGET_CITIES))
+    row_count = table.count(target)
+    skip_count = table.count(kanagawa) - row_count
 
-        # 市区町村チェック
+    for row in table.rows(target):
+        vals = list(row)
         city_name = str(vals[8]).strip() if vals[8] is not None else ""
-        if city_name not in TARGET_CITIES:
-            skip_count += 1
-            continue
-
-        row_count += 1
 
         medical_code = str(vals[0]).strip() if vals[0] else ""
         facility_name = str(vals[1]).strip() if vals[1] else ""
@@ -156,8 +147,6 @@ def main():
 
         facilities[medical_code]["wards"].append(ward_data)
 
-    wb.close()
-
     print(f"対象行数: {row_count}")
     print(f"神奈川県だが対象外市区町村: {skip_count}")
 
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+facility_matcher.py - 施設名の名寄せエンジン（ETLスクリプト共通）
+
+merge_and_update_areas / extract_kanagawa_data / extract_public_data /
+update_facility_db で別々に実装されていた施設名マッチングを一本化する。
+
+- 正規化（NFKC・空白除去・ケ/ヶ統一）とコア名抽出（法人格・法人名の除去）は
+  登録時に1名称1回だけ行う
+- 完全一致・コア名一致はハッシュ索引で O(1)
+- 部分一致・あいまい一致は文字bigramの転置索引で候補を絞ってからスコアリング
+  （部分一致は正規化した正式名・別名どうしに限る。コア名で部分一致させると
+  「第一病院」（湘南第一病院の法人名つき正式名のコア名）が「横浜第一病院」に
+  当たるように、地名違いの別施設を拾うため）
+- 結果は信頼度スコア付きで順位づけして返す
+
+スコアの目安:
+  1.00  正規化後の完全一致 (exact)
+  0.95  コア名一致 (core)
+  0.80-0.90  一方が他方を含む部分一致 (partial)。長さが近いほど高い
+  0.75 未満  bigram Dice 係数によるあいまい一致 (fuzzy)
+
+Usage:
+    python3 scripts/facility_matcher.py --bench     # 神奈川県CSV全件でベンチマーク
+    python3 scripts/facility_matcher.py --check     # 名寄せの回帰ケースを確認
+    python3 scripts/facility_matcher.py 小田原市立病院
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data" / "public_data"
+
+SCORE_EXACT = 1.0
+SCORE_CORE = 0.95
+SCORE_PARTIAL = 0.8
+SCORE_FUZZY_MAX = 0.75
+
+# 既存スクリプトの部分一致と同等（あいまい一致は含めない）
+DEFAULT_MIN_SCORE = SCORE_PARTIAL
+
+MIN_PARTIAL_LEN = 3
+
+CORPORATE_PREFIXES = [
+    "国家公務員共済組合連合会", "神奈川県厚生農業協同組合連合会",
+    "地方独立行政法人", "国立研究開発法人", "独立行政法人", "国立病院機構",
+    "特定医療法人社団", "特定医療法人", "医療法人社団", "医療法人財団", "社会医療法人",
+    "医療法人", "社会福祉法人", "公益社団法人", "公益財団法人",
+    "一般社団法人", "一般財団法人", "学校法人",
+]
+FACILITY_SUFFIXES = ["病院", "クリニック", "医院", "診療所", "メディカルセンター", "センター"]
+CORPORATE_SEPARATORS = ["会", "団", "法人", "連", "機構", "社"]
+
+Match = namedtuple("Match", ["key", "name", "score", "method"])
+
+# 回帰ケース: (登録する名称, 検索する名称, 期待する key（マッチしてはいけなければ None）)
+REGRESSION_CASES = [
+    # 正式名「医療法人社団慶友会 第一病院」のコア名「第一病院」で横浜第一病院を拾っていた
+    (("湘南第一病院", "医療法人社団慶友会 第一病院"), "横浜第一病院", None),
+    (("湘南第一病院", "医療法人社団慶友会 第一病院"), "医療法人社団　善仁会　横浜第一病院", None),
+    (("湘南第一病院", "医療法人社団慶友会 第一病院"), "医療法人社団慶友会　第一病院", "湘南第一病院"),
+    (("湘南第一病院",), "医療法人社団 湘南第一病院", "湘南第一病院"),
+    (("湘南厚木病院", "医療法人徳洲会 湘南厚木病院"), "湘南厚木病院", "湘南厚木病院"),
+    (("小田原市立病院",), "小田原市立", "小田原市立病院"),
+]
+
+
+# =============================================================================
+# 正規化
+# =============================================================================
+
+def normalize(name) -> str:
+    """比較用の正規化: NFKC（全角英数→半角）、空白除去、ヶ/ヵ統一"""
+    if not name:
+        return ""
+    s = unicodedata.normalize("NFKC", str(name))
+    s = s.replace("ヶ", "ケ").replace("ヵ", "カ")
+    return re.sub(r"\s+", "", s)
+
+
+def core_name(name) -> str:
+    """法人格・法人名・括弧を除いた施設コア名
+
+    例: 「医療法人徳洲会 湘南厚木病院」→「湘南厚木病院」
+    """
+    s = normalize(name)
+    if not s:
+        return ""
+    for prefix in CORPORATE_PREFIXES:
+        s = s.replace(prefix, "")
+    s = re.sub(r"[()]", "", s)
+
+    # 「〜会〇〇病院」のように法人名が前置されている場合は施設名部分だけ残す
+    for suffix in FACILITY_SUFFIXES:
+        idx = s.rfind(suffix)
+        if idx < 0:
+            continue
+        before = s[:idx]
+        start = 0
+        for sep in CORPORATE_SEPARATORS:
+            sep_idx = before.rfind(sep)
+            if sep_idx >= 0 and sep_idx + len(sep) > start:
+                start = sep_idx + len(sep)
+        core = s[start:idx + len(suffix)]
+        if len(core) >= MIN_PARTIAL_LEN:
+            return core
+        break
+    return s
+
+
+def _bigrams(s: str) -> set:
+    if len(s) < 2:
+        return {s} if s else set()
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+# =============================================================================
+# 索引
+# =============================================================================
+
+class FacilityIndex:
+    """施設名 → key の索引
+
+    add(key, name, *aliases) で登録。key は medicalCode や元の施設名など
+    呼び出し側が欲しい値。1つの key に複数の名称（name / fullName 等）を登録できる。
+    """
+
+    def __init__(self):
+        self._aliases = []   # alias_id -> (normalized string, entry_id, is_full_name)
+        self._entries = []   # entry_id -> (key, display name)
+        self._exact = {}     # normalized -> (priority, entry_id)
+        self._core = {}      # core name -> (priority, entry_id)
+        self._grams = {}     # bigram -> list of alias_id
+        self._gram_sizes = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def build(cls, items):
+        """items: (key, name, *aliases) のイテラブル"""
+        index = cls()
+        for item in items:
+            index.add(*item)
+        return index
+
+    def add(self, key, name, *aliases):
+        entry_id = len(self._entries)
+        self._entries.append((key, name))
+        seen = set()
+        for rank, raw in enumerate((name,) + aliases):
+            if not raw:
+                continue
+            n = normalize(raw)
+            c = core_name(raw)
+            # 同じ表記が複数施設にある場合は「正式名 > 別名」「先に登録 > 後」で優先
+            prio = (min(rank, 1), entry_id)
+            for table, form in ((self._exact, n), (self._core, c)):
+                if form and (form not in table or prio < table[form]):
+                    table[form] = prio
+            for form, full in ((n, True), (c, False)):
+                if form and form not in seen:
+                    seen.add(form)
+                    self._add_alias(form, entry_id, full)
+        return entry_id
+
+    def _add_alias(self, form, entry_id, full=True):
+        alias_id = len(self._aliases)
+        self._aliases.append((form, entry_id, full))
+        grams = _bigrams(form)
+        self._gram_sizes.append(len(grams))
+        for g in grams:
+            self._grams.setdefault(g, []).append(alias_id)
+
+    # --- 検索 ---
+
+    def _result(self, entry_id, score, method):
+        key, name = self._entries[entry_id]
+        return Match(key, name, round(score, 3), method)
+
+    def match(self, name, *aliases, limit=5, min_score=DEFAULT_MIN_SCORE) -> list:
+        """信頼度順の候補リスト [Match(key, name, score, method), ...]
+
+        同スコアなら先に渡した名称（name > aliases）でヒットしたものを優先する。
+        """
+        queries = [q for q in (name,) + aliases if q]
+        best = {}  # entry_id -> (score, query order, method)
+
+        def offer(entry_id, score, qi, method):
+            cur = best.get(entry_id)
+            if cur is None or (score, -qi) > (cur[0], -cur[1]):
+                best[entry_id] = (score, qi, method)
+
+        forms = []
+        seen = set()
+        for qi, q in enumerate(queries):
+            n, c = normalize(q), core_name(q)
+            if n in self._exact:
+                offer(self._exact[n][1], SCORE_EXACT, qi, "exact")
+            if c in self._core:
+                offer(self._core[c][1], SCORE_CORE, qi, "core")
+            for f, full in ((n, True), (c, False)):
+                if f and f not in seen:
+                    seen.add(f)
+                    forms.append((qi, f, full))
+
+        # 完全一致があれば bigram 検索は不要
+        if limit > 1 or not any(v[0] >= SCORE_EXACT for v in best.values()):
+            for qi, form, full in forms:
+                self._scan_grams(form, qi, offer, full)
+
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1][0], kv[1][1], kv[0]))
+        return [self._result(eid, s, m) for eid, (s, _, m) in ranked if s >= min_score][:limit]
+
+    def _scan_grams(self, form, qi, offer, full=True):
+        q_grams = _bigrams(form)
+        if not q_grams:
+            return
+        shared = {}
+        for g in q_grams:
+            for alias_id in self._grams.get(g, ()):
+                shared[alias_id] = shared.get(alias_id, 0) + 1
+
+        nq = len(q_grams)
+        for alias_id, k in shared.items():
+            cand, entry_id, cand_full = self._aliases[alias_id]
+            nc = self._gram_sizes[alias_id]
+            # 部分一致: 正規化した名称どうしで、短い方の bigram が全て共有されている場合のみ文字列で確認
+            short, long_ = (form, cand) if len(form) <= len(cand) else (cand, form)
+            if (full and cand_full and len(short) >= MIN_PARTIAL_LEN
+                    and k == min(nq, nc) and short in long_):
+                offer(entry_id, SCORE_PARTIAL + 0.1 * len(short) / len(long_), qi, "partial")
+                continue
+            dice = 2 * k / (nq + nc)
+            offer(entry_id, SCORE_FUZZY_MAX * dice, qi, "fuzzy")
+
+    def best(self, name, *aliases, min_score=DEFAULT_MIN_SCORE):
+        """最上位の候補（なければ None）"""
+        hits = self.match(name, *aliases, limit=1, min_score=min_score)
+        return hits[0] if hits else None
+
+
+# =============================================================================
+# 回帰チェック・ベンチマーク
+# =============================================================================
+
+def self_check() -> bool:
+    """REGRESSION_CASES を確認する。全て期待通りなら True"""
+    ok = True
+    for names, query, expected in REGRESSION_CASES:
+        index = FacilityIndex.build([(names[0],) + tuple(names)])
+        hit = index.best(query)
+        got = hit.key if hit else None
+        status = "OK" if got == expected else "NG"
+        ok &= got == expected
+        detail = f"{hit.score:.3f} {hit.method}" if hit else "-"
+        print(f"  [{status}] {query} → {got} ({detail}) 期待: {expected}")
+    return ok
+
+
+def _naive_best(name, entries):
+    """旧実装相当: 候補ごとに毎回正規化して線形走査"""
+    n, c = normalize(name), core_name(name)
+    for key, cand in entries:
+        if normalize(cand) == n or core_name(cand) == c:
+            return key
+    for key, cand in entries:
+        cn = normalize(cand)
+        if len(n) >= MIN_PARTIAL_LEN and (n in cn or cn in n):
+            return key
+    return None
+
+
+def benchmark(repeat=3):
+    """神奈川県CSV全件 × enriched/ward 名称で索引版と線形走査版を比較"""
+    csv_path = DATA_DIR / "kanagawa_csv_extract.json"
+    with open(csv_path, encoding="utf-8") as f:
+        queries = [h["name"] for h in json.load(f)]
+    with open(DATA_DIR / "kanagawa_hospitals_enriched.json", encoding="utf-8") as f:
+        enriched = json.load(f)
+    with open(DATA_DIR / "kanagawa_ward_data.json", encoding="utf-8") as f:
+        ward = json.load(f)
+
+    entries = [(h["name"], h["name"]) for h in enriched] + [(k, k) for k in ward]
+    print(f"queries: {len(queries)} (Kanagawa CSV) / candidates: {len(entries)}")
+
+    t0 = time.perf_counter()
+    index = FacilityIndex.build((h["name"], h["name"], h.get("fullName")) for h in enriched)
+    for k in ward:
+        index.add(k, k)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    def run_indexed():
+        return [index.best(q) for q in queries]
+
+    def run_naive():
+        return [_naive_best(q, entries) for q in queries]
+
+    results = {}
+    for label, fn in (("indexed", run_indexed), ("naive", run_naive)):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        results[label] = (min(times), out)
+
+    idx_t, idx_out = results["indexed"]
+    naive_t, naive_out = results["naive"]
+    matched = sum(1 for m in idx_out if m)
+    naive_matched = sum(1 for m in naive_out if m)
+    print(f"index build: {build_ms:.1f}ms")
+    print(f"indexed: {idx_t * 1000:.1f}ms ({idx_t / len(queries) * 1e6:.0f}us/query), matched {matched}")
+    print(f"naive:   {naive_t * 1000:.1f}ms ({naive_t / len(queries) * 1e6:.0f}us/query), matched {naive_matched}")
+    print(f"speedup: {naive_t / idx_t:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="施設名マッチング")
+    parser.add_argument("names", nargs="*", help="検索する施設名")
+    parser.add_argument("--bench", action="store_true", help="ベンチマーク実行")
+    parser.add_argument("--check", action="store_true", help="回帰ケースを確認")
+    parser.add_argument("--min-score", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark()
+        return
+    if args.check:
+        sys.exit(0 if self_check() else 1)
+    if not args.names:
+        parser.print_help()
+        sys.exit(1)
+
+    with open(DATA_DIR / "kanagawa_hospitals_enriched.json", encoding="utf-8") as f:
+        enriched = json.load(f)
+    index = FacilityIndex.build((h["medicalCode"], h["name"], h.get("fullName")) for h in enriched)
+    for name in args.names:
+        print(f"{name}:")
+        for m in index.match(name, min_score=args.min_score):
+            print(f"  {m.score:.3f} {m.method:8s} {m.name} ({m.key})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+ローカル用 Slack スタンドイン（fake_slack.py）
+
+slack_commander.py のイベント駆動モードを本物のSlackなしで動かすための最小サーバー。
+標準ライブラリのみ。
+
+  - Web API: chat.postMessage / conversations.history / auth.test を模擬
+    （投稿はメモリに保持。GET /_messages で確認できる）
+  - Events API: 署名つき event_callback を commander に送る（--send）
+  - --ratelimit N: N回に1回 429 + Retry-After を返す（slack_client の再試行検証用）
+
+使い方:
+  # 1) 偽Slackを起動
+  python3 fake_slack.py --serve --port 3100
+
+  # 2) commander を偽Slack向けに起動
+  SLACK_API_URL=http://127.0.0.1:3100/api SLACK_SIGNING_SECRET=local-secret \\
+      python3 slack_commander.py --events --port 3000
+
+  # 3) ユーザー発言をイベントとして送る（偽Slackの履歴にも記録される）
+  SLACK_SIGNING_SECRET=local-secret \\
+      python3 fake_slack.py --send "!help" --events-url http://127.0.0.1:3000/slack/events
+
+  # 4) commander の返信を確認
+  curl http://127.0.0.1:3100/_messages
+"""
+
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CHANNEL = os.getenv("SLACK_CHANNEL_ID", "C09A7U4TV4G")
+DEFAULT_SECRET = os.getenv("SLACK_SIGNING_SECRET", "local-secret")
+
+
+# ===================================================================
+# メッセージストア
+# ===================================================================
+
+class MessageStore:
+    """チャンネルごとのメッセージ（古い順）をメモリに保持"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.messages = {}
+
+    def next_ts(self) -> str:
+        # 同一秒内でも単調増加する Slack 形式の ts
+        return f"{int(time.time())}.{next(self._seq):06d}"
+
+    def add(self, channel: str, message: dict) -> dict:
+        with self._lock:
+            message = dict(message, ts=message.get("ts") or self.next_ts(), channel=channel)
+            self.messages.setdefault(channel, []).append(message)
+            return message
+
+    def history(self, channel: str, oldest: str = None, limit: int = 100) -> list:
+        """conversations.history と同じく新しい順で返す"""
+        with self._lock:
+            msgs = list(self.messages.get(channel, []))
+        if oldest:
+            msgs = [m for m in msgs if float(m["ts"]) > float(oldest)]
+        return list(reversed(msgs))[:limit]
+
+
+# ===================================================================
+# Web API サーバー
+# ===================================================================
+
+def make_handler(store: MessageStore, ratelimit_every: int = 0):
+    counter = itertools.count(1)
+
+    class FakeSlackHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            print(f"[fake_slack] {self.command} {self.path}")
+
+        def _send_json(self, data: dict, status: int = 200):
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _params(self) -> dict:
+            url = urllib.parse.urlsplit(self.path)
+            params = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length", 0))
+            if length:
+                raw = self.rfile.read(length)
+                if "json" in self.headers.get("Content-Type", ""):
+                    params.update(json.loads(raw))
+                else:
+                    params.update({k: v[-1] for k, v in urllib.parse.parse_qs(raw.decode()).items()})
+            return params
+
+        def _dispatch(self):
+            path = urllib.parse.urlsplit(self.path).path
+            params = self._params()
+            if path == "/_messages":
+                return self._send_json(store.messages)
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._send_json({"ok": False, "error": "not_authed"})
+            if ratelimit_every and next(counter) % ratelimit_every == 0:
+                body = b'{"ok": false, "error": "ratelimited"}'
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            method = path.rsplit("/", 1)[-1]
+            if method == "auth.test":
+                return self._send_json({"ok": True, "user_id": "UFAKEBOT", "team": "fake"})
+            if method == "chat.postMessage":
+                channel = params.get("channel")
+                if not channel:
+                    return self._send_json({"ok": False, "error": "channel_not_found"})
+                msg = {"type": "message", "text": params.get("text", "")}
+                # user 指定はユーザー発言の記録（send_event 用）、それ以外はBot投稿
+                if params.get("user"):
+                    msg["user"] = params["user"]
+                else:
+                    msg["bot_id"] = "BFAKE"
+                for key in ("blocks", "thread_ts"):
+                    if params.get(key):
+                        msg[key] = params[key]
+                msg = store.add(channel, msg)
+                return self._send_json({"ok": True, "channel": channel, "ts": msg["ts"], "message": msg})
+            if method == "conversations.history":
+                msgs = store.history(params.get("channel"), params.get("oldest"),
+                                     int(params.get("limit", 100)))
+                return self._send_json({"ok": True, "messages": msgs, "has_more": False})
+            return self._send_json({"ok": False, "error": "unknown_method"})
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+
+    return FakeSlackHandler
+
+
+def serve(host: str, port: int, store: MessageStore = None,
+          ratelimit_every: int = 0) -> ThreadingHTTPServer:
+    """偽Slackサーバーを生成（serve_forever は呼び出し側で）"""
+    return ThreadingHTTPServer((host, port), make_handler(store or MessageStore(), ratelimit_every))
+
+
+# ===================================================================
+# Events API 送信
+# ===================================================================
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    base = b"v0:" + timestamp.encode() + b":" + body
+    return "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+
+
+def send_event(events_url: str, text: str, channel: str = DEFAULT_CHANNEL,
+               user: str = "UFAKEUSER", secret: str = DEFAULT_SECRET,
+               api_url: str = None) -> int:
+    """ユーザー発言を event_callback として commander に送る。HTTPステータスを返す
+
+    api_url を指定すると偽Slackの履歴にも同じ発言を記録する（catch-up 検証用）。
+    """
+    event = {"type": "message", "channel": channel, "user": user, "text": text,
+             "ts": f"{time.time():.6f}"}
+    if api_url:
+        req = urllib.request.Request(
+            f"{api_url.rstrip('/')}/chat.postMessage",
+            data=json.dumps(event, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": "Bearer fake"},
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            event["ts"] = json.loads(resp.read())["ts"]
+
+    payload = {
+        "type": "event_callback",
+        "event_id": f"Ev{event['ts'].replace('.', '')}",
+        "event_time": int(time.time()),
+        "event": event,
+    }
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    timestamp = str(int(time.time()))
+    req = urllib.request.Request(events_url, data=body, headers={
+        "Content-Type": "application/json",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": sign(secret, timestamp, body),
+    })
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="ローカル用 Slack スタンドイン")
+    parser.add_argument("--serve", action="store_true", help="偽Slack Web APIサーバーを起動")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--ratelimit", type=int, default=0, metavar="N",
+                        help="N回に1回 429 を返す（0で無効）")
+    parser.add_argument("--send", metavar="TEXT", help="ユーザー発言をイベントとして送信")
+    parser.add_argument("--events-url", default="http://127.0.0.1:3000/slack/events",
+                        help="commander の Events API URL")
+    parser.add_argument("--api-url", help="偽Slackの /api URL（指定時は履歴にも記録）")
+    parser.add_argument("--channel", default=DEFAULT_CHANNEL)
+    parser.add_argument("--user", default="UFAKEUSER")
+    args = parser.parse_args()
+
+    if args.send:
+        status = send_event(args.events_url, args.send, channel=args.channel,
+                            user=args.user, api_url=args.api_url)
+        print(f"送信: {args.send!r} → HTTP {status}")
+        return
+
+    server = serve(args.host, args.port, ratelimit_every=args.ratelimit)
+    print(f"fake Slack 起動: http://{args.host}:{args.port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nfake Slack 終了")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,10 @@ import os
 import re
 import glob
 import sys
+import time
+from collections import namedtuple
+
+from site_build import match_paths, transform
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -69,183 +73,319 @@ def collect_html_files():
     return sorted(files)
 
 
+# ─── 正規表現（モジュール読み込み時に1回だけコンパイル） ───
+
+# 1パスで <head> 内の meta / link / </title> を拾うトークナイザ。
+# meta は has_meta と同じく「name/property → content」「content → name/property」の2形式のみ
+_TAG_RE = re.compile(r"""
+    <(?:
+        meta\s+(?:
+            (?P<attr>name|property)="(?P<key>[^"]*)"\s+content="(?P<value>[^"]*)"
+          | content="(?P<value2>[^"]*)"\s+(?P<attr2>name|property)="(?P<key2>[^"]*)"
+        )[^>]*/?\s*>
+      | link\s[^>]*?rel="(?P<rel>[^"]*)"[^>]*>
+      | (?P<title_end>/title>)
+    )
+""", re.IGNORECASE | re.VERBOSE)
+
+_HEAD_END_RE = re.compile(r'</head>', re.IGNORECASE)
+_TITLE_END_RE = re.compile(r'</title>', re.IGNORECASE)
+
+_meta_patterns = {}  # (attr, key) -> (name→content の順, content→name の順)
+
+
+def _meta_pattern(attr, key):
+    patterns = _meta_patterns.get((attr, key))
+    if patterns is None:
+        k = re.escape(key)
+        patterns = _meta_patterns[(attr, key)] = (
+            re.compile(rf'<meta\s+{attr}="{k}"\s+content="([^"]*)"[^>]*/?\s*>', re.IGNORECASE),
+            re.compile(rf'<meta\s+content="([^"]*)"\s+{attr}="{k}"[^>]*/?\s*>', re.IGNORECASE),
+        )
+    return patterns
+
+
 def find_head_end(content):
     """</head>の位置を返す"""
-    m = re.search(r'</head>', content, re.IGNORECASE)
+    m = _HEAD_END_RE.search(content)
     return m.start() if m else -1
 
 
 def find_title_end(content):
     """</title>タグの直後の位置を返す"""
-    m = re.search(r'</title>', content, re.IGNORECASE)
+    m = _TITLE_END_RE.search(content)
     return m.end() if m else -1
 
 
 def has_meta(content, name=None, prop=None):
     """指定のmeta属性が存在するか確認し、マッチオブジェクトを返す"""
     if name:
-        pattern = rf'<meta\s+name="{re.escape(name)}"\s+content="([^"]*)"[^>]*/?\s*>'
-        m = re.search(pattern, content, re.IGNORECASE)
-        if not m:
-            # content="..." name="..." の順もある
-            pattern = rf'<meta\s+content="([^"]*)"\s+name="{re.escape(name)}"[^>]*/?\s*>'
-            m = re.search(pattern, content, re.IGNORECASE)
-        return m
-    if prop:
-        pattern = rf'<meta\s+property="{re.escape(prop)}"\s+content="([^"]*)"[^>]*/?\s*>'
-        m = re.search(pattern, content, re.IGNORECASE)
-        if not m:
-            pattern = rf'<meta\s+content="([^"]*)"\s+property="{re.escape(prop)}"[^>]*/?\s*>'
-            m = re.search(pattern, content, re.IGNORECASE)
-        return m
-    return None
+        attr, key = "name", name
+    elif prop:
+        attr, key = "property", prop
+    else:
+        return None
+    name_first, content_first = _meta_pattern(attr, key)
+    # content="..." name="..." の順もある
+    return name_first.search(content) or content_first.search(content)
+
+
+# ─── meta タグ索引 ───
+
+MetaTag = namedtuple("MetaTag", ["start", "end", "value", "text"])
+
+
+class MetaIndex:
+    """1ページ分の meta / link / title の位置（<head> 内を1回走査して作る）
+
+    meta は (属性, キー) → 最初の MetaTag。has_meta と同じく
+    name→content 順の記述を content→name 順より優先する。
+    </head> 以降（本文）は走査しない。</head> が無ければ文書全体を走査する。
+    """
+
+    def __init__(self, content):
+        self.meta = {}
+        self.links = {}       # rel → [(start, end), ...]
+        self.title_end = -1   # </title> の直後
+        self.head_end = find_head_end(content)  # </head> の直前
+        content_first = {}
+        limit = len(content) if self.head_end < 0 else self.head_end
+        for m in _TAG_RE.finditer(content, 0, limit):
+            if m.group("title_end"):
+                if self.title_end < 0:
+                    self.title_end = m.end()
+            elif m.group("rel") is not None:
+                self.links.setdefault(m.group("rel").lower(), []).append((m.start(), m.end()))
+            elif m.group("attr"):
+                key = (m.group("attr").lower(), m.group("key").lower())
+                self.meta.setdefault(key, MetaTag(m.start(), m.end(), m.group("value"), m.group(0)))
+            else:
+                key = (m.group("attr2").lower(), m.group("key2").lower())
+                content_first.setdefault(key, MetaTag(m.start(), m.end(), m.group("value2"), m.group(0)))
+        for key, tag in content_first.items():
+            self.meta.setdefault(key, tag)
+
+    def get(self, attr, key):
+        return self.meta.get((attr, key.lower()))
+
+
+# ─── 統一ルール ───
+
+TITLE = None  # 挿入位置: </title> の直後
+
+# (統計キー接頭辞, ラベル, 属性, キー, 理想値, 修正時の表記, 挿入位置の候補)
+# 挿入位置の候補は先頭から順に探す。(属性, キー) はそのタグの直後、
+# (属性, キー, 前提キー) は前提の name タグも存在する場合のみ有効。
+META_RULES = [
+    ("robots", "robots", "name", "robots", IDEAL_ROBOTS, ("更新", "updated"),
+     [TITLE]),
+    ("og_image", "og:image", "property", "og:image", IDEAL_OG_IMAGE, ("修正", "fixed"),
+     [("property", "og:type"), TITLE]),
+    ("twitter_card", "twitter:card", "name", "twitter:card", IDEAL_TWITTER_CARD, ("修正", "fixed"),
+     [("name", "robots"), TITLE]),
+    ("og_locale", "og:locale", "property", "og:locale", IDEAL_OG_LOCALE, ("修正", "fixed"),
+     [("property", "og:site_name"), ("property", "og:image"), TITLE]),
+    ("twitter_image", "twitter:image", "name", "twitter:image", IDEAL_OG_IMAGE, ("修正", "fixed"),
+     [("name", "twitter:description", "twitter:card"), ("name", "twitter:title", "twitter:card"),
+      ("name", "twitter:card"), TITLE]),
+]
+
+
+def _meta_tag(attr, key, value):
+    return f'<meta {attr}="{key}" content="{value}">'
+
+
+def is_normalized(content):
+    """全ルールの meta が <head> 内に理想値で揃っているか（索引を作らずにルール数回の検索で判定）"""
+    head_end = find_head_end(content)
+    limit = len(content) if head_end < 0 else head_end
+    for _, _, attr, key, ideal, _, _ in META_RULES:
+        name_first, content_first = _meta_pattern(attr, key)
+        m = name_first.search(content, 0, limit) or content_first.search(content, 0, limit)
+        if m is None or m.group(1) != ideal:
+            return False
+    return True
+
+
+def apply_meta_fixes(content):
+    """meta情報を統一した content と、変更内容 [(統計キー, メッセージ), ...] を返す
+
+    索引は1回だけ作り、置換・挿入は最後に1回のスプライスで反映する。
+    挿入位置は逐次適用した場合と同じになるよう、同じ位置への挿入は
+    「後から挿入したものが前」、挿入済みタグの直後への挿入はその直後に並べる。
+    統一済みのページ（大半）は is_normalized() だけで返す。
+    """
+    if is_normalized(content):
+        return content, []
+    index = MetaIndex(content)
+    changes = []
+    replacements = {}  # start → (end, 新しいタグ)
+    inserts = {}       # 元の位置 → [挿入テキスト(list で包んで同一性を持たせる), ...]
+    inserted = {}      # (attr, key) → (元の位置, 挿入テキスト)
+
+    def anchor(candidates):
+        for cand in candidates:
+            if cand is TITLE:
+                return ("pos", index.title_end) if index.title_end > 0 else None
+            attr, key = cand[0], cand[1]
+            if len(cand) > 2 and not (index.get("name", cand[2]) or ("name", cand[2]) in inserted):
+                continue
+            if (attr, key) in inserted:
+                return ("seg", inserted[(attr, key)])
+            tag = index.get(attr, key)
+            if tag:
+                return ("pos", tag.end)
+        return None
+
+    for stat, label, attr, key, ideal, (fix_word, fix_stat), candidates in META_RULES:
+        tag = index.get(attr, key)
+        if tag:
+            if tag.value != ideal:
+                replacements[tag.start] = (tag.end, _meta_tag(attr, key, ideal))
+                changes.append((f"{stat}_{fix_stat}", f"{label}{fix_word}: '{tag.value}' -> '{ideal}'"))
+            continue
+
+        where = anchor(candidates)
+        if where is None:
+            continue
+        seg = ["\n    " + _meta_tag(attr, key, ideal)]
+        if where[0] == "pos":
+            pos = where[1]
+            inserts.setdefault(pos, []).insert(0, seg)
+        else:
+            pos, after = where[1]
+            group = inserts[pos]
+            group.insert(next(i for i, s in enumerate(group) if s is after) + 1, seg)
+        inserted[(attr, key)] = (pos, seg)
+        changes.append((f"{stat}_added", f"{label}追加"))
+
+    if not changes:
+        return content, changes
+
+    out = []
+    pos = 0
+    for p in sorted(set(inserts) | set(replacements)):
+        out.append(content[pos:p])
+        pos = p
+        out.extend(seg[0] for seg in inserts.get(p, ()))
+        if p in replacements:
+            end, text = replacements[p]
+            out.append(text)
+            pos = end
+    out.append(content[pos:])
+    return "".join(out), changes
 
 
 def process_file(filepath):
     """1ファイルを処理する"""
     with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
+        original = f.read()
 
-    original = content
-    changes = []
-    relpath = os.path.relpath(filepath, BASE_DIR)
-
-    # ─── 1. meta robots ───
-    m = has_meta(content, name="robots")
-    if m:
-        current_val = m.group(1)
-        if current_val != IDEAL_ROBOTS:
-            old_tag = m.group(0)
-            new_tag = f'<meta name="robots" content="{IDEAL_ROBOTS}">'
-            content = content.replace(old_tag, new_tag, 1)
-            changes.append(f"robots更新: '{current_val}' -> '{IDEAL_ROBOTS}'")
-            stats["robots_updated"] += 1
-    else:
-        # titleタグの直後に挿入
-        title_end = find_title_end(content)
-        if title_end > 0:
-            insert_tag = f'\n    <meta name="robots" content="{IDEAL_ROBOTS}">'
-            content = content[:title_end] + insert_tag + content[title_end:]
-            changes.append("robots追加")
-            stats["robots_added"] += 1
-
-    # ─── 2. og:image ───
-    m = has_meta(content, prop="og:image")
-    if m:
-        current_val = m.group(1)
-        if current_val != IDEAL_OG_IMAGE:
-            old_tag = m.group(0)
-            new_tag = f'<meta property="og:image" content="{IDEAL_OG_IMAGE}">'
-            content = content.replace(old_tag, new_tag, 1)
-            changes.append(f"og:image修正: '{current_val}' -> '{IDEAL_OG_IMAGE}'")
-            stats["og_image_fixed"] += 1
-    else:
-        # og:typeの後、またはtitleタグの後に挿入
-        m_ogtype = has_meta(content, prop="og:type")
-        if m_ogtype:
-            insert_pos = m_ogtype.end()
-        else:
-            insert_pos = find_title_end(content)
-        if insert_pos > 0:
-            insert_tag = f'\n    <meta property="og:image" content="{IDEAL_OG_IMAGE}">'
-            content = content[:insert_pos] + insert_tag + content[insert_pos:]
-            changes.append("og:image追加")
-            stats["og_image_added"] += 1
-
-    # ─── 3. twitter:card ───
-    m = has_meta(content, name="twitter:card")
-    if m:
-        current_val = m.group(1)
-        if current_val != IDEAL_TWITTER_CARD:
-            old_tag = m.group(0)
-            new_tag = f'<meta name="twitter:card" content="{IDEAL_TWITTER_CARD}">'
-            content = content.replace(old_tag, new_tag, 1)
-            changes.append(f"twitter:card修正: '{current_val}' -> '{IDEAL_TWITTER_CARD}'")
-            stats["twitter_card_fixed"] += 1
-    else:
-        # robots metaの後に挿入
-        m_robots = has_meta(content, name="robots")
-        if m_robots:
-            insert_pos = m_robots.end()
-        else:
-            insert_pos = find_title_end(content)
-        if insert_pos > 0:
-            insert_tag = f'\n    <meta name="twitter:card" content="{IDEAL_TWITTER_CARD}">'
-            content = content[:insert_pos] + insert_tag + content[insert_pos:]
-            changes.append("twitter:card追加")
-            stats["twitter_card_added"] += 1
-
-    # ─── 4. og:locale ───
-    m = has_meta(content, prop="og:locale")
-    if m:
-        current_val = m.group(1)
-        if current_val != IDEAL_OG_LOCALE:
-            old_tag = m.group(0)
-            new_tag = f'<meta property="og:locale" content="{IDEAL_OG_LOCALE}">'
-            content = content.replace(old_tag, new_tag, 1)
-            changes.append(f"og:locale修正: '{current_val}' -> '{IDEAL_OG_LOCALE}'")
-            stats["og_locale_fixed"] += 1
-    else:
-        # og:site_nameの後に挿入
-        m_sitename = has_meta(content, prop="og:site_name")
-        if m_sitename:
-            insert_pos = m_sitename.end()
-        else:
-            m_ogimage = has_meta(content, prop="og:image")
-            if m_ogimage:
-                insert_pos = m_ogimage.end()
-            else:
-                insert_pos = find_title_end(content)
-        if insert_pos > 0:
-            insert_tag = f'\n    <meta property="og:locale" content="{IDEAL_OG_LOCALE}">'
-            content = content[:insert_pos] + insert_tag + content[insert_pos:]
-            changes.append("og:locale追加")
-            stats["og_locale_added"] += 1
-
-    # ─── 5. twitter:image ───
-    m = has_meta(content, name="twitter:image")
-    if m:
-        current_val = m.group(1)
-        if current_val != IDEAL_OG_IMAGE:
-            old_tag = m.group(0)
-            new_tag = f'<meta name="twitter:image" content="{IDEAL_OG_IMAGE}">'
-            content = content.replace(old_tag, new_tag, 1)
-            changes.append(f"twitter:image修正: '{current_val}' -> '{IDEAL_OG_IMAGE}'")
-            stats["twitter_image_fixed"] += 1
-    else:
-        # twitter:cardの後に挿入
-        m_tcard = has_meta(content, name="twitter:card")
-        if m_tcard:
-            # twitter:descriptionがあればその後に
-            m_tdesc = has_meta(content, name="twitter:description")
-            if m_tdesc:
-                insert_pos = m_tdesc.end()
-            else:
-                # twitter:titleがあればその後に
-                m_ttitle = has_meta(content, name="twitter:title")
-                if m_ttitle:
-                    insert_pos = m_ttitle.end()
-                else:
-                    insert_pos = m_tcard.end()
-        else:
-            insert_pos = find_title_end(content)
-        if insert_pos > 0:
-            insert_tag = f'\n    <meta name="twitter:image" content="{IDEAL_OG_IMAGE}">'
-            content = content[:insert_pos] + insert_tag + content[insert_pos:]
-            changes.append("twitter:image追加")
-            stats["twitter_image_added"] += 1
+    content, fixes = apply_meta_fixes(original)
+    for key, _ in fixes:
+        stats[key] += 1
 
     # ─── 書き込み ───
     if content != original:
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(content)
         stats["modified"] += 1
-        stats["files_detail"].append((relpath, changes))
+        stats["files_detail"].append((os.path.relpath(filepath, BASE_DIR), [msg for _, msg in fixes]))
 
     stats["scanned"] += 1
 
 
+@transform("meta_tags", match_paths("lp/job-seeker/guide/*.html", "lp/job-seeker/area/*.html",
+                                    "blog/*.html", "*.html", exclude=EXCLUDE))
+def meta_tags_transform(page):
+    page.text, fixes = apply_meta_fixes(page.text)
+    return [msg for _, msg in fixes]
+
+
+# ─── 比較用の参照実装（索引化前の方式） ───
+
+def _reference_has_meta(content, attr, key):
+    """旧 has_meta: 呼ぶたびにパターンを組み立てて文書全体を探す"""
+    m = re.search(rf'<meta\s+{attr}="{re.escape(key)}"\s+content="([^"]*)"[^>]*/?\s*>', content, re.IGNORECASE)
+    if not m:
+        # content="..." name="..." の順もある
+        m = re.search(rf'<meta\s+content="([^"]*)"\s+{attr}="{re.escape(key)}"[^>]*/?\s*>', content, re.IGNORECASE)
+    return m
+
+
+def _reference_fixes(content):
+    """旧方式: ルールごとに文書全体を探索し、置換・挿入のたびに文字列を組み立て直す（--bench 用）"""
+    for _, _, attr, key, ideal, _, candidates in META_RULES:
+        m = _reference_has_meta(content, attr, key)
+        if m:
+            if m.group(1) != ideal:
+                content = content.replace(m.group(0), _meta_tag(attr, key, ideal), 1)
+            continue
+        insert_pos = -1
+        for cand in candidates:
+            if cand is TITLE:
+                m = re.search(r'</title>', content, re.IGNORECASE)
+                insert_pos = m.end() if m else -1
+                break
+            if len(cand) > 2 and not _reference_has_meta(content, "name", cand[2]):
+                continue
+            found = _reference_has_meta(content, cand[0], cand[1])
+            if found:
+                insert_pos = found.end()
+                break
+        if insert_pos > 0:
+            content = content[:insert_pos] + "\n    " + _meta_tag(attr, key, ideal) + content[insert_pos:]
+    return content
+
+
+def benchmark(repeat=5):
+    """collect_html_files() 全件で、索引+1回スプライス方式と旧方式の参照実装を比較
+
+    現状のページ（統一済み）と、統一対象の meta を取り除いたページ（要修正）の2通りで計測する。
+    ファイルは先に読み込み、CPU 時間だけを比べる。
+    """
+    pages = []
+    for path in collect_html_files():
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    strip = re.compile(r'\s*<meta\s+(?:name="(?:robots|twitter:card|twitter:image)"|property="og:locale")[^>]*>',
+                       re.IGNORECASE)
+    scenarios = [("現状", pages), ("要修正", [strip.sub("", p) for p in pages])]
+    print(f"対象: {len(pages)} ファイル ({sum(len(p) for p in pages):,} 文字), best of {repeat}")
+
+    def run_new(docs):
+        return [apply_meta_fixes(d)[0] for d in docs]
+
+    def run_reference(docs):
+        return [_reference_fixes(d) for d in docs]
+
+    for scenario, docs in scenarios:
+        results = {}
+        for label, fn in (("index + splice", run_new), ("reference", run_reference)):
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                out = fn(docs)
+                times.append(time.perf_counter() - t0)
+            results[label] = (min(times), out)
+
+        (new_t, new_out), (old_t, old_out) = results["index + splice"], results["reference"]
+        n_changed = sum(1 for d, c in zip(docs, new_out) if c != d)
+        print(f"[{scenario}] 変更予定 {n_changed} ファイル")
+        print(f"  index + splice  {new_t * 1000:8.2f}ms ({new_t / len(docs) * 1e6:.0f}us/file)")
+        print(f"  reference       {old_t * 1000:8.2f}ms ({old_t / len(docs) * 1e6:.0f}us/file)")
+        print(f"  speedup: {old_t / new_t:.1f}x")
+        if new_out != old_out:
+            diff = sum(1 for x, y in zip(new_out, old_out) if x != y)
+            print(f"  WARNING: {diff} ファイルで結果が一致しません")
+            sys.exit(1)
+
+
 def main():
+    if "--bench" in sys.argv[1:]:
+        benchmark()
+        return
+
     print("=" * 60)
     print("meta情報統一スクリプト")
     print("=" * 60)
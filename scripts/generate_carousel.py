@@ -38,6 +38,8 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
+import image_encode
+
 # ===========================================================================
 # Constants
 # ===========================================================================
@@ -377,37 +379,41 @@ def draw_centered_text_block(
 # Decorative elements v3.0
 # ===========================================================================
 
-def _draw_dot_grid(draw: ImageDraw.ImageDraw, theme: dict, alpha: int = 15, spacing: int = 60):
+def _draw_dot_grid(draw: ImageDraw.ImageDraw, theme: dict, alpha: int = 15, spacing: int = 60,
+                   size: tuple = (CANVAS_W, CANVAS_H)):
     """Draw a subtle dot grid pattern across the canvas."""
     color = (*theme["accent"][:3], alpha)
-    for y in range(0, CANVAS_H, spacing):
-        for x in range(0, CANVAS_W, spacing):
+    w, h = size
+    for y in range(0, h, spacing):
+        for x in range(0, w, spacing):
             r = 2
             draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
 
 
-def _draw_corner_accents(draw: ImageDraw.ImageDraw, theme: dict, alpha: int = 40):
+def _draw_corner_accents(draw: ImageDraw.ImageDraw, theme: dict, alpha: int = 40,
+                         size: tuple = (CANVAS_W, CANVAS_H)):
     """Draw decorative corner accent lines."""
     color = (*theme["accent"][:3], alpha)
     length = 120
     thickness = 3
     margin = 40
+    w, h = size
 
     # Top-left
     draw.line([(margin, margin), (margin + length, margin)], fill=color, width=thickness)
     draw.line([(margin, margin), (margin, margin + length)], fill=color, width=thickness)
 
     # Top-right
-    draw.line([(CANVAS_W - margin, margin), (CANVAS_W - margin - length, margin)], fill=color, width=thickness)
-    draw.line([(CANVAS_W - margin, margin), (CANVAS_W - margin, margin + length)], fill=color, width=thickness)
+    draw.line([(w - margin, margin), (w - margin - length, margin)], fill=color, width=thickness)
+    draw.line([(w - margin, margin), (w - margin, margin + length)], fill=color, width=thickness)
 
     # Bottom-left
-    draw.line([(margin, CANVAS_H - margin), (margin + length, CANVAS_H - margin)], fill=color, width=thickness)
-    draw.line([(margin, CANVAS_H - margin), (margin, CANVAS_H - margin - length)], fill=color, width=thickness)
+    draw.line([(margin, h - margin), (margin + length, h - margin)], fill=color, width=thickness)
+    draw.line([(margin, h - margin), (margin, h - margin - length)], fill=color, width=thickness)
 
     # Bottom-right
-    draw.line([(CANVAS_W - margin, CANVAS_H - margin), (CANVAS_W - margin - length, CANVAS_H - margin)], fill=color, width=thickness)
-    draw.line([(CANVAS_W - margin, CANVAS_H - margin), (CANVAS_W - margin, CANVAS_H - margin - length)], fill=color, width=thickness)
+    draw.line([(w - margin, h - margin), (w - margin - length, h - margin)], fill=color, width=thickness)
+    draw.line([(w - margin, h - margin), (w - margin, h - margin - length)], fill=color, width=thickness)
 
 
 def _draw_decorative_rings(img: Image.Image, theme: dict, count: int = 3, alpha: int = 12):
@@ -416,10 +422,11 @@ def _draw_decorative_rings(img: Image.Image, theme: dict, count: int = 3, alpha:
     d = ImageDraw.Draw(overlay)
     accent = theme["accent"]
 
+    w, h = img.size
     positions = [
-        (CANVAS_W * 0.85, CANVAS_H * 0.15, 180),
-        (CANVAS_W * 0.1, CANVAS_H * 0.7, 140),
-        (CANVAS_W * 0.75, CANVAS_H * 0.85, 100),
+        (w * 0.85, h * 0.15, 180),
+        (w * 0.1, h * 0.7, 140),
+        (w * 0.75, h * 0.85, 100),
     ]
 
     for i in range(min(count, len(positions))):
@@ -439,9 +446,10 @@ def _draw_diagonal_stripes(img: Image.Image, theme: dict, alpha: int = 8):
     d = ImageDraw.Draw(overlay)
     color = (*theme["accent_light"][:3], alpha)
     spacing = 80
+    w, h = img.size
 
-    for offset in range(-CANVAS_H, CANVAS_W + CANVAS_H, spacing):
-        d.line([(offset, 0), (offset + CANVAS_H, CANVAS_H)], fill=color, width=1)
+    for offset in range(-h, w + h, spacing):
+        d.line([(offset, 0), (offset + h, h)], fill=color, width=1)
 
     return Image.alpha_composite(img, overlay)
 
@@ -450,15 +458,16 @@ def _draw_diagonal_stripes(img: Image.Image, theme: dict, alpha: int = 8):
 # Background builders v3.0
 # ===========================================================================
 
-def _build_dark_bg(theme: dict) -> Image.Image:
+def _build_dark_bg(theme: dict, size: tuple = (CANVAS_W, CANVAS_H)) -> Image.Image:
     """Dark gradient background with glow and decorative elements."""
-    bg = create_gradient(CANVAS_W, CANVAS_H, theme["bg_dark_top"], theme["bg_dark_bottom"])
+    w, h = size
+    bg = create_gradient(w, h, theme["bg_dark_top"], theme["bg_dark_bottom"])
 
     # Radial glow from center-top
-    glow = Image.new("RGBA", (CANVAS_W, CANVAS_H), (0, 0, 0, 0))
+    glow = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     glow_draw = ImageDraw.Draw(glow)
     accent = theme["accent"]
-    cx, cy = CANVAS_W // 2, CANVAS_H // 4
+    cx, cy = w // 2, h // 4
     for r in range(500, 0, -8):
         a = max(1, int(10 * (1 - r / 500)))
         glow_draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(*accent[:3], a))
@@ -469,43 +478,45 @@ def _build_dark_bg(theme: dict) -> Image.Image:
     bg = _draw_decorative_rings(bg, theme, count=2, alpha=10)
 
     draw = ImageDraw.Draw(bg)
-    _draw_corner_accents(draw, theme, alpha=30)
+    _draw_corner_accents(draw, theme, alpha=30, size=size)
 
     return bg
 
 
-def _build_light_bg(theme: dict) -> Image.Image:
+def _build_light_bg(theme: dict, size: tuple = (CANVAS_W, CANVAS_H)) -> Image.Image:
     """Light, clean background with subtle color tint."""
-    bg = create_gradient(CANVAS_W, CANVAS_H, theme["bg_primary"], theme["bg_secondary"])
+    w, h = size
+    bg = create_gradient(w, h, theme["bg_primary"], theme["bg_secondary"])
 
     # Top accent strip
     draw = ImageDraw.Draw(bg)
-    draw.rectangle([(0, 0), (CANVAS_W, 5)], fill=(*theme["accent"][:3], 140))
+    draw.rectangle([(0, 0), (w, 5)], fill=(*theme["accent"][:3], 140))
 
     # Subtle dot grid
-    _draw_dot_grid(draw, theme, alpha=12, spacing=80)
+    _draw_dot_grid(draw, theme, alpha=12, spacing=80, size=size)
 
     # Corner accents (lighter)
-    _draw_corner_accents(draw, theme, alpha=25)
+    _draw_corner_accents(draw, theme, alpha=25, size=size)
 
     return bg
 
 
-def _build_accent_gradient_bg(theme: dict) -> Image.Image:
+def _build_accent_gradient_bg(theme: dict, size: tuple = (CANVAS_W, CANVAS_H)) -> Image.Image:
     """Bold accent gradient for reveal/emphasis slides."""
-    bg = create_gradient(CANVAS_W, CANVAS_H, theme["gradient_a"], theme["gradient_b"], direction="diagonal")
+    bg = create_gradient(*size, theme["gradient_a"], theme["gradient_b"], direction="diagonal")
     bg = _draw_decorative_rings(bg, theme, count=3, alpha=20)
     return bg
 
 
-def _build_brand_gradient_bg() -> Image.Image:
+def _build_brand_gradient_bg(size: tuple = (CANVAS_W, CANVAS_H)) -> Image.Image:
     """Brand gradient (blue-to-teal) for CTA slide."""
-    bg = create_gradient(CANVAS_W, CANVAS_H, COLOR_BRAND_BLUE, COLOR_BRAND_TEAL, direction="diagonal")
+    w, h = size
+    bg = create_gradient(w, h, COLOR_BRAND_BLUE, COLOR_BRAND_TEAL, direction="diagonal")
 
     # Glow
-    glow = Image.new("RGBA", (CANVAS_W, CANVAS_H), (0, 0, 0, 0))
+    glow = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     gd = ImageDraw.Draw(glow)
-    cx, cy = CANVAS_W // 2, CANVAS_H // 2
+    cx, cy = w // 2, h // 2
     for r in range(600, 0, -10):
         a = max(1, int(6 * (1 - r / 600)))
         gd.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(255, 255, 255, a))
@@ -1196,7 +1207,7 @@ def generate_carousel(
     # --- Slide 1: HOOK ---
     img1 = generate_slide_hook(hook, theme=theme, total_slides=total_slides_count)
     p1 = out / f"{content_id}_slide_01_hook.png"
-    img1.save(str(p1), "PNG", quality=95)
+    image_encode.save(img1, p1, "final")
     saved_paths.append(str(p1))
     print(f"    slide 01 (HOOK): {hook[:30]}...")
 
@@ -1221,7 +1232,7 @@ def generate_carousel(
             total_slides=total_slides_count,
         )
         p = out / f"{content_id}_slide_{slide_num:02d}_content.png"
-        img.save(str(p), "PNG", quality=95)
+        image_encode.save(img, p, "final")
         saved_paths.append(str(p))
         print(f"    slide {slide_num:02d} (CONTENT {'dark' if dark else 'light'}): {title[:30]}...")
 
@@ -1229,7 +1240,7 @@ def generate_carousel(
     cta_slide_num = total_slides_count
     img_cta = generate_slide_cta(cta_type=cta_type, theme=theme, total_slides=total_slides_count)
     p_cta = out / f"{content_id}_slide_{cta_slide_num:02d}_cta.png"
-    img_cta.save(str(p_cta), "PNG", quality=95)
+    image_encode.save(img_cta, p_cta, "final")
     saved_paths.append(str(p_cta))
     print(f"    slide {cta_slide_num:02d} (CTA: {cta_type})")
 
@@ -1493,12 +1504,11 @@ def generate_carousel_backgrounds(
         "slides": [],
     }
 
-    # Slide 1: Hook background
-    bg1 = _build_dark_bg(theme)
-    if canvas_h != CANVAS_H:
-        bg1 = bg1.resize((canvas_w, canvas_h), Image.LANCZOS)
+    # Slide 1: Hook background (rendered natively at the platform geometry)
+    size = (canvas_w, canvas_h)
+    bg1 = _build_dark_bg(theme, size)
     p1 = out / f"{content_id}_bg_01_hook.png"
-    bg1.save(str(p1), "PNG")
+    image_encode.save(bg1, p1, "intermediate")
     bg_paths.append(str(p1))
 
     font_hook = load_font(bold=True, size=120)
@@ -1524,15 +1534,12 @@ def generate_carousel_backgrounds(
         dark = (i % 2 == 0)
 
         if dark:
-            bg = _build_dark_bg(theme)
+            bg = _build_dark_bg(theme, size)
         else:
-            bg = _build_light_bg(theme)
-
-        if canvas_h != CANVAS_H:
-            bg = bg.resize((canvas_w, canvas_h), Image.LANCZOS)
+            bg = _build_light_bg(theme, size)
 
         p = out / f"{content_id}_bg_{slide_num:02d}_content.png"
-        bg.save(str(p), "PNG")
+        image_encode.save(bg, p, "intermediate")
         bg_paths.append(str(p))
 
         title = slide_data.get("title", "")
@@ -1565,11 +1572,9 @@ def generate_carousel_backgrounds(
         })
 
     # CTA background
-    bg_cta = _build_brand_gradient_bg()
-    if canvas_h != CANVAS_H:
-        bg_cta = bg_cta.resize((canvas_w, canvas_h), Image.LANCZOS)
+    bg_cta = _build_brand_gradient_bg(size)
     p_cta = out / f"{content_id}_bg_{total:02d}_cta.png"
-    bg_cta.save(str(p_cta), "PNG")
+    image_encode.save(bg_cta, p_cta, "intermediate")
     bg_paths.append(str(p_cta))
 
     cta_texts = {
@@ -1674,6 +1679,9 @@ def main():
 
     else:
         parser.print_help()
+        return
+
+    image_encode.report()
 
 
 if __name__ == "__main__":
@@ -9,14 +9,15 @@ import os
 import sys
 import time
 from pathlib import Path
-from dotenv import load_dotenv
 import google.generativeai as genai
 from PIL import Image
 import io
 
+from runtime_config import load_env
+
 # プロジェクトルートから.envを読み込む
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Google Gemini API設定
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
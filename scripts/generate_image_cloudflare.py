@@ -9,14 +9,15 @@ import os
 import sys
 import time
 from pathlib import Path
-from dotenv import load_dotenv
 import requests
 from PIL import Image
 import io
 
+from runtime_config import load_env
+
 # プロジェクトルートから.envを読み込む
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Cloudflare API設定
 CLOUDFLARE_ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID")
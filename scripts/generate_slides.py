@@ -17,6 +17,8 @@ from pathlib import Path
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont
 
+import image_encode
+
 project_root = Path(__file__).parent.parent
 
 # フォント検索パス（太字/標準）
@@ -293,7 +295,7 @@ def create_slide(base_image_path, text, output_path, slide_num=1, is_hook=False)
 
     # 保存
     final_img = img_with_overlay.convert('RGB')
-    final_img.save(output_path, "PNG", quality=95)
+    image_encode.save(final_img, output_path, "final")
 
 
 def normalize_slides(data):
@@ -419,6 +421,9 @@ def main():
         generate_slides(json_path)
     else:
         parser.print_help()
+        return
+
+    image_encode.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+ハッシュタグエンジン — ナースロビー
+
+ハッシュタグの選定・検証をここに集約する（ai_content_engine / sns_workflow 共通）。
+  - data/hashtag_rotation.json の combos / banned_tags は1回だけ読み、
+    禁止タグは frozenset、ローテーションは通日(1-366)→タグの表に展開しておく
+  - tags_for(day, content_type) は表引きのみ（O(1)）
+  - validate_batch() / audit() はバッチ全体を1パスで検証する
+    （キャプション本文に埋め込まれたタグも対象）
+
+rotation ファイルが編集されると runtime_config 側のキャッシュが差し替わるので、
+get_engine() はそれを検知して表を作り直す。
+
+使い方:
+  import hashtag_engine
+  hashtag_engine.tags_for()                    # 今日のローテーション
+  hashtag_engine.tags_for(content_type="salary")
+  hashtag_engine.validate(["#AI", "#看護師"])  # → ["#看護師"]
+
+  python3 hashtag_engine.py                    # 今日のタグ・タイプ別タグを表示
+  python3 hashtag_engine.py --date 2026-03-01
+  python3 hashtag_engine.py --check            # 投稿キュー全体の禁止タグ検査
+"""
+
+import argparse
+import re
+import sys
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import runtime_config
+
+# 1投稿あたりの上限
+MAX_TAGS = 5
+
+# rotation ファイルの banned_tags に追加される常設の禁止タグ
+BANNED_HASHTAGS = frozenset({"#AI", "#fyp", "#foryou", "#viral", "#foryoupage", "#AIやってみた"})
+
+# rotation ファイルが無い・空の時のタグ
+FALLBACK_TAGS = ("#看護師あるある", "#看護師の日常", "#神奈川看護師", "#ナースロビー")
+
+# コンテンツタイプ別の固定タグ（sns_workflow のキャプションテンプレートと対応）
+# content_type: (タグプール, 使う個数)
+TYPE_HASHTAGS = {
+    "aruaru": (
+        ["#看護師あるある", "#ナースロビー", "#看護師の日常", "#ナース", "#神奈川看護師"], 4,
+    ),
+    "career": (
+        ["#看護師転職", "#ナースロビー", "#キャリア", "#神奈川看護師", "#転職"], 4,
+    ),
+    "salary": (
+        ["#看護師転職", "#ナースロビー", "#給与", "#年収", "#神奈川看護師"], 4,
+    ),
+    "service": (
+        ["#看護師転職", "#ナースロビー", "#手数料10パーセント"], 3,
+    ),
+    "trend": (
+        ["#看護師あるある", "#ナースロビー", "#看護師の日常", "#ナース", "#神奈川看護師"], 5,
+    ),
+}
+
+# キャプション本文中のハッシュタグ（次の空白・#まで）
+TAG_PATTERN = re.compile(r"#[^\s#]+")
+
+
+# ===================================================================
+# エンジン本体
+# ===================================================================
+
+class HashtagEngine:
+    """ローテーション表・禁止タグ・タイプ別タグを前計算して保持する（生成後は不変）"""
+
+    def __init__(self, rotation: Dict, type_hashtags: Dict = TYPE_HASHTAGS):
+        self.banned = BANNED_HASHTAGS | frozenset(rotation.get("banned_tags", []))
+        self.combos = tuple(
+            self.clean(combo.get("tags", []))
+            for combo in rotation.get("combos", [])
+            if isinstance(combo, dict)
+        )
+        # 通日(tm_yday: 1-366) → タグ。従来どおり combos[通日 % 組数]
+        if self.combos:
+            self._by_day = tuple(self.combos[yday % len(self.combos)] for yday in range(367))
+        else:
+            self._by_day = (FALLBACK_TAGS,) * 367
+        self._by_type = {
+            content_type: self.clean(pool[:count])
+            for content_type, (pool, count) in type_hashtags.items()
+        }
+
+    def clean(self, tags: Iterable[str]) -> tuple:
+        """禁止タグを除去し MAX_TAGS 個までに切る"""
+        banned = self.banned
+        return tuple(t for t in tags if t not in banned)[:MAX_TAGS]
+
+    def validate(self, tags: Iterable[str]) -> List[str]:
+        return list(self.clean(tags))
+
+    def tags_for(self, day: Optional[date] = None, content_type: Optional[str] = None) -> List[str]:
+        """タイプ別の固定タグがあればそれを、なければその日のローテーションを返す"""
+        tags = self._by_type.get(content_type) if content_type else None
+        if tags is None:
+            tags = self._by_day[(day or date.today()).timetuple().tm_yday]
+        return list(tags)
+
+    def banned_in(self, text: str) -> List[str]:
+        """テキスト中の禁止タグ（出現順）"""
+        banned = self.banned
+        return [t for t in TAG_PATTERN.findall(text or "") if t in banned]
+
+    def validate_batch(self, posts: Iterable[Dict]) -> int:
+        """posts の "hashtags" をその場で検証・修正する。修正した件数を返す"""
+        changed = 0
+        for post in posts:
+            tags = post.get("hashtags") or []
+            clean = self.validate(tags)
+            if clean != tags:
+                post["hashtags"] = clean
+                changed += 1
+        return changed
+
+    def audit(self, posts: Iterable[Dict]) -> List[Dict]:
+        """バッチ全体を1パスで検査し、問題のある投稿だけを返す（データは変更しない）"""
+        issues = []
+        for post in posts:
+            tags = post.get("hashtags") or []
+            banned_tags = [t for t in tags if t in self.banned]
+            banned_caption = self.banned_in(post.get("caption", ""))
+            too_many = len(tags) - len(banned_tags) > MAX_TAGS
+            if banned_tags or banned_caption or too_many:
+                issues.append({
+                    "id": post.get("id"),
+                    "banned_tags": banned_tags,
+                    "banned_in_caption": banned_caption,
+                    "too_many": too_many,
+                })
+        return issues
+
+
+# ===================================================================
+# 共有インスタンス
+# ===================================================================
+
+_engine = None
+_engine_source = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> HashtagEngine:
+    """rotation ファイルが変わった時だけ作り直す共有エンジン"""
+    global _engine, _engine_source
+    rotation = runtime_config.hashtag_rotation()
+    with _engine_lock:
+        if _engine is None or rotation is not _engine_source:
+            _engine = HashtagEngine(rotation or {})
+            _engine_source = rotation
+        return _engine
+
+
+def tags_for(day: Optional[date] = None, content_type: Optional[str] = None) -> List[str]:
+    return get_engine().tags_for(day, content_type)
+
+
+def validate(tags: Iterable[str]) -> List[str]:
+    return get_engine().validate(tags)
+
+
+def validate_batch(posts: Iterable[Dict]) -> int:
+    return get_engine().validate_batch(posts)
+
+
+def audit(posts: Iterable[Dict]) -> List[Dict]:
+    return get_engine().audit(posts)
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="ハッシュタグエンジン")
+    parser.add_argument("--date", help="対象日 YYYY-MM-DD（既定: 今日）")
+    parser.add_argument("--check", action="store_true",
+                        help="投稿キュー全体の禁止タグ・個数を検査")
+    args = parser.parse_args()
+
+    engine = get_engine()
+
+    if args.check:
+        queue = runtime_config.read_json(runtime_config.DATA_DIR / "posting_queue.json", {})
+        posts = queue.get("posts", [])
+        issues = engine.audit(posts)
+        for issue in issues:
+            parts = []
+            if issue["banned_tags"]:
+                parts.append(f"禁止タグ {' '.join(issue['banned_tags'])}")
+            if issue["banned_in_caption"]:
+                parts.append(f"本文中の禁止タグ {' '.join(issue['banned_in_caption'])}")
+            if issue["too_many"]:
+                parts.append(f"{MAX_TAGS}個超過")
+            print(f"  #{issue['id']}: {' / '.join(parts)}")
+        print(f"検査: {len(posts)}件中 {len(issues)}件に問題")
+        sys.exit(1 if issues else 0)
+
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date else date.today()
+    print(f"禁止タグ: {' '.join(sorted(engine.banned))}")
+    print(f"{day} のローテーション: {' '.join(engine.tags_for(day))}")
+    for content_type in TYPE_HASHTAGS:
+        print(f"  {content_type:8s} {' '.join(engine.tags_for(day, content_type))}")
+
+
+if __name__ == "__main__":
+    main()
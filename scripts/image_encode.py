@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+画像エンコードポリシー — ナースロビー
+
+レンダラー（generate_carousel / generate_slides / overlay_text / video_text_animator）の
+画像書き出しをここに集約し、用途ごとに圧縮の掛け方を変える。
+PNG は quality を無視するので、従来の save(..., "PNG", quality=95) は既定の zlib レベル6だった。
+
+  - intermediate: 後段で読み直すだけの中間ファイル（動画用背景など）
+                  → compress_level=1 で速く書く
+  - frame:        ffmpeg に渡す動画フレーム → ファイルにせず生RGBバッファ（raw_frame）
+  - rendition:    マスターから派生させるプラットフォーム別の画像（renditions.py のキャッシュ）
+                  → PNG は compress_level=1、JPEG は呼び出し側の quality
+  - final:        投稿される画像 → まず compress_level=1 で書き、
+                  バックグラウンドのプールで optimize + 可逆なパレット化をして差し替える
+
+書き込みは一時ファイル + os.replace（blob_store のハードリンク先を書き換えない）。
+ステージごとの枚数・バイト数・エンコード時間を集計し report() で表示する。
+プロセス終了時には final の最適化が終わるまで待つ。
+
+使い方:
+  import image_encode
+  image_encode.save(img, path, "final")
+  image_encode.save(bg, path, "intermediate")
+  proc.stdin.write(image_encode.raw_frame(frame))
+  image_encode.report()
+
+  python3 image_encode.py slide_*.png     # 既存PNGに final の最適化をかける（結果を表示）
+"""
+
+import argparse
+import atexit
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ステージごとのPNG保存オプション
+STAGE_OPTIONS = {
+    "intermediate": {"compress_level": 1},
+    "rendition": {"compress_level": 1},
+    "final": {"compress_level": 1},
+}
+# final の仕上げ（バックグラウンド）
+OPTIMIZE_OPTIONS = {"optimize": True}
+# 仕上げを並列に走らせる数（zlib は GIL を離すのでスレッドで足りる）
+FINAL_WORKERS = int(os.getenv("IMAGE_ENCODE_WORKERS", "2"))
+# パレット化を試す色数の上限（これ以下の色数なら劣化なしで P モードにできる）
+PALETTE_MAX_COLORS = 256
+
+
+# ===================================================================
+# 集計
+# ===================================================================
+
+class EncodeStats:
+    """ステージごとの 枚数 / 出力バイト / エンコードms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def add(self, stage: str, nbytes: int, ms: float):
+        with self._lock:
+            row = self.stages.setdefault(stage, {"count": 0, "bytes": 0, "ms": 0.0})
+            row["count"] += 1
+            row["bytes"] += nbytes
+            row["ms"] += ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self.stages.items()}
+
+
+stats = EncodeStats()
+
+
+def report(file=None):
+    """ステージごとの集計を表示"""
+    file = file or sys.stdout
+    wait()
+    rows = stats.snapshot()
+    if not rows:
+        return
+    print("  [ENCODE] stage          count      bytes      ms  ms/img", file=file)
+    for stage, row in rows.items():
+        per = row["ms"] / row["count"] if row["count"] else 0
+        print(f"  [ENCODE] {stage:14s} {row['count']:5d} {row['bytes'] / 1024 / 1024:8.1f}MB "
+              f"{row['ms']:7.0f} {per:7.1f}", file=file)
+
+
+# ===================================================================
+# 書き出し
+# ===================================================================
+
+def _write(img, path: Path, fmt: str, options: dict) -> int:
+    """一時ファイルに書いて os.replace。書いたバイト数を返す"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            img.save(f, fmt, **options)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path.stat().st_size
+
+
+def save(img, path, stage: str = "final", fmt: str = "PNG", **options):
+    """ステージに応じて保存する。final はバックグラウンドで最適化を予約
+
+    options は PIL の保存オプション（JPEG の quality など）。PNG ではステージの既定に上書きする。
+    """
+    path = Path(path)
+    if fmt.upper() == "PNG":
+        options = {**STAGE_OPTIONS.get(stage, {}), **options}
+    start = time.perf_counter()
+    nbytes = _write(img, path, fmt, options)
+    stats.add(stage, nbytes, (time.perf_counter() - start) * 1000)
+    if stage == "final" and fmt.upper() == "PNG":
+        _submit(optimize_png, path, img.copy())
+
+
+def raw_frame(img) -> bytes:
+    """ffmpeg（-f rawvideo -pix_fmt rgb24）に渡す生バッファ"""
+    start = time.perf_counter()
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    data = img.tobytes()
+    stats.add("frame", len(data), (time.perf_counter() - start) * 1000)
+    return data
+
+
+def _lossless_palette(img):
+    """色数が PALETTE_MAX_COLORS 以下で、劣化なしに P モードにできれば返す"""
+    if img.mode not in ("RGB", "L"):
+        return None
+    colors = img.getcolors(PALETTE_MAX_COLORS)
+    if colors is None:
+        return None
+    from PIL import ImageChops
+    paletted = img.quantize(colors=len(colors))
+    if ImageChops.difference(paletted.convert(img.mode), img).getbbox() is not None:
+        return None
+    return paletted
+
+
+def optimize_png(path, img=None) -> int:
+    """final の仕上げ: optimize（+ 可逆ならパレット化）して小さくなった時だけ差し替える"""
+    from PIL import Image
+
+    path = Path(path)
+    start = time.perf_counter()
+    if img is None:
+        with Image.open(path) as f:
+            img = f.copy()
+    before = path.stat().st_size
+    candidate = _lossless_palette(img) or img
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".png")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            candidate.save(f, "PNG", **OPTIMIZE_OPTIONS)
+        after = os.path.getsize(tmp)
+        if after < before:
+            os.replace(tmp, path)
+        else:
+            os.unlink(tmp)
+            after = before
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    stats.add("final-optimize", after, (time.perf_counter() - start) * 1000)
+    return before - after
+
+
+# ===================================================================
+# バックグラウンドプール
+# ===================================================================
+
+_pool = None
+_pending = []
+_pool_lock = threading.Lock()
+
+
+def _submit(fn, *args):
+    global _pool
+    with _pool_lock:
+        if FINAL_WORKERS <= 0:
+            fn(*args)
+            return
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=FINAL_WORKERS, thread_name_prefix="encode")
+            atexit.register(wait)
+        _pending.append(_pool.submit(fn, *args))
+
+
+def wait():
+    """予約済みの仕上げが全て終わるまで待つ（失敗は警告だけ）"""
+    with _pool_lock:
+        pending, _pending[:] = list(_pending), []
+    for future in pending:
+        try:
+            future.result()
+        except Exception as e:
+            print(f"[WARN] PNG最適化失敗: {e}", file=sys.stderr)
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="既存PNGに final の最適化をかける")
+    parser.add_argument("paths", nargs="+", help="PNGファイル")
+    args = parser.parse_args()
+
+    saved = 0
+    for p in args.paths:
+        saved += optimize_png(p)
+    print(f"{len(args.paths)}ファイル: {saved / 1024:.0f}KB 削減")
+    report()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,10 +25,12 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+import slack_client
+from runtime_config import load_env
+
 PROJECT_DIR = Path(__file__).parent.parent
 SESSION_FILE = PROJECT_DIR / "data" / ".instagram_session.json"
 ENGAGE_LOG_FILE = PROJECT_DIR / "data" / "engagement_log.json"
-ENV_FILE = PROJECT_DIR / ".env"
 
 # Target hashtags (nursing community)
 TARGET_HASHTAGS = [
@@ -64,16 +66,6 @@ LIKE_PROBABILITY = 0.8
 COMMENT_PROBABILITY = 0.08
 
 
-def load_env():
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 def load_engage_log() -> List[Dict]:
     if ENGAGE_LOG_FILE.exists():
         with open(ENGAGE_LOG_FILE) as f:
@@ -87,15 +79,7 @@ def save_engage_log(log: List[Dict]):
 
 
 def slack_notify(message: str):
-    try:
-        import subprocess
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception:
-        pass
+    slack_client.notify(message)
 
 
 def instagram_login():
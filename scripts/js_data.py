@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+js_data.py - data/*.js（areas.js / jobs.js）を Node.js なしで読むローダー
+
+`node -e "require(...)"` → JSON 出力 → json.loads の代わりに、JS ファイル中の
+オブジェクトリテラルを Python で直接パースする。
+
+- 戻り値は require() と同じく module.exports の中身（関数は JSON.stringify と同様に除外）
+- パース結果は data/.cache/js_data/ に保存し、ファイルの mtime・サイズが同じ間は再利用
+- 同一プロセス内ではメモリ上でも再利用する
+
+Usage:
+    python3 scripts/js_data.py data/areas.js            # エクスポート名と件数を表示
+    python3 scripts/js_data.py data/areas.js --bench    # Node.js との起動時間比較
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_DIR / "data" / ".cache" / "js_data"
+
+CACHE_VERSION = 1
+
+_memory = {}  # 解決済みパス → (mtime_ns, size, exports)
+
+
+# =============================================================================
+# JS オブジェクトリテラルのパース
+# =============================================================================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<punct>[\[\]{}:,])
+""", re.VERBOSE | re.DOTALL)
+
+_JS_CONSTANTS = {"true": True, "false": False, "null": None, "undefined": None}
+
+_DECL_RE = re.compile(r"^(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?=[\[{])", re.MULTILINE)
+_EXPORTS_RE = re.compile(r"module\.exports\s*=\s*\{([^}]*)\}")
+
+
+class JSParseError(ValueError):
+    pass
+
+
+def _tokenize(text, pos=0):
+    n = len(text)
+    while pos < n:
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise JSParseError(f"unexpected character {text[pos]!r} at {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "ws":
+            continue
+        yield kind, m.group(), m.start()
+
+
+def _js_string(tok):
+    if tok[0] == "'":
+        tok = '"' + tok[1:-1].replace('\\\'', "'").replace('"', '\\"') + '"'
+    return json.loads(tok)
+
+
+def parse_js_value(text, pos=0):
+    """text[pos:] の先頭にある JS リテラル（配列/オブジェクト/文字列/数値）を Python 値にする
+
+    対応するのは data/*.js で使っている範囲（クォートなしキー・末尾カンマ・
+    コメント）のみ。関数や式は扱わない。
+    """
+    tokens = _tokenize(text, pos)
+
+    def value(tok):
+        kind, s, at = tok
+        if kind == "str":
+            return _js_string(s)
+        if kind == "num":
+            return float(s) if any(c in s for c in ".eE") else int(s)
+        if kind == "ident":
+            if s in _JS_CONSTANTS:
+                return _JS_CONSTANTS[s]
+            raise JSParseError(f"unsupported identifier {s!r} at {at}")
+        if s == "[":
+            items = []
+            for t in tokens:
+                if t[1] == "]":
+                    return items
+                if t[1] == ",":
+                    continue
+                items.append(value(t))
+            raise JSParseError("unterminated array")
+        if s == "{":
+            obj = {}
+            for t in tokens:
+                if t[1] == "}":
+                    return obj
+                if t[1] == ",":
+                    continue
+                if t[0] not in ("ident", "str", "num"):
+                    raise JSParseError(f"bad key {t[1]!r} at {t[2]}")
+                key = _js_string(t[1]) if t[0] == "str" else t[1]
+                colon = next(tokens)
+                if colon[1] != ":":
+                    raise JSParseError(f"expected ':' at {colon[2]}")
+                obj[key] = value(next(tokens))
+            raise JSParseError("unterminated object")
+        raise JSParseError(f"unexpected {s!r} at {at}")
+
+    try:
+        return value(next(tokens))
+    except StopIteration:
+        raise JSParseError("unexpected end of input") from None
+
+
+def parse_js_consts(text, *names):
+    """`const NAME = <literal>;` の値を {NAME: value} で返す"""
+    result = {}
+    for name in names:
+        m = re.search(rf"\b(?:const|let|var)\s+{re.escape(name)}\s*=\s*", text)
+        if not m:
+            raise JSParseError(f"{name} not found")
+        result[name] = parse_js_value(text, m.end())
+    return result
+
+
+def parse_js_module(text) -> dict:
+    """トップレベルのリテラル定義から module.exports 相当の dict を作る
+
+    module.exports = { A, B, alias: C } があればその名前だけ（関数は除外）、
+    なければトップレベルで定義された配列/オブジェクトすべてを返す。
+    """
+    decls = {m.group(1): m.end() for m in _DECL_RE.finditer(text)}
+    m = _EXPORTS_RE.search(text)
+    if m:
+        exports = []
+        for item in m.group(1).split(","):
+            item = item.strip()
+            if not item:
+                continue
+            key, _, ref = item.partition(":")
+            exports.append((key.strip(), (ref or key).strip()))
+    else:
+        exports = [(name, name) for name in decls]
+
+    result = {}
+    for key, ref in exports:
+        if ref in decls:
+            result[key] = parse_js_value(text, decls[ref])
+    return result
+
+
+# =============================================================================
+# キャッシュ付きローダー
+# =============================================================================
+
+def _cache_path(path: Path) -> Path:
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"{path.stem}-{digest}.pkl"
+
+
+def _write_cache(cache: Path, payload):
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def load_js_module(path, use_cache=True) -> dict:
+    """JS データファイルの module.exports を dict で返す（require() 相当）
+
+    mtime・サイズが前回と同じならパースせずキャッシュを返す。
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    if use_cache:
+        hit = _memory.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+        cache = _cache_path(path)
+        if cache.exists():
+            try:
+                with open(cache, "rb") as f:
+                    payload = pickle.load(f)
+                if payload.get("version") == CACHE_VERSION and payload.get("stamp") == stamp:
+                    _memory[path] = (stamp, payload["exports"])
+                    return payload["exports"]
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+                pass
+
+    exports = parse_js_module(path.read_text(encoding="utf-8"))
+    if use_cache:
+        _memory[path] = (stamp, exports)
+        _write_cache(_cache_path(path), {"version": CACHE_VERSION, "stamp": stamp, "exports": exports})
+    return exports
+
+
+def clear_cache():
+    _memory.clear()
+    if CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+
+
+# =============================================================================
+# ベンチマーク
+# =============================================================================
+
+def _node_load(path):
+    script = f"console.log(JSON.stringify(require({json.dumps(str(Path(path).resolve()))})));"
+    result = subprocess.run(["node", "-e", script], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout)
+
+
+def benchmark(path, repeat=5):
+    path = Path(path)
+
+    def timed(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        return min(times) * 1000, out
+
+    def cold():
+        return parse_js_module(path.read_text(encoding="utf-8"))
+
+    def warm_disk():
+        _memory.clear()
+        return load_js_module(path)
+
+    load_js_module(path)  # ディスクキャッシュを作っておく
+    rows = [("parse (no cache)", *timed(cold)),
+            ("disk cache", *timed(warm_disk)),
+            ("memory cache", *timed(lambda: load_js_module(path)))]
+    if shutil.which("node"):
+        rows.insert(0, ("node -e require()", *timed(lambda: _node_load(path))))
+
+    print(f"{path.name} ({path.stat().st_size:,} bytes), best of {repeat}")
+    reference = rows[0][2]
+    for label, ms, out in rows:
+        same = "" if out == reference else "  ※結果が一致しません"
+        print(f"  {label:20s} {ms:8.2f}ms{same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data/*.js を Node.js なしで読む")
+    parser.add_argument("path", help="JS データファイル")
+    parser.add_argument("--bench", action="store_true", help="Node.js との読み込み時間比較")
+    parser.add_argument("--clear", action="store_true", help="キャッシュを削除")
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_cache()
+    if args.bench:
+        benchmark(args.path)
+        return
+    try:
+        exports = load_js_module(args.path)
+    except (OSError, JSParseError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    for key, value in exports.items():
+        size = len(value) if isinstance(value, (list, dict)) else "-"
+        print(f"  {key}: {type(value).__name__} ({size})")
+
+
+if __name__ == "__main__":
+    main()
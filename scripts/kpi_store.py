@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+ROBBY THE MATCH KPI時系列ストア
+プロフィール指標・動画別指標を月別パーティションの型付き配列ファイルに保存する。
+kpi_log.csv はエクスポート形式として維持する。lp_visitors などは CSV を手で編集するので、
+前回の書き出し/取り込み以降に CSV が変わっていれば、開く時と書き出す前にその行をストアへ取り込む
+（ウォーターマーク: data/kpi_store/csv_watermark.json に CSV の mtime とサイズ）。
+
+ファイル形式 (data/kpi_store/<series>/<YYYY-MM>.kpi):
+  1行目: JSONヘッダ（列名・型コード・行数・動画IDテーブル）
+  以降:   列ごとの array.array バイト列（ヘッダの列順に連結）
+
+使い方:
+  python3 kpi_store.py --import-csv    # kpi_log.csv からストアを再構築
+  python3 kpi_store.py --export-csv    # ストアから kpi_log.csv を書き出し
+  python3 kpi_store.py --trend         # 前日比 / 7日 / 28日 の変化を表示
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent
+STORE_DIR = PROJECT_DIR / "data" / "kpi_store"
+KPI_LOG = PROJECT_DIR / "data" / "kpi_log.csv"
+WATERMARK_FILE = "csv_watermark.json"
+
+# kpi_log.csv と同じ列順（CSVエクスポートの互換性を保つ）
+PROFILE_COLUMNS = [
+    "tiktok_followers",
+    "tiktok_videos",
+    "tiktok_total_views",
+    "tiktok_total_likes",
+    "lp_visitors",
+    "line_registrations",
+]
+VIDEO_COLUMNS = ["views", "likes", "comments", "shares"]
+
+# 手動入力の列: TikTok取得時に0で上書きしない
+MANUAL_COLUMNS = ("lp_visitors", "line_registrations")
+
+# 前日比 / 週次 / 4週
+DEFAULT_WINDOWS = (1, 7, 28)
+
+_DAY_TYPE = "l"   # date.toordinal()
+_VALUE_TYPE = "q"  # 64bit整数
+
+
+def _to_ordinal(day) -> int:
+    if isinstance(day, int):
+        return day
+    if isinstance(day, datetime):
+        return day.date().toordinal()
+    if isinstance(day, date):
+        return day.toordinal()
+    return date.fromisoformat(str(day)[:10]).toordinal()
+
+
+def _partition_key(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%Y-%m")
+
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value or 0))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _csv_stamp(path: Path):
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return {"path": str(Path(path).resolve()), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _read_csv(path: Path) -> dict:
+    """kpi_log.csv を {月: {ordinal: 行}} で読む（同日行は後勝ち）"""
+    by_partition = {}
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if not row.get("date"):
+                continue
+            try:
+                ordinal = _to_ordinal(row["date"])
+            except ValueError:
+                continue
+            by_partition.setdefault(_partition_key(ordinal), {})[ordinal] = row
+    return by_partition
+
+
+# ============================================================
+# パーティション入出力
+# ============================================================
+
+class _Partition:
+    """1ヶ月分の列データ。days は昇順、各列は days と同じ長さ。"""
+
+    def __init__(self, columns, with_video_ids=False):
+        self.columns = list(columns)
+        self.days = array(_DAY_TYPE)
+        self.values = {c: array(_VALUE_TYPE) for c in self.columns}
+        # 動画系列のみ: 行ごとの動画IDインデックスとIDテーブル
+        self.video_idx = array("l") if with_video_ids else None
+        self.video_ids = [] if with_video_ids else None
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def read(cls, path: Path, columns, with_video_ids=False):
+        part = cls(columns, with_video_ids)
+        if not path.exists():
+            return part
+        with open(path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            n = header["rows"]
+            part.columns = header["columns"]
+            part.days.fromfile(f, n)
+            part.values = {}
+            for col in part.columns:
+                arr = array(_VALUE_TYPE)
+                arr.fromfile(f, n)
+                part.values[col] = arr
+            if with_video_ids:
+                part.video_ids = header.get("video_ids", [])
+                part.video_idx.fromfile(f, n)
+        # 新しい列が追加された場合は0埋め
+        for col in columns:
+            if col not in part.values:
+                part.columns.append(col)
+                part.values[col] = array(_VALUE_TYPE, bytes(8 * n))
+        return part
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "version": 1,
+            "rows": len(self.days),
+            "columns": self.columns,
+        }
+        if self.video_ids is not None:
+            header["video_ids"] = self.video_ids
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.days.tofile(f)
+                for col in self.columns:
+                    self.values[col].tofile(f)
+                if self.video_idx is not None:
+                    self.video_idx.tofile(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+# ============================================================
+# ストア本体
+# ============================================================
+
+class KPIStore:
+    """月別パーティションのKPI時系列ストア。
+
+    profile系列は1日1行（date主キー）、video系列は1日×動画IDで1行。
+    読み込みはパーティション単位でキャッシュし、書き込みは該当月のみ行う。
+    """
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+        self._cache = {}
+
+    # --- パーティション管理 ---
+
+    def _path(self, series: str, key: str) -> Path:
+        return self.root / series / f"{key}.kpi"
+
+    def _partition(self, series: str, key: str) -> _Partition:
+        cache_key = (series, key)
+        if cache_key not in self._cache:
+            columns = PROFILE_COLUMNS if series == "profile" else VIDEO_COLUMNS
+            self._cache[cache_key] = _Partition.read(
+                self._path(series, key), columns, with_video_ids=(series == "video"),
+            )
+        return self._cache[cache_key]
+
+    def partitions(self, series: str = "profile") -> list:
+        d = self.root / series
+        if not d.exists():
+            return []
+        return sorted(p.stem for p in d.glob("*.kpi"))
+
+    def is_empty(self) -> bool:
+        return not self.partitions("profile")
+
+    # --- 書き込み ---
+
+    def upsert_profile(self, day, values: dict) -> bool:
+        """1日分のプロフィール指標を追加/更新する。
+
+        MANUAL_COLUMNS は新しい値が0なら既存値を保持する。
+        戻り値: 既存行を更新した場合True、新規追加ならFalse。
+        """
+        ordinal = _to_ordinal(day)
+        key = _partition_key(ordinal)
+        part = self._partition("profile", key)
+
+        pos = bisect_right(part.days, ordinal)
+        exists = pos > 0 and part.days[pos - 1] == ordinal
+        if exists:
+            i = pos - 1
+            for col in part.columns:
+                if col not in values:
+                    continue
+                new = _to_int(values[col])
+                if col in MANUAL_COLUMNS and new == 0:
+                    continue
+                part.values[col][i] = new
+        else:
+            part.days.insert(pos, ordinal)
+            for col in part.columns:
+                part.values[col].insert(pos, _to_int(values.get(col, 0)))
+
+        part.write(self._path("profile", key))
+        return exists
+
+    def upsert_videos(self, day, videos: list) -> int:
+        """1日分の動画別指標を追加/更新する。戻り値: 書き込んだ動画数"""
+        if not videos:
+            return 0
+        ordinal = _to_ordinal(day)
+        key = _partition_key(ordinal)
+        part = self._partition("video", key)
+        id_index = {vid: i for i, vid in enumerate(part.video_ids)}
+
+        # 同じ日の既存行: (day, video_idx) -> 行番号
+        lo = bisect_right(part.days, ordinal - 1)
+        hi = bisect_right(part.days, ordinal)
+        existing = {part.video_idx[i]: i for i in range(lo, hi)}
+
+        written = 0
+        for v in videos:
+            vid = str(v.get("id") or "")
+            if not vid:
+                continue
+            if vid not in id_index:
+                id_index[vid] = len(part.video_ids)
+                part.video_ids.append(vid)
+            idx = id_index[vid]
+            row = existing.get(idx)
+            if row is None:
+                row = hi
+                part.days.insert(row, ordinal)
+                part.video_idx.insert(row, idx)
+                for col in part.columns:
+                    part.values[col].insert(row, 0)
+                existing[idx] = row
+                hi += 1
+            for col in part.columns:
+                part.values[col][row] = _to_int(v.get(col, 0))
+            written += 1
+
+        part.write(self._path("video", key))
+        return written
+
+    # --- 読み込み ---
+
+    def profile_series(self, start=None, end=None):
+        """(days, {列名: array}) を返す。start/end は日付（両端含む）"""
+        lo = _to_ordinal(start) if start is not None else None
+        hi = _to_ordinal(end) if end is not None else None
+        days = array(_DAY_TYPE)
+        cols = {c: array(_VALUE_TYPE) for c in PROFILE_COLUMNS}
+        for key in self.partitions("profile"):
+            if lo is not None and key < _partition_key(lo):
+                continue
+            if hi is not None and key > _partition_key(hi):
+                continue
+            part = self._partition("profile", key)
+            a = 0 if lo is None else bisect_right(part.days, lo - 1)
+            b = len(part) if hi is None else bisect_right(part.days, hi)
+            days.extend(part.days[a:b])
+            for c in PROFILE_COLUMNS:
+                cols[c].extend(part.values[c][a:b])
+        return days, cols
+
+    def video_history(self, video_id: str) -> list:
+        """1動画の日次指標を [{date, views, likes, ...}] で返す"""
+        rows = []
+        for key in self.partitions("video"):
+            part = self._partition("video", key)
+            if video_id not in part.video_ids:
+                continue
+            idx = part.video_ids.index(video_id)
+            for i in range(len(part)):
+                if part.video_idx[i] == idx:
+                    row = {"date": date.fromordinal(part.days[i]).isoformat()}
+                    row.update({c: part.values[c][i] for c in part.columns})
+                    rows.append(row)
+        return rows
+
+    def rows(self, last: int = None) -> list:
+        """kpi_log.csv 互換の dict 行（値はint）。last指定で末尾N行のみ"""
+        days, cols = self.profile_series()
+        start = 0 if last is None else max(0, len(days) - last)
+        out = []
+        for i in range(start, len(days)):
+            row = {"date": date.fromordinal(days[i]).isoformat()}
+            row.update({c: cols[c][i] for c in PROFILE_COLUMNS})
+            out.append(row)
+        return out
+
+    # --- ローリング計算 ---
+
+    @staticmethod
+    def rolling_change(days, values, window: int):
+        """各行について「window日前以前の直近行」との差分を返す。
+
+        window=1 は直前行との差（kpi_log.csv の行差分と同じ）。
+        基準行がない位置は None。
+        """
+        out = []
+        for i, d in enumerate(days):
+            if window <= 1:
+                j = i - 1
+            else:
+                j = bisect_right(days, d - window, 0, i) - 1
+            out.append(values[i] - values[j] if j >= 0 else None)
+        return out
+
+    def trend(self, windows=DEFAULT_WINDOWS, columns=PROFILE_COLUMNS) -> dict:
+        """最新日の値と各ウィンドウの変化量を返す"""
+        days, cols = self.profile_series()
+        if not days:
+            return {"days": 0}
+        result = {
+            "latest_date": date.fromordinal(days[-1]).isoformat(),
+            "days": len(days),
+            "current": {c: cols[c][-1] for c in columns},
+            "change": {},
+        }
+        for w in windows:
+            result["change"][w] = {
+                c: self.rolling_change(days, cols[c], w)[-1] for c in columns
+            }
+        return result
+
+    # --- CSV 入出力 ---
+
+    def _watermark_path(self) -> Path:
+        return self.root / WATERMARK_FILE
+
+    def _save_watermark(self, path: Path):
+        stamp = _csv_stamp(path)
+        if stamp is None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._watermark_path(), "w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+
+    def csv_changed(self, path: Path = KPI_LOG) -> bool:
+        """前回の書き出し/取り込み以降に CSV が（手で）変更されたか"""
+        stamp = _csv_stamp(path)
+        if stamp is None:
+            return False
+        try:
+            with open(self._watermark_path(), encoding="utf-8") as f:
+                return json.load(f) != stamp
+        except (OSError, json.JSONDecodeError):
+            return True
+
+    def merge_csv(self, path: Path = KPI_LOG) -> int:
+        """CSV の行をストアに上書きで取り込む（CSV に無い日はそのまま）。戻り値: 行数"""
+        if not Path(path).exists():
+            return 0
+        count = 0
+        for key, rows in _read_csv(path).items():
+            part = self._partition("profile", key)
+            for ordinal in sorted(rows):
+                row = rows[ordinal]
+                pos = bisect_right(part.days, ordinal)
+                if pos > 0 and part.days[pos - 1] == ordinal:
+                    for c in part.columns:
+                        if row.get(c) is not None:
+                            part.values[c][pos - 1] = _to_int(row[c])
+                else:
+                    part.days.insert(pos, ordinal)
+                    for c in part.columns:
+                        part.values[c].insert(pos, _to_int(row.get(c)))
+                count += 1
+            part.write(self._path("profile", key))
+        self._save_watermark(path)
+        return count
+
+    def sync_csv(self, path: Path = KPI_LOG) -> int:
+        """CSV が手で変更されていれば取り込む。戻り値: 取り込んだ行数"""
+        if not self.csv_changed(path):
+            return 0
+        return self.merge_csv(path)
+
+    def import_csv(self, path: Path = KPI_LOG) -> int:
+        """kpi_log.csv を取り込む（同日行は上書き）。戻り値: 取り込み行数"""
+        if not Path(path).exists():
+            return 0
+        by_partition = _read_csv(path)
+
+        count = 0
+        for key, rows in by_partition.items():
+            part = _Partition(PROFILE_COLUMNS)
+            for ordinal in sorted(rows):
+                part.days.append(ordinal)
+                for c in PROFILE_COLUMNS:
+                    part.values[c].append(_to_int(rows[ordinal].get(c)))
+                count += 1
+            part.write(self._path("profile", key))
+            self._cache[("profile", key)] = part
+        self._save_watermark(path)
+        return count
+
+    def export_csv(self, path: Path = KPI_LOG):
+        """ストア全体を kpi_log.csv 形式で書き出す（先に CSV の手編集を取り込む）"""
+        path = Path(path)
+        self.sync_csv(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date"] + PROFILE_COLUMNS)
+            for row in self.rows():
+                writer.writerow([row["date"]] + [row[c] for c in PROFILE_COLUMNS])
+        self._save_watermark(path)
+
+
+def open_store(root: Path = STORE_DIR, csv_path: Path = KPI_LOG) -> KPIStore:
+    """ストアを開く。空なら kpi_log.csv から初回移行し、CSV が手で変更されていれば取り込む"""
+    store = KPIStore(root)
+    if store.is_empty() and Path(csv_path).exists():
+        n = store.import_csv(csv_path)
+        if n:
+            print(f"[INFO] kpi_log.csv から {n} 行をKPIストアに移行")
+    elif store.csv_changed(csv_path):
+        n = store.merge_csv(csv_path)
+        if n:
+            print(f"[INFO] kpi_log.csv の変更を取り込み（{n} 行）")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KPI時系列ストア")
+    parser.add_argument("--import-csv", action="store_true", help="kpi_log.csvから再構築")
+    parser.add_argument("--export-csv", action="store_true", help="kpi_log.csvへ書き出し")
+    parser.add_argument("--trend", action="store_true", help="変化量を表示")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        n = KPIStore().import_csv()
+        print(f"[OK] {n} 行を取り込み: {STORE_DIR}")
+    elif args.export_csv:
+        open_store().export_csv()
+        print(f"[OK] 書き出し: {KPI_LOG}")
+    else:
+        t = open_store().trend()
+        if not t.get("days"):
+            print("データなし")
+            sys.exit(0)
+        print(f"最新: {t['latest_date']} ({t['days']}日分)")
+        for col, value in t["current"].items():
+            changes = []
+            for w, diffs in t["change"].items():
+                d = diffs[col]
+                changes.append(f"{w}d: {'-' if d is None else f'{d:+d}'}")
+            print(f"  {col}: {value} ({' / '.join(changes)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+link_graph.py - ガイド・ブログ記事の内部リンク計画（ページ類似度グラフ）
+
+add_topic_cluster_links（ガイド→関連ガイド）と add_crosslinks（ブログ→ガイド）が
+使う「どのページにリンクするか」を、本文の類似度で決める。
+
+- ページごとに本文の文字bigram TF-IDF ベクトルを作る（日本語の分かち書き不要）
+- 各ページの近傍（類似度上位 NEIGHBORS_K 件）と逆リンク（自分を近傍に持つページ）を保持
+- クラスター間の関連度はクラスター重心どうしの類似度で計算する
+  （クラスターの初期ラベルは add_topic_cluster_links.CLUSTERS。未分類ページは最も近い重心）
+- 関連ページは「類似度降順 → パス昇順」の決定的な上位k件（乱数は使わない）
+- グラフは data/.cache/link_graph.pkl に保存し、次回は変わったページの
+  ベクトル・近傍と、そのページを近傍に持っていたページだけを計算し直す
+- リンクを足すページは blog_to_guide / CLUSTERS に登録したものだけ。未登録ページへの
+  類似度によるフォールバックは環境変数 LINK_GRAPH_FALLBACK=1
+  （site_build.py / 各スクリプトの --graph-fallback）で有効にした時だけ行う
+
+Usage:
+    python3 scripts/link_graph.py                        # グラフ更新して統計を表示
+    python3 scripts/link_graph.py blog/yakin-nashi.html  # 関連ページを表示
+    python3 scripts/link_graph.py --rebuild              # キャッシュを捨てて全計算
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import pickle
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+CACHE_PATH = PROJECT_DIR / "data" / ".cache" / "link_graph.pkl"
+
+CACHE_VERSION = 1
+
+# グラフに載せるページ（PROJECT_DIR 相対）
+PAGE_GLOBS = ["lp/job-seeker/guide/*.html", "blog/*.html"]
+EXCLUDE = {"index.html"}
+
+GUIDE_PREFIX = "lp/job-seeker/guide/"
+BLOG_PREFIX = "blog/"
+
+NEIGHBORS_K = 20
+TITLE_WEIGHT = 3
+
+# 変更ページがこの割合を超えたら IDF から全部計算し直す
+REBUILD_RATIO = 0.2
+
+# 未登録ページにも類似度でリンクを足すか（既定: 足さない。プロセスプールの子にも引き継ぐため環境変数）
+FALLBACK_ENV = "LINK_GRAPH_FALLBACK"
+
+
+# =============================================================================
+# 本文抽出・ベクトル化
+# =============================================================================
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_BODY_RE = re.compile(r"<body[^>]*>", re.IGNORECASE)
+_DROP_RE = re.compile(r"<(script|style|nav|header)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_ENTITY_RE = re.compile(r"&[#\w]+;")
+_WORD_RE = re.compile(r"[\w぀-ヿ㐀-鿿]+")
+
+# 本文の終わり（ここから後ろは関連リンク・出典・フッター等の定型部分）
+BOILERPLATE_MARKERS = [
+    '<section class="related-guides"',
+    '<div class="related-articles"',
+    "参考文献・出典",
+    "もっと詳しく知る",
+    "<footer",
+]
+
+
+def page_title(html) -> str:
+    m = _TITLE_RE.search(html)
+    if not m:
+        return ""
+    title = _TAG_RE.sub("", m.group(1)).strip()
+    return re.split(r"[｜|]", title)[0].strip()
+
+
+def page_text(html) -> str:
+    """本文テキスト（定型部分・タグを除去）"""
+    m = _BODY_RE.search(html)
+    body = html[m.end():] if m else html
+    cut = min((i for i in (body.find(mark) for mark in BOILERPLATE_MARKERS) if i >= 0), default=len(body))
+    body = _DROP_RE.sub(" ", body[:cut])
+    body = _ENTITY_RE.sub(" ", _TAG_RE.sub(" ", body))
+    return unicodedata.normalize("NFKC", body)
+
+
+def term_counts(title, text) -> Counter:
+    """文字bigramの出現数（タイトルは TITLE_WEIGHT 倍）"""
+    counts = Counter()
+    for weight, s in ((TITLE_WEIGHT, title), (1, text)):
+        for word in _WORD_RE.findall(unicodedata.normalize("NFKC", s).lower()):
+            if len(word) == 1:
+                continue
+            for i in range(len(word) - 1):
+                counts[word[i:i + 2]] += weight
+    return counts
+
+
+def _idf(df, n_docs):
+    return math.log((n_docs + 1) / (df + 1)) + 1.0
+
+
+def build_vector(counts, idf, n_docs) -> dict:
+    default = _idf(0, n_docs)
+    vec = {t: (1.0 + math.log(c)) * idf.get(t, default) for t, c in counts.items()}
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {t: v / norm for t, v in vec.items()}
+
+
+def cosine(a, b) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(t, 0.0) for t, v in a.items())
+
+
+def _rank_key(item):
+    score, rel = item
+    return (-round(score, 9), rel)
+
+
+# =============================================================================
+# グラフ
+# =============================================================================
+
+class LinkGraph:
+    """ページ類似度グラフ（近傍・逆リンク付き）"""
+
+    def __init__(self):
+        self.stamps = {}      # rel -> (mtime_ns, size)
+        self.digests = {}     # rel -> 本文＋タイトルのハッシュ
+        self.titles = {}      # rel -> タイトル
+        self.counts = {}      # rel -> Counter（IDF 再計算用）
+        self.vectors = {}     # rel -> 正規化済み TF-IDF
+        self.idf = {}
+        self.idf_docs = 0
+        self.neighbors = {}   # rel -> [(score, rel), ...] 類似度上位 NEIGHBORS_K
+        self.backlinks = {}   # rel -> {自分を近傍に持つ rel}
+        self.last_update = {"changed": [], "removed": [], "recomputed": [], "full": False}
+        self._centroids = None
+
+    # --- 読み書き ---
+
+    @classmethod
+    def load(cls, path=CACHE_PATH, update=True):
+        """キャッシュから読み込み、update=True ならページの変更を反映する"""
+        graph = None
+        path = Path(path)
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    payload = pickle.load(f)
+                if payload.get("version") == CACHE_VERSION:
+                    graph = cls()
+                    graph.__dict__.update(payload["state"])
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+                graph = None
+        if graph is None:
+            graph = cls()
+        if update and graph.refresh():
+            graph.save(path)
+        return graph
+
+    def save(self, path=CACHE_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {k: v for k, v in self.__dict__.items() if k not in ("_centroids", "last_update")}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"version": CACHE_VERSION, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    # --- 更新 ---
+
+    @staticmethod
+    def discover():
+        paths = {}
+        for pattern in PAGE_GLOBS:
+            for p in PROJECT_DIR.glob(pattern):
+                if p.is_file() and p.name not in EXCLUDE:
+                    paths[p.relative_to(PROJECT_DIR).as_posix()] = p
+        return dict(sorted(paths.items()))
+
+    def refresh(self) -> bool:
+        """ディスク上のページと同期する。グラフが変わったら True"""
+        pages = self.discover()
+        removed = [rel for rel in self.stamps if rel not in pages]
+        changed = []
+        touched = bool(removed)
+        for rel, path in pages.items():
+            st = path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            if self.stamps.get(rel) == stamp:
+                continue
+            touched = True
+            html = path.read_text(encoding="utf-8", errors="replace")
+            title, text = page_title(html), page_text(html)
+            digest = hashlib.sha1(f"{title}\0{text}".encode("utf-8")).hexdigest()
+            self.stamps[rel] = stamp
+            # リンク・出典ブロックの追加だけなら本文は同じ → 再計算しない
+            if self.digests.get(rel) == digest:
+                continue
+            self.digests[rel] = digest
+            self.titles[rel] = title
+            self.counts[rel] = term_counts(title, text)
+            changed.append(rel)
+
+        for rel in removed:
+            for table in (self.stamps, self.digests, self.titles, self.counts, self.vectors):
+                table.pop(rel, None)
+
+        self.last_update = {"changed": changed, "removed": removed, "recomputed": [], "full": False}
+        if not changed and not removed:
+            return touched
+
+        self._centroids = None
+        if not self.idf or len(changed) + len(removed) > REBUILD_RATIO * max(self.idf_docs, 1):
+            self._rebuild()
+        else:
+            self._update_incremental(changed, removed)
+        return True
+
+    def _rebuild(self):
+        df = Counter()
+        for counts in self.counts.values():
+            df.update(counts.keys())
+        n = len(self.counts)
+        self.idf = {t: _idf(c, n) for t, c in df.items()}
+        self.idf_docs = n
+        self.vectors = {rel: build_vector(c, self.idf, n) for rel, c in self.counts.items()}
+        self.neighbors = {rel: self._scan_neighbors(rel) for rel in self.vectors}
+        self._rebuild_backlinks()
+        self.last_update.update(recomputed=sorted(self.vectors), full=True)
+
+    def _update_incremental(self, changed, removed):
+        """変わったページの近傍と、それを近傍に持っていたページ（逆リンク）だけ計算し直す"""
+        for rel in changed:
+            self.vectors[rel] = build_vector(self.counts[rel], self.idf, self.idf_docs)
+        for rel in removed:
+            self.neighbors.pop(rel, None)
+
+        stale = set(changed) | set(removed)
+        dirty = set(changed)
+        for rel in stale:
+            dirty.update(self.backlinks.get(rel, ()))
+        dirty = {rel for rel in dirty if rel in self.vectors}
+
+        for rel in dirty:
+            self.neighbors[rel] = self._scan_neighbors(rel)
+
+        # 残りのページは、変わったページが上位に入る場合だけ差し込む
+        for rel, items in self.neighbors.items():
+            if rel in dirty:
+                continue
+            added = [(cosine(self.vectors[rel], self.vectors[c]), c) for c in changed if c != rel]
+            if not added:
+                continue
+            floor = _rank_key(items[-1]) if len(items) >= NEIGHBORS_K else None
+            added = [a for a in added if floor is None or _rank_key(a) < floor]
+            if added:
+                self.neighbors[rel] = sorted(items + added, key=_rank_key)[:NEIGHBORS_K]
+
+        self._rebuild_backlinks()
+        self.last_update["recomputed"] = sorted(dirty)
+
+    def _scan_neighbors(self, rel):
+        vec = self.vectors[rel]
+        scored = [(cosine(vec, other), o) for o, other in self.vectors.items() if o != rel]
+        return sorted(scored, key=_rank_key)[:NEIGHBORS_K]
+
+    def _rebuild_backlinks(self):
+        self.backlinks = {}
+        for rel, items in self.neighbors.items():
+            for _, other in items:
+                self.backlinks.setdefault(other, set()).add(rel)
+
+    # --- 問い合わせ ---
+
+    def __contains__(self, rel):
+        return rel in self.vectors
+
+    def title(self, rel):
+        return self.titles.get(rel, "")
+
+    def similarity(self, a, b) -> float:
+        return cosine(self.vectors[a], self.vectors[b])
+
+    def related(self, rel, k=5, where=None):
+        """rel に類似したページの上位 k 件 [(score, rel), ...]（決定的）
+
+        where(rel) で候補を絞る。近傍キャッシュで k 件に足りなければ全ページを走査する。
+        """
+        if rel not in self.vectors:
+            return []
+        accept = where or (lambda r: True)
+        hits = [item for item in self.neighbors.get(rel, ()) if accept(item[1])]
+        if len(hits) >= k:
+            return hits[:k]
+        vec = self.vectors[rel]
+        scored = [(cosine(vec, v), o) for o, v in self.vectors.items() if o != rel and accept(o)]
+        return sorted(scored, key=_rank_key)[:k]
+
+    # --- クラスター ---
+
+    def clusters(self, seeds):
+        """{rel: クラスター名}。seeds（{rel: クラスター名}）に無いページは最も近い重心へ"""
+        centroids = self.centroids(seeds)
+        if self._centroids[2] is None:
+            result = {}
+            for rel, vec in self.vectors.items():
+                if rel in seeds:
+                    result[rel] = seeds[rel]
+                elif centroids:
+                    result[rel] = min(centroids, key=lambda c: (-round(cosine(vec, centroids[c]), 9), c))
+            self._centroids[2] = result
+        return self._centroids[2]
+
+    def centroids(self, seeds):
+        key = tuple(sorted(seeds.items()))
+        if self._centroids and self._centroids[0] == key:
+            return self._centroids[1]
+        sums = {}
+        for rel, cluster in seeds.items():
+            vec = self.vectors.get(rel)
+            if vec is None:
+                continue
+            acc = sums.setdefault(cluster, Counter())
+            for t, v in vec.items():
+                acc[t] += v
+        centroids = {}
+        for cluster, acc in sums.items():
+            norm = math.sqrt(sum(v * v for v in acc.values())) or 1.0
+            centroids[cluster] = {t: v / norm for t, v in acc.items()}
+        self._centroids = [key, centroids, None]  # [seeds, 重心, clusters() の結果]
+        return centroids
+
+    def cluster_affinity(self, cluster, seeds, count=2):
+        """cluster と関連の強い他クラスター（重心の類似度順）"""
+        centroids = self.centroids(seeds)
+        if cluster not in centroids:
+            return []
+        base = centroids[cluster]
+        ranked = sorted(((cosine(base, v), c) for c, v in centroids.items() if c != cluster), key=_rank_key)
+        return [c for _, c in ranked[:count]]
+
+
+_graph = None
+
+
+def get_graph():
+    """プロセス内で共有するグラフ（初回にキャッシュ読み込み＋差分更新）"""
+    global _graph
+    if _graph is None:
+        _graph = LinkGraph.load()
+    return _graph
+
+
+def fallback_enabled() -> bool:
+    return os.environ.get(FALLBACK_ENV, "") not in ("", "0")
+
+
+def enable_fallback():
+    os.environ[FALLBACK_ENV] = "1"
+
+
+def is_guide(rel):
+    return rel.startswith(GUIDE_PREFIX)
+
+
+def is_blog(rel):
+    return rel.startswith(BLOG_PREFIX)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内部リンク計画用のページ類似度グラフ")
+    parser.add_argument("pages", nargs="*", help="関連ページを表示するページ（PROJECT_DIR 相対）")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--rebuild", action="store_true", help="キャッシュを捨てて全計算")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.rebuild and CACHE_PATH.exists():
+        CACHE_PATH.unlink()
+    graph = LinkGraph.load()
+    info = graph.last_update
+    print(f"{len(graph.vectors)} pages, {len(graph.idf)} terms "
+          f"({'full rebuild' if info['full'] else 'incremental'}: "
+          f"{len(info['changed'])} changed, {len(info['removed'])} removed, "
+          f"{len(info['recomputed'])} neighbour lists recomputed, {(time.perf_counter() - t0) * 1000:.0f}ms)")
+
+    for rel in args.pages:
+        if rel not in graph:
+            print(f"ERROR: {rel} はグラフにありません")
+            sys.exit(1)
+        print(f"\n{rel} ({graph.title(rel)})")
+        for score, other in graph.related(rel, args.k):
+            print(f"  {score:.3f}  {other}  {graph.title(other)}")
+
+
+if __name__ == "__main__":
+    main()
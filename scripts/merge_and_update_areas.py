@@ -3,21 +3,29 @@
 施設データ統合スクリプト
 - kanagawa_hospitals_enriched.json（施設票+医療情報ネット）
 - kanagawa_ward_data.json（病棟票）
-- 既存 areas.js の施設データ
-を統合し、更新済み areas.js を生成する。
+- 既存の data/areas.json（areas_db.py が管理する正本）の手動設定フィールド
+を統合し、areas.json と areas.js を更新する。
 
-Usage: python3 scripts/merge_and_update_areas.py
+公開データ由来の値が変わらなかったエリアは areas.js の断片を再利用する。
+他のスクリプトからは run_merge() で呼び出せる（書き込みは呼び出し側）。
+
+Usage:
+    python3 scripts/merge_and_update_areas.py
+    python3 scripts/merge_and_update_areas.py --area odawara --area hadano
+    python3 scripts/merge_and_update_areas.py --dry-run
 """
 
+import argparse
 import json
 import re
 import unicodedata
 from pathlib import Path
 
+import areas_db
+from facility_matcher import FacilityIndex
+
 BASE = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE / "data" / "public_data"
-AREAS_JS = BASE / "data" / "areas.js"
-OUTPUT_JS = BASE / "data" / "areas.js"  # 上書き
 
 # ==========================================
 # 1. データ読み込み
@@ -27,104 +35,62 @@ def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_areas_js():
-    """areas.js をパースして AREA_DATABASE 部分を抽出"""
-    text = AREAS_JS.read_text(encoding="utf-8")
-    return text
-
-enriched = load_json(DATA_DIR / "kanagawa_hospitals_enriched.json")  # list
-ward_data = load_json(DATA_DIR / "kanagawa_ward_data.json")  # dict keyed by name
+def load_sources():
+    """enriched（list）と ward_data（施設名キーの dict）を読む"""
+    enriched = load_json(DATA_DIR / "kanagawa_hospitals_enriched.json")
+    ward_data = load_json(DATA_DIR / "kanagawa_ward_data.json")
+    return enriched, ward_data
 
-# medicalCode→ward_data のルックアップを作成
-ward_by_code = {}
-for name, wd in ward_data.items():
-    code = wd.get("medicalCode", "")
-    if code:
-        ward_by_code[code] = wd
 
 # ==========================================
 # 2. enriched + ward_data を medicalCode で結合
 # ==========================================
 
-merged = {}  # medicalCode → combined dict
-for h in enriched:
-    code = h["medicalCode"]
-    combined = dict(h)
-    wd = ward_by_code.get(code)
-    if wd:
-        combined["nursingRatio"] = wd.get("nursingRatio", "不明")
-        combined["admissionFees"] = wd.get("admissionFees", [])
-        combined["totalWardNurses"] = wd.get("totalWardNurses", 0)
-        combined["wardCount_ward"] = wd.get("wardCount", 0)
-        combined["functions_ward"] = wd.get("functions", [])
-        combined["wards"] = wd.get("wards", [])
-    else:
-        combined["nursingRatio"] = "不明"
-        combined["admissionFees"] = []
-        combined["totalWardNurses"] = 0
-        combined["wardCount_ward"] = 0
-        combined["functions_ward"] = []
-        combined["wards"] = []
-    merged[code] = combined
+def merge_sources(enriched, ward_data):
+    """medicalCode → combined dict"""
+    ward_by_code = {}
+    for name, wd in ward_data.items():
+        code = wd.get("medicalCode", "")
+        if code:
+            ward_by_code[code] = wd
+
+    merged = {}
+    for h in enriched:
+        code = h["medicalCode"]
+        combined = dict(h)
+        wd = ward_by_code.get(code)
+        if wd:
+            combined["nursingRatio"] = wd.get("nursingRatio", "不明")
+            combined["admissionFees"] = wd.get("admissionFees", [])
+            combined["totalWardNurses"] = wd.get("totalWardNurses", 0)
+            combined["wardCount_ward"] = wd.get("wardCount", 0)
+            combined["functions_ward"] = wd.get("functions", [])
+            combined["wards"] = wd.get("wards", [])
+        else:
+            combined["nursingRatio"] = "不明"
+            combined["admissionFees"] = []
+            combined["totalWardNurses"] = 0
+            combined["wardCount_ward"] = 0
+            combined["functions_ward"] = []
+            combined["wards"] = []
+        merged[code] = combined
+    return merged
 
-print(f"統合済み施設数: {len(merged)}")
 
 # ==========================================
-# 3. 既存 areas.js の施設と名寄せ
+# 3. 既存施設と名寄せ
 # ==========================================
 
-def normalize(s):
-    """名前正規化: 全角→半角、カ/ケ/ヶ統一"""
-    s = unicodedata.normalize("NFKC", s)
-    s = s.replace("ヶ", "ケ").replace("ヵ", "カ")
-    s = re.sub(r'\s+', '', s)
-    return s
-
-def core_name(s):
-    """法人格等を取り除いたコア名"""
-    s = re.sub(r'(医療法人|社団|財団|一般社団法人|公益社団法人|独立行政法人|国立病院機構|社会福祉法人|学校法人|神奈川県厚生農業協同組合連合会)\s*', '', s)
-    s = re.sub(r'[（）()]\s*', '', s)
-    s = re.sub(r'\s+', '', s)
-    return normalize(s)
-
-# merged の名前ルックアップ
-name_to_code = {}
-for code, h in merged.items():
-    n1 = normalize(h["name"])
-    n2 = normalize(h.get("fullName", ""))
-    name_to_code[n1] = code
-    if n2:
-        name_to_code[n2] = code
-    # コア名でも
-    cn1 = core_name(h["name"])
-    cn2 = core_name(h.get("fullName", ""))
-    if cn1 not in name_to_code:
-        name_to_code[cn1] = code
-    if cn2 and cn2 not in name_to_code:
-        name_to_code[cn2] = code
-
-def find_match(facility_name, full_name=None):
-    """既存施設名 → merged の medicalCode"""
-    candidates = [facility_name]
-    if full_name:
-        candidates.append(full_name)
-
-    for name in candidates:
-        n = normalize(name)
-        if n in name_to_code:
-            return name_to_code[n]
-        cn = core_name(name)
-        if cn in name_to_code:
-            return name_to_code[cn]
-
-    # 部分一致
-    for name in candidates:
-        n = normalize(name)
-        for key, code in name_to_code.items():
-            if len(n) >= 3 and (n in key or key in n):
-                return code
+def build_index(merged):
+    """merged の名前索引（正規化・コア名は登録時に1回だけ計算）"""
+    return FacilityIndex.build(
+        (code, h["name"], h.get("fullName")) for code, h in merged.items()
+    )
 
-    return None
+def find_match(index, facility_name, full_name=None):
+    """既存施設名 → merged の medicalCode"""
+    m = index.best(facility_name, full_name)
+    return m.key if m else None
 
 
 # ==========================================
@@ -344,11 +310,11 @@ def build_features(h, existing_features=None):
     if existing_features:
         # 既存から、公開データで得られない独自情報を抽出
         unique_parts = []
-        existing_lower = existing_features
         # 公開データにない情報（歴史、移転、特色等）を保持
         for sentence in re.split(r'[。、]', existing_features):
             sentence = sentence.strip()
-            if not sentence:
+            # 空文字・生成済みの文・重複はスキップ（再実行しても増えないように）
+            if not sentence or sentence in parts or sentence in unique_parts:
                 continue
             # 公開データで更新される情報はスキップ
             skip_patterns = [
@@ -375,135 +341,45 @@ def build_features(h, existing_features=None):
 # 8. エリアごとの施設分配
 # ==========================================
 
-# areaId → 既存施設リスト（areas.jsをパースして取得する代わりに、
-# enriched のareaIdを使用）
-area_facilities = {}  # areaId → [merged dict]
-for code, h in merged.items():
-    aid = h.get("areaId", "")
-    if aid:
-        if aid not in area_facilities:
-            area_facilities[aid] = []
-        area_facilities[aid].append(h)
-
-# 各エリア内でベッド数降順にソート
-for aid in area_facilities:
-    area_facilities[aid].sort(key=lambda x: x.get("totalBeds", 0), reverse=True)
-
-print("\nエリア別施設数:")
-for aid, facilities in sorted(area_facilities.items()):
-    print(f"  {aid}: {len(facilities)}施設")
+def distribute_by_area(merged):
+    """areaId → merged dict のリスト（enriched の areaId を使用、ベッド数降順）"""
+    area_facilities = {}
+    for code, h in merged.items():
+        aid = h.get("areaId", "")
+        if aid:
+            area_facilities.setdefault(aid, []).append(h)
+    for aid in area_facilities:
+        area_facilities[aid].sort(key=lambda x: x.get("totalBeds", 0), reverse=True)
+    return area_facilities
 
 
 # ==========================================
-# 9. 既存 areas.js をパースして既存フィールドを保持
+# 9. 既存データから手動設定フィールドを保持
 # ==========================================
 
-# JavaScriptのオブジェクトリテラルをPythonで完全パースするのは困難なので、
-# 施設名をキーに既存データのマッピングを作成する
-# (既存areas.jsから抽出した施設の access, nightShiftType, annualHolidays, salary等を保持)
+# access, nightShiftType, annualHolidays, 給与など公開データにない項目
+MANUAL_FIELDS = [
+    "fullName", "access", "nightShiftType", "annualHolidays",
+    "nurseMonthlyMin", "nurseMonthlyMax", "ptMonthlyMin", "ptMonthlyMax",
+    "educationLevel", "features", "referral",
+]
 
-def parse_existing_facilities(js_text):
-    """areas.jsから既存施設の手動設定フィールドを抽出"""
+def existing_facilities_from_db(db):
+    """areas.json の施設 → 施設名キーの手動設定フィールド"""
     facilities = {}
-
-    # name: "..." でブロックを特定し、手動フィールドを抽出
-    # 正規表現でシンプルに抽出
-    blocks = re.split(r'\{\s*\n\s*name:', js_text)
-
-    for block in blocks[1:]:  # 最初は前置テキスト
-        # name
-        m_name = re.match(r'\s*"([^"]+)"', block)
-        if not m_name:
-            continue
-        name = m_name.group(1)
-
-        info = {"name": name}
-
-        # fullName
-        m = re.search(r'fullName:\s*"([^"]*)"', block)
-        if m:
-            info["fullName"] = m.group(1)
-
-        # access
-        m = re.search(r'access:\s*"([^"]*)"', block)
-        if m:
-            info["access"] = m.group(1)
-
-        # nightShiftType
-        m = re.search(r'nightShiftType:\s*"([^"]*)"', block)
-        if m:
-            info["nightShiftType"] = m.group(1)
-
-        # annualHolidays
-        m = re.search(r'annualHolidays:\s*(\d+)', block)
-        if m:
-            info["annualHolidays"] = int(m.group(1))
-
-        # nurseMonthlyMin/Max
-        m = re.search(r'nurseMonthlyMin:\s*(\d+)', block)
-        if m:
-            info["nurseMonthlyMin"] = int(m.group(1))
-        m = re.search(r'nurseMonthlyMax:\s*(\d+)', block)
-        if m:
-            info["nurseMonthlyMax"] = int(m.group(1))
-
-        # ptMonthlyMin/Max
-        m = re.search(r'ptMonthlyMin:\s*(\d+)', block)
-        if m:
-            info["ptMonthlyMin"] = int(m.group(1))
-        m = re.search(r'ptMonthlyMax:\s*(\d+)', block)
-        if m:
-            info["ptMonthlyMax"] = int(m.group(1))
-
-        # educationLevel
-        m = re.search(r'educationLevel:\s*"([^"]*)"', block)
-        if m:
-            info["educationLevel"] = m.group(1)
-
-        # features（既存）
-        m = re.search(r'features:\s*"([^"]*)"', block)
-        if m:
-            info["features"] = m.group(1)
-
-        # ptCount
-        m = re.search(r'ptCount:\s*(\d+)', block)
-        if m:
-            info["ptCount_manual"] = int(m.group(1))
-
-        # referral (A病院フラグ)
-        if "referral:" in block:
-            m = re.search(r'referral:\s*(true|false)', block)
-            if m:
-                info["referral"] = m.group(1) == "true"
-
-        # matchingTags
-        m = re.search(r'matchingTags:\s*\[([^\]]*)\]', block)
-        if m:
-            tags_str = m.group(1)
-            tags = re.findall(r'"([^"]*)"', tags_str)
-            info["matchingTags_manual"] = tags
-
-        facilities[name] = info
-
+    for area in db.get("areas", []):
+        for f in area.get("majorFacilities", []):
+            info = {"name": f["name"]}
+            for key in MANUAL_FIELDS:
+                if f.get(key) is not None:
+                    info[key] = f[key]
+            if f.get("ptCount") is not None:
+                info["ptCount_manual"] = f["ptCount"]
+            if "matchingTags" in f:
+                info["matchingTags_manual"] = list(f["matchingTags"])
+            facilities[f["name"]] = info
     return facilities
 
-existing_facilities = parse_existing_facilities(load_areas_js())
-print(f"\n既存施設数（パース済み）: {len(existing_facilities)}")
-
-# マッチング状況の確認
-matched_count = 0
-unmatched_existing = []
-for name, info in existing_facilities.items():
-    code = find_match(name, info.get("fullName"))
-    if code:
-        matched_count += 1
-    else:
-        unmatched_existing.append(name)
-
-print(f"既存→公開データ マッチ: {matched_count}/{len(existing_facilities)}")
-if unmatched_existing:
-    print(f"未マッチ既存施設: {unmatched_existing}")
-
 
 # ==========================================
 # 10. 最終施設データの生成
@@ -608,43 +484,46 @@ def build_facility_entry(h, existing_info=None):
 
     return entry
 
+# areas.js に出力するときの並び順と、0/空なら省略する項目
+RECORD_ORDER = [
+    "name", "fullName", "medicalCode", "type", "beds", "wardCount", "functions",
+    "nursingRatio", "admissionFees", "emergencyLevel", "ambulanceCount", "ownerType",
+    "dpcHospital", "nurseCount", "doctorCount", "ptCount", "otCount", "stCount",
+    "pharmacistCount", "midwifeCount", "ctCount", "mriCount", "address", "lat", "lng",
+    "website", "features", "access", "nightShiftType", "annualHolidays",
+    "nurseMonthlyMin", "nurseMonthlyMax", "ptMonthlyMin", "ptMonthlyMax",
+    "educationLevel", "referral", "matchingTags", "dataSource", "lastUpdated",
+]
+OMIT_IF_EMPTY = {
+    "fullName", "medicalCode", "admissionFees", "ambulanceCount", "doctorCount",
+    "ptCount", "otCount", "stCount", "pharmacistCount", "midwifeCount",
+    "ctCount", "mriCount", "address", "website",
+}
 
-# エリア別に最終データを構築
-final_areas = {}  # areaId → [facility entries]
-used_codes = set()
+def facility_record(entry):
+    """build_facility_entry の dict → areas.json に保存する施設レコード"""
+    record = {}
+    for key in RECORD_ORDER:
+        if key not in entry:
+            continue
+        value = entry[key]
+        if key in OMIT_IF_EMPTY and not value:
+            continue
+        if key == "lat" and value is None:
+            continue
+        if key == "lng" and entry.get("lat") is None:
+            continue
+        if key == "referral" and value is None:
+            continue
+        record[key] = value
+    return record
 
-for aid, facilities in area_facilities.items():
-    final_areas[aid] = []
-    for h in facilities:
-        code = h["medicalCode"]
-        # 既存施設とのマッチ
-        existing_info = None
-        for ename, einfo in existing_facilities.items():
-            ecode = find_match(ename, einfo.get("fullName"))
-            if ecode == code:
-                existing_info = einfo
-                break
-
-        entry = build_facility_entry(h, existing_info)
-        final_areas[aid].append(entry)
-        used_codes.add(code)
-
-# 既存施設で公開データにマッチしなかったもの（20床未満のクリニック等）
-# → 既存データのまま保持
-unmatched_kept = 0
-for name, info in existing_facilities.items():
-    code = find_match(name, info.get("fullName"))
-    if code is None:
-        # どのエリアに属するか既存areas.jsから判定する必要がある
-        # → 簡易的にスキップ（公開データに載っていない小規模施設）
-        unmatched_kept += 1
-        print(f"  公開データ未マッチ（保持せず）: {name}")
 
 # ==========================================
-# 11. areas.js の再生成
+# 11. エリアの構築
 # ==========================================
 
-# エリアメタデータ（既存のareas.jsから抽出して保持）
+# エリアメタデータ（areas.json にまだ無いエリアの初期値）
 AREA_META = {
     "odawara": {
         "name": "小田原市",
@@ -785,318 +664,105 @@ AREA_ORDER = [
 ]
 
 
-def js_str(s):
-    """Python文字列 → JS文字列リテラル"""
-    if s is None:
-        return "null"
-    return '"' + str(s).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
-
-def js_num(n):
-    if n is None:
-        return "null"
-    if isinstance(n, float):
-        return str(round(n, 6))
-    return str(n)
-
-def js_bool(b):
-    if b is None:
-        return "null"
-    return "true" if b else "false"
-
-def js_array_str(arr):
-    """文字列配列をJS形式に"""
-    if not arr:
-        return "[]"
-    items = ", ".join(js_str(s) for s in arr)
-    return f"[{items}]"
-
-
-def format_facility(f, indent="      "):
-    """施設データを整形されたJS文字列に変換"""
-    lines = []
-    lines.append(f"{indent}{{")
-    i = indent + "  "
-
-    lines.append(f'{i}name: {js_str(f["name"])},')
-    if f.get("fullName"):
-        lines.append(f'{i}fullName: {js_str(f["fullName"])},')
-    if f.get("medicalCode"):
-        lines.append(f'{i}medicalCode: {js_str(f["medicalCode"])},')
-
-    lines.append(f'{i}type: {js_str(f["type"])},')
-    lines.append(f'{i}beds: {js_num(f["beds"])},')
-    lines.append(f'{i}wardCount: {js_num(f.get("wardCount", 0))},')
-    lines.append(f'{i}functions: {js_array_str(f.get("functions", []))},')
+def build_area(aid, facilities, existing_area=None):
+    """エリア1件分のレコード（エリア説明等は既存 areas.json を優先）"""
+    if existing_area:
+        area = dict(existing_area)
+    else:
+        area = {"areaId": aid}
+        for key, value in AREA_META[aid].items():
+            area[key] = value
+            if key == "ptAvgSalary":
+                area["facilityCount"] = {"hospitals": 0, "clinics": 0, "nursingHomes": 0}
+                area["majorFacilities"] = []
+    area["facilityCount"] = dict(area.get("facilityCount") or {}, hospitals=len(facilities))
+    area["majorFacilities"] = facilities
+    return area
 
-    # 看護配置
-    lines.append(f'{i}nursingRatio: {js_str(f.get("nursingRatio", "不明"))},')
-    if f.get("admissionFees"):
-        lines.append(f'{i}admissionFees: {js_array_str(f["admissionFees"])},')
 
-    # 救急・DPC
-    lines.append(f'{i}emergencyLevel: {js_str(f.get("emergencyLevel", "なし"))},')
-    amb = f.get("ambulanceCount", 0)
-    if amb and amb > 0:
-        lines.append(f'{i}ambulanceCount: {js_num(amb)},')
-    lines.append(f'{i}ownerType: {js_str(f.get("ownerType", ""))},')
-    lines.append(f'{i}dpcHospital: {js_bool(f.get("dpcHospital", False))},')
-
-    # スタッフ
-    lines.append(f'{i}nurseCount: {js_num(f.get("nurseCount", 0))},')
-    dc = f.get("doctorCount", 0)
-    if dc and dc > 0:
-        lines.append(f'{i}doctorCount: {js_num(dc)},')
-    pt = f.get("ptCount", 0)
-    if pt and pt > 0:
-        lines.append(f'{i}ptCount: {js_num(pt)},')
-    ot = f.get("otCount", 0)
-    if ot and ot > 0:
-        lines.append(f'{i}otCount: {js_num(ot)},')
-    st = f.get("stCount", 0)
-    if st and st > 0:
-        lines.append(f'{i}stCount: {js_num(st)},')
-    pharm = f.get("pharmacistCount", 0)
-    if pharm and pharm > 0:
-        lines.append(f'{i}pharmacistCount: {js_num(pharm)},')
-    mid = f.get("midwifeCount", 0)
-    if mid and mid > 0:
-        lines.append(f'{i}midwifeCount: {js_num(mid)},')
+# ==========================================
+# 12. 統合の実行
+# ==========================================
 
-    # 設備
-    ct = f.get("ctCount", 0)
-    mri = f.get("mriCount", 0)
-    if ct and ct > 0:
-        lines.append(f'{i}ctCount: {js_num(ct)},')
-    if mri and mri > 0:
-        lines.append(f'{i}mriCount: {js_num(mri)},')
-
-    # 所在地
-    if f.get("address"):
-        lines.append(f'{i}address: {js_str(f["address"])},')
-    if f.get("lat") is not None:
-        lines.append(f'{i}lat: {js_num(f["lat"])},')
-        lines.append(f'{i}lng: {js_num(f["lng"])},')
-    if f.get("website"):
-        lines.append(f'{i}website: {js_str(f["website"])},')
-
-    # 既存フィールド
-    lines.append(f'{i}features: {js_str(f.get("features", ""))},')
-    lines.append(f'{i}access: {js_str(f.get("access", ""))},')
-    lines.append(f'{i}nightShiftType: {js_str(f.get("nightShiftType", "二交代制"))},')
-    lines.append(f'{i}annualHolidays: {js_num(f.get("annualHolidays", 110))},')
-    lines.append(f'{i}nurseMonthlyMin: {js_num(f.get("nurseMonthlyMin", 270000))},')
-    lines.append(f'{i}nurseMonthlyMax: {js_num(f.get("nurseMonthlyMax", 350000))},')
-    lines.append(f'{i}ptMonthlyMin: {js_num(f.get("ptMonthlyMin"))},')
-    lines.append(f'{i}ptMonthlyMax: {js_num(f.get("ptMonthlyMax"))},')
-    lines.append(f'{i}educationLevel: {js_str(f.get("educationLevel", "あり"))},')
-
-    # referral
-    if f.get("referral") is not None:
-        lines.append(f'{i}referral: {js_bool(f["referral"])},')
-
-    lines.append(f'{i}matchingTags: {js_array_str(f.get("matchingTags", []))},')
-    lines.append(f'{i}dataSource: {js_str(f.get("dataSource", ""))},')
-    lines.append(f'{i}lastUpdated: {js_str(f.get("lastUpdated", "2026-02-25"))},')
-
-    lines.append(f"{indent}}},")
-    return "\n".join(lines)
-
-
-def format_area(aid, meta, facilities):
-    """エリアデータを整形されたJS文字列に変換"""
-    lines = []
-    lines.append("  {")
-    i = "    "
-
-    lines.append(f'{i}areaId: {js_str(aid)},')
-    lines.append(f'{i}name: {js_str(meta["name"])},')
-    lines.append(f'{i}medicalRegion: {js_str(meta["medicalRegion"])},')
-    lines.append(f'{i}description: {js_str(meta["description"])},')
-    lines.append(f'{i}population: {js_str(meta["population"])},')
-
-    # majorStations
-    stations = meta.get("majorStations", [])
-    if len(stations) == 1:
-        lines.append(f'{i}majorStations: [{js_str(stations[0])}],')
-    else:
-        lines.append(f'{i}majorStations: [')
-        for s in stations:
-            lines.append(f'{i}  {js_str(s)},')
-        lines.append(f'{i}],')
+def run_merge(db=None, areas=None, verbose=True):
+    """公開データと既存 DB を統合した新しい DB を返す（書き込みはしない）
+
+    areas: 再生成するエリアIDのリスト（None なら全エリア）。
+           指定外のエリアは既存 DB の内容をそのまま残す。
+    """
+    log = print if verbose else (lambda *a, **k: None)
+    db = areas_db.load() if db is None else db
+
+    merged = merge_sources(*load_sources())
+    log(f"統合済み施設数: {len(merged)}")
+
+    area_facilities = distribute_by_area(merged)
+    log("\nエリア別施設数:")
+    for aid, facilities in sorted(area_facilities.items()):
+        log(f"  {aid}: {len(facilities)}施設")
+
+    existing_facilities = existing_facilities_from_db(db)
+    log(f"\n既存施設数: {len(existing_facilities)}")
+
+    # 既存施設 → medicalCode（1施設1回だけ名寄せする）
+    index = build_index(merged)
+    existing_codes = {name: find_match(index, name, info.get("fullName"))
+                      for name, info in existing_facilities.items()}
+    unmatched_existing = [name for name, code in existing_codes.items() if not code]
+    log(f"既存→公開データ マッチ: {len(existing_codes) - len(unmatched_existing)}/{len(existing_facilities)}")
+    if unmatched_existing:
+        log(f"未マッチ既存施設: {unmatched_existing}")
+        # 公開データに載っていない小規模施設（20床未満のクリニック等）は保持しない
+        for name in unmatched_existing:
+            log(f"  公開データ未マッチ（保持せず）: {name}")
+
+    # 既存施設 → 公開データのレコード（同じコードに複数あれば先勝ち）
+    existing_by_code = {}
+    for name, code in existing_codes.items():
+        if code is not None:
+            existing_by_code.setdefault(code, existing_facilities[name])
+
+    existing_areas = areas_db.areas_by_id(db)
+    targets = set(AREA_ORDER if areas is None else areas)
+    new_areas = []
+    for aid in AREA_ORDER:
+        if aid not in targets and aid in existing_areas:
+            new_areas.append(existing_areas[aid])
+            continue
+        if aid not in existing_areas and aid not in AREA_META:
+            log(f"WARNING: no meta for {aid}")
+            continue
+        facilities = [facility_record(build_facility_entry(h, existing_by_code.get(h["medicalCode"])))
+                      for h in area_facilities.get(aid, [])]
+        new_areas.append(build_area(aid, facilities, existing_areas.get(aid)))
 
-    lines.append(f'{i}commuteToYokohama: {js_str(meta["commuteToYokohama"])},')
-    lines.append(f'{i}nurseAvgSalary: {js_str(meta["nurseAvgSalary"])},')
-    lines.append(f'{i}ptAvgSalary: {js_str(meta["ptAvgSalary"])},')
+    return {"medicalRegions": db.get("medicalRegions", []), "areas": new_areas}
 
-    # facilityCount
-    h_count = len(facilities)
-    lines.append(f'{i}facilityCount: {{ hospitals: {h_count}, clinics: 0, nursingHomes: 0 }},')
 
-    # majorFacilities
-    lines.append(f'{i}majorFacilities: [')
-    for f in facilities:
-        lines.append(format_facility(f))
-    lines.append(f'{i}],')
+def main():
+    parser = argparse.ArgumentParser(description="公開データを areas.json / areas.js に統合")
+    parser.add_argument("--area", action="append", metavar="AREA_ID",
+                        help="指定エリアのみ再生成（複数指定可）")
+    parser.add_argument("--dry-run", action="store_true", help="変更エリアを表示するだけで書き込まない")
+    args = parser.parse_args()
 
-    lines.append(f'{i}demandLevel: {js_str(meta.get("demandLevel", "高い"))},')
-    lines.append(f'{i}demandNote: {js_str(meta.get("demandNote", ""))},')
-    lines.append(f'{i}livingInfo: {js_str(meta.get("livingInfo", ""))},')
+    db = run_merge(areas=args.area)
+    total_facilities = sum(len(a["majorFacilities"]) for a in db["areas"])
 
-    lines.append("  },")
-    return "\n".join(lines)
+    if args.dry_run:
+        changed = areas_db.changed_areas(areas_db.load(), db)
+        print(f"\n[dry-run] 変更エリア: {', '.join(changed) or 'なし'}")
+        return
 
+    changed = areas_db.save(db)
+    areas_db.write_js(db)
+
+    print(f"\n✅ areas.js 更新完了!")
+    print(f"  エリア数: {len(db['areas'])}")
+    print(f"  施設数: {total_facilities}")
+    print(f"  変更エリア: {', '.join(changed) or 'なし'}")
+    print(f"  出力: {areas_db.AREAS_JSON} / {areas_db.AREAS_JS}")
 
-# ==========================================
-# 12. 出力
-# ==========================================
 
-output_lines = []
-output_lines.append("// ========================================")
-output_lines.append("// ナースロビー - エリア・医療機関データベース")
-output_lines.append("// 神奈川県西部10エリア 実データ（病床機能報告R5 + 医療情報ネット 2025.12）")
-output_lines.append("// 自動生成: 2026-02-25 merge_and_update_areas.py")
-output_lines.append("// ========================================")
-output_lines.append("")
-
-# MEDICAL_REGIONS（そのまま）
-output_lines.append("// ==========================================")
-output_lines.append("// 医療圏マスターデータ（神奈川県二次保健医療圏）")
-output_lines.append("// ==========================================")
-output_lines.append("const MEDICAL_REGIONS = [")
-output_lines.append('  {')
-output_lines.append('    regionId: "kensei",')
-output_lines.append('    name: "県西",')
-output_lines.append('    description: "小田原市を中心とした神奈川県西部の医療圏。箱根・足柄エリアを含む。",')
-output_lines.append('    areaIds: ["odawara", "minamiashigara_kaisei_oi"],')
-output_lines.append('    municipalities: ["小田原市", "南足柄市", "開成町", "大井町", "中井町", "松田町", "山北町", "箱根町", "真鶴町", "湯河原町"],')
-output_lines.append('  },')
-output_lines.append('  {')
-output_lines.append('    regionId: "shonan_west",')
-output_lines.append('    name: "湘南西部",')
-output_lines.append('    description: "平塚市・秦野市・伊勢原市を中核とした湘南西部の医療圏。東海大学病院が立地。",')
-output_lines.append('    areaIds: ["hiratsuka", "hadano", "isehara", "oiso_ninomiya"],')
-output_lines.append('    municipalities: ["平塚市", "秦野市", "伊勢原市", "大磯町", "二宮町"],')
-output_lines.append('  },')
-output_lines.append('  {')
-output_lines.append('    regionId: "shonan_east",')
-output_lines.append('    name: "湘南東部",')
-output_lines.append('    description: "藤沢市・茅ヶ崎市を中心とした湘南東部の医療圏。県内有数の医療集積地。",')
-output_lines.append('    areaIds: ["fujisawa", "chigasaki"],')
-output_lines.append('    municipalities: ["藤沢市", "茅ヶ崎市", "寒川町"],')
-output_lines.append('  },')
-output_lines.append('  {')
-output_lines.append('    regionId: "kenoh",')
-output_lines.append('    name: "県央",')
-output_lines.append('    description: "厚木市・海老名市を中心とした県央の医療圏。海老名総合病院が3次救急を担う。",')
-output_lines.append('    areaIds: ["atsugi", "ebina"],')
-output_lines.append('    municipalities: ["厚木市", "海老名市", "大和市", "座間市", "綾瀬市", "愛川町", "清川村"],')
-output_lines.append('  },')
-output_lines.append("];")
-output_lines.append("")
-
-# AREA_DATABASE
-output_lines.append("const AREA_DATABASE = [")
-
-total_facilities = 0
-for aid in AREA_ORDER:
-    meta = AREA_META.get(aid)
-    if not meta:
-        print(f"WARNING: no meta for {aid}")
-        continue
-    facilities = final_areas.get(aid, [])
-    total_facilities += len(facilities)
-    output_lines.append(format_area(aid, meta, facilities))
-
-output_lines.append("];")
-output_lines.append("")
-
-# ヘルパー関数
-output_lines.append("// ==========================================")
-output_lines.append("// エリア検索ヘルパー")
-output_lines.append("// ==========================================")
-output_lines.append("function findAreaByName(name) {")
-output_lines.append("  if (!name) return null;")
-output_lines.append("  return AREA_DATABASE.find(a =>")
-output_lines.append('    a.name.includes(name) || name.includes(a.name) ||')
-output_lines.append('    a.areaId === name.toLowerCase()')
-output_lines.append("  );")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append("// 施設検索ヘルパー")
-output_lines.append("function findFacilitiesByArea(areaName) {")
-output_lines.append("  const area = findAreaByName(areaName);")
-output_lines.append("  return area ? area.majorFacilities : [];")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append("// 全施設数サマリ")
-output_lines.append("function getDatabaseSummary() {")
-output_lines.append("  let totalFacilities = 0;")
-output_lines.append("  let totalBeds = 0;")
-output_lines.append("  let totalNurses = 0;")
-output_lines.append("  for (const area of AREA_DATABASE) {")
-output_lines.append("    totalFacilities += area.majorFacilities.length;")
-output_lines.append("    for (const f of area.majorFacilities) {")
-output_lines.append("      totalBeds += f.beds || 0;")
-output_lines.append("      totalNurses += f.nurseCount || 0;")
-output_lines.append("    }")
-output_lines.append("  }")
-output_lines.append("  return { areas: AREA_DATABASE.length, facilities: totalFacilities, beds: totalBeds, nurses: totalNurses };")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append("// ==========================================")
-output_lines.append("// 医療圏ベース検索ヘルパー")
-output_lines.append("// ==========================================")
-output_lines.append("")
-output_lines.append("// 医療圏IDからエリア配列を返す")
-output_lines.append("function findAreasByRegion(regionId) {")
-output_lines.append('  const region = MEDICAL_REGIONS.find(r => r.regionId === regionId);')
-output_lines.append("  if (!region) return [];")
-output_lines.append("  return AREA_DATABASE.filter(a => region.areaIds.includes(a.areaId));")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append("// 医療圏IDから施設配列をフラットに返す")
-output_lines.append("function findFacilitiesByRegion(regionId) {")
-output_lines.append("  const areas = findAreasByRegion(regionId);")
-output_lines.append("  const facilities = [];")
-output_lines.append("  for (const area of areas) {")
-output_lines.append("    for (const f of area.majorFacilities) {")
-output_lines.append("      facilities.push({ ...f, areaId: area.areaId, areaName: area.name });")
-output_lines.append("    }")
-output_lines.append("  }")
-output_lines.append("  return facilities;")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append("// 全施設をフラット配列で返す（エリア情報付き）")
-output_lines.append("function getAllFacilities() {")
-output_lines.append("  const facilities = [];")
-output_lines.append("  for (const area of AREA_DATABASE) {")
-output_lines.append("    for (const f of area.majorFacilities) {")
-output_lines.append('      facilities.push({ ...f, areaId: area.areaId, areaName: area.name, medicalRegion: area.medicalRegion });')
-output_lines.append("    }")
-output_lines.append("  }")
-output_lines.append("  return facilities;")
-output_lines.append("}")
-output_lines.append("")
-output_lines.append('// ブラウザ・Node.js両対応エクスポート')
-output_lines.append('if (typeof module !== "undefined" && module.exports) {')
-output_lines.append("  module.exports = {")
-output_lines.append("    MEDICAL_REGIONS,")
-output_lines.append("    AREA_DATABASE,")
-output_lines.append("    findAreaByName,")
-output_lines.append("    findFacilitiesByArea,")
-output_lines.append("    getDatabaseSummary,")
-output_lines.append("    findAreasByRegion,")
-output_lines.append("    findFacilitiesByRegion,")
-output_lines.append("    getAllFacilities,")
-output_lines.append("  };")
-output_lines.append("}")
-output_lines.append("")
-
-# 書き込み
-output_text = "\n".join(output_lines)
-OUTPUT_JS.write_text(output_text, encoding="utf-8")
-
-print(f"\n✅ areas.js 更新完了!")
-print(f"  エリア数: {len(AREA_ORDER)}")
-print(f"  施設数: {total_facilities}")
-print(f"  出力: {OUTPUT_JS}")
+if __name__ == "__main__":
+    main()
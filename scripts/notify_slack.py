@@ -10,12 +10,13 @@ import json
 import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-import requests
+
+import slack_client
+from runtime_config import load_env
 
 # プロジェクトルート
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Slack Bot Token
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
@@ -127,36 +128,16 @@ def send_slack_notification(json_path: Path = None, message: str = None):
         print("❌ エラー: --json または --message のいずれかが必要です")
         sys.exit(1)
 
-    # Slackに送信（Bot Token使用）
-    try:
-        headers = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json"
-        }
-
-        # chat.postMessage APIエンドポイント
-        if "blocks" in payload:
-            payload["channel"] = SLACK_CHANNEL_ID
-
-        response = requests.post(
-            "https://slack.com/api/chat.postMessage",
-            headers=headers,
-            json=payload,
-            timeout=10
-        )
-
-        data = response.json()
-        if data.get("ok"):
-            print("✅ Slack通知送信完了")
-            if json_path:
-                print(f"   ID: {content_id}")
-            return True
-        else:
-            print(f"❌ Slack通知失敗: {data.get('error', 'unknown')}")
-            return False
-
-    except Exception as e:
-        print(f"❌ エラー: {type(e).__name__}: {e}")
+    # Slackに送信（Bot Token使用、共通クライアント経由）
+    data = slack_client.post_message(SLACK_CHANNEL_ID, text=payload.get("text", ""),
+                                     blocks=payload.get("blocks"))
+    if data.get("ok"):
+        print("✅ Slack通知送信完了")
+        if json_path:
+            print(f"   ID: {content_id}")
+        return True
+    else:
+        print(f"❌ Slack通知失敗: {data.get('error', 'unknown')}")
         return False
 
 
@@ -11,6 +11,8 @@ import sys
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 
+import image_encode
+
 # フォント検索パス
 FONT_PATHS = [
     "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc",
@@ -129,7 +131,7 @@ def overlay_text(input_path, text, output_path, position="center", fontsize=None
         current_y += line_height
 
     final_img = img_with_overlay.convert('RGB')
-    final_img.save(output_path, "PNG", quality=95)
+    image_encode.save(final_img, output_path, "final")
     print(f"✅ 保存完了: {output_path} (fontsize={fontsize}px, {len(lines)}行)")
 
 
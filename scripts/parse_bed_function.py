@@ -20,11 +20,13 @@ import sys
 from collections import defaultdict
 
 try:
-    import openpyxl
+    import openpyxl  # noqa: F401  (excel_cache が初回変換時に使用)
 except ImportError:
     print("ERROR: openpyxl not installed. Run: pip3 install openpyxl")
     sys.exit(1)
 
+from excel_cache import load_table
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -236,10 +238,10 @@ def estimate_nursing_ratio(admission_fee, general_beds, therapy_beds, nurse_ft,
 def parse_ward_file():
     """Parse the ward-level Excel file for 神奈川県西部 hospitals."""
     print(f"Loading ward file: {WARD_FILE}")
-    print("  (This may take a moment for a 10MB file...)")
+    print("  (First run converts the 10MB file to a cache; later runs load the cache)")
 
-    wb = openpyxl.load_workbook(WARD_FILE, read_only=True)
-    ws = wb.active
+    # Data starts at row 7 (1-indexed), so min_row=7
+    table = load_table(WARD_FILE, min_row=7, data_only=False)
 
     hospitals = defaultdict(lambda: {
         "medical_code": "",
@@ -251,26 +253,14 @@ def parse_ward_file():
         "wards": [],
     })
 
-    row_count = 0
-    kanagawa_count = 0
-    target_count = 0
-
-    # Data starts at row 7 (1-indexed), so min_row=7
-    for row in ws.iter_rows(min_row=7, values_only=True):
-        row_count += 1
-        pref_code = safe_str(row[WARD_COLS["pref_code"]])
-
-        if pref_code != KANAGAWA_PREF_CODE:
-            continue
+    kanagawa = table.eq(WARD_COLS["pref_code"], KANAGAWA_PREF_CODE)
+    target = table.both(kanagawa, table.isin(WARD_COLS["city_name"], NISHI_KANAGAWA_CITIES))
+    row_count = len(table)
+    kanagawa_count = table.count(kanagawa)
+    target_count = table.count(target)
 
-        kanagawa_count += 1
+    for row in table.rows(target):
         city_name = safe_str(row[WARD_COLS["city_name"]])
-
-        if city_name not in NISHI_KANAGAWA_CITIES:
-            continue
-
-        target_count += 1
-
         medical_code = safe_str(row[WARD_COLS["medical_code"]])
         hospital_name = safe_str(row[WARD_COLS["hospital_name"]])
 
@@ -366,8 +356,6 @@ def parse_ward_file():
 
         h["wards"].append(ward_data)
 
-    wb.close()
-
     print(f"  Total rows scanned: {row_count}")
     print(f"  Kanagawa rows: {kanagawa_count}")
     print(f"  Target area rows (wards): {target_count}")
@@ -380,20 +368,15 @@ def parse_facility_file():
     """Parse the facility-level Excel file for additional hospital info."""
     print(f"\nLoading facility file: {FACILITY_FILE}")
 
-    wb = openpyxl.load_workbook(FACILITY_FILE, read_only=True)
-    ws = wb.active
+    table = load_table(FACILITY_FILE, min_row=7, max_col=25, data_only=False)
 
     facilities = {}
 
-    for row in ws.iter_rows(min_row=7, max_col=25, values_only=True):
-        pref_code = safe_str(row[FACILITY_COLS["pref_code"]])
-        if pref_code != KANAGAWA_PREF_CODE:
-            continue
-
-        city_name = safe_str(row[FACILITY_COLS["city_name"]])
-        if city_name not in NISHI_KANAGAWA_CITIES:
-            continue
-
+    target = table.both(
+        table.eq(FACILITY_COLS["pref_code"], KANAGAWA_PREF_CODE),
+        table.isin(FACILITY_COLS["city_name"], NISHI_KANAGAWA_CITIES),
+    )
+    for row in table.rows(target):
         medical_code = safe_str(row[FACILITY_COLS["medical_code"]])
         facilities[medical_code] = {
             "type": safe_str(row[FACILITY_COLS["type"]]),
@@ -407,7 +390,6 @@ def parse_facility_file():
             "zaitaku_kouhou": safe_str(row[FACILITY_COLS["zaitaku_kouhou"]]),
         }
 
-    wb.close()
     print(f"  Target facilities found: {len(facilities)}")
     return facilities
 
@@ -42,6 +42,11 @@ else
     handle_failure "content_creator" "Content Pipeline exit=$PIPELINE_EXIT"
 fi
 
+# === 先行レンダリング（先3日分のスライド・動画を投稿前に書き出す） ===
+echo "[INFO] 先行レンダリング実行" >> "$LOG"
+python3 "$PROJECT_DIR/scripts/prerender.py" --days 3 >> "$LOG" 2>&1 || \
+    echo "[WARN] 先行レンダリングに失敗した投稿あり（投稿時にその場で生成）" >> "$LOG"
+
 # === 進捗記録 ===
 QUEUE_STATUS=$(python3 "$PROJECT_DIR/scripts/content_pipeline.py" --status 2>/dev/null | tail -5)
 update_progress "content" "コンテンツ生成: $QUEUE_STATUS"
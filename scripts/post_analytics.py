@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+ROBBY THE MATCH 投稿パフォーマンス分析エンジン
+posting_queue.json / stock.csv を一度だけ列指向に読み込み、
+カテゴリ・CTA種別・フックパターン・曜日・時間帯の集計、
+保存率・いいね率、パーセンタイル順位を1パスで計算する。
+
+analyze_performance.py と ai_content_engine.py --feedback-loop の共通基盤。
+
+使い方:
+  python3 post_analytics.py                 # 投稿済みの集計を表示
+  python3 post_analytics.py --dim category  # 指定ディメンションのみ表示
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent
+QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
+STATE_FILE = PROJECT_DIR / "data" / "analytics_state.json"
+
+# posting_queue.json の content_type → 日本語カテゴリ
+CONTENT_TYPE_TO_CATEGORY = {
+    "aruaru": "あるある",
+    "salary": "給与",
+    "local": "地域ネタ",
+    "career": "転職",
+    "trend": "トレンド",
+}
+DEFAULT_CATEGORY = "あるある"
+
+DIMENSIONS = ("category", "cta_type", "hook_pattern", "weekday", "hour")
+METRICS = ("views", "likes", "saves", "comments")
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_MISSING = -1  # 数値列の欠損値（views等は0以上なので衝突しない）
+
+
+def _metric(value) -> int:
+    if value is None:
+        return _MISSING
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return _MISSING
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator * 100, 2) if denominator > 0 else 0
+
+
+class PostFrame:
+    """投稿を列指向で保持する軽量フレーム。
+
+    文字列列は list、数値列は array.array('q')（欠損は -1）。
+    weekday / hour は posted_at から算出（未投稿は -1）。
+    """
+
+    def __init__(self):
+        self.post_id = []
+        self.content_id = []
+        self.caption = []
+        self.status = []
+        self.posted_at = []
+        self.category = []
+        self.cta_type = []
+        self.hook_pattern = []
+        self.verified = array("b")
+        self.weekday = array("b")
+        self.hour = array("b")
+        self.metrics = {m: array("q") for m in METRICS}
+
+    def __len__(self):
+        return len(self.content_id)
+
+    # --- 構築 ---
+
+    def _append(self, post_id, content_id, caption, status, posted_at, category,
+                cta_type, hook_pattern, verified, perf):
+        self.post_id.append(str(post_id))
+        self.content_id.append(content_id)
+        self.caption.append(caption)
+        self.status.append(status)
+        self.posted_at.append(posted_at)
+        self.category.append(category)
+        self.cta_type.append(cta_type)
+        self.hook_pattern.append(hook_pattern)
+        self.verified.append(1 if verified else 0)
+
+        weekday = hour = -1
+        if posted_at:
+            try:
+                dt = datetime.fromisoformat(posted_at)
+                weekday, hour = dt.weekday(), dt.hour
+            except (ValueError, TypeError):
+                pass
+        self.weekday.append(weekday)
+        self.hour.append(hour)
+
+        perf = perf if isinstance(perf, dict) else {}
+        for m in METRICS:
+            self.metrics[m].append(_metric(perf.get(m)))
+
+    @classmethod
+    def from_queue(cls, queue: dict, category_map: dict = None):
+        """posting_queue.json の dict から構築"""
+        category_map = category_map or CONTENT_TYPE_TO_CATEGORY
+        frame = cls()
+        for p in queue.get("posts", []):
+            frame._append(
+                post_id=p.get("id", p.get("content_id", "unknown")),
+                content_id=p.get("content_id", "unknown"),
+                caption=p.get("caption", "") or "",
+                status=p.get("status", ""),
+                posted_at=p.get("posted_at") or "",
+                category=category_map.get(p.get("content_type"), DEFAULT_CATEGORY),
+                cta_type=p.get("cta_type", "soft") or "soft",
+                hook_pattern=p.get("hook_pattern") or "unknown",
+                verified=p.get("verified"),
+                perf=p.get("performance"),
+            )
+        return frame
+
+    @classmethod
+    def from_stock(cls, stock_rows: list):
+        """content/stock.csv の行から構築（カテゴリ・ステータスのみ）"""
+        frame = cls()
+        for row in stock_rows:
+            content_id = row.get("id", "") or row.get("content_id", "")
+            frame._append(
+                post_id=content_id,
+                content_id=content_id,
+                caption="",
+                status=row.get("status", ""),
+                posted_at="",
+                category=row.get("category", "other") or "other",
+                cta_type=row.get("cta_type", "soft") or "soft",
+                hook_pattern="unknown",
+                verified=False,
+                perf=None,
+            )
+        return frame
+
+    @classmethod
+    def load(cls, path: Path = QUEUE_FILE, category_map: dict = None):
+        if not Path(path).exists():
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls.from_queue(json.load(f), category_map)
+
+    # --- マスク ---
+
+    def mask_status(self, *statuses) -> array:
+        wanted = set(statuses)
+        return array("b", (1 if s in wanted else 0 for s in self.status))
+
+    def mask_has_views(self, min_views: int = 0, base: array = None) -> array:
+        """views が記録済みかつ min_views 以上の行（base 指定時はその部分集合）"""
+        views = self.metrics["views"]
+        if base is None:
+            base = array("b", [1]) * len(views)
+        return array("b", (1 if b and v != _MISSING and v >= min_views else 0
+                           for b, v in zip(base, views)))
+
+    # --- 集計 ---
+
+    def _key(self, dim: str, i: int):
+        if dim == "weekday":
+            w = self.weekday[i]
+            return WEEKDAY_NAMES[w] if w >= 0 else None
+        if dim == "hour":
+            h = self.hour[i]
+            return h if h >= 0 else None
+        return getattr(self, dim)[i]
+
+    def analyze(self, dims=DIMENSIONS, rows: array = None, data_rows: array = None) -> dict:
+        """全ディメンションの集計を1パスで計算する。
+
+        rows:      集計対象の行マスク（件数 count に反映）
+        data_rows: 指標を合算する行マスク（省略時は views 記録済みの行）
+        """
+        n = len(self)
+        views, likes, saves, comments = (self.metrics[m] for m in METRICS)
+        groups = {d: {} for d in dims}
+        total = _new_bucket()
+
+        for i in range(n):
+            if rows is not None and not rows[i]:
+                continue
+            if data_rows is not None:
+                has_data = bool(data_rows[i])
+            else:
+                has_data = views[i] != _MISSING
+            posted = self.status[i] == "posted"
+            buckets = [total]
+            for d in dims:
+                key = self._key(d, i)
+                if key is None:
+                    continue
+                b = groups[d].get(key)
+                if b is None:
+                    b = groups[d][key] = _new_bucket()
+                buckets.append(b)
+            for b in buckets:
+                b["count"] += 1
+                b["posted"] += posted
+                if has_data:
+                    b["with_data"] += 1
+                    b["total_views"] += max(views[i], 0)
+                    b["total_likes"] += max(likes[i], 0)
+                    b["total_saves"] += max(saves[i], 0)
+                    b["total_comments"] += max(comments[i], 0)
+
+        _finish_bucket(total)
+        for d in dims:
+            for b in groups[d].values():
+                _finish_bucket(b)
+        total["by"] = groups
+        return total
+
+    def percentile_ranks(self, metric: str = "views", rows: array = None) -> dict:
+        """行番号 → パーセンタイル順位 (0-100)。同値は平均順位。"""
+        values = self.metrics[metric]
+        idx = [i for i in range(len(self))
+               if values[i] != _MISSING and (rows is None or rows[i])]
+        if not idx:
+            return {}
+        ordered = sorted(values[i] for i in idx)
+        n = len(ordered)
+        if n == 1:
+            return {idx[0]: 100.0}
+        ranks = {}
+        for i in idx:
+            v = values[i]
+            lo = bisect_left(ordered, v)
+            hi = bisect_right(ordered, v) - 1
+            ranks[i] = round((lo + hi) / 2 / (n - 1) * 100, 1)
+        return ranks
+
+    def top(self, metric: str = "views", k: int = 3, rows: array = None,
+            reverse: bool = True) -> list:
+        """指標順の行番号リスト（欠損行は除外）"""
+        values = self.metrics[metric]
+        idx = [i for i in range(len(self))
+               if values[i] != _MISSING and (rows is None or rows[i])]
+        idx.sort(key=lambda i: values[i], reverse=reverse)
+        return idx[:k]
+
+    def record(self, i: int, ranks: dict = None) -> dict:
+        """1行を analyze_performance 互換の dict に変換"""
+        rec = {
+            "content_id": self.content_id[i],
+            "caption": self.caption[i][:50],
+            "views": max(self.metrics["views"][i], 0),
+            "likes": max(self.metrics["likes"][i], 0),
+            "saves": max(self.metrics["saves"][i], 0),
+            "comments": max(self.metrics["comments"][i], 0),
+            "cta_type": self.cta_type[i],
+            "category": self.category[i],
+            "hook_pattern": self.hook_pattern[i],
+            "posted_at": self.posted_at[i],
+        }
+        if ranks is not None and i in ranks:
+            rec["percentile"] = ranks[i]
+        return rec
+
+
+def _new_bucket() -> dict:
+    return {
+        "count": 0,
+        "posted": 0,
+        "with_data": 0,
+        "total_views": 0,
+        "total_likes": 0,
+        "total_saves": 0,
+        "total_comments": 0,
+    }
+
+
+def _finish_bucket(b: dict):
+    n = b["with_data"]
+    b["avg_views"] = round(b["total_views"] / n) if n else 0
+    b["save_rate"] = _rate(b["total_saves"], b["total_views"])
+    b["like_rate"] = _rate(b["total_likes"], b["total_views"])
+
+
+# ============================================================
+# インクリメンタル集計
+# ============================================================
+
+class IncrementalAggregates:
+    """ディメンション別の累積和を保持し、変化した投稿だけを反映する。
+
+    対象行: status == "posted" かつ views >= min_views
+    （analyze_performance.analyze_content_performance と同じ条件）。
+    投稿ごとに前回反映した値（fingerprint）を保持し、変化があれば
+    旧寄与を引いて新寄与を足す。watermark は posting_queue.json の
+    "updated" で、前回から変わっていなければ走査自体を省略する。
+    """
+
+    VERSION = 1
+
+    def __init__(self, dims=DIMENSIONS, min_views: int = 1):
+        self.dims = tuple(dims)
+        self.min_views = min_views
+        self.watermark = None
+        self.rows = {}  # post_id -> 前回反映した行スナップショット
+        self.total = _new_bucket()
+        self.groups = {d: {} for d in self.dims}
+
+    # --- 永続化 ---
+
+    @classmethod
+    def load(cls, path: Path = STATE_FILE, dims=DIMENSIONS, min_views: int = 1):
+        agg = cls(dims, min_views)
+        path = Path(path)
+        if not path.exists():
+            return agg
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return agg
+        if (state.get("version") != cls.VERSION
+                or tuple(state.get("dims", ())) != agg.dims
+                or state.get("min_views") != min_views):
+            return agg  # 定義が変わったら空から再構築
+        agg.watermark = state.get("watermark")
+        agg.rows = state.get("rows", {})
+        for row in agg.rows.values():
+            agg._apply(row, 1)
+        return agg
+
+    def save(self, path: Path = STATE_FILE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "version": self.VERSION,
+            "dims": list(self.dims),
+            "min_views": self.min_views,
+            "watermark": self.watermark,
+            "updated_at": datetime.now().isoformat(),
+            "rows": self.rows,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=path.stem + "_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    # --- 集計 ---
+
+    def _snapshot(self, frame: PostFrame, i: int):
+        """行 i の寄与。対象外なら None"""
+        views = frame.metrics["views"][i]
+        if frame.status[i] != "posted" or views == _MISSING or views < self.min_views:
+            return None
+        return {
+            "keys": {d: frame._key(d, i) for d in self.dims},
+            "record": frame.record(i),
+        }
+
+    def _apply(self, row: dict, sign: int):
+        rec = row["record"]
+        buckets = [self.total]
+        for d in self.dims:
+            key = row["keys"].get(d)
+            if key is None:
+                continue
+            b = self.groups[d].get(key)
+            if b is None:
+                b = self.groups[d][key] = _new_bucket()
+            buckets.append(b)
+        for b in buckets:
+            b["count"] += sign
+            b["posted"] += sign
+            b["with_data"] += sign
+            b["total_views"] += sign * rec["views"]
+            b["total_likes"] += sign * rec["likes"]
+            b["total_saves"] += sign * rec["saves"]
+            b["total_comments"] += sign * rec["comments"]
+        if sign < 0:
+            for d in self.dims:
+                key = row["keys"].get(d)
+                if key is not None and self.groups[d].get(key, {}).get("count") == 0:
+                    del self.groups[d][key]
+
+    def fold(self, frame: PostFrame, watermark=None) -> int:
+        """変化した投稿だけを反映する。戻り値: 反映した行数（-1 は走査省略）"""
+        if watermark is not None and watermark == self.watermark:
+            return -1
+        changed = 0
+        seen = set()
+        for i in range(len(frame)):
+            pid = frame.post_id[i]
+            seen.add(pid)
+            new = self._snapshot(frame, i)
+            old = self.rows.get(pid)
+            if new == old:
+                continue
+            if old is not None:
+                self._apply(old, -1)
+                del self.rows[pid]
+            if new is not None:
+                self._apply(new, 1)
+                self.rows[pid] = new
+            changed += 1
+        # キューから消えた投稿
+        for pid in [p for p in self.rows if p not in seen]:
+            self._apply(self.rows.pop(pid), -1)
+            changed += 1
+        self.watermark = watermark
+        return changed
+
+    def result(self) -> dict:
+        """PostFrame.analyze() と同じ形式の集計結果"""
+        total = dict(self.total)
+        _finish_bucket(total)
+        by = {}
+        for d in self.dims:
+            by[d] = {}
+            for key, b in self.groups[d].items():
+                b = dict(b)
+                _finish_bucket(b)
+                by[d][key] = b
+        total["by"] = by
+        return total
+
+    def ranked_records(self) -> list:
+        """views降順の行レコード（percentile付き）"""
+        recs = sorted((r["record"] for r in self.rows.values()),
+                      key=lambda r: r["views"], reverse=True)
+        ordered = sorted(r["views"] for r in recs)
+        n = len(ordered)
+        out = []
+        for r in recs:
+            r = dict(r)
+            if n == 1:
+                r["percentile"] = 100.0
+            else:
+                lo = bisect_left(ordered, r["views"])
+                hi = bisect_right(ordered, r["views"]) - 1
+                r["percentile"] = round((lo + hi) / 2 / (n - 1) * 100, 1)
+            out.append(r)
+        return out
+
+    def verify(self, frame: PostFrame) -> list:
+        """全件再計算と比較する整合性チェック。戻り値: 不一致の説明リスト"""
+        fresh = type(self)(self.dims, self.min_views)
+        fresh.fold(frame)
+        expected = fresh.result()
+        actual = self.result()
+        problems = []
+        for field in ("count", "total_views", "total_likes", "total_saves", "total_comments"):
+            if expected[field] != actual[field]:
+                problems.append(f"total.{field}: {actual[field]} != {expected[field]}")
+        for d in self.dims:
+            exp_d, act_d = expected["by"][d], actual["by"][d]
+            for key in set(exp_d) | set(act_d):
+                e, a = exp_d.get(key), act_d.get(key)
+                if e is None or a is None:
+                    problems.append(f"{d}[{key}]: {'missing' if a is None else 'unexpected'}")
+                    continue
+                for field in ("count", "total_views", "total_likes", "total_saves"):
+                    if e[field] != a[field]:
+                        problems.append(f"{d}[{key}].{field}: {a[field]} != {e[field]}")
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="投稿パフォーマンス集計")
+    parser.add_argument("--dim", choices=DIMENSIONS, help="表示するディメンション")
+    parser.add_argument("--verify", action="store_true",
+                        help="インクリメンタル集計を全件再計算と照合")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="インクリメンタル集計を全件から再構築")
+    args = parser.parse_args()
+
+    queue = {"posts": []}
+    if QUEUE_FILE.exists():
+        with open(QUEUE_FILE, encoding="utf-8") as f:
+            queue = json.load(f)
+    frame = PostFrame.from_queue(queue)
+
+    if args.verify or args.rebuild:
+        agg = IncrementalAggregates() if args.rebuild else IncrementalAggregates.load()
+        if args.rebuild:
+            agg.fold(frame, queue.get("updated"))
+            agg.save()
+            print(f"[OK] 再構築: {len(agg.rows)} 投稿 → {STATE_FILE}")
+        problems = agg.verify(frame)
+        if problems:
+            print(f"[NG] 不一致 {len(problems)} 件")
+            for p in problems:
+                print(f"  {p}")
+            raise SystemExit(1)
+        print("[OK] インクリメンタル集計は全件再計算と一致")
+        return
+
+    posted = frame.mask_status("posted")
+    result = frame.analyze(rows=posted)
+    print(f"投稿済み: {result['count']} / データあり: {result['with_data']}")
+    print(f"平均再生: {result['avg_views']} / 保存率: {result['save_rate']}% / "
+          f"いいね率: {result['like_rate']}%")
+    for dim in ([args.dim] if args.dim else DIMENSIONS):
+        print(f"\n--- {dim} ---")
+        for key, b in sorted(result["by"][dim].items(), key=lambda kv: -kv[1]["avg_views"]):
+            print(f"  {key}: {b['count']}本 (データ{b['with_data']}) "
+                  f"平均再生{b['avg_views']} 保存率{b['save_rate']}%")
+
+
+if __name__ == "__main__":
+    main()
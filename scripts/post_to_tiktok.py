@@ -11,11 +11,12 @@ import sys
 import subprocess
 from pathlib import Path
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
+
+from runtime_config import load_env
 
 # プロジェクトルート
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Postiz API Key
 POSTIZ_API_KEY = os.getenv("POSTIZ_API_KEY")
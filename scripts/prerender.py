@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+先行レンダリング — ナースロビー
+
+投稿時刻にレンダリングを待たないよう、キューの先 N 日分を前もって書き出しておく。
+  - 対象: posting_schedule.json の投稿枠（N 日分）の数だけ、キュー順に未投稿の投稿
+          + scheduled_date / scheduled_for が N 日以内の投稿
+  - 書き出すもの: スライドPNG / アニメーション動画 / 静止スライドショー動画（フォールバック）
+    動画は content/prerendered/<content_id>/ に置く
+  - 全レンディションを検証してから、キューの投稿に ready_assets を付ける
+    （パス + バイト数。検証できなかった投稿は prerender_error を残して次回やり直す）
+
+投稿する側（tiktok_post / sns_workflow）は asset() / slides() でファイルを引くだけ。
+記録したバイト数と一致しない（再生成された・消えた）時は None になり、従来どおりその場で作る。
+
+使い方:
+  python3 prerender.py                 # 3日先まで書き出す
+  python3 prerender.py --days 7 --workers 2
+  python3 prerender.py --status        # 対象投稿と ready_assets の状態を表示
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import runtime_config
+
+PROJECT_DIR = Path(__file__).parent.parent
+QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
+RENDER_DIR = PROJECT_DIR / "content" / "prerendered"
+
+HORIZON_DAYS = 3
+WORKERS = 2
+# 投稿前の状態（tiktok_post.post_next が拾うもの）
+ACTIVE_STATUSES = ("pending", "ready", "video_created")
+# ready_assets に載せる動画（この順に tiktok_post が使う）
+VIDEO_RENDITIONS = ("animated", "slideshow")
+MIN_VIDEO_BYTES = 10 * 1024
+# 動画がどのスライドから作られたか（スライドのダイジェスト）を書いておくファイル
+SOURCE_FILE = "source.json"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# posting_schedule.json が無い時の投稿枠（ai_content_engine の calendar と同じ）
+DEFAULT_DAY_TIMES = {"Mon": "17:30", "Tue": "12:00", "Wed": "21:00",
+                     "Thu": "17:30", "Fri": "18:00", "Sat": "20:00"}
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _rel(path) -> str:
+    path = Path(path).resolve()
+    try:
+        return str(path.relative_to(PROJECT_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+
+# ===================================================================
+# 投稿側の参照（ファイルを引くだけ）
+# ===================================================================
+
+def _lookup(assets: Dict, rel: Optional[str]) -> Optional[Path]:
+    """記録したバイト数と一致する時だけパスを返す"""
+    if not rel:
+        return None
+    path = PROJECT_DIR / rel
+    try:
+        if path.stat().st_size == assets.get("sizes", {}).get(rel):
+            return path
+    except OSError:
+        pass
+    return None
+
+
+def asset(post: Dict, name: str) -> Optional[Path]:
+    """書き出し済みの動画（"animated" / "slideshow"）。動画か元スライドが無い・変わっていれば None"""
+    assets = post.get("ready_assets") or {}
+    if slides(post) is None:
+        return None
+    return _lookup(assets, assets.get(name))
+
+
+def slides(post: Dict) -> Optional[List[Path]]:
+    """書き出し済みのスライドPNG（順番どおり）。1枚でも欠けていれば None"""
+    assets = post.get("ready_assets") or {}
+    paths = [_lookup(assets, rel) for rel in assets.get("slides", [])]
+    if not paths or None in paths:
+        return None
+    return paths
+
+
+# ===================================================================
+# 対象の選定
+# ===================================================================
+
+def _parse_slot(value) -> Optional[datetime]:
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value), fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def posting_slots(now: datetime, days: int) -> List[datetime]:
+    """now から days 日以内の投稿枠（posting_schedule.json の曜日別時刻）"""
+    schedule = runtime_config.posting_schedule() or {}
+    day_times = schedule.get("schedule") or DEFAULT_DAY_TIMES
+    end = now + timedelta(days=days)
+    slots = []
+    for offset in range(days + 1):
+        day = (now + timedelta(days=offset)).date()
+        time_str = day_times.get(DAY_NAMES[day.weekday()])
+        slot = _parse_slot(f"{day.isoformat()} {time_str}") if time_str else None
+        if slot and now <= slot <= end:
+            slots.append(slot)
+    return slots
+
+
+def due_posts(queue: Dict, days: int, now: datetime = None) -> List[Dict]:
+    """先 days 日で投稿される見込みの投稿（キュー順）"""
+    now = now or datetime.now()
+    end = now + timedelta(days=days)
+    remaining = len(posting_slots(now, days))
+    due = []
+    for post in queue.get("posts", []):
+        if post.get("status") not in ACTIVE_STATUSES:
+            continue
+        slot = _parse_slot(post.get("scheduled_date") or post.get("scheduled_for"))
+        if slot is not None:
+            if slot > end:
+                continue
+        elif remaining <= 0:
+            continue
+        due.append(post)
+        remaining -= 1
+    return due
+
+
+# ===================================================================
+# 書き出しと検証
+# ===================================================================
+
+def verify_png(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(8) == PNG_SIGNATURE
+    except OSError:
+        return False
+
+
+def verify_mp4(path: Path) -> bool:
+    """サイズ・ftyp ボックス・（ffprobe があれば）再生時間を確認"""
+    try:
+        if path.stat().st_size < MIN_VIDEO_BYTES:
+            return False
+        with open(path, "rb") as f:
+            if f.read(12)[4:8] != b"ftyp":
+                return False
+    except OSError:
+        return False
+    if not shutil.which("ffprobe"):
+        return True
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, timeout=30,
+        )
+        return result.returncode == 0 and float(result.stdout.strip() or 0) > 0
+    except (subprocess.TimeoutExpired, ValueError):
+        return False
+
+
+def slides_digest(slide_files: List[Path]) -> str:
+    """スライド一式（名前と中身）のダイジェスト"""
+    h = hashlib.sha256()
+    for path in slide_files:
+        h.update(path.name.encode() + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_source(out_dir: Path) -> Optional[str]:
+    try:
+        with open(out_dir / SOURCE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("slides_digest")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_source(out_dir: Path, digest: str):
+    with open(out_dir / SOURCE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"slides_digest": digest,
+                   "rendered_at": datetime.now().isoformat(timespec="seconds")}, f, indent=2)
+
+
+def _render_video(name: str, render, dest: Path) -> bool:
+    """検証済みの既存ファイルがあれば使い回し、無ければ一時名で作って差し替える"""
+    if verify_mp4(dest):
+        return True
+    tmp = dest.with_name(f"{dest.stem}.partial{dest.suffix}")
+    tmp.unlink(missing_ok=True)
+    print(f"   [{name}] {_rel(dest)}")
+    if not render(tmp) or not verify_mp4(tmp):
+        tmp.unlink(missing_ok=True)
+        return False
+    tmp.replace(dest)
+    return True
+
+
+def render_post(post: Dict, force: bool = False) -> Dict:
+    """1投稿分の全レンディションを書き出して検証する。ready_assets を返す（失敗は RuntimeError）"""
+    import sns_workflow
+    import tiktok_post
+
+    if not sns_workflow.ensure_slides_exist(post):
+        raise RuntimeError("slide_generation_failed")
+    slide_dir = sns_workflow.to_absolute(post.get("slide_dir"))
+    slide_files = sorted(slide_dir.glob("slide_*.png"))
+    if not slide_files or not all(verify_png(p) for p in slide_files):
+        raise RuntimeError("slide_verification_failed")
+
+    out_dir = RENDER_DIR / post["content_id"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # 既存の動画は同じスライドから作ったものだけ使い回す（再生成後の古い動画を拾わない）
+    digest = slides_digest(slide_files)
+    if force or _read_source(out_dir) != digest:
+        (out_dir / SOURCE_FILE).unlink(missing_ok=True)
+        for name in VIDEO_RENDITIONS:
+            (out_dir / f"{name}.mp4").unlink(missing_ok=True)
+    json_path = post.get("json_path")
+    json_path = str(PROJECT_DIR / json_path) if json_path else None
+    renders = {
+        "animated": lambda out: tiktok_post.create_video_animated(slide_dir, out, json_path=json_path),
+        "slideshow": lambda out: tiktok_post.create_video_slideshow(slide_dir, out),
+    }
+    videos = {}
+    for name in VIDEO_RENDITIONS:
+        dest = out_dir / f"{name}.mp4"
+        if not _render_video(name, renders[name], dest):
+            raise RuntimeError(f"{name}_render_failed")
+        videos[name] = dest
+    _write_source(out_dir, digest)
+
+    files = slide_files + list(videos.values())
+    assets = {
+        "slides": [_rel(p) for p in slide_files],
+        "sizes": {_rel(p): p.stat().st_size for p in files},
+        "slides_digest": digest,
+        "verified_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    assets.update({name: _rel(path) for name, path in videos.items()})
+    return assets
+
+
+def _apply(results: Dict[int, Dict]):
+    """結果をキューに書き戻す（sns_workflow と同じロック。書き出し中はロックを持たない）"""
+    import sns_workflow
+
+    qm = sns_workflow.QueueManager()
+    if not qm.load():
+        return False
+    for post_id, result in results.items():
+        post = qm.get_post_by_id(post_id)
+        if post is None or post.get("content_id") != result["content_id"]:
+            continue
+        if result.get("assets"):
+            post["ready_assets"] = result["assets"]
+            post.pop("prerender_error", None)
+        else:
+            post.pop("ready_assets", None)
+            post["prerender_error"] = result["error"]
+    return qm.save()
+
+
+def prerender(days: int = HORIZON_DAYS, workers: int = WORKERS, force: bool = False) -> Dict:
+    """先 days 日分を並列に書き出し、検証できたものに ready_assets を付ける"""
+    queue = runtime_config.read_json(QUEUE_FILE, {})
+    targets = [p for p in due_posts(queue, days) if force or slides(p) is None
+               or any(asset(p, name) is None for name in VIDEO_RENDITIONS)]
+    print(f"[PRERENDER] 先{days}日: 対象{len(targets)}件")
+    if not targets:
+        return {}
+
+    results = {}
+    lock = threading.Lock()
+
+    def run(post):
+        print(f"  #{post['id']} {post['content_id']}")
+        try:
+            result = {"content_id": post["content_id"], "assets": render_post(post, force)}
+        except Exception as e:
+            result = {"content_id": post["content_id"], "error": str(e)}
+        with lock:
+            results[post["id"]] = result
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="prerender") as pool:
+        list(pool.map(run, targets))
+
+    _apply(results)
+    ok = sum(1 for r in results.values() if r.get("assets"))
+    print(f"[PRERENDER] 完了 {ok}/{len(results)}件")
+    for post_id, result in sorted(results.items()):
+        if result.get("error"):
+            print(f"  ❌ #{post_id} {result['content_id']}: {result['error']}")
+    return results
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def show_status(days: int):
+    queue = runtime_config.read_json(QUEUE_FILE, {})
+    for post in due_posts(queue, days):
+        ready = slides(post) is not None and all(asset(post, n) for n in VIDEO_RENDITIONS)
+        mark = "✅" if ready else "⏳"
+        note = post.get("prerender_error") or ""
+        when = post.get("scheduled_date") or post.get("scheduled_for") or "-"
+        print(f"  {mark} #{post['id']:3d} {post['content_id']:20s} {when:16s} {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="先行レンダリング")
+    parser.add_argument("--days", type=int, default=HORIZON_DAYS, help="何日先まで書き出すか")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--force", action="store_true", help="ready_assets があっても書き直す")
+    parser.add_argument("--status", action="store_true", help="対象投稿の状態を表示")
+    args = parser.parse_args()
+
+    if args.status:
+        show_status(args.days)
+        return
+    results = prerender(args.days, args.workers, args.force)
+    if any(r.get("error") for r in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
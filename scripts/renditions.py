@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+プラットフォーム別レンディション — ナースロビー
+
+マスター画像（1080x1920 のスライドPNG）から各プラットフォーム向けの派生画像を作る。
+  - 1枚のマスターは1回だけデコードし、そのバッファから全レンディションを切り出す
+    （4:5 はリサイズせず中央クロップ。同じアスペクトのクロップ・RGB変換は使い回す）
+  - 複数マスターはスレッドプールで並列に処理する（PIL のデコード/エンコードは GIL を離す）
+  - 出力はマスターの隣の .renditions/ にキャッシュする。
+    ファイル名にマスターの (サイズ, mtime) 由来のキーを含めるので、マスターが変われば自動的に作り直す
+
+背景そのものを別ジオメトリで作る場合は generate_carousel_backgrounds(platform=...) が
+その解像度でネイティブに描画する（リサイズしない）。
+
+使い方:
+  import renditions
+  renditions.render(master)                       # {"jpeg": Path, "feed_4x5": Path, ...}
+  renditions.render_many(slides, ["jpeg"])        # 並列
+  renditions.cached(master, "feed_4x5_jpeg")      # 作らずに引くだけ（無ければ None）
+
+  python3 renditions.py content/ready/20260301_A01     # ディレクトリ内のスライド全て
+  python3 renditions.py slide_1.png --names jpeg
+  python3 renditions.py content/ready --prune          # 古い・持ち主のいないキャッシュを消す
+"""
+
+import argparse
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import image_encode
+
+CACHE_DIRNAME = ".renditions"
+WORKERS = 4
+
+# 名前: アスペクト比（None はマスターのまま）/ 形式 / 保存オプション
+RENDITIONS = {
+    "jpeg": {"aspect": None, "format": "JPEG", "options": {"quality": 95}},
+    "feed_4x5": {"aspect": (4, 5), "format": "PNG", "options": {}},
+    "feed_4x5_jpeg": {"aspect": (4, 5), "format": "JPEG", "options": {"quality": 95}},
+}
+EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg"}
+
+
+# ===================================================================
+# キャッシュの場所
+# ===================================================================
+
+def _key(master: Path) -> Optional[str]:
+    """マスターの (サイズ, mtime) から作る短いキー。マスターが無ければ None"""
+    try:
+        st = master.stat()
+    except OSError:
+        return None
+    stamp = f"{st.st_size}:{st.st_mtime_ns}".encode()
+    return hashlib.blake2s(stamp, digest_size=5).hexdigest()
+
+
+def rendition_path(master, name: str, key: str = None) -> Optional[Path]:
+    master = Path(master)
+    key = key or _key(master)
+    if key is None:
+        return None
+    ext = EXTENSIONS[RENDITIONS[name]["format"]]
+    return master.parent / CACHE_DIRNAME / f"{master.stem}.{key}.{name}{ext}"
+
+
+def cached(master, name: str) -> Optional[Path]:
+    """キャッシュ済みのレンディション（マスターと一致するもの）。無ければ None"""
+    path = rendition_path(master, name)
+    return path if path is not None and path.exists() else None
+
+
+def _drop_stale(master: Path, name: str, keep: Path):
+    ext = EXTENSIONS[RENDITIONS[name]["format"]]
+    for old in keep.parent.glob(f"{master.stem}.*.{name}{ext}"):
+        if old != keep:
+            old.unlink(missing_ok=True)
+
+
+# ===================================================================
+# 派生
+# ===================================================================
+
+def crop_to_aspect(img, aspect):
+    """中央クロップで指定アスペクト比（幅, 高さ）にする（リサンプルなし）"""
+    if aspect is None:
+        return img
+    w, h = img.size
+    aw, ah = aspect
+    if w * ah > h * aw:
+        new_w = h * aw // ah
+        left = (w - new_w) // 2
+        return img.crop((left, 0, left + new_w, h))
+    new_h = w * ah // aw
+    top = (h - new_h) // 2
+    return img.crop((0, top, w, top + new_h))
+
+
+def _flatten(img):
+    """JPEG 用に RGB へ（透過は白背景に合成）"""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or "transparency" in img.info:
+        from PIL import Image
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def render(master, names: Iterable[str] = None) -> Dict[str, Path]:
+    """1マスター分のレンディションを揃える（キャッシュに無いものだけ、デコードは1回）"""
+    from PIL import Image
+
+    master = Path(master)
+    names = list(names or RENDITIONS)
+    key = _key(master)
+    if key is None:
+        raise FileNotFoundError(master)
+
+    paths = {name: rendition_path(master, name, key) for name in names}
+    missing = [name for name in names if not paths[name].exists()]
+    if not missing:
+        return paths
+
+    with Image.open(master) as f:
+        f.load()
+        base = f.copy()
+    crops, flattened = {}, {}
+    for name in missing:
+        spec = RENDITIONS[name]
+        aspect = spec["aspect"]
+        if aspect not in crops:
+            crops[aspect] = crop_to_aspect(base, aspect)
+        img = crops[aspect]
+        if spec["format"] == "JPEG":
+            if aspect not in flattened:
+                flattened[aspect] = _flatten(img)
+            img = flattened[aspect]
+        image_encode.save(img, paths[name], "rendition", spec["format"], **spec["options"])
+        _drop_stale(master, name, paths[name])
+    return paths
+
+
+def render_many(masters: Iterable, names: Iterable[str] = None,
+                workers: int = WORKERS) -> List[Dict[str, Path]]:
+    """複数マスターを並列に処理する（結果は masters と同じ順）"""
+    masters = [Path(m) for m in masters]
+    names = list(names or RENDITIONS)
+    if len(masters) <= 1 or workers <= 1:
+        return [render(m, names) for m in masters]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rendition") as pool:
+        return list(pool.map(lambda m: render(m, names), masters))
+
+
+def prune(root) -> int:
+    """root 以下の .renditions から、マスターが消えた・変わったものを消す。消した数を返す"""
+    removed = 0
+    for cache_dir in Path(root).rglob(CACHE_DIRNAME):
+        for path in cache_dir.iterdir():
+            stem, _, rest = path.name.partition(".")
+            key = rest.split(".", 1)[0]
+            masters = list(cache_dir.parent.glob(f"{stem}.*"))
+            if not any(m.is_file() and _key(m) == key for m in masters):
+                path.unlink(missing_ok=True)
+                removed += 1
+        if not any(cache_dir.iterdir()):
+            cache_dir.rmdir()
+    return removed
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def _masters(paths: Iterable[str]) -> List[Path]:
+    masters = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            masters.extend(sorted(p.glob("*slide_*.png")))
+        elif p.is_file():
+            masters.append(p)
+    return masters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="プラットフォーム別レンディション")
+    parser.add_argument("paths", nargs="+", help="マスターPNG またはスライドのディレクトリ")
+    parser.add_argument("--names", nargs="+", choices=sorted(RENDITIONS),
+                        help="作るレンディション（既定: 全て）")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--prune", action="store_true", help="古いキャッシュを消す")
+    args = parser.parse_args()
+
+    if args.prune:
+        removed = sum(prune(p) for p in args.paths)
+        print(f"削除: {removed}ファイル")
+        return
+
+    masters = _masters(args.paths)
+    results = render_many(masters, args.names, args.workers)
+    for master, paths in zip(masters, results):
+        print(f"  {master.name}: " + ", ".join(
+            f"{name}={os.path.getsize(p) / 1024:.0f}KB" for name, p in paths.items()))
+    image_encode.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+実行時設定・データファイルの共有レジストリ — ナースロビー
+
+.env と data/ 配下の設定JSONを、プロセスごとに1回だけ読んでキャッシュする。
+ファイルの (mtime, size, inode) が変わった時だけ読み直すので、
+slack_commander のような常駐プロセスも再起動なしで編集を拾える。
+stat も REVALIDATE_INTERVAL 秒に1回までに抑える。
+
+  runtime_config.load_env()          # .env → os.environ（既存の環境変数は上書きしない）
+  runtime_config.env("SLACK_BOT_TOKEN")
+  runtime_config.hashtag_rotation()  # data/hashtag_rotation.json
+  runtime_config.posting_schedule()  # data/posting_schedule.json
+  runtime_config.agent_state()       # data/agent_state.json
+  runtime_config.read_json(path, default)  # 任意のJSON
+
+返すオブジェクトはキャッシュそのもの（読み取り専用）。
+書き換えて保存する場合はファイルを直接読み直すか、copy.deepcopy してから save_json() で書き戻す。
+
+使い方:
+  python3 runtime_config.py          # 登録済みファイルの読み込み状況を表示
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+ENV_FILE = PROJECT_DIR / ".env"
+DATA_DIR = PROJECT_DIR / "data"
+HASHTAG_ROTATION_FILE = DATA_DIR / "hashtag_rotation.json"
+POSTING_SCHEDULE_FILE = DATA_DIR / "posting_schedule.json"
+AGENT_STATE_FILE = DATA_DIR / "agent_state.json"
+
+# 同じファイルの stat はこの秒数に1回まで
+REVALIDATE_INTERVAL = 1.0
+
+
+# ===================================================================
+# キャッシュ本体
+# ===================================================================
+
+def _stamp(path: Path):
+    """ファイルの同一性スタンプ。存在しなければ None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class CachedFile:
+    """1ファイル分のキャッシュ。スタンプが変わった時だけ parser を通す"""
+
+    def __init__(self, path: Path, parser: Callable[[str], Any], default: Any = None):
+        self.path = Path(path)
+        self.parser = parser
+        self.default = default
+        self.value = default
+        self.stamp = None
+        self.loads = 0
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        with self._lock:
+            now = time.monotonic()
+            if self._checked is not None and now - self._checked < REVALIDATE_INTERVAL:
+                return self.value
+            self._checked = now
+            stamp = _stamp(self.path)
+            if stamp == self.stamp:
+                return self.value
+            self.stamp = stamp
+            if stamp is None:
+                self.value = self.default
+                return self.value
+            try:
+                self.value = self.parser(self.path.read_text(encoding="utf-8"))
+                self.loads += 1
+            except Exception as e:
+                print(f"[WARN] {self.path.name} 読み込み失敗: {e}")
+                self.value = self.default
+            return self.value
+
+    def prime(self, value: Any):
+        """書き込み直後の値をそのままキャッシュに載せる"""
+        with self._lock:
+            self.value = value
+            self.stamp = _stamp(self.path)
+            self._checked = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self.stamp = None
+            self._checked = None
+
+
+_files: Dict[tuple, CachedFile] = {}
+_files_lock = threading.Lock()
+
+
+def cached(path, parser: Callable[[str], Any], default: Any = None) -> CachedFile:
+    """(path, parser) ごとの CachedFile を返す（なければ登録）"""
+    key = (str(Path(path).resolve()), parser)
+    with _files_lock:
+        entry = _files.get(key)
+        if entry is None:
+            entry = _files[key] = CachedFile(path, parser, default)
+        return entry
+
+
+def read_json(path, default: Any = None) -> Any:
+    """JSONファイルを読む（キャッシュ・mtime検証つき）"""
+    return cached(path, json.loads, default).get()
+
+
+def read_text(path, default: str = "") -> str:
+    """テキストファイルを読む（キャッシュ・mtime検証つき）"""
+    return cached(path, str, default).get()
+
+
+def save_json(path, data: Any, indent: int = 2):
+    """JSONを原子的に書き込み、キャッシュも更新する"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    cached(path, json.loads).prime(data)
+
+
+def invalidate_all():
+    """全キャッシュを捨てる（次回アクセスで必ず stat する）"""
+    with _files_lock:
+        entries = list(_files.values())
+    for entry in entries:
+        entry.invalidate()
+
+
+# ===================================================================
+# .env
+# ===================================================================
+
+def parse_env(text: str) -> Dict[str, str]:
+    """.env をパース（KEY=VALUE, export 接頭辞, クォート, 行末コメント対応）"""
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, _, value = line.partition("=")
+        key, value = key.strip(), value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
+            value = value[1:-1]
+        elif " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        values[key] = value
+    return values
+
+
+# .env から os.environ に入れた値（外部で設定された環境変数とは区別する）
+_env_applied: Dict[str, str] = {}
+_env_source = None
+_env_lock = threading.Lock()
+
+
+def load_env(path=ENV_FILE) -> Dict[str, str]:
+    """.env を os.environ に反映する。既存の環境変数は上書きしない
+
+    .env が編集されていれば、このモジュールが入れた値だけを更新・削除する。
+    """
+    global _env_source
+    values = cached(path, parse_env, {}).get()
+    with _env_lock:
+        if values is _env_source:
+            return values
+        for key in list(_env_applied):
+            if key not in values and os.environ.get(key) == _env_applied[key]:
+                del os.environ[key]
+                del _env_applied[key]
+        for key, value in values.items():
+            current = os.environ.get(key)
+            if current is None or (key in _env_applied and current == _env_applied[key]):
+                os.environ[key] = value
+                _env_applied[key] = value
+        _env_source = values
+    return values
+
+
+def env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """.env を反映したうえで環境変数を取得"""
+    load_env()
+    return os.environ.get(key, default)
+
+
+# ===================================================================
+# データファイル（型つきアクセサ）
+# ===================================================================
+
+def hashtag_rotation() -> Dict:
+    """data/hashtag_rotation.json（combos, banned_tags 等）。無ければ {}"""
+    return read_json(HASHTAG_ROTATION_FILE, {})
+
+
+def posting_schedule() -> Dict:
+    """data/posting_schedule.json（schedule: {曜日: "HH:MM"} 等）。無ければ {}"""
+    return read_json(POSTING_SCHEDULE_FILE, {})
+
+
+def agent_state() -> Dict:
+    """data/agent_state.json（status, lastRun, pendingTasks, agentMemory 等）。無ければ {}"""
+    return read_json(AGENT_STATE_FILE, {})
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    load_env()
+    for accessor in (hashtag_rotation, posting_schedule, agent_state):
+        accessor()
+    with _files_lock:
+        entries = list(_files.values())
+    for entry in entries:
+        state = "missing" if entry.stamp is None else f"loaded x{entry.loads}"
+        try:
+            rel = entry.path.resolve().relative_to(PROJECT_DIR)
+        except ValueError:
+            rel = entry.path
+        print(f"  {str(rel):40s} {state}")
+    print(f"  .env keys: {len(_env_applied)} applied")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+site_build.py - 静的ページ（lp/・blog/・トップレベル）の一括ビルド
+
+fix_meta_tags / add_og_image / add_citations / add_crosslinks /
+add_topic_cluster_links / update_area_pages がそれぞれ全HTMLを読み直して
+書き戻していた処理を、1ページ1回の読み込み → 登録済み変換の連鎖 → 最大1回の書き込み
+にまとめる。
+
+- 変換は各スクリプトで @transform(...) により登録する（順序は TRANSFORM_MODULES 順）
+- 読み取り専用のチェック（SEO状況など）は @check(...) で登録し、結果をキャッシュする
+- data/.cache/site_build.json に「最後に処理した内容のハッシュ」と変換ごとの署名を保存し、
+  ページも変換（コード・入力データ）も変わっていなければ読み込み以外の処理を省略する
+- 処理が必要なページが多ければプロセスプールで並列に処理する
+
+Usage:
+    python3 scripts/site_build.py                       # 全変換を実行
+    python3 scripts/site_build.py --only meta_tags og_image
+    python3 scripts/site_build.py --dry-run             # 書き込まずに変更予定を表示
+    python3 scripts/site_build.py --force --jobs 1      # キャッシュを無視・直列実行
+    python3 scripts/site_build.py --graph-fallback      # 未登録の記事にも類似度で内部リンクを足す
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_DIR / "data" / ".cache"
+MANIFEST = CACHE_DIR / "site_build.json"
+
+MANIFEST_VERSION = 1
+
+# 変換を登録しているモジュール（この順に適用される）
+TRANSFORM_MODULES = [
+    "update_area_pages",        # area_table: エリアページの施設テーブル
+    "add_topic_cluster_links",  # topic_cluster: ガイドの関連記事セクション
+    "add_citations",            # citations: 出典ブロック（related-guides の直前）
+    "add_crosslinks",           # crosslinks: ブログ→ガイド（出典ブロックの直後）
+    "add_og_image",             # og_image: og:image + width/height
+    "fix_meta_tags",            # meta_tags: robots / og / twitter の統一
+]
+
+# ビルド対象のページ（PROJECT_DIR 相対の glob）
+SITE_GLOBS = [
+    "*.html",
+    "lp/**/*.html",
+    "blog/*.html",
+]
+
+PARALLEL_MIN_PAGES = 16
+
+Transform = namedtuple("Transform", ["name", "func", "applies", "key", "module"])
+
+TRANSFORMS = {}  # name -> Transform（変換）
+CHECKS = {}      # name -> Transform（読み取り専用）
+
+
+# =============================================================================
+# 登録
+# =============================================================================
+
+def match_paths(*patterns, exclude=()):
+    """PROJECT_DIR 相対パスの glob で対象ページを判定する関数を作る"""
+    def applies(rel):
+        name = rel.rsplit("/", 1)[-1]
+        if name in exclude:
+            return False
+        return any(fnmatch.fnmatchcase(rel, p) for p in patterns)
+    return applies
+
+
+def transform(name, applies, key=None):
+    """ページ変換を登録する。func(page) は変更内容のメッセージ（list/None）を返す
+
+    applies(rel) → 対象ページか。key() → 入力データの識別子（変われば再実行）。
+    """
+    def register(func):
+        TRANSFORMS[name] = Transform(name, func, applies, key, func.__module__)
+        return func
+    return register
+
+
+def check(name, applies, key=None):
+    """読み取り専用チェックを登録する。func(page) は JSON 化できる結果を返す"""
+    def register(func):
+        CHECKS[name] = Transform(name, func, applies, key, func.__module__)
+        return func
+    return register
+
+
+def load_transforms():
+    for module in TRANSFORM_MODULES:
+        importlib.import_module(module)
+    return TRANSFORMS
+
+
+# =============================================================================
+# ページ
+# =============================================================================
+
+_pattern_cache = {}
+
+
+def compiled(pattern, flags=0):
+    """正規表現のコンパイル結果をモジュール単位でキャッシュ"""
+    key = (pattern, flags)
+    rx = _pattern_cache.get(key)
+    if rx is None:
+        rx = _pattern_cache[key] = re.compile(pattern, flags)
+    return rx
+
+
+class Page:
+    """1ページ分の共有表現。変換は page.text を書き換える"""
+
+    def __init__(self, path, text):
+        self.path = Path(path)
+        self.rel = self.path.relative_to(PROJECT_DIR).as_posix()
+        self.name = self.path.name
+        self.original = text
+        self.text = text
+
+    @property
+    def changed(self):
+        return self.text != self.original
+
+    def search(self, pattern, flags=0, pos=0):
+        return compiled(pattern, flags).search(self.text, pos)
+
+    def finditer(self, pattern, flags=0):
+        return compiled(pattern, flags).finditer(self.text)
+
+    def insert(self, pos, s):
+        self.text = self.text[:pos] + s + self.text[pos:]
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def discover(globs=SITE_GLOBS):
+    """ビルド対象ページ（重複なし・ソート済み）"""
+    paths = set()
+    for pattern in globs:
+        paths.update(p for p in PROJECT_DIR.glob(pattern) if p.is_file())
+    return sorted(paths)
+
+
+# =============================================================================
+# 署名（変換コード・入力データが変わったら再実行）
+# =============================================================================
+
+_source_digest = {}
+
+
+def _module_digest(module):
+    if module not in _source_digest:
+        mod = sys.modules.get(module)
+        path = getattr(mod, "__file__", None)
+        data = Path(path).read_bytes() if path else b""
+        _source_digest[module] = hashlib.sha1(data).hexdigest()[:12]
+    return _source_digest[module]
+
+
+def signatures(items):
+    """{name: 署名}（変換モジュールのソース + key() の値）"""
+    sigs = {}
+    for t in items:
+        extra = t.key() if t.key else ""
+        sigs[t.name] = hashlib.sha1(f"{_module_digest(t.module)}|{extra}".encode("utf-8")).hexdigest()[:16]
+    return sigs
+
+
+def load_manifest():
+    if MANIFEST.exists():
+        try:
+            data = json.loads(MANIFEST.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {"version": MANIFEST_VERSION, "pages": {}}
+
+
+def save_manifest(manifest):
+    _atomic_write(MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+# =============================================================================
+# 組み込みチェック
+# =============================================================================
+
+@check("seo", match_paths("lp/*.html", "lp/**/*.html"))
+def seo_status(page):
+    """title / meta description / h1 / 構造化データ / GA4 の有無（slack_report 用）"""
+    return {
+        "title": bool(page.search(r"<title>.+?</title>", re.IGNORECASE)),
+        "meta_desc": bool(page.search(r'<meta\s+name=["\']description["\']', re.IGNORECASE)),
+        "h1": bool(page.search(r"<h1[^>]*>.+?</h1>", re.IGNORECASE)),
+        "schema": bool(page.search(r"application/ld\+json", re.IGNORECASE)),
+        "ga4": bool(page.search(r"gtag|G-[A-Z0-9]+|googletagmanager", re.IGNORECASE)),
+    }
+
+
+# =============================================================================
+# 実行
+# =============================================================================
+
+def process_page(path, text, transforms, checks, dry_run=False):
+    """1ページに変換とチェックを順に適用して、内容が変わっていれば1回だけ書く"""
+    page = Page(path, text)
+    changes = {}
+    for name in transforms:
+        msgs = TRANSFORMS[name].func(page)
+        if msgs:
+            changes[name] = list(msgs)
+    results = {name: CHECKS[name].func(page) for name in checks}
+
+    if page.changed and not dry_run:
+        _atomic_write(page.path, page.text.encode("utf-8"))
+    return {
+        "rel": page.rel,
+        "changes": changes,
+        "checks": results,
+        "changed": page.changed,
+        "written": page.changed and not dry_run,
+        "hash": content_hash(page.text),
+    }
+
+
+def _worker_init():
+    load_transforms()
+
+
+def _process_job(args):
+    return process_page(*args)
+
+
+def build(names=None, paths=None, jobs=None, dry_run=False, force=False, verbose=True):
+    """ページをビルドして、ページごとの結果のリストを返す
+
+    names: 実行する変換/チェック名（None なら全変換）
+    paths: 対象ページ（None なら SITE_GLOBS）
+    """
+    load_transforms()
+    log = print if verbose else (lambda *a, **k: None)
+    t0 = time.perf_counter()
+
+    if names is None:
+        names = list(TRANSFORMS)
+    unknown = [n for n in names if n not in TRANSFORMS and n not in CHECKS]
+    if unknown:
+        raise ValueError(f"unknown transform/check: {', '.join(unknown)}")
+    # 変換は登録順（= TRANSFORM_MODULES 順）、チェックはその後
+    selected = [t for n, t in TRANSFORMS.items() if n in names] + \
+               [t for n, t in CHECKS.items() if n in names]
+    sigs = signatures(selected)
+
+    manifest = load_manifest()
+    pages = manifest["pages"]
+    paths = discover() if paths is None else sorted(Path(p).resolve() for p in paths)
+
+    results = []
+    todo = []  # (page text, 実行する変換, 実行するチェック, 対象の全項目)
+    for path in paths:
+        rel = path.relative_to(PROJECT_DIR).as_posix()
+        wanted = [t for t in selected if t.applies(rel)]
+        if not wanted:
+            continue
+        text = path.read_text(encoding="utf-8")
+        entry = pages.get(rel, {})
+        done = entry.get("done", {}) if entry.get("hash") == content_hash(text) else {}
+        pending = [t.name for t in wanted if force or done.get(t.name) != sigs[t.name]]
+        if not pending:
+            cached = entry.get("checks", {})
+            results.append({"rel": rel, "changes": {}, "written": False, "skipped": True,
+                            "checks": {t.name: cached.get(t.name) for t in wanted if t.name in CHECKS}})
+            continue
+        todo.append((path, text,
+                     [n for n in pending if n in TRANSFORMS],
+                     [n for n in pending if n in CHECKS],
+                     [t.name for t in wanted]))
+
+    workers = jobs or min(os.cpu_count() or 1, 8)
+    job_args = [(path, text, tr, ch, dry_run) for path, text, tr, ch, _ in todo]
+    if workers > 1 and len(todo) >= PARALLEL_MIN_PAGES:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            processed = list(pool.map(_process_job, job_args, chunksize=4))
+    else:
+        processed = [_process_job(a) for a in job_args]
+
+    for (path, text, tr, ch, wanted), res in zip(todo, processed):
+        entry = pages.get(res["rel"], {})
+        if res["changed"] or entry.get("hash") != content_hash(text):
+            # 内容が変わったら今回実行しなかった変換・チェックはやり直し
+            done, checks = {}, {}
+        else:
+            done, checks = dict(entry.get("done", {})), dict(entry.get("checks", {}))
+        done.update({n: sigs[n] for n in tr + ch})
+        checks.update(res["checks"])
+        res["checks"] = {n: checks.get(n) for n in wanted if n in CHECKS}
+        res["skipped"] = False
+        results.append(res)
+        if not dry_run:
+            pages[res["rel"]] = {"hash": res["hash"], "done": done, "checks": checks}
+
+    if not dry_run:
+        save_manifest(manifest)
+
+    results.sort(key=lambda r: r["rel"])
+    n_written = sum(1 for r in results if r["written"])
+    n_skipped = sum(1 for r in results if r.get("skipped"))
+    log(f"  {len(results)} pages: {len(todo)} processed, {n_skipped} unchanged (skipped), "
+        f"{n_written} written ({(time.perf_counter() - t0) * 1000:.0f}ms)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="静的ページの一括ビルド")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="実行する変換/チェック名")
+    parser.add_argument("--list", action="store_true", help="登録済みの変換/チェックを表示")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに変更予定を表示")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視して全ページ処理")
+    parser.add_argument("--jobs", type=int, default=None, help="並列数（1で直列）")
+    parser.add_argument("--graph-fallback", action="store_true",
+                        help="blog_to_guide / CLUSTERS に無い記事にも類似度で内部リンクを足す")
+    args = parser.parse_args()
+
+    if args.graph_fallback:
+        import link_graph
+        link_graph.enable_fallback()
+    load_transforms()
+    if args.list:
+        for kind, table in (("transform", TRANSFORMS), ("check", CHECKS)):
+            for name, t in table.items():
+                print(f"  {kind:9s} {name:15s} ({t.module})")
+        return
+
+    try:
+        results = build(names=args.only, jobs=args.jobs, dry_run=args.dry_run, force=args.force)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    for r in results:
+        if not r["changes"]:
+            continue
+        mark = "~" if args.dry_run else "+"
+        print(f"  {mark} {r['rel']}")
+        for name, msgs in r["changes"].items():
+            for msg in msgs:
+                print(f"      [{name}] {msg}")
+
+
+if __name__ == "__main__":
+    # 変換モジュールは `from site_build import transform` で登録するので、
+    # __main__ ではなく site_build モジュールとして実行する（プロセスプールの子も同様）
+    import site_build
+    site_build.main()
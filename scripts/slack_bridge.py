@@ -21,12 +21,12 @@ import time
 from datetime import datetime
 from pathlib import Path
 
-from dotenv import load_dotenv
-import requests
+import slack_client
+from runtime_config import load_env
 
 # プロジェクトルート
 PROJECT_ROOT = Path(__file__).parent.parent
-load_dotenv(PROJECT_ROOT / ".env")
+load_env()
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID", "C09A7U4TV4G")
@@ -38,72 +38,30 @@ if not SLACK_BOT_TOKEN:
     sys.exit(1)
 
 
-def _headers():
-    return {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-
-
 def _post_message(text: str, blocks: list = None) -> bool:
     """Slackにメッセージ送信"""
-    payload = {"channel": SLACK_CHANNEL_ID, "text": text}
-    if blocks:
-        payload["blocks"] = blocks
-    try:
-        resp = requests.post(
-            "https://slack.com/api/chat.postMessage",
-            headers=_headers(),
-            json=payload,
-            timeout=15,
-        )
-        data = resp.json()
-        if not data.get("ok"):
-            print(f"Slack送信エラー: {data.get('error')}", file=sys.stderr)
-            return False
-        return True
-    except Exception as e:
-        print(f"Slack接続エラー: {e}", file=sys.stderr)
+    data = slack_client.post_message(SLACK_CHANNEL_ID, text=text, blocks=blocks)
+    if not data.get("ok"):
+        print(f"Slack送信エラー: {data.get('error')}", file=sys.stderr)
         return False
+    return True
 
 
 def _get_messages(oldest: str = None, limit: int = 20) -> list:
     """チャンネルのメッセージ取得"""
-    params = {"channel": SLACK_CHANNEL_ID, "limit": limit}
-    if oldest:
-        params["oldest"] = oldest
-    try:
-        resp = requests.get(
-            "https://slack.com/api/conversations.history",
-            headers=_headers(),
-            params=params,
-            timeout=10,
-        )
-        data = resp.json()
-        if data.get("ok"):
-            return data.get("messages", [])
-        print(f"メッセージ取得エラー: {data.get('error')}", file=sys.stderr)
-        return []
-    except Exception as e:
-        print(f"接続エラー: {e}", file=sys.stderr)
-        return []
+    data = slack_client.get_client().history(SLACK_CHANNEL_ID, oldest=oldest, limit=limit)
+    if data.get("ok"):
+        return data.get("messages", [])
+    print(f"メッセージ取得エラー: {data.get('error')}", file=sys.stderr)
+    return []
 
 
 def _get_user_name(user_id: str) -> str:
     """ユーザーIDから表示名を取得"""
-    try:
-        resp = requests.get(
-            "https://slack.com/api/users.info",
-            headers=_headers(),
-            params={"user": user_id},
-            timeout=10,
-        )
-        data = resp.json()
-        if data.get("ok"):
-            user = data["user"]
-            return user.get("real_name") or user.get("name") or user_id
-    except Exception:
-        pass
+    data = slack_client.get_client().user_info(user_id)
+    if data.get("ok"):
+        user = data["user"]
+        return user.get("real_name") or user.get("name") or user_id
     return user_id
 
 
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Slack Web API 共通クライアント — ナースロビー
+
+全スクリプトのSlack送受信をここに集約する。
+  - requests.Session によるkeep-alive接続プール（プロセス内で共有）
+  - メソッドごとのTierに沿ったレート制限（chat.postMessage はチャンネル毎 1件/秒）
+  - 429 の Retry-After を守って再試行、通信エラーは指数バックオフで再試行
+  - notify(): 通知をまとめて1メッセージにする coalesce モード
+    （短時間に連続した通知は SLACK_COALESCE_SECONDS 待ってから1通で送る。
+      プロセス終了時には必ず flush する）
+
+トークン・チャンネルは呼び出し時に runtime_config.env() で読む（.env の編集も反映される）。
+SLACK_API_URL でAPIの向き先を差し替えられる（ローカル検証は fake_slack.py）。
+
+使い方:
+  import slack_client
+  slack_client.post_message(channel, text="...")           # → レスポンスdict
+  slack_client.notify("パイプライン完了")                    # まとめて送信
+  with slack_client.coalesced():                            # ブロック内の通知を1通に
+      ...
+  python3 slack_client.py --message "テスト" [--coalesce]   # 動作確認
+"""
+
+import argparse
+import atexit
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import runtime_config
+
+DEFAULT_CHANNEL_ID = "C09A7U4TV4G"
+DEFAULT_API_URL = "https://slack.com/api"
+
+# Web API のレート制限Tier（1分あたりの呼び出し数）
+# https://api.slack.com/docs/rate-limits
+TIER_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "conversations.history": 3,
+    "users.info": 4,
+    "auth.test": 4,
+    "apps.connections.open": 1,
+}
+DEFAULT_TIER = 3
+# chat.postMessage は Tier ではなく「チャンネル毎 1件/秒」の特別枠
+POST_MESSAGE_INTERVAL = 1.0
+
+MAX_RETRIES = 3
+POOL_SIZE = 8
+
+# notify() のまとめ送信
+COALESCE_SECONDS = float(os.getenv("SLACK_COALESCE_SECONDS", "2"))
+COALESCE_SEPARATOR = "\n\n"
+# 1メッセージあたりの文字数上限（Slackは40000だが読みやすさ優先）
+MAX_TEXT_LEN = 3900
+
+
+# ===================================================================
+# レート制限
+# ===================================================================
+
+class RateLimiter:
+    """キー（メソッド / メソッド+チャンネル）ごとの最小間隔を守らせる
+
+    429 で Retry-After を受けたキーは、その時刻まで全呼び出しを止める。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, key, interval: float):
+        """次に呼べる時刻まで待ち、次回の枠を予約する"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(key, 0.0))
+            self._next[key] = start + interval
+        if start > now:
+            time.sleep(start - now)
+
+    def backoff(self, key, seconds: float):
+        with self._lock:
+            self._next[key] = max(self._next.get(key, 0.0), time.monotonic() + seconds)
+
+
+def _interval(method: str) -> float:
+    if method == "chat.postMessage":
+        return POST_MESSAGE_INTERVAL
+    return 60.0 / TIER_PER_MINUTE[METHOD_TIERS.get(method, DEFAULT_TIER)]
+
+
+def _limit_key(method: str, params: dict):
+    if method == "chat.postMessage":
+        return method, params.get("channel")
+    return method
+
+
+# ===================================================================
+# クライアント
+# ===================================================================
+
+class SlackClient:
+    """プロセス内で共有する Slack Web API クライアント"""
+
+    def __init__(self, token: str = None, api_url: str = None):
+        self._token = token
+        self.api_url = (api_url or os.getenv("SLACK_API_URL", DEFAULT_API_URL)).rstrip("/")
+        self.limiter = RateLimiter()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def token(self) -> str:
+        return self._token or runtime_config.env("SLACK_BOT_TOKEN", "")
+
+    @property
+    def session(self):
+        # requests は初回呼び出し時に読み込む（import だけのスクリプトを重くしない）
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def call(self, method: str, params: dict = None, http_method: str = "POST",
+             token: str = None, timeout: float = 15) -> dict:
+        """Web API を呼ぶ。失敗時も例外は投げず {"ok": False, "error": ...} を返す"""
+        params = params or {}
+        token = token or self.token
+        if not token:
+            return {"ok": False, "error": "not_authed"}
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"{self.api_url}/{method}"
+        key = _limit_key(method, params)
+        interval = _interval(method)
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait(key, interval)
+            try:
+                if http_method == "GET":
+                    resp = self.session.get(url, headers=headers, params=params, timeout=timeout)
+                else:
+                    resp = self.session.post(url, headers=headers, json=params, timeout=timeout)
+            except Exception as e:
+                if attempt == MAX_RETRIES:
+                    return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                time.sleep(2 ** attempt)
+                continue
+
+            if resp.status_code == 429:
+                retry_after = float(resp.headers.get("Retry-After", 1))
+                self.limiter.backoff(key, retry_after)
+                if attempt == MAX_RETRIES:
+                    return {"ok": False, "error": "ratelimited"}
+                continue
+            if resp.status_code >= 500 and attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt)
+                continue
+            try:
+                return resp.json()
+            except ValueError:
+                return {"ok": False, "error": f"HTTP {resp.status_code}"}
+        return {"ok": False, "error": "unknown"}
+
+    # --- よく使うメソッド ---
+
+    def post_message(self, channel: str = None, text: str = "", blocks: list = None,
+                     thread_ts: str = None) -> dict:
+        payload = {"channel": channel or default_channel(), "text": text}
+        if blocks:
+            payload["blocks"] = blocks
+        if thread_ts:
+            payload["thread_ts"] = thread_ts
+        return self.call("chat.postMessage", payload)
+
+    def history(self, channel: str = None, oldest: str = None, limit: int = 10) -> dict:
+        params = {"channel": channel or default_channel(), "limit": limit}
+        if oldest:
+            params["oldest"] = oldest
+        return self.call("conversations.history", params, http_method="GET", timeout=10)
+
+    def user_info(self, user_id: str) -> dict:
+        return self.call("users.info", {"user": user_id}, http_method="GET", timeout=10)
+
+
+def default_channel() -> str:
+    return runtime_config.env("SLACK_CHANNEL_ID", DEFAULT_CHANNEL_ID)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SlackClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SlackClient()
+        return _client
+
+
+def post_message(channel: str = None, text: str = "", blocks: list = None,
+                 thread_ts: str = None) -> dict:
+    return get_client().post_message(channel, text=text, blocks=blocks, thread_ts=thread_ts)
+
+
+def call(method: str, params: dict = None, **kwargs) -> dict:
+    return get_client().call(method, params, **kwargs)
+
+
+# ===================================================================
+# まとめ送信（coalesce）
+# ===================================================================
+
+class Notifier:
+    """通知をバッファし、一定時間静かになったら1メッセージにまとめて送る"""
+
+    def __init__(self, window: float = COALESCE_SECONDS, channel: str = None):
+        self.window = window
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._timer = None
+        self._hold = 0
+
+    def add(self, message: str):
+        with self._lock:
+            self._buffer.append(message)
+            if self._hold:
+                return
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """バッファを送信。全て送れたら True"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            messages, self._buffer = self._buffer, []
+        ok = True
+        for text in _pack(messages):
+            result = post_message(self.channel, text=text)
+            if not result.get("ok"):
+                print(f"[WARN] Slack通知失敗: {result.get('error')}", file=sys.stderr)
+                ok = False
+        return ok
+
+    @contextmanager
+    def hold(self):
+        """ブロック内の通知はタイマーを止めて溜め、抜けた時に1回で送る"""
+        with self._lock:
+            self._hold += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._hold -= 1
+                release = self._hold == 0
+            if release:
+                self.flush()
+
+
+def _pack(messages: list) -> list:
+    """メッセージを MAX_TEXT_LEN 以内のチャンクに詰める（長すぎる単体は切り詰め）"""
+    chunks = []
+    current = ""
+    for msg in messages:
+        msg = msg[:MAX_TEXT_LEN]
+        if current and len(current) + len(COALESCE_SEPARATOR) + len(msg) > MAX_TEXT_LEN:
+            chunks.append(current)
+            current = ""
+        current = f"{current}{COALESCE_SEPARATOR}{msg}" if current else msg
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+_notifier = None
+
+
+def get_notifier() -> Notifier:
+    global _notifier
+    with _client_lock:
+        if _notifier is None:
+            _notifier = Notifier()
+            atexit.register(_notifier.flush)
+        return _notifier
+
+
+def notify(message: str, immediate: bool = False) -> bool:
+    """通知を送る。既定はまとめ送信（送信はタイマーかプロセス終了時）
+
+    immediate=True ならバッファ分も含めてその場で送り、結果を返す。
+    """
+    notifier = get_notifier()
+    notifier.add(message)
+    if immediate:
+        return notifier.flush()
+    return True
+
+
+def coalesced():
+    """with ブロック内の notify() を1通にまとめる"""
+    return get_notifier().hold()
+
+
+def flush() -> bool:
+    return get_notifier().flush()
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Slack Web API 共通クライアント（動作確認用）")
+    parser.add_argument("--message", required=True, help="送信するメッセージ")
+    parser.add_argument("--channel", default=None, help="チャンネルID")
+    parser.add_argument("--coalesce", action="store_true", help="notify() 経由でまとめ送信")
+    args = parser.parse_args()
+
+    if args.coalesce:
+        ok = notify(args.message, immediate=True)
+    else:
+        ok = post_message(args.channel, text=args.message).get("ok", False)
+    print("送信完了" if ok else "送信失敗")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
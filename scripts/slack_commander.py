@@ -15,6 +15,7 @@ Slackチャンネルからのメッセージを監視し、コマンド実行 &
   !generate → コンテンツ生成タスクを作成
   !queue    → 投稿キュー状態を表示
   !agents   → Agent Team状態一覧を表示
+  !jobs     → 実行中・直近のジョブ一覧を表示
   !tasks    → 指示キューの一覧を表示
   !clear    → 指示キューをクリア
   !help     → コマンド一覧を表示
@@ -26,33 +27,56 @@ Slackチャンネルからのメッセージを監視し、コマンド実行 &
   python3 slack_commander.py --poll                    # 常駐ポーリング
   python3 slack_commander.py --poll --interval 30      # 30秒間隔
   python3 slack_commander.py --once                    # 1回チェックして終了（cron用）
+  python3 slack_commander.py --events --port 3000      # Events API受信（イベント駆動）
+  python3 slack_commander.py --events --socket         # Socket Mode（要 websockets）
+
+イベント駆動モード:
+  Events API（HTTP）または Socket Mode でメッセージを即時受信し、asyncioで処理する。
+  遅いコマンド（!status, !push, !generate 等）はコマンドごとの同時実行数上限つきで
+  スレッドに逃がすため、他のコマンドの応答を止めない。
+  ローカル検証は fake_slack.py を使う（同ファイルの使い方参照）。
 """
 
 import argparse
+import asyncio
+import fcntl
+import hashlib
+import hmac
 import json
 import os
 import re
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime
+from functools import partial
 from pathlib import Path
 
-from dotenv import load_dotenv
 import requests
 
+import runtime_config
+import slack_client
+from runtime_config import load_env
+
 # プロジェクトルート
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Slack設定
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID", "C09A7U4TV4G")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN", "")
+SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET", "")
 
 # 指示キューファイル
 INSTRUCTIONS_FILE = project_root / "data" / "slack_instructions.json"
 LAST_TS_FILE = project_root / "data" / ".slack_last_ts"
+JOBS_FILE = project_root / "data" / "slack_jobs.json"
 
 if not SLACK_BOT_TOKEN:
     print("エラー: SLACK_BOT_TOKEN が.envに設定されていません")
@@ -65,84 +89,26 @@ if not SLACK_BOT_TOKEN:
 
 def post_message(channel: str, text: str = "", blocks: list = None) -> bool:
     """Slackにメッセージを送信"""
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {"channel": channel}
-    if blocks:
-        payload["blocks"] = blocks
-        payload["text"] = text or "ナースロビー"
-    else:
-        payload["text"] = text
-
-    try:
-        resp = requests.post(
-            "https://slack.com/api/chat.postMessage",
-            headers=headers,
-            json=payload,
-            timeout=15,
-        )
-        data = resp.json()
-        if data.get("ok"):
-            return True
-        else:
-            print(f"Slack APIエラー: {data.get('error')}")
-            return False
-    except Exception as e:
-        print(f"送信エラー: {e}")
-        return False
+    data = slack_client.post_message(channel, text=text or ("ナースロビー" if blocks else ""),
+                                     blocks=blocks)
+    if data.get("ok"):
+        return True
+    print(f"Slack APIエラー: {data.get('error')}")
+    return False
 
 
 def post_reply(channel: str, thread_ts: str, text: str) -> bool:
     """スレッドに返信"""
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "channel": channel,
-        "text": text,
-        "thread_ts": thread_ts,
-    }
-    try:
-        resp = requests.post(
-            "https://slack.com/api/chat.postMessage",
-            headers=headers,
-            json=payload,
-            timeout=15,
-        )
-        return resp.json().get("ok", False)
-    except Exception:
-        return False
+    return slack_client.post_message(channel, text=text, thread_ts=thread_ts).get("ok", False)
 
 
 def get_conversation_history(channel: str, oldest: str = None, limit: int = 10) -> list:
     """チャンネルの直近メッセージを取得"""
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    params = {"channel": channel, "limit": limit}
-    if oldest:
-        params["oldest"] = oldest
-
-    try:
-        resp = requests.get(
-            "https://slack.com/api/conversations.history",
-            headers=headers,
-            params=params,
-            timeout=10,
-        )
-        data = resp.json()
-        if data.get("ok"):
-            return data.get("messages", [])
-        else:
-            print(f"conversations.history エラー: {data.get('error')}")
-            return []
-    except Exception as e:
-        print(f"取得エラー: {e}")
-        return []
+    data = slack_client.get_client().history(channel, oldest=oldest, limit=limit)
+    if data.get("ok"):
+        return data.get("messages", [])
+    print(f"conversations.history エラー: {data.get('error')}")
+    return []
 
 
 # ===================================================================
@@ -200,6 +166,262 @@ def save_last_ts(ts: str):
     LAST_TS_FILE.write_text(ts)
 
 
+# ===================================================================
+# ジョブ実行（ワーカープール）
+# ===================================================================
+
+# コマンドごとの同時実行数上限。subprocess / git / 外部APIを叩く遅いコマンドを絞る。
+# ここに無いコマンドは DEFAULT_COMMAND_LIMIT。
+COMMAND_LIMITS = {
+    "!status": 1,
+    "!kpi": 1,
+    "!content": 1,
+    "!seo": 1,
+    "!team": 1,
+    "!push": 1,
+    "!deploy": 1,
+    "!generate": 1,
+    "!reply": 4,
+    "instruction": 1,  # 指示キューJSONへの書き込みは直列化
+}
+DEFAULT_COMMAND_LIMIT = 4
+# 全コマンド合計のワーカースレッド上限
+MAX_WORKERS = 8
+
+# ジョブとして投げっぱなしで実行するコマンド（受付を即返信し、結果はスレッドへ）
+JOB_COMMANDS = {"!status", "!kpi", "!content", "!seo", "!team", "!push", "!generate"}
+# 完了済みジョブを何件までテーブルに残すか
+JOB_HISTORY = 100
+# --once で投入したジョブの完了を待つ上限（秒）
+ONCE_WAIT_TIMEOUT = 30 * 60
+
+
+class JobRunner:
+    """遅いコマンドをワーカープールで実行するジョブランナー
+
+    ジョブは ID つきで JOBS_FILE に永続化する。再起動時、待機中のジョブは
+    そのまま再投入し、実行中だったジョブは二重実行を避けて interrupted にする。
+    各ジョブは投入したプロセスの pid を持ち、生きている別プロセスのジョブには触らない。
+    保存はジョブファイル隣のロック（data/.slack_jobs.lock）を取ってファイルを読み直し、ID ごとにマージしてから書く
+    （自プロセスのジョブはメモリ、他プロセスのジョブはファイルが正）。ID の採番も同じロック内で行う。
+    同時実行数の判定と wait() は自プロセスのジョブだけを見る（他プロセスの分は更新されないため）。
+    コマンドごとの同時実行数は COMMAND_LIMITS、全体は MAX_WORKERS で抑える。
+    """
+
+    def __init__(self, path: Path = JOBS_FILE, workers: int = MAX_WORKERS):
+        self.path = path
+        self.lock_path = path.with_name(f".{path.stem}.lock")
+        self.workers = workers
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._idle = threading.Condition(self._lock)
+        self.pid = os.getpid()
+        self.next_id = 1
+        self.jobs = OrderedDict()
+        self._load()
+
+    # --- 永続化 ---
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        self.next_id = data.get("next_id", 1)
+        for job in data.get("jobs", []):
+            self.jobs[job["id"]] = job
+
+    @contextmanager
+    def _file_lock(self):
+        """プロセス間ロック（読み直し → マージ → 書き込みの間だけ持つ）"""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _merge(self):
+        """ファイル上のジョブを取り込む（要 _lock と _file_lock）"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        self.next_id = max(self.next_id, data.get("next_id", 1))
+        merged = {job["id"]: job for job in data.get("jobs", []) if job.get("pid") != self.pid}
+        merged.update((jid, job) for jid, job in self.jobs.items() if job.get("pid") == self.pid)
+        self.jobs = OrderedDict(sorted(merged.items()))
+
+    def _write(self):
+        finished = [j for j in self.jobs.values() if j["status"] not in ("queued", "running")]
+        for job in finished[:-JOB_HISTORY]:
+            del self.jobs[job["id"]]
+        data = {"next_id": self.next_id, "jobs": list(self.jobs.values())}
+        _atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def _save(self):
+        with self._file_lock():
+            self._merge()
+            self._write()
+
+    def resume(self):
+        """前回の commander 停止時に残ったジョブを処理"""
+        interrupted = []
+        with self._lock:
+            with self._file_lock():
+                self._merge()
+                for job in self.jobs.values():
+                    if job["status"] not in ("queued", "running") or job.get("pid") == self.pid:
+                        continue
+                    if _pid_alive(job.get("pid")):
+                        continue
+                    job["pid"] = self.pid
+                    if job["status"] == "running":
+                        job["status"] = "interrupted"
+                        job["finished"] = datetime.now().isoformat()
+                        interrupted.append(job)
+                self._write()
+            self._pump()
+        for job in interrupted:
+            post_reply(job["channel"], job["ts"],
+                       f"ジョブ #{job['id']} ({job['command']}) は再起動で中断されました。"
+                       "必要なら再度コマンドを送ってください。")
+
+    # --- 投入・実行 ---
+
+    def submit(self, command: str, message: dict, channel: str) -> dict:
+        """ジョブを登録して受付をスレッドに返信"""
+        with self._lock, self._file_lock():
+            self._merge()
+            job = {
+                "id": self.next_id,
+                "command": command,
+                "channel": channel,
+                "ts": message.get("ts", ""),
+                "user": message.get("user", "unknown"),
+                "text": message.get("text", ""),
+                "status": "queued",
+                "created": datetime.now().isoformat(),
+                "started": None,
+                "finished": None,
+                "error": None,
+                "pid": self.pid,
+            }
+            self.next_id += 1
+            self.jobs[job["id"]] = job
+            waiting = sum(1 for j in self.jobs.values()
+                          if j["command"] == command and j["status"] in ("queued", "running")) - 1
+            self._write()
+        note = f"（待ち {waiting} 件）" if waiting else ""
+        post_reply(channel, job["ts"], f"ジョブ #{job['id']} を受け付けました: `{command}`{note}")
+        with self._lock:
+            self._pump()
+        return job
+
+    def _mine(self):
+        return [j for j in self.jobs.values() if j.get("pid") == self.pid]
+
+    def _running(self, command: str = None) -> int:
+        return sum(1 for j in self._mine()
+                   if j["status"] == "running" and (command is None or j["command"] == command))
+
+    def _pump(self):
+        """空きスロットがあれば待機中のジョブを古い順に開始（要ロック）"""
+        running = self._running()
+        for job in self._mine():
+            if running >= self.workers:
+                break
+            if job["status"] != "queued":
+                continue
+            if self._running(job["command"]) >= COMMAND_LIMITS.get(job["command"], DEFAULT_COMMAND_LIMIT):
+                continue
+            job["status"] = "running"
+            job["started"] = datetime.now().isoformat()
+            running += 1
+            self._pool.submit(self._execute, job)
+        self._save()
+
+    def _execute(self, job: dict):
+        start = time.time()
+        error = None
+        try:
+            route = route_message({"text": job["text"], "user": job["user"], "ts": job["ts"]},
+                                  job["channel"], log=False)
+            if route is None or route[1]() is False:
+                error = "コマンドがエラーを返しました"
+        except Exception as e:
+            error = str(e)
+        elapsed = time.time() - start
+
+        with self._lock:
+            job["status"] = "failed" if error else "done"
+            job["error"] = error
+            job["finished"] = datetime.now().isoformat()
+            self._pump()
+            self._idle.notify_all()
+        if error:
+            post_reply(job["channel"], job["ts"], f"ジョブ #{job['id']} 失敗 ({elapsed:.1f}秒): {error[:200]}")
+        else:
+            post_reply(job["channel"], job["ts"], f"ジョブ #{job['id']} 完了 ({elapsed:.1f}秒)")
+
+    def wait(self, timeout: float = None) -> bool:
+        """このプロセスの待機中・実行中のジョブが無くなるまで待つ（--once 用）"""
+        deadline = time.time() + timeout if timeout else None
+        with self._lock:
+            while any(j["status"] in ("queued", "running") for j in self._mine()):
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    # --- 参照 ---
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [dict(j) for j in self.jobs.values()]
+
+
+def _pid_alive(pid) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_job_runner = None
+
+
+def get_job_runner() -> JobRunner:
+    """プロセス内で共有するジョブランナー（初回に前回分を再開）"""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner()
+        _job_runner.resume()
+    return _job_runner
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
 # ===================================================================
 # コマンドハンドラー
 # ===================================================================
@@ -216,29 +438,30 @@ def handle_status(channel: str, **kwargs):
             return
         else:
             post_message(channel, text=f"レポート生成エラー:\n```{result.stderr[:500]}```")
-            return
+            return False
 
     post_message(channel, text="slack_report.py が見つかりません。")
+    return False
 
 
 def handle_kpi(channel: str, **kwargs):
     """!kpi — KPIダッシュボードを送信"""
-    _run_report(channel, "kpi")
+    return _run_report(channel, "kpi")
 
 
 def handle_content(channel: str, **kwargs):
     """!content — 今日のコンテンツ生成状態を報告"""
-    _run_report(channel, "content")
+    return _run_report(channel, "content")
 
 
 def handle_seo(channel: str, **kwargs):
     """!seo — SEOページの状態を報告"""
-    _run_report(channel, "seo")
+    return _run_report(channel, "seo")
 
 
 def handle_team(channel: str, **kwargs):
     """!team — チーム別レポートを送信"""
-    _run_report(channel, "team")
+    return _run_report(channel, "team")
 
 
 def _run_report(channel: str, report_type: str):
@@ -253,8 +476,9 @@ def _run_report(channel: str, report_type: str):
             return
         else:
             post_message(channel, text=f"{report_type}レポート生成エラー:\n```{result.stderr[:500]}```")
-            return
+            return False
     post_message(channel, text="slack_report.py が見つかりません。")
+    return False
 
 
 def handle_site(channel: str, **kwargs):
@@ -341,8 +565,10 @@ def handle_push(channel: str, **kwargs):
             post_message(channel, text=f"git push 完了 ({file_count} ファイル変更)\n```{changes[:500]}```")
         else:
             post_message(channel, text=f"git push エラー:\n```{push_result.stderr[:500]}```")
+            return False
     except Exception as e:
         post_message(channel, text=f"push エラー: {e}")
+        return False
 
 
 def handle_tasks(channel: str, **kwargs):
@@ -441,6 +667,7 @@ def handle_generate(channel: str, **kwargs):
         post_message(channel, text="コンテンツ生成タスクを作成しました。次回のcron 15:00で実行されます。")
     except Exception as e:
         post_message(channel, text=f"タスク作成エラー: {e}")
+        return False
 
 
 def handle_queue(channel: str, **kwargs):
@@ -492,10 +719,8 @@ def handle_queue(channel: str, **kwargs):
 
 def handle_agents(channel: str, **kwargs):
     """!agents — 全エージェント状態一覧"""
-    agent_state_file = project_root / "data" / "agent_state.json"
     try:
-        with open(agent_state_file) as f:
-            state = json.load(f)
+        state = runtime_config.agent_state()
 
         status_emoji = {
             "completed": ":white_check_mark:",
@@ -551,6 +776,46 @@ def handle_agents(channel: str, **kwargs):
         post_message(channel, text=f"エージェント状態読み込みエラー: {e}")
 
 
+JOB_STATUS_EMOJI = {
+    "queued": ":hourglass:",
+    "running": ":arrows_counterclockwise:",
+    "done": ":white_check_mark:",
+    "failed": ":x:",
+    "interrupted": ":warning:",
+}
+
+
+def handle_jobs(channel: str, **kwargs):
+    """!jobs — ジョブ一覧（実行中・待機中・直近の完了）を表示"""
+    jobs = get_job_runner().snapshot()
+    active = [j for j in jobs if j["status"] in ("running", "queued")]
+    recent = [j for j in jobs if j["status"] not in ("running", "queued")][-10:]
+
+    def line(job):
+        when = (job["finished"] or job["started"] or job["created"])[11:19]
+        err = f" — {job['error'][:60]}" if job.get("error") else ""
+        return (f"{JOB_STATUS_EMOJI.get(job['status'], ':question:')} "
+                f"#{job['id']} `{job['command']}` {job['status']} ({when}){err}")
+
+    text = (
+        f"*実行中・待機中:* {len(active)} 件\n"
+        + ("\n".join(line(j) for j in active) or "  なし")
+        + "\n\n*直近の完了:*\n"
+        + ("\n".join(line(j) for j in reversed(recent)) or "  なし")
+    )
+    blocks = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": "ジョブ一覧"},
+        },
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": text},
+        },
+    ]
+    post_message(channel, blocks=blocks, text="ジョブ一覧")
+
+
 def handle_help(channel: str, **kwargs):
     """!help — コマンド一覧を表示"""
     blocks = [
@@ -576,7 +841,8 @@ def handle_help(channel: str, **kwargs):
                     "  `!generate` — コンテンツ生成を要求\n\n"
                     "*モニタリング:*\n"
                     "  `!queue`   — 投稿キュー状態\n"
-                    "  `!agents`  — Agent Team状態一覧\n\n"
+                    "  `!agents`  — Agent Team状態一覧\n"
+                    "  `!jobs`    — 実行中・直近のジョブ一覧\n\n"
                     "*LINE返信:*\n"
                     "  `!reply <userID> メッセージ` — LINE看護師に返信\n\n"
                     "*指示キュー:*\n"
@@ -594,8 +860,8 @@ def handle_help(channel: str, **kwargs):
 
 def handle_reply(channel: str, line_user_id: str, message: str, ts: str = ""):
     """!reply — SlackからLINE看護師に返信"""
-    worker_url = os.getenv("WORKER_URL", "https://robby-the-match-api.robby-the-robot-2026.workers.dev")
-    push_secret = os.getenv("LINE_PUSH_SECRET", "")
+    worker_url = runtime_config.env("WORKER_URL", "https://robby-the-match-api.robby-the-robot-2026.workers.dev")
+    push_secret = runtime_config.env("LINE_PUSH_SECRET", "")
 
     if not push_secret:
         post_reply(channel, ts, "❌ LINE_PUSH_SECRET が .env に設定されていません")
@@ -628,6 +894,7 @@ COMMANDS = {
     "!generate": handle_generate,
     "!queue": handle_queue,
     "!agents": handle_agents,
+    "!jobs": handle_jobs,
     "!tasks": handle_tasks,
     "!clear": handle_clear,
     "!help": handle_help,
@@ -638,19 +905,22 @@ COMMANDS = {
 # メッセージ処理
 # ===================================================================
 
-def process_message(message: dict, channel: str):
-    """メッセージを解析してコマンドを実行、または指示キューに保存"""
+def route_message(message: dict, channel: str, log: bool = True):
+    """メッセージを解析し (コマンドキー, 実行関数) を返す。処理不要なら None
+
+    実行関数は引数なしで呼べる partial。ポーリング・イベント駆動の両モードで共用する。
+    """
     text = message.get("text", "").strip()
     user = message.get("user", "unknown")
     ts = message.get("ts", "")
 
     # Bot自身のメッセージは無視
     if message.get("bot_id") or message.get("subtype") == "bot_message":
-        return
+        return None
 
     # 空メッセージ無視
     if not text:
-        return
+        return None
 
     # !reply 特別処理（引数パース必要）
     if text.startswith("!reply "):
@@ -658,26 +928,63 @@ def process_message(message: dict, channel: str):
         if len(parts) >= 3:
             line_user_id = parts[1]
             reply_message = parts[2]
-            handle_reply(channel, line_user_id, reply_message, ts=ts)
-        else:
-            post_reply(channel, ts, "使い方: `!reply <userID> メッセージ`")
-        return
+            return "!reply", partial(handle_reply, channel, line_user_id, reply_message, ts=ts)
+        return "!reply", partial(post_reply, channel, ts, "使い方: `!reply <userID> メッセージ`")
 
     # コマンド検出
     for cmd, handler in COMMANDS.items():
         if text.lower().startswith(cmd):
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] コマンド: {cmd} (user={user})")
-            handler(channel, user=user, ts=ts)
-            return
+            if log:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] コマンド: {cmd} (user={user})")
+            return cmd, partial(handler, channel, user=user, ts=ts)
 
     # !で始まらない自由文 → 指示キューに保存
     if not text.startswith("!"):
-        idx = add_instruction(text, user=user)
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 指示保存: #{idx} '{text[:50]}...'")
-        post_reply(
-            channel, ts,
-            f"指示を受け付けました (#{idx})\nClaude Codeが次回処理します。"
-        )
+        return "instruction", partial(_save_instruction, channel, text, user, ts)
+    return None
+
+
+def _save_instruction(channel: str, text: str, user: str, ts: str):
+    """自由文を指示キューに保存してスレッドに受付を返信"""
+    idx = add_instruction(text, user=user)
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] 指示保存: #{idx} '{text[:50]}...'")
+    post_reply(
+        channel, ts,
+        f"指示を受け付けました (#{idx})\nClaude Codeが次回処理します。"
+    )
+
+
+def process_message(message: dict, channel: str):
+    """メッセージを解析してコマンドを実行、または指示キューに保存
+
+    JOB_COMMANDS はジョブランナーに投入して即座に戻る。
+    """
+    route = route_message(message, channel)
+    if not route:
+        return
+    if route[0] in JOB_COMMANDS:
+        get_job_runner().submit(route[0], message, channel)
+    else:
+        route[1]()
+
+
+class SeenSet:
+    """処理済みキー（ts / event_id）の上限つき集合。古いものから捨てる"""
+
+    def __init__(self, maxlen: int = 1000):
+        self.maxlen = maxlen
+        self._keys = OrderedDict()
+
+    def add(self, key: str) -> bool:
+        """新規なら登録して True、処理済みなら False"""
+        if not key:
+            return True
+        if key in self._keys:
+            return False
+        self._keys[key] = None
+        if len(self._keys) > self.maxlen:
+            self._keys.popitem(last=False)
+        return True
 
 
 # ===================================================================
@@ -691,24 +998,20 @@ def run_polling(channel: str, interval: int = 30):
     print("終了: Ctrl+C")
     print("---")
 
+    get_job_runner()
     last_ts = load_last_ts()
-    processed_ts = set()
+    processed_ts = SeenSet()
 
     while True:
         try:
             messages = get_conversation_history(channel, oldest=last_ts, limit=10)
             for msg in reversed(messages):
-                ts = msg.get("ts", "")
-                if ts in processed_ts:
+                if not processed_ts.add(msg.get("ts", "")):
                     continue
-                processed_ts.add(ts)
                 process_message(msg, channel)
 
-            if len(processed_ts) > 500:
-                processed_ts.clear()
-
-            if messages:
-                newest_ts = messages[0].get("ts", last_ts)
+            newest_ts = messages[0].get("ts", last_ts) if messages else last_ts
+            if newest_ts != last_ts:
                 last_ts = newest_ts
                 save_last_ts(last_ts)
 
@@ -725,6 +1028,7 @@ def run_polling(channel: str, interval: int = 30):
 
 def run_once(channel: str):
     """1回チェックして終了（cron用）"""
+    runner = get_job_runner()
     last_ts = load_last_ts()
     messages = get_conversation_history(channel, oldest=last_ts, limit=20)
 
@@ -742,6 +1046,245 @@ def run_once(channel: str):
     else:
         print("新規メッセージなし")
 
+    # 投入したジョブ（と前回分の再開ジョブ）を終えてから終了
+    if not runner.wait(ONCE_WAIT_TIMEOUT):
+        print(f"[WARN] {ONCE_WAIT_TIMEOUT}秒待ってもジョブが終わらないため終了します")
+
+
+# ===================================================================
+# イベント駆動モード（asyncio）
+# ===================================================================
+
+# Slack署名の許容時刻ずれ（秒）
+SIGNATURE_MAX_AGE = 60 * 5
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class EventDispatcher:
+    """Slackイベントを受けてコマンドを非同期実行する
+
+    ハンドラ本体は同期関数のまま asyncio.to_thread で実行し、
+    コマンドキーごとの Semaphore と全体の Semaphore で同時実行数を抑える。
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.seen = SeenSet()
+        self.last_ts = load_last_ts()
+        self._workers = asyncio.Semaphore(MAX_WORKERS)
+        self._limits = {}
+        self._tasks = set()
+
+    def _limit(self, key: str) -> asyncio.Semaphore:
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(COMMAND_LIMITS.get(key, DEFAULT_COMMAND_LIMIT))
+        return self._limits[key]
+
+    def submit(self, message: dict, event_id: str = ""):
+        """メッセージを受け付けて実行タスクを作る（受信側は待たずに即ACKする）"""
+        if event_id and not self.seen.add(event_id):
+            return None
+        if not self.seen.add(message.get("ts", "")):
+            return None
+        self._advance(message.get("ts", ""))
+        route = route_message(message, self.channel)
+        if not route:
+            return None
+        if route[0] in JOB_COMMANDS:
+            # 受付返信・ファイル書き込みを伴うのでスレッドで投入
+            task = asyncio.get_running_loop().create_task(
+                asyncio.to_thread(get_job_runner().submit, route[0], message, self.channel))
+        else:
+            task = asyncio.get_running_loop().create_task(self._run(*route))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, key: str, func):
+        async with self._limit(key), self._workers:
+            try:
+                await asyncio.to_thread(func)
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {key} 実行エラー: {e}")
+
+    def _advance(self, ts: str):
+        """処理済みtsを進めて保存（イベント受信時のみ書き込む）"""
+        try:
+            newer = float(ts) > float(self.last_ts)
+        except ValueError:
+            return
+        if newer:
+            self.last_ts = ts
+            save_last_ts(ts)
+
+    async def catch_up(self):
+        """停止中に届いたメッセージを conversations.history で1回だけ拾う"""
+        messages = await asyncio.to_thread(
+            get_conversation_history, self.channel, self.last_ts, 20)
+        for msg in reversed(messages):
+            self.submit(msg)
+
+    def handle_event(self, payload: dict):
+        """event_callback ペイロードを処理"""
+        event = payload.get("event") or {}
+        if event.get("type") != "message" or event.get("channel") != self.channel:
+            return None
+        return self.submit(event, event_id=payload.get("event_id", ""))
+
+    async def drain(self):
+        """実行中のコマンド・ジョブ投入を待つ"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def verify_signature(secret: str, timestamp: str, body: bytes, signature: str) -> bool:
+    """Slack署名（v0）を検証"""
+    try:
+        if abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+            return False
+    except ValueError:
+        return False
+    base = b"v0:" + timestamp.encode() + b":" + body
+    expected = "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+async def _read_request(reader):
+    """最小限のHTTP/1.1リクエストを読む → (method, path, headers, body)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _http_response(status: str, body: bytes = b"", content_type: str = "text/plain") -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode() + body
+
+
+async def _handle_http(dispatcher: EventDispatcher, path: str, reader, writer):
+    """Events API リクエスト1件を処理（処理は投げっぱなしで即200を返す）"""
+    try:
+        method, req_path, headers, body = await _read_request(reader)
+        if method != "POST" or req_path.split("?")[0] != path:
+            writer.write(_http_response("404 Not Found"))
+            return
+        if not verify_signature(SLACK_SIGNING_SECRET,
+                                headers.get("x-slack-request-timestamp", ""),
+                                body, headers.get("x-slack-signature", "")):
+            writer.write(_http_response("401 Unauthorized"))
+            return
+        payload = json.loads(body or b"{}")
+        if payload.get("type") == "url_verification":
+            challenge = json.dumps({"challenge": payload.get("challenge", "")}).encode()
+            writer.write(_http_response("200 OK", challenge, "application/json"))
+            return
+        if payload.get("type") == "event_callback":
+            dispatcher.handle_event(payload)
+        writer.write(_http_response("200 OK"))
+    except (asyncio.IncompleteReadError, ValueError, json.JSONDecodeError):
+        writer.write(_http_response("400 Bad Request"))
+    finally:
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve_events(channel: str, host: str = "127.0.0.1", port: int = 3000,
+                       path: str = "/slack/events"):
+    """Events API（HTTP）受信サーバー"""
+    dispatcher = EventDispatcher(channel)
+    await asyncio.to_thread(get_job_runner)
+    server = await asyncio.start_server(
+        lambda r, w: _handle_http(dispatcher, path, r, w), host, port)
+    print(f"ナースロビー Commander v3.0 起動 (Events API, http://{host}:{port}{path})")
+    print(f"監視チャンネル: {channel}")
+    print("---")
+    await dispatcher.catch_up()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await dispatcher.drain()
+
+
+def _open_socket_url() -> str:
+    """apps.connections.open で Socket Mode の接続URLを取得"""
+    data = slack_client.call("apps.connections.open", token=SLACK_APP_TOKEN, timeout=10)
+    if not data.get("ok"):
+        raise RuntimeError(f"apps.connections.open エラー: {data.get('error')}")
+    return data["url"]
+
+
+async def serve_socket_mode(channel: str):
+    """Socket Mode 受信（websockets パッケージが必要）"""
+    try:
+        import websockets
+    except ImportError:
+        print("ERROR: websockets not installed. Run: pip3 install websockets")
+        print("       または --events（Events API受信）を使用してください")
+        sys.exit(1)
+
+    dispatcher = EventDispatcher(channel)
+    await asyncio.to_thread(get_job_runner)
+    print("ナースロビー Commander v3.0 起動 (Socket Mode)")
+    print(f"監視チャンネル: {channel}")
+    print("---")
+    await dispatcher.catch_up()
+    backoff = 1
+    try:
+        while True:
+            try:
+                url = await asyncio.to_thread(_open_socket_url)
+                async with websockets.connect(url) as ws:
+                    backoff = 1
+                    async for raw in ws:
+                        envelope = json.loads(raw)
+                        if envelope.get("envelope_id"):
+                            await ws.send(json.dumps({"envelope_id": envelope["envelope_id"]}))
+                        if envelope.get("type") == "events_api":
+                            dispatcher.handle_event(envelope.get("payload") or {})
+                        elif envelope.get("type") == "disconnect":
+                            break
+            except Exception as e:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Socket Mode 再接続: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+    finally:
+        await dispatcher.drain()
+
+
+def run_events(channel: str, host: str, port: int, socket_mode: bool = False):
+    """イベント駆動モード起動"""
+    if socket_mode:
+        if not SLACK_APP_TOKEN:
+            print("エラー: Socket Mode には SLACK_APP_TOKEN (xapp-...) が必要です")
+            sys.exit(1)
+        coro = serve_socket_mode(channel)
+    else:
+        if not SLACK_SIGNING_SECRET:
+            print("エラー: Events API 受信には SLACK_SIGNING_SECRET が必要です")
+            sys.exit(1)
+        coro = serve_events(channel, host=host, port=port)
+    try:
+        asyncio.run(coro)
+    except KeyboardInterrupt:
+        print("\nCommander 終了")
+
 
 # ===================================================================
 # メイン
@@ -755,10 +1298,16 @@ def main():
     parser.add_argument("--once", action="store_true", help="1回チェックして終了（cron用）")
     parser.add_argument("--interval", type=int, default=30, help="ポーリング間隔（秒）")
     parser.add_argument("--channel", default=SLACK_CHANNEL_ID, help="監視チャンネルID")
+    parser.add_argument("--events", action="store_true", help="イベント駆動モード（Events API受信）")
+    parser.add_argument("--socket", action="store_true", help="--events を Socket Mode で受信")
+    parser.add_argument("--host", default="127.0.0.1", help="Events API 待受ホスト")
+    parser.add_argument("--port", type=int, default=3000, help="Events API 待受ポート")
 
     args = parser.parse_args()
 
-    if args.once:
+    if args.events or args.socket:
+        run_events(channel=args.channel, host=args.host, port=args.port, socket_mode=args.socket)
+    elif args.once:
         run_once(channel=args.channel)
     elif args.poll:
         run_polling(channel=args.channel, interval=args.interval)
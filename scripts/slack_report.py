@@ -16,12 +16,15 @@ import sys
 from datetime import datetime, date
 from pathlib import Path
 
-from dotenv import load_dotenv
-import requests
+import content_catalog
+import site_build
+import slack_client
+from runtime_config import load_env
+from kpi_store import PROFILE_COLUMNS as KPI_COLUMNS, open_store
 
 # プロジェクトルート
 project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+load_env()
 
 # Slack設定
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
@@ -33,7 +36,6 @@ if not SLACK_BOT_TOKEN:
 
 PROGRESS_MD = project_root / "PROGRESS.md"
 KPI_LOG_CSV = project_root / "data" / "kpi_log.csv"
-CONTENT_DIR = project_root / "content" / "generated"
 SEO_DIR = project_root / "lp"
 
 
@@ -43,32 +45,12 @@ SEO_DIR = project_root / "lp"
 
 def post_to_slack(blocks: list, text: str = "ナースロビー レポート") -> bool:
     """Block Kit形式でSlackにメッセージを送信"""
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "channel": SLACK_CHANNEL_ID,
-        "text": text,
-        "blocks": blocks,
-    }
-    try:
-        resp = requests.post(
-            "https://slack.com/api/chat.postMessage",
-            headers=headers,
-            json=payload,
-            timeout=15,
-        )
-        data = resp.json()
-        if data.get("ok"):
-            print(f"Slack送信成功 (channel={SLACK_CHANNEL_ID})")
-            return True
-        else:
-            print(f"Slack APIエラー: {data.get('error', 'unknown')}")
-            return False
-    except Exception as e:
-        print(f"送信エラー: {type(e).__name__}: {e}")
-        return False
+    data = slack_client.post_message(SLACK_CHANNEL_ID, text=text, blocks=blocks)
+    if data.get("ok"):
+        print(f"Slack送信成功 (channel={SLACK_CHANNEL_ID})")
+        return True
+    print(f"Slack APIエラー: {data.get('error', 'unknown')}")
+    return False
 
 
 def truncate(text: str, max_len: int = 2900) -> str:
@@ -113,37 +95,15 @@ def parse_progress_md() -> dict:
 # ===================================================================
 
 def check_seo_pages() -> list[dict]:
-    """lp/ 以下のHTMLファイルを走査し、SEO状況を返す"""
-    results = []
+    """lp/ 以下のHTMLファイルを走査し、SEO状況を返す（未変更ページは site_build のキャッシュを使う）"""
     if not SEO_DIR.exists():
-        return results
-
-    for html_file in sorted(SEO_DIR.rglob("*.html")):
-        rel = html_file.relative_to(project_root)
-        content = html_file.read_text(encoding="utf-8", errors="replace")
+        return []
 
-        has_title = bool(re.search(r"<title>.+?</title>", content, re.IGNORECASE))
-        has_meta_desc = bool(
-            re.search(r'<meta\s+name=["\']description["\']', content, re.IGNORECASE)
-        )
-        has_h1 = bool(re.search(r"<h1[^>]*>.+?</h1>", content, re.IGNORECASE))
-        has_schema = bool(
-            re.search(r"application/ld\+json", content, re.IGNORECASE)
-        )
-        has_ga4 = bool(
-            re.search(r"gtag|G-[A-Z0-9]+|googletagmanager", content, re.IGNORECASE)
-        )
-
-        results.append(
-            {
-                "file": str(rel),
-                "title": has_title,
-                "meta_desc": has_meta_desc,
-                "h1": has_h1,
-                "schema": has_schema,
-                "ga4": has_ga4,
-            }
-        )
+    results = []
+    for r in site_build.build(names=["seo"], paths=SEO_DIR.rglob("*.html"), verbose=False):
+        status = r["checks"].get("seo") or {}
+        results.append({"file": r["rel"], **{k: status.get(k, False) for k in
+                                            ("title", "meta_desc", "h1", "schema", "ga4")}})
     return results
 
 
@@ -152,28 +112,13 @@ def check_seo_pages() -> list[dict]:
 # ===================================================================
 
 def check_content_status() -> dict:
-    """content/generated/ 以下を確認し、今日の生成状況を返す"""
-    today_str = date.today().strftime("%Y-%m-%d")
-    total_dirs = 0
-    today_dirs = 0
-    total_images = 0
-    today_images = 0
-
-    if CONTENT_DIR.exists():
-        for d in CONTENT_DIR.iterdir():
-            if d.is_dir():
-                total_dirs += 1
-                imgs = list(d.glob("*.png")) + list(d.glob("*.jpg"))
-                total_images += len(imgs)
-                if d.name.startswith(today_str):
-                    today_dirs += 1
-                    today_images += len(imgs)
-
+    """content/generated/ の生成状況（content_catalog から）を返す"""
+    s = content_catalog.summary("generated")
     return {
-        "total_sets": total_dirs,
-        "today_sets": today_dirs,
-        "total_images": total_images,
-        "today_images": today_images,
+        "total_sets": s["total_sets"],
+        "today_sets": s["today_sets"],
+        "total_images": s["total_images"],
+        "today_images": s["today_images"],
     }
 
 
@@ -347,26 +292,38 @@ def send_kpi_dashboard():
             }
         )
 
-    # KPIログCSVがあれば直近データを追加
-    if KPI_LOG_CSV.exists():
-        try:
-            lines = KPI_LOG_CSV.read_text(encoding="utf-8").strip().splitlines()
-            if len(lines) > 1:
-                recent = lines[-5:]  # 直近5行
-                blocks.append({"type": "divider"})
-                blocks.append(
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "*直近パフォーマンスデータ*\n```\n"
-                            + "\n".join(recent)
-                            + "\n```",
-                        },
-                    }
-                )
-        except Exception:
-            pass
+    # KPIストアがあれば直近データ + 前日比/7日/28日変化を追加
+    try:
+        store = open_store(csv_path=KPI_LOG_CSV)
+        recent = store.rows(last=5)
+        if recent:
+            header = ",".join(["date"] + KPI_COLUMNS)
+            lines = [",".join(str(r[k]) for k in ["date"] + KPI_COLUMNS) for r in recent]
+            trend = store.trend()
+            change_lines = []
+            for window, diffs in trend["change"].items():
+                parts = []
+                for col, label in (("tiktok_followers", "フォロワー"),
+                                   ("tiktok_total_views", "再生"),
+                                   ("tiktok_total_likes", "いいね")):
+                    d = diffs[col]
+                    parts.append(f"{label} {'-' if d is None else f'{d:+,}'}")
+                change_lines.append(f"{window}日: " + " / ".join(parts))
+            blocks.append({"type": "divider"})
+            blocks.append(
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "*直近パフォーマンスデータ*\n```\n"
+                        + "\n".join([header] + lines)
+                        + "\n```\n*変化量*\n"
+                        + "\n".join(change_lines),
+                    },
+                }
+            )
+    except Exception:
+        pass
 
     return post_to_slack(blocks, text="KPIダッシュボード")
 
@@ -400,24 +357,25 @@ def send_content_report():
     ]
 
     # generated以下の各ディレクトリの一覧
-    if CONTENT_DIR.exists():
-        dirs = sorted(
-            [d.name for d in CONTENT_DIR.iterdir() if d.is_dir()], reverse=True
+    dirs = sorted(
+        (str(Path(r["dir"]).relative_to("content/generated"))
+         for r in content_catalog.sets("generated")),
+        reverse=True,
+    )
+    if dirs:
+        listing = "\n".join(f"  - `{d}`" for d in dirs[:10])
+        if len(dirs) > 10:
+            listing += f"\n  ...他 {len(dirs) - 10} セット"
+        blocks.append({"type": "divider"})
+        blocks.append(
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "*直近のコンテンツセット*\n" + listing,
+                },
+            }
         )
-        if dirs:
-            listing = "\n".join(f"  - `{d}`" for d in dirs[:10])
-            if len(dirs) > 10:
-                listing += f"\n  ...他 {len(dirs) - 10} セット"
-            blocks.append({"type": "divider"})
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "*直近のコンテンツセット*\n" + listing,
-                    },
-                }
-            )
 
     return post_to_slack(blocks, text="コンテンツ生成レポート")
 
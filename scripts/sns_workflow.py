@@ -16,7 +16,6 @@ SNS統合投稿ワークフロー v1.0
 import argparse
 import fcntl
 import json
-import os
 import shutil
 import subprocess
 import sys
@@ -24,6 +23,13 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+import blob_store
+import content_catalog
+import hashtag_engine
+import prerender
+import slack_client
+from runtime_config import load_env
+
 # ============================================================
 # 定数
 # ============================================================
@@ -33,7 +39,6 @@ QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 READY_DIR = PROJECT_DIR / "content" / "ready"
 LOCK_FILE = PROJECT_DIR / "data" / ".posting_queue.lock"
 LOG_DIR = PROJECT_DIR / "logs"
-ENV_FILE = PROJECT_DIR / ".env"
 
 # ============================================================
 # キャプションテンプレート & ハッシュタグ
@@ -46,7 +51,7 @@ HASHTAGS = {
     "niche": ["#小田原看護師", "#神奈川県西部", "#手数料10パーセント"],
 }
 
-# コンテンツタイプ別テンプレート
+# コンテンツタイプ別テンプレート（ハッシュタグは hashtag_engine.TYPE_HASHTAGS）
 # content_type: aruaru(40%), career(25%), salary(20%), service(5%), trend(10%)
 CAPTION_TEMPLATES = {
     "aruaru": {
@@ -54,69 +59,34 @@ CAPTION_TEMPLATES = {
         "description": "看護師あるある x AIやってみた",
         "cta_style": "soft",
         "caption_suffix": "\n\n共感したら保存してね",
-        "hashtag_pool": [
-            "#看護師あるある", "#ナースロビー", "#看護師の日常",
-            "#ナース", "#神奈川看護師",
-        ],
-        "hashtag_count": 4,
     },
     "career": {
         "ratio": 0.25,
         "description": "転職・キャリア x AIシミュレーション",
         "cta_style": "soft",
         "caption_suffix": "\n\n転職の相談はプロフィールのLINEからどうぞ",
-        "hashtag_pool": [
-            "#看護師転職", "#ナースロビー", "#キャリア",
-            "#神奈川看護師", "#転職",
-        ],
-        "hashtag_count": 4,
     },
     "salary": {
         "ratio": 0.20,
         "description": "給与・待遇 x AIデータ分析",
         "cta_style": "soft",
         "caption_suffix": "\n\nこの表は保存推奨です",
-        "hashtag_pool": [
-            "#看護師転職", "#ナースロビー", "#給与",
-            "#年収", "#神奈川看護師",
-        ],
-        "hashtag_count": 4,
     },
     "service": {
         "ratio": 0.05,
         "description": "ナースロビー紹介",
         "cta_style": "hard",
         "caption_suffix": "\n\n手数料10%で転職サポート。プロフィールのLINEから無料相談できます",
-        "hashtag_pool": [
-            "#看護師転職", "#ナースロビー", "#手数料10パーセント",
-        ],
-        "hashtag_count": 3,
     },
     "trend": {
         "ratio": 0.10,
         "description": "トレンド便乗",
         "cta_style": "soft",
         "caption_suffix": "\n\nしんどい環境にいる人、話聞くよ",
-        "hashtag_pool": [
-            "#看護師あるある", "#ナースロビー", "#看護師の日常",
-            "#ナース", "#神奈川看護師",
-        ],
-        "hashtag_count": 5,
     },
 }
 
 
-def load_env():
-    """Load .env file"""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 # ============================================================
 # ファイルロック付きキュー管理
 # ============================================================
@@ -254,15 +224,8 @@ def to_relative(abs_path):
 # ============================================================
 
 def slack_notify(message):
-    """Slack通知を送信"""
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception as e:
-        print("[WARN] Slack通知失敗: %s" % e)
+    """Slack通知を送信（slack_client でまとめ送信）"""
+    slack_client.notify(message)
 
 
 # ============================================================
@@ -315,11 +278,10 @@ def get_content_type(post):
 
 
 def generate_hashtags_for_type(content_type):
-    """コンテンツタイプに基づくハッシュタグを生成"""
-    template = CAPTION_TEMPLATES.get(content_type, CAPTION_TEMPLATES["aruaru"])
-    pool = template["hashtag_pool"]
-    count = min(template["hashtag_count"], len(pool))
-    return pool[:count]
+    """コンテンツタイプに基づくハッシュタグを生成（hashtag_engine のタイプ別タグ）"""
+    if content_type not in hashtag_engine.TYPE_HASHTAGS:
+        content_type = "aruaru"
+    return hashtag_engine.tags_for(content_type=content_type)
 
 
 def format_caption_for_export(post):
@@ -345,7 +307,7 @@ def format_hashtags_for_export(post):
     # 既存のハッシュタグを使用
     existing = post.get("hashtags", [])
     if existing:
-        return " ".join(existing)
+        return " ".join(hashtag_engine.validate(existing))
 
     # なければテンプレートから生成
     content_type = get_content_type(post)
@@ -432,8 +394,9 @@ def prepare_next():
     print("投稿準備 #%d: %s" % (post_id, content_id))
     print("=" * 50)
 
-    # Step 1: スライドが存在するか確認/生成
-    if not ensure_slides_exist(post):
+    # Step 1: スライドが存在するか確認/生成（先行レンダリング済みなら引くだけ）
+    slides = prerender.slides(post)
+    if slides is None and not ensure_slides_exist(post):
         post["status"] = "failed"
         post["error"] = "slide_generation_failed"
         qm.save()
@@ -449,7 +412,8 @@ def prepare_next():
     ready_subdir.mkdir(parents=True, exist_ok=True)
 
     slide_dir = to_absolute(post.get("slide_dir"))
-    slides = sorted(slide_dir.glob("slide_*.png"))
+    if slides is None:
+        slides = sorted(slide_dir.glob("slide_*.png"))
 
     if not slides:
         print("[ERROR] スライドファイルが見つかりません: %s" % slide_dir)
@@ -458,10 +422,9 @@ def prepare_next():
         qm.save()
         return False
 
-    # スライドをコピー（slide_1.png, slide_2.png, ...）
+    # スライドを配置（slide_1.png, ...）。同一内容はブロブストアで1つに共有
     for i, slide_src in enumerate(slides, start=1):
-        dest = ready_subdir / ("slide_%d.png" % i)
-        shutil.copy2(str(slide_src), str(dest))
+        blob_store.install(slide_src, ready_subdir / ("slide_%d.png" % i))
     print("[OK] %d枚のスライドをコピー: %s" % (len(slides), ready_subdir.name))
 
     # Step 3: caption.txt を生成
@@ -494,6 +457,7 @@ def prepare_next():
     with open(meta_file, 'w', encoding='utf-8') as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
     print("[OK] meta.json 生成完了")
+    content_catalog.record(ready_subdir, "ready", content_id=content_id, post_id=post_id)
 
     # Step 6: キューステータスを更新
     post["status"] = "ready"
@@ -714,14 +678,16 @@ def regenerate_slides(post_id):
         qm.release()
         return False
 
-    # 既存スライドを削除
+    # 既存スライドを削除（先行レンダリングも無効にする）
     if slide_dir and slide_dir.exists():
         for old_slide in slide_dir.glob("slide_*.png"):
             old_slide.unlink()
         print("[INFO] 既存スライドを削除しました")
+    post.pop("ready_assets", None)
+    shutil.rmtree(prerender.RENDER_DIR / post["content_id"], ignore_errors=True)
 
     # 再生成
-    qm.release()
+    qm.save()
     print("[INFO] スライドを再生成中...")
     generate_script = PROJECT_DIR / "scripts" / "generate_slides.py"
     result = subprocess.run(
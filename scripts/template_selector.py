@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+カルーセルテンプレート選択インデックス — ナースロビー
+
+data/carousel_templates.json を1回だけ走査して転置インデックスを作る。
+  - カテゴリ / 心理学ファミリー（PSYCHOLOGY_ALIASES）/ CTAタイプ → テンプレート位置
+  - 条件の組み合わせごとに候補と累積重み配列をメモ化し、
+    重みつき抽選は bisect で O(log n)
+  - 重みは過去の投稿実績（posting_queue.json の template_id + performance）から作れる
+    （実績のないテンプレートは 1.0、全て 1.0 なら従来の random.choice と同じ分布）
+
+使い方:
+  from template_selector import TemplateIndex, performance_weights
+  index = TemplateIndex(templates, weights=performance_weights(posts))
+  index.pick(category="あるある", psychology="philosophy", cta="soft")
+
+  python3 template_selector.py              # インデックスの内訳と実績ウェイトを表示
+  python3 template_selector.py --bench      # 従来の線形フィルタとのスループット比較
+"""
+
+import argparse
+import bisect
+import json
+import random
+import time
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+PROJECT_DIR = Path(__file__).parent.parent
+TEMPLATES_PATH = PROJECT_DIR / "data" / "carousel_templates.json"
+QUEUE_PATH = PROJECT_DIR / "data" / "posting_queue.json"
+
+PSYCHOLOGY_ALIASES = {
+    "behavioral_economics": ["行動経済学", "損失回避", "アンカリング", "フレーミング", "サンクコスト", "社会的証明", "デフォルト効果", "現状維持", "IKEA効果", "初頭効果", "ハロー効果", "メンタルアカウンティング", "機会費用", "時間的割引", "ゼロリスク"],
+    "positive_psychology": ["ポジティブ心理学", "PERMA", "成長マインドセット", "フロー理論", "VIA", "感謝介入", "希望理論", "自己決定理論", "ポジティブ加齢"],
+    "philosophy": ["哲学", "ストア", "実存主義", "サルトル", "アドラー", "ニーチェ", "禅仏教", "マインドフルネス", "功利主義"],
+}
+
+# 実績ウェイト: スコア = views + 3*likes + 10*saves + 5*comments
+PERFORMANCE_COEFFS = {"views": 1, "likes": 3, "saves": 10, "comments": 5}
+# 投稿数が少ないテンプレートを全体平均に寄せる（擬似投稿数）
+PERFORMANCE_PRIOR = 3
+WEIGHT_MIN = 0.25
+WEIGHT_MAX = 4.0
+
+
+# ===================================================================
+# 転置インデックス
+# ===================================================================
+
+def cta_types(template: Dict) -> set:
+    """テンプレートのCTAスライドに含まれる cta_type"""
+    return {s.get("cta_type") for s in template.get("slides", [])
+            if s.get("type") == "cta" and s.get("cta_type")}
+
+
+class TemplateIndex:
+    """カテゴリ・心理学ファミリー・CTAタイプの転置インデックス + 重みつき抽選"""
+
+    def __init__(self, templates: List[Dict], weights: Optional[Dict[str, float]] = None):
+        self.templates = list(templates)
+        self.by_id = {t.get("id"): t for t in self.templates}
+
+        category, psychology, cta = {}, {}, {}
+        for pos, t in enumerate(self.templates):
+            category.setdefault(t.get("category", ""), set()).add(pos)
+            text = t.get("psychology", "")
+            for family, keywords in PSYCHOLOGY_ALIASES.items():
+                if any(kw in text for kw in keywords):
+                    psychology.setdefault(family, set()).add(pos)
+            for cta_type in cta_types(t):
+                cta.setdefault(cta_type, set()).add(pos)
+        self.category: Dict[str, frozenset] = {k: frozenset(v) for k, v in category.items()}
+        self.psychology: Dict[str, frozenset] = {k: frozenset(v) for k, v in psychology.items()}
+        self.cta: Dict[str, frozenset] = {k: frozenset(v) for k, v in cta.items()}
+
+        self._pools = {}
+        self.set_weights(weights)
+
+    def set_weights(self, weights: Optional[Dict[str, float]]):
+        """テンプレートID → 重み。指定のないIDは 1.0。候補キャッシュは作り直す"""
+        weights = weights or {}
+        self.weights = [max(float(weights.get(t.get("id"), 1.0)), 0.0) for t in self.templates]
+        self._pools = {}
+
+    def _psychology_positions(self, psychology: str) -> frozenset:
+        positions = self.psychology.get(psychology)
+        if positions is None:
+            # エイリアス以外の自由語（例: "アドラー"）は初回だけ走査して覚える
+            positions = frozenset(pos for pos, t in enumerate(self.templates)
+                                  if psychology in t.get("psychology", ""))
+            self.psychology[psychology] = positions
+        return positions
+
+    def _pool(self, category: str = None, psychology: str = None, cta: str = None):
+        """条件に合う (位置のタプル, 累積重み) をメモ化して返す"""
+        key = (category, psychology, cta)
+        pool = self._pools.get(key)
+        if pool is None:
+            sets = []
+            if category:
+                sets.append(self.category.get(category, frozenset()))
+            if psychology:
+                sets.append(self._psychology_positions(psychology))
+            if cta:
+                sets.append(self.cta.get(cta, frozenset()))
+            positions = sorted(frozenset.intersection(*sets)) if sets else range(len(self.templates))
+            positions = tuple(p for p in positions if self.weights[p] > 0)
+            cumulative = tuple(accumulate(self.weights[p] for p in positions))
+            pool = self._pools[key] = (positions, cumulative)
+        return pool
+
+    def candidates(self, category: str = None, psychology: str = None,
+                   cta: str = None) -> List[Dict]:
+        positions, _ = self._pool(category, psychology, cta)
+        return [self.templates[p] for p in positions]
+
+    def pick(self, category: str = None, psychology: str = None, cta: str = None,
+             rng: random.Random = random) -> Optional[Dict]:
+        """条件に合うテンプレートを重みつきで1つ選ぶ（候補なしは None）"""
+        positions, cumulative = self._pool(category, psychology, cta)
+        if not positions:
+            return None
+        i = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+        return self.templates[positions[min(i, len(positions) - 1)]]
+
+
+# ===================================================================
+# 実績ウェイト
+# ===================================================================
+
+def _score(performance: Dict) -> Optional[float]:
+    values = {k: performance.get(k) for k in PERFORMANCE_COEFFS}
+    if all(v is None for v in values.values()):
+        return None
+    return sum(coeff * (values[k] or 0) for k, coeff in PERFORMANCE_COEFFS.items())
+
+
+def performance_weights(posts: Iterable[Dict]) -> Dict[str, float]:
+    """投稿キューの実績からテンプレートIDごとの重みを作る
+
+    重み = テンプレートの平均スコア（全体平均へ PERFORMANCE_PRIOR 件分寄せる）/ 全体平均。
+    WEIGHT_MIN〜WEIGHT_MAX に丸める。実績が無ければ {}。
+    """
+    scores: Dict[str, List[float]] = {}
+    for post in posts:
+        template_id = post.get("template_id")
+        score = _score(post.get("performance") or {})
+        if template_id and score is not None:
+            scores.setdefault(template_id, []).append(score)
+    all_scores = [s for values in scores.values() for s in values]
+    if not all_scores:
+        return {}
+    mean = sum(all_scores) / len(all_scores)
+    if mean <= 0:
+        return {}
+    weights = {}
+    for template_id, values in scores.items():
+        shrunk = (sum(values) + PERFORMANCE_PRIOR * mean) / (len(values) + PERFORMANCE_PRIOR)
+        weights[template_id] = min(max(shrunk / mean, WEIGHT_MIN), WEIGHT_MAX)
+    return weights
+
+
+# ===================================================================
+# ベンチマーク
+# ===================================================================
+
+def _linear_pick(templates: List[Dict], category: str = None, psychology: str = None,
+                 cta: str = None) -> Optional[Dict]:
+    """従来の pick_template / get_template_for_generation と同じ線形フィルタ（比較用）"""
+    pool = templates
+    if category:
+        pool = [t for t in pool if t.get("category") == category]
+    if psychology:
+        keywords = PSYCHOLOGY_ALIASES.get(psychology, [psychology])
+        pool = [t for t in pool if any(kw in t.get("psychology", "") for kw in keywords)]
+    if cta:
+        pool = [t for t in pool if any(
+            s.get("cta_type") == cta for s in t.get("slides", []) if s.get("type") == "cta"
+        )]
+    return random.choice(pool) if pool else None
+
+
+def bench(templates: List[Dict], n: int = 50000) -> Dict[str, float]:
+    """線形フィルタとインデックス選択の1秒あたり選択数を比較する"""
+    index = TemplateIndex(templates)
+    categories = sorted(index.category) or [None]
+    families = [None] + sorted(PSYCHOLOGY_ALIASES)
+    ctas = [None] + sorted(index.cta)
+    queries = [(c, p, k) for c in categories for p in families for k in ctas]
+    results = {}
+    for name, fn in (("linear", lambda q: _linear_pick(templates, *q)),
+                     ("indexed", lambda q: index.pick(*q))):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(queries[i % len(queries)])
+        results[name] = n / (time.perf_counter() - start)
+    return results
+
+
+# ===================================================================
+# メイン
+# ===================================================================
+
+def _load(path: Path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def main():
+    parser = argparse.ArgumentParser(description="カルーセルテンプレート選択インデックス")
+    parser.add_argument("--bench", action="store_true", help="選択スループットを計測")
+    parser.add_argument("-n", type=int, default=50000, help="--bench の選択回数")
+    args = parser.parse_args()
+
+    templates = _load(TEMPLATES_PATH, [])
+    if args.bench:
+        results = bench(templates, args.n)
+        print(f"[BENCH] {len(templates)} templates, {args.n} picks")
+        for name, rate in results.items():
+            print(f"  {name:8s} {rate:12,.0f} picks/s")
+        if results["linear"]:
+            print(f"  speedup  {results['indexed'] / results['linear']:.1f}x")
+        return
+
+    weights = performance_weights(_load(QUEUE_PATH, {}).get("posts", []))
+    index = TemplateIndex(templates, weights)
+    print(f"テンプレート: {len(templates)}本")
+    for label, table in (("カテゴリ", index.category), ("心理学", index.psychology),
+                         ("CTA", index.cta)):
+        print(f"  {label}: " + ", ".join(f"{k}={len(v)}" for k, v in sorted(table.items())))
+    if weights:
+        print("実績ウェイト:")
+        for template_id, weight in sorted(weights.items(), key=lambda kv: -kv[1]):
+            print(f"  {template_id:8s} {weight:.2f}")
+    else:
+        print("実績ウェイト: なし（template_id つきの実績が未収集）")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,6 @@ TikTokプロフィールページをcurlで取得し、埋め込みJSONから
 """
 
 import argparse
-import csv
 import json
 import os
 import re
@@ -21,13 +20,16 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+import slack_client
+from kpi_store import open_store
+from runtime_config import load_env
+
 PROJECT_DIR = Path(__file__).parent.parent
 QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 KPI_FILE = PROJECT_DIR / "data" / "kpi_log.csv"
 COOKIE_FILE = PROJECT_DIR / "TK_cookies_robby15051.json"
 COOKIE_TXT = PROJECT_DIR / "data" / ".tiktok_cookies.txt"
 LOG_DIR = PROJECT_DIR / "logs"
-ENV_FILE = PROJECT_DIR / ".env"
 TIKTOK_USERNAME = "robby15051"
 
 USER_AGENT = (
@@ -36,27 +38,9 @@ USER_AGENT = (
 )
 
 
-def load_env():
-    """Load .env file."""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 def slack_notify(message):
-    """Slack notification."""
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception as e:
-        print(f"[WARN] Slack notification failed: {e}")
+    """Slack notification (coalesced via slack_client)."""
+    slack_client.notify(message)
 
 
 def log_event(event_type, data):
@@ -647,71 +631,48 @@ def update_queue_performance(videos):
     return updated_count > 0
 
 
-def append_kpi(profile):
-    """Append today's KPI row to data/kpi_log.csv.
+def _write_kpi(profile, total_views, videos=None):
+    """Upsert today's KPI row into the KPI store and re-export kpi_log.csv.
 
-    CSV header: date,tiktok_followers,tiktok_videos,tiktok_total_views,tiktok_total_likes,lp_visitors,line_registrations
+    lp_visitors / line_registrations are preserved by the store when the
+    new value is 0 (they are filled in manually, not by this script).
+    Manual edits to kpi_log.csv since the last export are merged into the
+    store before it is re-exported.
     """
-    if not profile:
-        print("  [ERROR] No profile data, cannot append KPI")
-        return False
-
-    KPI_FILE.parent.mkdir(parents=True, exist_ok=True)
     today = datetime.now().strftime("%Y-%m-%d")
+    store = open_store(csv_path=KPI_FILE)
+    updated = store.upsert_profile(today, {
+        "tiktok_followers": profile.get("followers", 0),
+        "tiktok_videos": profile.get("video_count", 0),
+        "tiktok_total_views": total_views,
+        "tiktok_total_likes": profile.get("heart_count", 0),
+    })
+    if videos:
+        store.upsert_videos(today, videos)
+    store.export_csv(KPI_FILE)
 
-    # Read existing file to check if today already has an entry
-    existing_rows = []
-    today_exists = False
-
-    if KPI_FILE.exists():
-        with open(KPI_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                existing_rows.append(row)
-                if row and row[0] == today:
-                    today_exists = True
-
-    # Prepare the new row
-    new_row = [
-        today,
-        str(profile.get("followers", 0)),
-        str(profile.get("video_count", 0)),
-        str(profile.get("heart_count", 0)),  # total_views approximation from heart
-        str(profile.get("heart_count", 0)),  # total_likes
-        "0",  # lp_visitors - not tracked here
-        "0",  # line_registrations - not tracked here
-    ]
-
-    # Note: The CSV header uses tiktok_total_views and tiktok_total_likes.
-    # heart_count is total likes. Total views isn't available at profile level
-    # without summing per-video data. We'll use 0 for views if we can't sum them.
-
-    if today_exists:
-        # Update existing row for today
-        with open(KPI_FILE, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            for row in existing_rows:
-                if row and row[0] == today:
-                    # Preserve lp_visitors and line_registrations if they were set
-                    if len(row) >= 6 and row[5] != "0":
-                        new_row[5] = row[5]
-                    if len(row) >= 7 and row[6] != "0":
-                        new_row[6] = row[6]
-                    writer.writerow(new_row)
-                else:
-                    writer.writerow(row)
+    if updated:
         print(f"  Updated KPI for {today} in {KPI_FILE.name}")
     else:
-        # Append new row
-        with open(KPI_FILE, 'a', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            f.write("\n".join([]) if not existing_rows else "")
-            writer.writerow(new_row)
         print(f"  Appended KPI for {today} to {KPI_FILE.name}")
-
     return True
 
 
+def append_kpi(profile):
+    """Append today's KPI row to the KPI store (exported to data/kpi_log.csv).
+
+    CSV header: date,tiktok_followers,tiktok_videos,tiktok_total_views,tiktok_total_likes,lp_visitors,line_registrations
+    """
+    if not profile:
+        print("  [ERROR] No profile data, cannot append KPI")
+        return False
+
+    # Note: heart_count is total likes. Total views isn't available at profile
+    # level without summing per-video data, so heart_count is used as an
+    # approximation here (append_kpi_with_videos sums the real views).
+    return _write_kpi(profile, profile.get("heart_count", 0))
+
+
 def compute_total_views(profile, videos):
     """If we have per-video data, sum the views for a more accurate total_views.
     Otherwise fall back to 0 (profile-level view count is not exposed by TikTok).
@@ -728,51 +689,7 @@ def append_kpi_with_videos(profile, videos):
         return False
 
     total_views = compute_total_views(profile, videos)
-
-    KPI_FILE.parent.mkdir(parents=True, exist_ok=True)
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    # Read existing data
-    existing_rows = []
-    today_index = -1
-
-    if KPI_FILE.exists():
-        with open(KPI_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                existing_rows.append(row)
-                if row and row[0] == today:
-                    today_index = i
-
-    new_row = [
-        today,
-        str(profile.get("followers", 0)),
-        str(profile.get("video_count", 0)),
-        str(total_views),
-        str(profile.get("heart_count", 0)),
-        "0",  # lp_visitors
-        "0",  # line_registrations
-    ]
-
-    if today_index >= 0:
-        # Preserve lp_visitors and line_registrations from existing row
-        old_row = existing_rows[today_index]
-        if len(old_row) >= 6 and old_row[5] != "0":
-            new_row[5] = old_row[5]
-        if len(old_row) >= 7 and old_row[6] != "0":
-            new_row[6] = old_row[6]
-        existing_rows[today_index] = new_row
-
-        with open(KPI_FILE, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            for row in existing_rows:
-                writer.writerow(row)
-        print(f"  Updated KPI for {today} in {KPI_FILE.name}")
-    else:
-        with open(KPI_FILE, 'a', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(new_row)
-        print(f"  Appended KPI for {today} to {KPI_FILE.name}")
+    _write_kpi(profile, total_views, videos)
 
     print(f"    followers={profile.get('followers', 0)}, "
           f"videos={profile.get('video_count', 0)}, "
@@ -17,21 +17,11 @@ import sys
 import time
 from pathlib import Path
 
+from runtime_config import load_env
+
 PROJECT_DIR = Path(__file__).parent.parent
 COOKIE_FILE = PROJECT_DIR / "data" / ".tiktok_cookies.txt"
 COOKIE_JSON = PROJECT_DIR / "data" / ".tiktok_cookies.json"
-ENV_FILE = PROJECT_DIR / ".env"
-
-
-def load_env():
-    """Load .env file"""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
 
 
 def setup_auth_interactive():
@@ -18,11 +18,14 @@ Upload-Post.com API経由でTikTokにフォトカルーセルを投稿
 import argparse
 import json
 import os
-import subprocess
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import content_catalog
+import slack_client
+from runtime_config import load_env
+
 try:
     import requests
 except ImportError:
@@ -34,7 +37,6 @@ except ImportError:
 # ============================================================
 
 PROJECT_DIR = Path(__file__).parent.parent
-ENV_FILE = PROJECT_DIR / ".env"
 READY_DIR = PROJECT_DIR / "content" / "ready"
 QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 POST_LOG = PROJECT_DIR / "data" / "tiktok_carousel_log.json"
@@ -47,17 +49,6 @@ MIN_SLIDES = 4
 MAX_SLIDES = 35
 
 
-def load_env():
-    """Load .env file"""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 def get_api_key():
     return os.environ.get("UPLOADPOST_API_KEY", "")
 
@@ -67,15 +58,8 @@ def get_user():
 
 
 def slack_notify(message):
-    """Slack通知"""
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception as e:
-        print(f"[WARN] Slack通知失敗: {e}")
+    """Slack通知（slack_client でまとめ送信）"""
+    slack_client.notify(message)
 
 
 def log_event(event):
@@ -288,16 +272,11 @@ def get_posted_dirs():
 
 
 def find_next_ready():
-    """次の未投稿readyディレクトリを取得"""
-    if not READY_DIR.exists():
-        return None
-
+    """次の未投稿readyディレクトリを取得（content_catalog から）"""
     posted = get_posted_dirs()
-    for d in sorted(READY_DIR.iterdir()):
-        if d.is_dir() and d.name not in posted:
-            slides = list(d.glob("slide_*.png"))
-            if len(slides) >= MIN_SLIDES:
-                return d
+    for d in content_catalog.ready_dirs(min_slides=MIN_SLIDES):
+        if d.name not in posted and d.is_dir():
+            return d
     return None
 
 
@@ -356,6 +335,8 @@ def post_from_ready_dir(ready_dir):
 
     # posting_queue.json も更新（対応するエントリがあれば）
     update_queue_status(dir_name, result)
+    if result["success"]:
+        content_catalog.mark_posted(ready_dir, "tiktok")
 
     # Slack通知
     if result["success"]:
@@ -442,22 +423,20 @@ def show_status():
 
     # readyコンテンツ
     posted = get_posted_dirs()
-    ready_dirs = sorted(READY_DIR.iterdir()) if READY_DIR.exists() else []
     ready_count = 0
     posted_count = 0
 
     print("content/ready/ ディレクトリ:")
-    for d in ready_dirs:
-        if d.is_dir():
-            slides = list(d.glob("slide_*.png"))
-            if d.name in posted:
-                print(f"  ✅ {d.name} ({len(slides)}枚) — 投稿済み")
-                posted_count += 1
-            elif len(slides) >= MIN_SLIDES:
-                print(f"  ⏳ {d.name} ({len(slides)}枚) — 未投稿")
-                ready_count += 1
-            else:
-                print(f"  ⚠️ {d.name} ({len(slides)}枚) — スライド不足")
+    for r in content_catalog.sets("ready"):
+        name, slides = Path(r["dir"]).name, r["slides"]
+        if name in posted:
+            print(f"  ✅ {name} ({slides}枚) — 投稿済み")
+            posted_count += 1
+        elif slides >= MIN_SLIDES:
+            print(f"  ⏳ {name} ({slides}枚) — 未投稿")
+            ready_count += 1
+        else:
+            print(f"  ⚠️ {name} ({slides}枚) — スライド不足")
 
     print(f"\n投稿済み: {posted_count}件 / 未投稿: {ready_count}件")
 
@@ -27,13 +27,16 @@ import time
 from pathlib import Path
 from datetime import datetime
 
+import content_catalog
+import prerender
+import slack_client
+from runtime_config import load_env
+
 PROJECT_DIR = Path(__file__).parent.parent
 QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 COOKIE_FILE = PROJECT_DIR / "data" / ".tiktok_cookies.txt"
 COOKIE_JSON = PROJECT_DIR / "data" / ".tiktok_cookies.json"
-CONTENT_DIR = PROJECT_DIR / "content" / "generated"
 TEMP_DIR = PROJECT_DIR / "content" / "temp_videos"
-ENV_FILE = PROJECT_DIR / ".env"
 VENV_PYTHON = PROJECT_DIR / ".venv" / "bin" / "python3"
 TIKTOK_USERNAME = "robby15051"
 LOG_DIR = PROJECT_DIR / "logs"
@@ -69,27 +72,9 @@ def atomic_json_write(filepath, data, indent=2):
         raise
 
 
-def load_env():
-    """Load .env file"""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
 def slack_notify(message):
-    """Slack通知"""
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception as e:
-        print(f"[WARN] Slack通知失敗: {e}")
+    """Slack通知（slack_client でまとめ送信）"""
+    slack_client.notify(message)
 
 
 def log_event(event_type, data):
@@ -938,43 +923,16 @@ def upload_to_tiktok(video_path, caption, hashtags, max_retries=2):
 # ============================================================
 
 def find_content_sets():
-    """生成済みコンテンツセットを検索"""
-    content_sets = []
-
-    for json_file in sorted(CONTENT_DIR.rglob("*.json")):
-        if json_file.name == "batch_summary.md":
-            continue
-        slide_dir = json_file.parent / json_file.stem
-        if slide_dir.is_dir() and list(slide_dir.glob("*slide_*.png")):
-            content_sets.append({
-                "json_path": str(json_file),
-                "slide_dir": str(slide_dir),
-                "content_id": json_file.stem,
-                "batch": json_file.parent.name
-            })
-
-    for subdir in sorted(CONTENT_DIR.iterdir()):
-        if subdir.is_dir() and list(subdir.glob("*slide_*.png")):
-            json_candidates = [
-                CONTENT_DIR / f"{subdir.name}.json",
-                CONTENT_DIR / f"test_script_{subdir.name.split('_')[-1]}.json"
-            ]
-            json_path = None
-            for j in json_candidates:
-                if j.exists():
-                    json_path = str(j)
-                    break
-
-            existing = [c["slide_dir"] for c in content_sets]
-            if str(subdir) not in existing:
-                content_sets.append({
-                    "json_path": json_path,
-                    "slide_dir": str(subdir),
-                    "content_id": subdir.name,
-                    "batch": "standalone"
-                })
-
-    return content_sets
+    """生成済みコンテンツセットを検索（content_catalog から）"""
+    return [
+        {
+            "json_path": str(PROJECT_DIR / r["json_path"]) if r.get("json_path") else None,
+            "slide_dir": str(PROJECT_DIR / r["dir"]),
+            "content_id": r["content_id"],
+            "batch": r.get("batch") or "standalone",
+        }
+        for r in content_catalog.sets("generated", min_slides=1)
+    ]
 
 
 def init_queue():
@@ -1176,12 +1134,22 @@ def post_next():
     print(f"投稿 #{next_post['id']}: {next_post['content_id']}")
     print(f"{'='*50}")
 
-    # Step 1: 動画生成（アニメーション優先、フォールバックあり）
+    # Step 1: 動画生成（先行レンダリング済みなら引くだけ。アニメーション優先、フォールバックあり）
     TEMP_DIR.mkdir(parents=True, exist_ok=True)
     video_filename = f"tiktok_{next_post['content_id']}_{datetime.now().strftime('%Y%m%d')}.mp4"
     video_path = TEMP_DIR / video_filename
 
-    if not video_path.exists():
+    for video_type in prerender.VIDEO_RENDITIONS:
+        prerendered = prerender.asset(next_post, video_type)
+        if prerendered:
+            break
+    else:
+        prerendered, video_type = None, "animated"
+
+    if prerendered:
+        video_path = prerendered
+        print(f"   ✅ 先行レンダリング済み: {video_path.relative_to(PROJECT_DIR)}")
+    elif not video_path.exists():
         # Try animated version first, fallback to static slideshow
         success = create_video_animated(
             next_post["slide_dir"], video_path,
@@ -1207,7 +1175,7 @@ def post_next():
         next_post["status"] = "posted"
         next_post["posted_at"] = datetime.now().isoformat()
         next_post["verified"] = True
-        next_post["video_type"] = "animated"
+        next_post["video_type"] = video_type
         save_queue(queue)
         record_upload_attempt(next_post["content_id"], success=True)
 
@@ -3,58 +3,63 @@
 エリアページの施設データセクションを公開データで更新する。
 areas.jsのデータを読み込み、各エリアページのHTMLに施設テーブルを挿入/更新する。
 
-Usage: python3 scripts/update_area_pages.py
+テーブルは事前コンパイルしたテンプレートで描画し、同じエリア構成のページ
+（例: 大磯・二宮）では生成済みの断片を使い回す。前回実行時の施設ごとの
+ダイジェストを data/.cache/area_pages.json に保存し、施設データが変わった
+エリアのページ（と前回以降に編集されたページ）だけを再生成する。
+
+Usage:
+    python3 scripts/update_area_pages.py         # 変更のあったページのみ
+    python3 scripts/update_area_pages.py --all   # 全ページ再生成
 """
 
+import argparse
+import hashlib
 import json
 import re
-import subprocess
 from pathlib import Path
+from string import Template
+
+from js_data import JSParseError, load_js_module
+from site_build import match_paths, transform
 
 BASE = Path(__file__).resolve().parent.parent
 AREA_DIR = BASE / "lp" / "job-seeker" / "area"
 
-# areas.js → Node.jsで施設データをJSON出力
+# areas.js → エリアID別の施設データ
 def load_areas_data():
-    """Node.jsでareas.jsを読み込み、JSON形式で取得"""
-    script = """
-    const { AREA_DATABASE } = require('./data/areas.js');
-    const result = {};
-    for (const a of AREA_DATABASE) {
-        result[a.areaId] = {
-            name: a.name,
-            facilityCount: a.facilityCount,
-            nurseAvgSalary: a.nurseAvgSalary,
-            majorFacilities: a.majorFacilities.map(f => ({
-                name: f.name,
-                type: f.type,
-                beds: f.beds,
-                nurseCount: f.nurseCount,
-                nursingRatio: f.nursingRatio || '',
-                emergencyLevel: f.emergencyLevel || '',
-                ownerType: f.ownerType || '',
-                dpcHospital: f.dpcHospital || false,
-                ambulanceCount: f.ambulanceCount || 0,
-                doctorCount: f.doctorCount || 0,
-                ptCount: f.ptCount || 0,
-                access: f.access || '',
-                features: f.features || '',
-                referral: f.referral || false,
-                address: f.address || '',
-                website: f.website || '',
-            }))
-        };
-    }
-    console.log(JSON.stringify(result));
-    """
-    result = subprocess.run(
-        ["node", "-e", script],
-        capture_output=True, text=True, cwd=str(BASE)
-    )
-    if result.returncode != 0:
-        print(f"ERROR: {result.stderr}")
+    """areas.jsを読み込み、areaIdをキーにした表示用データを返す（Node.js不要）"""
+    try:
+        area_db = load_js_module(BASE / "data" / "areas.js")["AREA_DATABASE"]
+    except (OSError, KeyError, JSParseError) as e:
+        print(f"ERROR: {e}")
         return {}
-    return json.loads(result.stdout)
+    result = {}
+    for a in area_db:
+        result[a["areaId"]] = {
+            "name": a["name"],
+            "facilityCount": a.get("facilityCount"),
+            "nurseAvgSalary": a.get("nurseAvgSalary"),
+            "majorFacilities": [{
+                "name": f["name"],
+                "type": f.get("type"),
+                "beds": f.get("beds"),
+                "nurseCount": f.get("nurseCount"),
+                "nursingRatio": f.get("nursingRatio") or "",
+                "emergencyLevel": f.get("emergencyLevel") or "",
+                "ownerType": f.get("ownerType") or "",
+                "dpcHospital": f.get("dpcHospital") or False,
+                "ambulanceCount": f.get("ambulanceCount") or 0,
+                "doctorCount": f.get("doctorCount") or 0,
+                "ptCount": f.get("ptCount") or 0,
+                "access": f.get("access") or "",
+                "features": f.get("features") or "",
+                "referral": f.get("referral") or False,
+                "address": f.get("address") or "",
+                "website": f.get("website") or "",
+            } for f in a["majorFacilities"]],
+        }
+    return result
 
 
 # ページファイル名 → areaId のマッピング
@@ -77,28 +82,23 @@ PAGE_TO_AREA = {
 }
 
 
-def generate_facility_table(facilities, area_name):
-    """施設データからHTMLテーブルを生成"""
-    if not facilities:
-        return ""
-
-    rows = []
-    for f in facilities:
-        referral_badge = '<span style="display:inline-block;background:#E8735A;color:#fff;font-size:0.7rem;font-weight:700;padding:1px 6px;border-radius:3px;margin-left:4px;">紹介可能</span>' if f.get("referral") else ""
+# =============================================================================
+# テンプレート（読み込み時に1回だけコンパイル）
+# =============================================================================
 
-        amb = f.get("ambulanceCount", 0)
-        amb_text = f"年{amb:,}台" if amb > 0 else "—"
+REFERRAL_BADGE = '<span style="display:inline-block;background:#E8735A;color:#fff;font-size:0.7rem;font-weight:700;padding:1px 6px;border-radius:3px;margin-left:4px;">紹介可能</span>'
+REFERRAL_ROW_STYLE = "  style='background:rgba(232,115,90,0.06);'"
 
-        rows.append(f"""                    <tr{"  style='background:rgba(232,115,90,0.06);'" if f.get('referral') else ""}>
-                        <td><strong>{f['name']}</strong>{referral_badge}<br><small>{f.get('ownerType', '')}・{f['type']}</small></td>
-                        <td>{f.get('nursingRatio', '—')}</td>
-                        <td>{f.get('emergencyLevel', '—')}</td>
-                        <td>{f.get('nurseCount', 0)}名</td>
-                        <td>{f.get('beds', 0)}床</td>
-                        <td>{amb_text}</td>
+ROW_TEMPLATE = Template("""                    <tr$row_style>
+                        <td><strong>$name</strong>$badge<br><small>$owner・$type</small></td>
+                        <td>$nursing_ratio</td>
+                        <td>$emergency</td>
+                        <td>$nurses名</td>
+                        <td>$beds床</td>
+                        <td>$ambulance</td>
                     </tr>""")
 
-    return f"""
+TABLE_TEMPLATE = Template("""
             <div style="overflow-x:auto;">
             <table class="data-table">
                 <thead>
@@ -112,58 +112,156 @@ def generate_facility_table(facilities, area_name):
                     </tr>
                 </thead>
                 <tbody>
-{"".join(rows)}
+$rows
                 </tbody>
             </table>
             </div>
-            <p style="font-size:0.8rem;color:#888;margin-top:8px;">データ出典：厚生労働省 病床機能報告（令和5年度）・医療情報ネット（2025年12月時点）</p>"""
+            <p style="font-size:0.8rem;color:#888;margin-top:8px;">データ出典：厚生労働省 病床機能報告（令和5年度）・医療情報ネット（2025年12月時点）</p>""")
+
+MARKER_START = "<!-- FACILITY_TABLE_START -->"
+MARKER_END = "<!-- FACILITY_TABLE_END -->"
+MARKER_RE = re.compile(re.escape(MARKER_START) + r'.*?' + re.escape(MARKER_END), re.DOTALL)
+HEADING_PATTERNS = [
+    re.compile(r'(<h2[^>]*>.*?医療機関.*?</h2>)', re.DOTALL),
+    re.compile(r'(<h2[^>]*>.*?病院.*?</h2>)', re.DOTALL),
+]
+
+
+def render_row(f):
+    amb = f.get("ambulanceCount", 0)
+    referral = f.get("referral")
+    return ROW_TEMPLATE.substitute(
+        row_style=REFERRAL_ROW_STYLE if referral else "",
+        name=f["name"],
+        badge=REFERRAL_BADGE if referral else "",
+        owner=f.get("ownerType", ""),
+        type=f["type"],
+        nursing_ratio=f.get("nursingRatio", "—"),
+        emergency=f.get("emergencyLevel", "—"),
+        nurses=f.get("nurseCount", 0),
+        beds=f.get("beds", 0),
+        ambulance=f"年{amb:,}台" if amb > 0 else "—",
+    )
 
 
-def update_page(filepath, areas_data, area_ids):
-    """1ページのHTMLを更新"""
-    text = filepath.read_text(encoding="utf-8")
+def generate_facility_table(facilities, area_name):
+    """施設データからHTMLテーブルを生成"""
+    if not facilities:
+        return ""
+    return TABLE_TEMPLATE.substitute(rows="".join(render_row(f) for f in facilities))
+
 
-    # 対象エリアの施設を集める
-    all_facilities = []
+# =============================================================================
+# エリア単位の断片キャッシュ・差分検出
+# =============================================================================
+
+STATE_PATH = BASE / "data" / ".cache" / "area_pages.json"
+
+_fragments = {}  # (areaId, ...) + 施設ダイジェスト → テーブルHTML
+
+
+def _digest(obj):
+    return hashlib.sha1(json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def facility_digests(areas_data):
+    """{areaId: {施設名: ダイジェスト}}（表示に使う項目のみ）"""
+    result = {}
+    for aid, area in areas_data.items():
+        digests = {}
+        for i, f in enumerate(area["majorFacilities"]):
+            # 並び順もテーブルに影響するので位置を含める
+            digests[f["name"]] = _digest([i, f])
+        digests["__area__"] = _digest([area["name"], len(area["majorFacilities"])])
+        result[aid] = digests
+    return result
+
+
+def changed_facilities(old, new):
+    """前回から変わった施設 {areaId: [施設名, ...]}（追加・削除・変更）"""
+    changed = {}
+    for aid in set(old) | set(new):
+        before, after = old.get(aid, {}), new.get(aid, {})
+        names = sorted(n for n in set(before) | set(after) if before.get(n) != after.get(n))
+        if names:
+            changed[aid] = names
+    return changed
+
+
+def facility_table(areas_data, area_ids):
+    """area_ids の施設テーブル（同じエリア構成のページ間で共有する）"""
+    facilities = []
     for aid in area_ids:
         if aid in areas_data:
-            all_facilities.extend(areas_data[aid]["majorFacilities"])
+            facilities.extend(areas_data[aid]["majorFacilities"])
+    if not facilities:
+        return None, 0
+    key = (tuple(area_ids), _digest(facilities))
+    html = _fragments.get(key)
+    if html is None:
+        html = _fragments[key] = generate_facility_table(facilities, "")
+    return html, len(facilities)
+
+
+def load_state():
+    if STATE_PATH.exists():
+        try:
+            return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {"areas": {}, "pages": {}}
 
-    if not all_facilities:
-        print(f"  SKIP {filepath.name}: 施設データなし")
-        return False
 
-    area_name = areas_data[area_ids[0]]["name"] if area_ids[0] in areas_data else ""
+def save_state(state):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps(state, ensure_ascii=False, indent=1), encoding="utf-8")
 
-    # 施設テーブルHTMLを生成
-    table_html = generate_facility_table(all_facilities, area_name)
+
+def dirty_pages(state, digests, force=False):
+    """再生成が必要なページ {ページ名: 理由}
+
+    施設データが変わったエリアを含むページと、前回の生成後に手で編集されたページ。
+    """
+    changed = changed_facilities(state.get("areas", {}), digests)
+    pages = {}
+    for page_name, area_ids in PAGE_TO_AREA.items():
+        filepath = AREA_DIR / page_name
+        if not filepath.exists():
+            continue
+        hit = [aid for aid in area_ids if aid in changed]
+        if force:
+            pages[page_name] = "all"
+        elif hit:
+            pages[page_name] = ", ".join(f"{aid}: {len(changed[aid])}件変更" for aid in hit)
+        elif state.get("pages", {}).get(page_name) != _file_hash(filepath):
+            pages[page_name] = "ページ更新あり"
+    return pages, changed
+
+
+def _file_hash(path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def apply_facility_table(text, areas_data, area_ids):
+    """施設テーブルを挿入/更新した HTML と件数を返す。更新できない場合は (None, 理由)"""
+    # 施設テーブルHTML（同じエリア構成なら生成済みの断片を使う）
+    table_html, n_facilities = facility_table(areas_data, area_ids)
+    if table_html is None:
+        return None, "施設データなし"
 
     # 「主な医療機関」セクションの直後にテーブルを挿入/更新
     # パターン: <h2>...主な医療機関...</h2> の後、次の</section>の前
 
-    # 既存のテーブルがあれば置き換え
-    marker_start = "<!-- FACILITY_TABLE_START -->"
-    marker_end = "<!-- FACILITY_TABLE_END -->"
-
-    if marker_start in text:
+    if MARKER_START in text:
         # 既存テーブルを置き換え
-        pattern = re.compile(
-            re.escape(marker_start) + r'.*?' + re.escape(marker_end),
-            re.DOTALL
-        )
-        new_block = f"{marker_start}\n{table_html}\n            {marker_end}"
-        text = pattern.sub(new_block, text)
+        new_block = f"{MARKER_START}\n{table_html}\n            {MARKER_END}"
+        text = MARKER_RE.sub(lambda m: new_block, text)
     else:
         # 「主な医療機関」セクションを探してテーブルを挿入
         # h2タグで「医療機関」を含むものを探す
-        patterns_to_try = [
-            r'(<h2[^>]*>.*?医療機関.*?</h2>)',
-            r'(<h2[^>]*>.*?病院.*?</h2>)',
-        ]
-
         inserted = False
-        for pat in patterns_to_try:
-            m = re.search(pat, text, re.DOTALL)
+        for pat in HEADING_PATTERNS:
+            m = pat.search(text)
             if m:
                 # h2の直後にテーブルを挿入
                 insert_pos = m.end()
@@ -172,7 +270,7 @@ def update_page(filepath, areas_data, area_ids):
                 if next_p != -1 and next_p - insert_pos < 500:
                     insert_pos = next_p + len("</p>")
 
-                new_block = f"\n\n            {marker_start}\n{table_html}\n            {marker_end}\n"
+                new_block = f"\n\n            {MARKER_START}\n{table_html}\n            {MARKER_END}\n"
                 text = text[:insert_pos] + new_block + text[insert_pos:]
                 inserted = True
                 break
@@ -181,25 +279,68 @@ def update_page(filepath, areas_data, area_ids):
             # フォールバック: 最初の</section>の前に挿入
             first_section_end = text.find("</section>", text.find("<section>", text.find("</header>")))
             if first_section_end != -1:
-                new_block = f"\n            {marker_start}\n{table_html}\n            {marker_end}\n        </div>\n    "
+                new_block = f"\n            {MARKER_START}\n{table_html}\n            {MARKER_END}\n        </div>\n    "
                 text = text[:first_section_end] + new_block + text[first_section_end:]
                 inserted = True
 
         if not inserted:
-            print(f"  WARN {filepath.name}: 挿入位置が見つからない")
-            return False
+            return None, "挿入位置が見つからない"
+
+    return text, n_facilities
 
-    # 施設数の更新: facilityCountを使って記述を更新
-    fc = areas_data[area_ids[0]].get("facilityCount", {}) if area_ids[0] in areas_data else {}
-    h_count = fc.get("hospitals", 0)
-    c_count = fc.get("clinics", 0)
 
+def update_page(filepath, areas_data, area_ids):
+    """1ページのHTMLを更新（内容が変わらなければ書かない）"""
+    old = filepath.read_text(encoding="utf-8")
+    text, result = apply_facility_table(old, areas_data, area_ids)
+    if text is None:
+        label = "SKIP" if result == "施設データなし" else "WARN"
+        print(f"  {label} {filepath.name}: {result}")
+        return False
+
+    if text == old:
+        print(f"  OK {filepath.name}: 変更なし（{result}施設）")
+        return False
     filepath.write_text(text, encoding="utf-8")
-    print(f"  OK {filepath.name}: {len(all_facilities)}施設のテーブル挿入")
+    print(f"  OK {filepath.name}: {result}施設のテーブル挿入")
     return True
 
 
+# site_build 用: areas.js が変わった時だけ読み直す
+_areas_cache = {}
+
+
+def _areas_data():
+    st = (BASE / "data" / "areas.js").stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _areas_cache.get("stamp") != stamp:
+        data = load_areas_data()
+        _areas_cache.update(stamp=stamp, data=data, digest=_digest(facility_digests(data)))
+    return _areas_cache["data"]
+
+
+def _areas_key():
+    """施設データの内容で決まる署名（areas.js の mtime だけの変化では再実行しない）"""
+    _areas_data()
+    return _areas_cache["digest"]
+
+
+@transform("area_table", match_paths(*(f"lp/job-seeker/area/{name}" for name in PAGE_TO_AREA)),
+           key=_areas_key)
+def area_table_transform(page):
+    old = page.text
+    text, result = apply_facility_table(old, _areas_data(), PAGE_TO_AREA[page.name])
+    if text is None or text == old:
+        return None
+    page.text = text
+    return [f"{result}施設のテーブル更新"]
+
+
 def main():
+    parser = argparse.ArgumentParser(description="エリアページの施設テーブル更新")
+    parser.add_argument("--all", action="store_true", help="変更の有無にかかわらず全ページ再生成")
+    args = parser.parse_args()
+
     print("エリアページ更新開始...")
     areas_data = load_areas_data()
     if not areas_data:
@@ -208,17 +349,32 @@ def main():
 
     print(f"areas.jsから{len(areas_data)}エリア読み込み完了")
 
+    state = load_state()
+    digests = facility_digests(areas_data)
+    pages, changed = dirty_pages(state, digests, force=args.all)
+    for aid, names in sorted(changed.items()):
+        shown = [n for n in names if n != "__area__"]
+        print(f"  変更: {aid} {len(shown)}施設" + (f"（{', '.join(shown[:5])}{' ...' if len(shown) > 5 else ''}）" if shown else ""))
+    print(f"再生成対象: {len(pages)}/{len(PAGE_TO_AREA)}ページ")
+
     updated = 0
+    page_hashes = dict(state.get("pages", {}))
     for page_name, area_ids in PAGE_TO_AREA.items():
         filepath = AREA_DIR / page_name
         if not filepath.exists():
             print(f"  SKIP {page_name}: ファイルなし")
+            page_hashes.pop(page_name, None)
+            continue
+        if page_name not in pages:
             continue
 
+        print(f"  [{pages[page_name]}]", end="")
         if update_page(filepath, areas_data, area_ids):
             updated += 1
+        page_hashes[page_name] = _file_hash(filepath)
 
-    print(f"\n✅ {updated}ページ更新完了")
+    save_state({"areas": digests, "pages": page_hashes})
+    print(f"\n✅ {updated}ページ更新完了（テーブル生成 {len(_fragments)}種類）")
 
 
 if __name__ == "__main__":
@@ -13,13 +13,15 @@
 - worker_facilities.js の features/beds 更新用データ
 """
 
-import openpyxl
 import json
 import csv
 import os
 import re
 from datetime import datetime
 
+from excel_cache import load_tables
+from facility_matcher import FacilityIndex
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, 'data', 'public_data')
 
@@ -84,17 +86,21 @@ def parse_shisetsu_kijun():
 
     hospitals = {}
 
+    available = []
     for filepath, category in files:
         if not os.path.exists(filepath):
             print(f"WARNING: {filepath} not found, skipping")
             continue
+        available.append((filepath, category))
 
-        wb = openpyxl.load_workbook(filepath, read_only=True)
-        ws = wb[wb.sheetnames[0]]
+    # 2つの項目別ワークブックは並列に変換（2回目以降はキャッシュ）
+    tables = load_tables([f for f, _ in available], sheet=0, min_row=5, data_only=False)
 
-        for row in ws.iter_rows(min_row=5, values_only=True):
-            if not row[7]:
-                continue
+    for (filepath, category), table in zip(available, tables):
+        # Check if in target area (name present and address contains a target city)
+        target = table.both(table.notnull(7), table.contains_any(9, TARGET_CITIES))
+
+        for row in table.rows(target):
             name = str(row[7]).strip()
             address = str(row[9]) if row[9] else ''
             todoke = str(row[3]) if row[3] else ''
@@ -103,11 +109,6 @@ def parse_shisetsu_kijun():
             biko_key = str(row[17]).strip() if row[17] else ''
             biko_val = str(row[18]).strip() if row[18] else ''
 
-            # Check if in target area
-            in_target = any(city in address for city in TARGET_CITIES)
-            if not in_target:
-                continue
-
             if name not in hospitals:
                 hospitals[name] = {
                     'name': name,
@@ -129,8 +130,6 @@ def parse_shisetsu_kijun():
                 key = biko_key.rstrip(':：')
                 hospitals[name]['entries'][-1]['details'][key] = biko_val
 
-        wb.close()
-
     return hospitals
 
 
@@ -302,13 +301,13 @@ def update_ward_data(new_data):
     updated_count = 0
     added_count = 0
 
+    # Name index over existing hospitals (new entries are added as we go)
+    name_index = FacilityIndex.build((name, name) for name in existing)
+
     for full_name, data in new_data.items():
-        # Find matching hospital in existing data (by partial name match)
-        short_name = None
-        for existing_name in existing:
-            if existing_name in full_name or full_name in existing_name:
-                short_name = existing_name
-                break
+        # Find matching hospital in existing data (exact / core / partial name match)
+        m = name_index.best(full_name)
+        short_name = m.key if m else None
 
         # Build ward list in existing format
         new_wards = []
@@ -405,6 +404,7 @@ def update_ward_data(new_data):
             simple_name = re.sub(r'^[\s　]+', '', simple_name)
 
             existing[simple_name] = entry
+            name_index.add(simple_name, simple_name)
             added_count += 1
 
     # Save updated file
@@ -13,16 +13,28 @@ ROBBY THE MATCH - sitemap.xml 自動更新スクリプト
 出力:
   - sitemap.xml（ルート直下）
   - lp/sitemap.xml（同一内容）
+  - URL数が 50,000 を超える場合は sitemap-1.xml, sitemap-2.xml ... に分割し、
+    sitemap.xml はサイトマップインデックスになる
+
+lastmod:
+  data/sitemap_manifest.json に URL ごとの内容ハッシュと lastmod を保存し、
+  ページの内容が変わった時だけ lastmod を今日の日付に進める
+  （git checkout 等でファイルの mtime が変わっても lastmod は動かない）。
+  マニフェストが無い初回は既存の sitemap.xml の lastmod を引き継ぐ。
 
 実行:
   python3 scripts/update_sitemap.py
 """
 
 import glob
+import hashlib
+import json
 import os
+import re
 import sys
+import tempfile
 from datetime import date
-from xml.dom.minidom import Document
+from xml.sax.saxutils import escape
 
 # === 設定 ===
 BASE_URL = "https://quads-nurse.com/"
@@ -32,6 +44,14 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_ROOT_SITEMAP = os.path.join(PROJECT_ROOT, "sitemap.xml")
 OUTPUT_LP_SITEMAP = os.path.join(PROJECT_ROOT, "lp", "sitemap.xml")
 
+# URL ごとの内容ハッシュと lastmod
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "data", "sitemap_manifest.json")
+
+# サイトマップ1ファイルあたりの上限（sitemaps.org の仕様）
+MAX_URLS_PER_SITEMAP = 50000
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
 # 今日の日付
 TODAY = date.today().isoformat()
 
@@ -46,14 +66,83 @@ def file_to_url(filepath):
     return url
 
 
-def get_lastmod(filepath):
-    """ファイルの最終更新日を取得する"""
-    mtime = os.path.getmtime(filepath)
-    return date.fromtimestamp(mtime).isoformat()
-
-
-def discover_pages():
-    """全ページを走査して URL エントリのリストを返す"""
+def _atomic_write(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def content_hash(filepath):
+    """ページ内容のハッシュ（lastmod の判定用）"""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# =============================================================================
+# マニフェスト（url → {hash, lastmod}）
+# =============================================================================
+
+def _lastmods_from_sitemap(path=OUTPUT_ROOT_SITEMAP):
+    """既存 sitemap.xml の loc → lastmod（マニフェストが無い初回の引き継ぎ用）"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    pattern = re.compile(r"<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>")
+    return {loc.strip(): lastmod.strip() for loc, lastmod in pattern.findall(text)}
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{"pages": {url: {"hash": ..., "lastmod": ...}}} を返す"""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    seeded = _lastmods_from_sitemap()
+    # ハッシュは未知なので、初回は lastmod だけ引き継いでハッシュを記録する
+    return {"pages": {url: {"hash": None, "lastmod": lastmod} for url, lastmod in seeded.items()},
+            "seeded": True}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    manifest = {"pages": dict(sorted(manifest["pages"].items()))}
+    data = json.dumps(manifest, ensure_ascii=False, indent=1) + "\n"
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == data:
+                return False
+    _atomic_write(path, data.encode("utf-8"))
+    return True
+
+
+def get_lastmod(filepath, manifest, today=TODAY):
+    """内容ハッシュが前回と同じなら前回の lastmod、変わっていれば今日の日付"""
+    url = file_to_url(filepath)
+    digest = content_hash(filepath)
+    pages = manifest["pages"]
+    prev = pages.get(url)
+    if prev and (prev["hash"] == digest or (prev["hash"] is None and manifest.get("seeded"))):
+        lastmod = prev["lastmod"]
+    else:
+        lastmod = today
+    pages[url] = {"hash": digest, "lastmod": lastmod}
+    return lastmod
+
+
+def discover_pages(manifest):
+    """全ページを走査して URL エントリのリストを返す
+
+    manifest は走査したページのハッシュ・lastmod で更新され、無くなったページは削除される。
+    """
     entries = []
 
     # --- 固定ページ（トップ、プライバシー、利用規約） ---
@@ -67,7 +156,7 @@ def discover_pages():
         if os.path.exists(filepath):
             entries.append({
                 "loc": file_to_url(filepath),
-                "lastmod": get_lastmod(filepath),
+                "lastmod": get_lastmod(filepath, manifest),
                 "changefreq": meta["changefreq"],
                 "priority": meta["priority"],
             })
@@ -77,7 +166,7 @@ def discover_pages():
     if os.path.exists(job_seeker_index):
         entries.append({
             "loc": file_to_url(job_seeker_index),
-            "lastmod": get_lastmod(job_seeker_index),
+            "lastmod": get_lastmod(job_seeker_index, manifest),
             "changefreq": "weekly",
             "priority": "1.0",
         })
@@ -87,7 +176,7 @@ def discover_pages():
     if os.path.exists(facility_index):
         entries.append({
             "loc": file_to_url(facility_index),
-            "lastmod": get_lastmod(facility_index),
+            "lastmod": get_lastmod(facility_index, manifest),
             "changefreq": "monthly",
             "priority": "0.5",
         })
@@ -98,7 +187,7 @@ def discover_pages():
     for filepath in area_files:
         entries.append({
             "loc": file_to_url(filepath),
-            "lastmod": get_lastmod(filepath),
+            "lastmod": get_lastmod(filepath, manifest),
             "changefreq": "weekly",
             "priority": "0.8",
         })
@@ -109,7 +198,7 @@ def discover_pages():
     for filepath in guide_files:
         entries.append({
             "loc": file_to_url(filepath),
-            "lastmod": get_lastmod(filepath),
+            "lastmod": get_lastmod(filepath, manifest),
             "changefreq": "monthly",
             "priority": "0.7",
         })
@@ -120,55 +209,120 @@ def discover_pages():
     for filepath in blog_files:
         entries.append({
             "loc": file_to_url(filepath),
-            "lastmod": get_lastmod(filepath),
+            "lastmod": get_lastmod(filepath, manifest),
             "changefreq": "weekly",
             "priority": "0.6",
         })
 
+    seen = {entry["loc"] for entry in entries}
+    manifest["pages"] = {url: v for url, v in manifest["pages"].items() if url in seen}
+    manifest.pop("seeded", None)
     return entries
 
 
-def generate_sitemap_xml(entries):
-    """エントリリストからsitemap.xmlの文字列を生成する"""
-    doc = Document()
-
-    urlset = doc.createElement("urlset")
-    urlset.setAttribute("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
-    doc.appendChild(urlset)
+# =============================================================================
+# XML 出力（ストリーミング）
+# =============================================================================
 
+def iter_urlset(entries):
+    """<urlset> の XML を行単位で生成する"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
     for entry in entries:
-        url_elem = doc.createElement("url")
+        yield (
+            "  <url>\n"
+            f"    <loc>{escape(entry['loc'])}</loc>\n"
+            f"    <lastmod>{escape(entry['lastmod'])}</lastmod>\n"
+            f"    <changefreq>{escape(entry['changefreq'])}</changefreq>\n"
+            f"    <priority>{escape(entry['priority'])}</priority>\n"
+            "  </url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def iter_sitemap_index(sitemaps):
+    """<sitemapindex> の XML を行単位で生成する。sitemaps は (loc, lastmod) のリスト"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for loc, lastmod in sitemaps:
+        yield (
+            "  <sitemap>\n"
+            f"    <loc>{escape(loc)}</loc>\n"
+            f"    <lastmod>{escape(lastmod)}</lastmod>\n"
+            "  </sitemap>\n"
+        )
+    yield "</sitemapindex>\n"
 
-        loc = doc.createElement("loc")
-        loc.appendChild(doc.createTextNode(entry["loc"]))
-        url_elem.appendChild(loc)
 
-        lastmod = doc.createElement("lastmod")
-        lastmod.appendChild(doc.createTextNode(entry["lastmod"]))
-        url_elem.appendChild(lastmod)
-
-        changefreq = doc.createElement("changefreq")
-        changefreq.appendChild(doc.createTextNode(entry["changefreq"]))
-        url_elem.appendChild(changefreq)
-
-        priority = doc.createElement("priority")
-        priority.appendChild(doc.createTextNode(entry["priority"]))
-        url_elem.appendChild(priority)
-
-        urlset.appendChild(url_elem)
-
-    # xml.dom.minidom の toprettyxml は宣言を含む
-    xml_str = doc.toprettyxml(indent="  ", encoding="UTF-8")
-    # bytes -> str
-    return xml_str.decode("utf-8")
-
-
-def write_sitemap(xml_content, output_path):
-    """sitemap.xmlをファイルに書き出す"""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(xml_content)
+def generate_sitemap_xml(entries):
+    """エントリリストからsitemap.xmlの文字列を生成する"""
+    return "".join(iter_urlset(entries))
+
+
+def write_sitemap(chunks, output_path):
+    """XML をストリーミングで一時ファイルに書き、内容が変わっていれば置き換える
+
+    戻り値: 書き換えたか
+    """
+    directory = os.path.dirname(output_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if os.path.exists(output_path) and _same_file(tmp, output_path):
+            os.unlink(tmp)
+            print(f"  -> {output_path} (変更なし)")
+            return False
+        os.replace(tmp, output_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
     print(f"  -> {output_path}")
+    return True
+
+
+def _same_file(a, b):
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            ca, cb = fa.read(1 << 16), fb.read(1 << 16)
+            if ca != cb:
+                return False
+            if not ca:
+                return True
+
+
+def write_sitemaps(entries, outputs=(OUTPUT_ROOT_SITEMAP, OUTPUT_LP_SITEMAP),
+                   max_urls=MAX_URLS_PER_SITEMAP):
+    """sitemap.xml を書き出す。max_urls を超えたら分割してインデックスを作る"""
+    if len(entries) <= max_urls:
+        for path in outputs:
+            write_sitemap(iter_urlset(entries), path)
+        _remove_stale_parts(0)
+        return
+
+    chunks = [entries[i:i + max_urls] for i in range(0, len(entries), max_urls)]
+    sitemaps = []
+    for n, chunk in enumerate(chunks, 1):
+        name = f"sitemap-{n}.xml"
+        write_sitemap(iter_urlset(chunk), os.path.join(PROJECT_ROOT, name))
+        sitemaps.append((BASE_URL + name, max(e["lastmod"] for e in chunk)))
+    for path in outputs:
+        write_sitemap(iter_sitemap_index(sitemaps), path)
+    _remove_stale_parts(len(chunks))
+
+
+def _remove_stale_parts(keep):
+    """前回より分割数が減った場合に残った sitemap-N.xml を消す"""
+    n = keep + 1
+    while os.path.exists(os.path.join(PROJECT_ROOT, f"sitemap-{n}.xml")):
+        os.unlink(os.path.join(PROJECT_ROOT, f"sitemap-{n}.xml"))
+        print(f"  -> sitemap-{n}.xml (削除)")
+        n += 1
 
 
 def main():
@@ -182,7 +336,8 @@ def main():
 
     # ページ走査
     print("[1/3] ページを走査中...")
-    entries = discover_pages()
+    manifest = load_manifest()
+    entries = discover_pages(manifest)
     print(f"  検出ページ数: {len(entries)}")
     print()
 
@@ -216,13 +371,14 @@ def main():
     print()
 
     # XML生成
-    print("[2/3] sitemap.xml を生成中...")
-    xml_content = generate_sitemap_xml(entries)
+    updated = sum(1 for e in entries if e["lastmod"] == TODAY)
+    print(f"[2/3] lastmod 更新: {updated}ページ（内容が変わったページのみ）")
+    if save_manifest(manifest):
+        print(f"  -> {MANIFEST_PATH}")
 
     # 書き出し
     print("[3/3] ファイルを書き出し中...")
-    write_sitemap(xml_content, OUTPUT_ROOT_SITEMAP)
-    write_sitemap(xml_content, OUTPUT_LP_SITEMAP)
+    write_sitemaps(entries)
     print()
 
     # URLリスト表示
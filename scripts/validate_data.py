@@ -4,28 +4,21 @@
 areas.js / jobs.js のデータ品質を自動チェック
 """
 
-import subprocess
-import json
 import sys
 from pathlib import Path
 
+from js_data import JSParseError, load_js_module
+
 project_root = Path(__file__).parent.parent
 
 
 def load_js_data(filepath: Path, var_name: str):
-    """Node.jsでJSファイルを読み込んでJSONとして返す"""
-    script = f"""
-    const data = require('{filepath.resolve()}');
-    console.log(JSON.stringify(data));
-    """
-    result = subprocess.run(
-        ["node", "-e", script],
-        capture_output=True, text=True, cwd=str(project_root)
-    )
-    if result.returncode != 0:
-        print(f"Error loading {filepath.name}: {result.stderr}")
+    """JSファイルの module.exports を読み込んで返す（Node.js不要・mtimeキャッシュ付き）"""
+    try:
+        return load_js_module(filepath)
+    except (OSError, JSParseError) as e:
+        print(f"Error loading {filepath.name}: {e}")
         return None
-    return json.loads(result.stdout)
 
 
 def validate_areas(data):
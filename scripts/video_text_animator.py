@@ -30,6 +30,8 @@ from pathlib import Path
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 
+import image_encode
+
 PROJECT_DIR = Path(__file__).parent.parent
 BGM_DIR = PROJECT_DIR / "content" / "bgm"
 
@@ -709,117 +711,131 @@ def generate_animated_video(metadata_path, output_path=None, with_bgm=True):
     total_frames = int(total_duration * FPS)
     print(f"[ANIM] {content_id}: {len(slides_meta)} slides, {total_duration:.1f}s, {total_frames} frames")
 
-    # Render all frames to a temp directory
-    with tempfile.TemporaryDirectory(prefix="anim_") as tmpdir:
-        tmpdir = Path(tmpdir)
-        frame_pattern = tmpdir / "frame_%05d.jpg"
-
-        # Transition: cross-fade / directional wipe between slides (0.3s overlap)
-        xfade_dur = 0.3
-
-        # P2b: Transition type per slide boundary
-        # Pattern: fade → wipe_left → wipe_up → fade → ...
-        _TRANSITION_TYPES = ["fade", "wipe_left", "wipe_up"]
-
-        for frame_idx in range(total_frames):
-            t = frame_idx / FPS
-
-            # Find which slide we're on
-            slide_idx = 0
-            local_t = t
-            for i, (start, dur) in enumerate(slide_timings):
-                if t >= start and t < start + dur:
-                    slide_idx = i
-                    local_t = t - start
-                    break
-            else:
-                slide_idx = len(slides_meta) - 1
-                local_t = t - slide_timings[-1][0]
-
-            sm = slides_meta[slide_idx]
-            bg = backgrounds[slide_idx]
-            dur = sm.get("duration", 3.0)
-
-            # Check if we're in a crossfade zone
-            _, cur_dur = slide_timings[slide_idx]
-            time_to_end = (slide_timings[slide_idx][0] + cur_dur) - t
-
-            if slide_idx < len(slides_meta) - 1 and time_to_end < xfade_dur:
-                # Transition zone: blend current and next slide
-                next_idx = slide_idx + 1
-                blend_factor = 1.0 - (time_to_end / xfade_dur)
-
-                # Render current frame
-                frame1 = _render_slide_frame(bg, sm, font_path, local_t, dur,
-                                             slide_index=slide_idx)
-                # Render next frame (t=0 for next)
-                next_bg = backgrounds[next_idx]
-                next_sm = slides_meta[next_idx]
-                next_dur = next_sm.get("duration", 3.0)
-                frame2 = _render_slide_frame(next_bg, next_sm, font_path, 0, next_dur,
-                                             slide_index=next_idx)
-
-                # P2b: Select transition type
-                trans_type = _TRANSITION_TYPES[slide_idx % len(_TRANSITION_TYPES)]
-                if trans_type == "fade":
-                    frame = Image.blend(frame1, frame2, blend_factor)
-                elif trans_type == "wipe_left":
-                    frame = directional_wipe(frame1, frame2, blend_factor, direction="left")
-                elif trans_type == "wipe_up":
-                    frame = directional_wipe(frame1, frame2, blend_factor, direction="up")
-                else:
-                    frame = Image.blend(frame1, frame2, blend_factor)
-            else:
-                frame = _render_slide_frame(bg, sm, font_path, local_t, dur,
-                                            slide_index=slide_idx)
-
-            # Save frame
-            frame_path = tmpdir / f"frame_{frame_idx:05d}.jpg"
-            frame.save(str(frame_path), "JPEG", quality=92)
-
-            if frame_idx % (FPS * 2) == 0:
-                print(f"  Frame {frame_idx}/{total_frames} ({t:.1f}s)")
-
-        print(f"  All {total_frames} frames rendered. Encoding...")
-
-        # Encode with ffmpeg
-        cmd = [
-            "ffmpeg", "-y",
-            "-framerate", str(FPS),
-            "-i", str(tmpdir / "frame_%05d.jpg"),
-        ]
-
-        bgm_path = find_bgm() if with_bgm else None
-        if bgm_path:
-            cmd.extend(["-i", bgm_path])
+    # ffmpeg to read raw RGB frames from stdin (no per-frame image files)
+    cmd = [
+        "ffmpeg", "-y",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{canvas_w}x{canvas_h}",
+        "-framerate", str(FPS),
+        "-i", "-",
+    ]
 
+    bgm_path = find_bgm() if with_bgm else None
+    if bgm_path:
+        cmd.extend(["-i", bgm_path])
+
+    cmd.extend([
+        "-c:v", "libx264",
+        "-profile:v", "high",
+        "-level", "4.2",
+        "-preset", "medium",
+        "-crf", "18",
+        "-maxrate", "15M",
+        "-bufsize", "20M",
+        "-pix_fmt", "yuv420p",
+        "-r", str(FPS),
+        "-movflags", "+faststart",
+    ])
+
+    if bgm_path:
         cmd.extend([
-            "-c:v", "libx264",
-            "-profile:v", "high",
-            "-level", "4.2",
-            "-preset", "medium",
-            "-crf", "18",
-            "-maxrate", "15M",
-            "-bufsize", "20M",
-            "-pix_fmt", "yuv420p",
-            "-r", str(FPS),
-            "-movflags", "+faststart",
+            "-map", "0:v", "-map", "1:a",
+            "-af", f"volume=0.15,afade=t=in:d=1,afade=t=out:st={total_duration-1.5}:d=1.5",
+            "-shortest",
         ])
 
-        if bgm_path:
-            cmd.extend([
-                "-map", "0:v", "-map", "1:a",
-                "-af", f"volume=0.15,afade=t=in:d=1,afade=t=out:st={total_duration-1.5}:d=1.5",
-                "-shortest",
-            ])
-
-        cmd.extend(["-t", str(total_duration), str(output_path)])
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        if result.returncode != 0:
-            print(f"  [FFMPEG] Error:\n{result.stderr[-300:]}")
+    cmd.extend(["-t", str(total_duration), str(output_path)])
+
+    # Render frames and stream them to ffmpeg (encodes while rendering)
+    with tempfile.TemporaryFile() as ffmpeg_log:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                stderr=ffmpeg_log)
+        try:
+            # Transition: cross-fade / directional wipe between slides (0.3s overlap)
+            xfade_dur = 0.3
+
+            # P2b: Transition type per slide boundary
+            # Pattern: fade → wipe_left → wipe_up → fade → ...
+            _TRANSITION_TYPES = ["fade", "wipe_left", "wipe_up"]
+
+            for frame_idx in range(total_frames):
+                t = frame_idx / FPS
+
+                # Find which slide we're on
+                slide_idx = 0
+                local_t = t
+                for i, (start, dur) in enumerate(slide_timings):
+                    if t >= start and t < start + dur:
+                        slide_idx = i
+                        local_t = t - start
+                        break
+                else:
+                    slide_idx = len(slides_meta) - 1
+                    local_t = t - slide_timings[-1][0]
+
+                sm = slides_meta[slide_idx]
+                bg = backgrounds[slide_idx]
+                dur = sm.get("duration", 3.0)
+
+                # Check if we're in a crossfade zone
+                _, cur_dur = slide_timings[slide_idx]
+                time_to_end = (slide_timings[slide_idx][0] + cur_dur) - t
+
+                if slide_idx < len(slides_meta) - 1 and time_to_end < xfade_dur:
+                    # Transition zone: blend current and next slide
+                    next_idx = slide_idx + 1
+                    blend_factor = 1.0 - (time_to_end / xfade_dur)
+
+                    # Render current frame
+                    frame1 = _render_slide_frame(bg, sm, font_path, local_t, dur,
+                                                 slide_index=slide_idx)
+                    # Render next frame (t=0 for next)
+                    next_bg = backgrounds[next_idx]
+                    next_sm = slides_meta[next_idx]
+                    next_dur = next_sm.get("duration", 3.0)
+                    frame2 = _render_slide_frame(next_bg, next_sm, font_path, 0, next_dur,
+                                                 slide_index=next_idx)
+
+                    # P2b: Select transition type
+                    trans_type = _TRANSITION_TYPES[slide_idx % len(_TRANSITION_TYPES)]
+                    if trans_type == "fade":
+                        frame = Image.blend(frame1, frame2, blend_factor)
+                    elif trans_type == "wipe_left":
+                        frame = directional_wipe(frame1, frame2, blend_factor, direction="left")
+                    elif trans_type == "wipe_up":
+                        frame = directional_wipe(frame1, frame2, blend_factor, direction="up")
+                    else:
+                        frame = Image.blend(frame1, frame2, blend_factor)
+                else:
+                    frame = _render_slide_frame(bg, sm, font_path, local_t, dur,
+                                                slide_index=slide_idx)
+
+                # Stream frame (raw rgb24, canvas size)
+                if frame.size != (canvas_w, canvas_h):
+                    frame = frame.resize((canvas_w, canvas_h))
+                proc.stdin.write(image_encode.raw_frame(frame))
+
+                if frame_idx % (FPS * 2) == 0:
+                    print(f"  Frame {frame_idx}/{total_frames} ({t:.1f}s)")
+
+            print(f"  All {total_frames} frames rendered. Finishing encode...")
+            proc.stdin.close()
+            returncode = proc.wait(timeout=120)
+        except BrokenPipeError:
+            returncode = proc.wait(timeout=10)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+
+        if returncode != 0:
+            ffmpeg_log.seek(0)
+            stderr = ffmpeg_log.read().decode("utf-8", errors="replace")
+            print(f"  [FFMPEG] Error:\n{stderr[-300:]}")
             return None
 
+    image_encode.report()
     size_mb = os.path.getsize(str(output_path)) / (1024 * 1024)
     print(f"  [OK] {output_path} ({size_mb:.1f} MB)")
     return str(output_path)
@@ -869,7 +885,7 @@ def generate_test_video():
             b = int(c1[2] + (c2[2] - c1[2]) * y / 1920)
             draw.line([(0, y), (1079, y)], fill=(r, g, b))
         stype = "hook" if i == 0 else ("cta" if i == 4 else "content")
-        img.save(test_dir / f"TEST_bg_{i+1:02d}_{stype}.png")
+        image_encode.save(img, test_dir / f"TEST_bg_{i+1:02d}_{stype}.png", "intermediate")
 
     metadata = {
         "content_id": "TEST",
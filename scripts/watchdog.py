@@ -10,21 +10,33 @@
 - Slackにアラート通知
 
 cron: */30 * * * * python3 ~/robby-the-match/scripts/watchdog.py
+常駐: python3 ~/robby-the-match/scripts/watchdog.py --daemon
+      （data/heartbeats をイベント駆動で監視。常駐中は cron 起動が何もせず終わる）
 """
 
+import argparse
+import ctypes
+import ctypes.util
+import fcntl
 import json
 import os
+import queue
+import select
+import struct
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import slack_client
+from runtime_config import load_env, posting_schedule
+
 PROJECT_DIR = Path(__file__).parent.parent
 HEARTBEAT_DIR = PROJECT_DIR / "data" / "heartbeats"
 RECOVERY_LOG = PROJECT_DIR / "data" / "recovery_log.json"
 LOG_DIR = PROJECT_DIR / "logs"
-ENV_FILE = PROJECT_DIR / ".env"
-POSTING_SCHEDULE_FILE = PROJECT_DIR / "data" / "posting_schedule.json"
 POSTING_QUEUE_FILE = PROJECT_DIR / "data" / "posting_queue.json"
 TIKTOK_DISCREPANCY_FILE = PROJECT_DIR / "data" / "tiktok_discrepancy.json"
 
@@ -52,27 +64,15 @@ MAX_RETRIES = 2
 TIKTOK_DISCREPANCY_THRESHOLD = 3
 # TikTok乖離が連続何回検出されたらエスカレーションするか
 TIKTOK_ESCALATION_AFTER = 3
+# TikTok乖離チェックを行う時間帯
+TIKTOK_CHECK_HOURS = (9, 22)
 
-
-def load_env():
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ.setdefault(key.strip(), value.strip())
+# 常駐モードではリカバリが並行するので recovery_log の読み書きを直列化する
+_recovery_log_lock = threading.Lock()
 
 
 def slack_notify(message):
-    try:
-        subprocess.run(
-            ["python3", str(PROJECT_DIR / "scripts" / "notify_slack.py"),
-             "--message", message],
-            capture_output=True, timeout=30
-        )
-    except Exception:
-        pass
+    slack_client.notify(message)
 
 
 def load_recovery_log():
@@ -96,11 +96,10 @@ def get_today_sns_schedule():
     """posting_schedule.json から今日（曜日）の予定投稿時刻を返す。
     Returns: (hour, minute) or None (休止日)
     """
-    if not POSTING_SCHEDULE_FILE.exists():
+    data = posting_schedule()
+    if not data:
         return None
     try:
-        with open(POSTING_SCHEDULE_FILE) as f:
-            data = json.load(f)
         # 曜日名（Mon, Tue, Wed, Thu, Fri, Sat）
         day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
         today_name = day_names[datetime.now().weekday()]
@@ -344,6 +343,43 @@ def save_tiktok_discrepancy_state(state):
         json.dumps(state, indent=2, ensure_ascii=False))
 
 
+def run_tiktok_discrepancy_check(now):
+    """TikTok投稿数乖離をチェックし、連続検出回数を更新する。
+    Returns: (issues, info)
+    """
+    issues = []
+    info = []
+    has_issue, detail, q_count, p_count = check_tiktok_discrepancy()
+
+    disc_state = load_tiktok_discrepancy_state()
+
+    if has_issue:
+        disc_state["consecutive_alerts"] = disc_state.get(
+            "consecutive_alerts", 0) + 1
+        disc_state["last_alert"] = now.isoformat()
+        disc_state["last_queue_posted"] = q_count
+        disc_state["last_profile_count"] = p_count
+        save_tiktok_discrepancy_state(disc_state)
+
+        consecutive = disc_state["consecutive_alerts"]
+
+        if consecutive >= TIKTOK_ESCALATION_AFTER:
+            # エスカレーション: より強い警告
+            issues.append(
+                f"TikTok投稿乖離 [{consecutive}回連続検出]: {detail}"
+                f" — 手動確認が必要（Cookie期限切れ / アカウント制限の可能性）")
+        else:
+            issues.append(f"TikTok投稿乖離: {detail}")
+    else:
+        # 正常に戻ったらカウンタリセット
+        if disc_state.get("consecutive_alerts", 0) > 0:
+            disc_state["consecutive_alerts"] = 0
+            disc_state["resolved_at"] = now.isoformat()
+            save_tiktok_discrepancy_state(disc_state)
+        info.append(f"TikTok: {detail}")
+    return issues, info
+
+
 # ============================================================
 # リカバリ
 # ============================================================
@@ -351,19 +387,20 @@ def attempt_recovery(job_name, script_path, safe_to_recover=True):
     """失敗ジョブの再実行を試行。
     safe_to_recover=False のジョブは、現在が適切な実行タイミングでなければスキップ。
     """
-    recovery = load_recovery_log()
-    today = datetime.now().strftime("%Y-%m-%d")
-    key = f"{job_name}_{today}"
-    attempts = recovery.get(key, 0)
+    with _recovery_log_lock:
+        recovery = load_recovery_log()
+        today = datetime.now().strftime("%Y-%m-%d")
+        key = f"{job_name}_{today}"
+        attempts = recovery.get(key, 0)
 
-    if attempts >= MAX_RETRIES:
-        return "max_retries"
+        if attempts >= MAX_RETRIES:
+            return "max_retries"
 
-    if not safe_to_recover:
-        return "unsafe_time"
+        if not safe_to_recover:
+            return "unsafe_time"
 
-    recovery[key] = attempts + 1
-    save_recovery_log(recovery)
+        recovery[key] = attempts + 1
+        save_recovery_log(recovery)
 
     full_path = PROJECT_DIR / script_path
     if not full_path.exists():
@@ -416,15 +453,16 @@ def attempt_instagram_engage_recovery():
         if not full_path.exists():
             return "script_not_found"
 
-        recovery = load_recovery_log()
-        today = now.strftime("%Y-%m-%d")
-        key = f"instagram_engage_{today}"
-        attempts = recovery.get(key, 0)
-        if attempts >= MAX_RETRIES:
-            return "max_retries"
+        with _recovery_log_lock:
+            recovery = load_recovery_log()
+            today = now.strftime("%Y-%m-%d")
+            key = f"instagram_engage_{today}"
+            attempts = recovery.get(key, 0)
+            if attempts >= MAX_RETRIES:
+                return "max_retries"
 
-        recovery[key] = attempts + 1
-        save_recovery_log(recovery)
+            recovery[key] = attempts + 1
+            save_recovery_log(recovery)
 
         try:
             result = subprocess.run(
@@ -442,6 +480,35 @@ def attempt_instagram_engage_recovery():
         return "wrong_time"
 
 
+def report(now, issues, recovered, info):
+    """結果をログに追記し、問題・復旧があればSlackに通知"""
+    # ─── ログ記録 ───
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_file = LOG_DIR / f"watchdog_{now.strftime('%Y%m%d')}.log"
+    entry = {
+        "ts": now.isoformat(),
+        "issues": issues,
+        "recovered": recovered,
+        "info": info,
+    }
+    with open(log_file, 'a') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    # ─── Slack通知（問題がある場合のみ） ───
+    if issues:
+        slack_notify(
+            f"*[Watchdog v2.0] アラート*\n\n"
+            + "\n".join(f"- {i}" for i in issues)
+            + ("\n\n" + "\n".join(f"+ {r}" for r in recovered)
+               if recovered else "")
+        )
+    elif recovered:
+        slack_notify(
+            f"*[Watchdog v2.0] 自動復旧*\n\n"
+            + "\n".join(f"+ {r}" for r in recovered)
+        )
+
+
 # ============================================================
 # メインウォッチドッグ
 # ============================================================
@@ -517,63 +584,360 @@ def run_watchdog():
                 f"instagram_engage: 復旧失敗 ({result}) — {ig_detail}")
 
     # ─── 4. TikTok投稿数乖離チェック（1日2回: 09時台と22時台に実行） ───
-    if now.hour in (9, 22):
-        has_issue, detail, q_count, p_count = check_tiktok_discrepancy()
+    if now.hour in TIKTOK_CHECK_HOURS:
+        disc_issues, disc_info = run_tiktok_discrepancy_check(now)
+        issues.extend(disc_issues)
+        info.extend(disc_info)
 
-        disc_state = load_tiktok_discrepancy_state()
+    report(now, issues, recovered, info)
 
-        if has_issue:
-            disc_state["consecutive_alerts"] = disc_state.get(
-                "consecutive_alerts", 0) + 1
-            disc_state["last_alert"] = now.isoformat()
-            disc_state["last_queue_posted"] = q_count
-            disc_state["last_profile_count"] = p_count
-            save_tiktok_discrepancy_state(disc_state)
 
-            consecutive = disc_state["consecutive_alerts"]
+# ============================================================
+# 常駐モード（イベント駆動）
+# ============================================================
+# data/heartbeats を inotify（使えなければポーリング）で監視し、
+# その日のジョブごとの期限を前計算した状態機械で判定する。
+#   - ハートビートが exit_code != 0 で書かれたら即リカバリ
+#   - 期限を過ぎてもOKにならなければ、期限の時刻ちょうどに cron と同じ判定をしてリカバリ
+#   - リカバリは別スレッド。失敗したら RECOVERY_RETRY_DELAY 後に再試行（回数は recovery_log で共有）
+# 常駐中は DAEMON_LOCK を保持し、cron 起動の run_watchdog は何もせず終わる（cron はフォールバック）。
+
+DAEMON_LOCK = PROJECT_DIR / "data" / ".watchdog.lock"
+POLL_INTERVAL = 2.0
+RECOVERY_RETRY_DELAY = 120
+RECOVERY_WORKERS = 2
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# ジョブの状態
+WAITING = "waiting"        # 期限前（ハートビート待ち）
+OK = "ok"
+RECOVERING = "recovering"
+RETRY = "retry"            # リカバリ失敗、retry_at に再試行
+GAVE_UP = "gave_up"        # リトライ上限・時間帯外など（翌日に持ち越し）
+
+
+class HeartbeatWatcher:
+    """ハートビートディレクトリの変更を待つ。inotify が使えなければ mtime のポーリング"""
+
+    def __init__(self, directory, force_poll=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._wake_r, self._wake_w = os.pipe()
+        self._fd = None if force_poll else self._inotify_open()
+        self._stamps = self._scan()
+        self.mode = "inotify" if self._fd is not None else "poll"
+
+    def _inotify_open(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            wd = libc.inotify_add_watch(fd, str(self.directory).encode(),
+                                        IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
 
-            if consecutive >= TIKTOK_ESCALATION_AFTER:
-                # エスカレーション: より強い警告
-                issues.append(
-                    f"TikTok投稿乖離 [{consecutive}回連続検出]: {detail}"
-                    f" — 手動確認が必要（Cookie期限切れ / アカウント制限の可能性）")
-            else:
-                issues.append(f"TikTok投稿乖離: {detail}")
+    def _scan(self):
+        stamps = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        stamps[entry.name] = entry.stat().st_mtime_ns
+        except OSError:
+            pass
+        return stamps
+
+    def wake(self):
+        """別スレッドから wait() を起こす"""
+        os.write(self._wake_w, b"\0")
+
+    def wait(self, timeout):
+        """変更されたハートビートのジョブ名の集合を返す（timeout 秒で空集合）"""
+        fds = [self._wake_r] + ([self._fd] if self._fd is not None else [])
+        if self._fd is None:
+            timeout = min(timeout, POLL_INTERVAL)
+        ready, _, _ = select.select(fds, [], [], max(timeout, 0))
+        if self._wake_r in ready:
+            os.read(self._wake_r, 4096)
+
+        changed = set()
+        if self._fd is not None:
+            if self._fd in ready:
+                changed |= self._read_events()
         else:
-            # 正常に戻ったらカウンタリセット
-            if disc_state.get("consecutive_alerts", 0) > 0:
-                disc_state["consecutive_alerts"] = 0
-                disc_state["resolved_at"] = now.isoformat()
-                save_tiktok_discrepancy_state(disc_state)
-            info.append(f"TikTok: {detail}")
+            stamps = self._scan()
+            changed = {name for name, ns in stamps.items() if self._stamps.get(name) != ns}
+            self._stamps = stamps
+        return {name[:-5] for name in changed if name.endswith(".json")}
+
+    def _read_events(self):
+        names = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(buf):
+                _, _, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+                offset += _INOTIFY_EVENT.size
+                names.add(buf[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+                offset += length
+
+
+class Job:
+    """1日分のジョブ状態。期限と判定・リカバリ関数は作成時に決める"""
+
+    def __init__(self, name, expected, deadline, check, recover):
+        self.name = name
+        self.expected = expected
+        self.deadline = deadline
+        self.check = check        # () -> (status, detail)  cron と同じ判定
+        self.recover = recover    # () -> 結果文字列
+        self.state = WAITING
+        self.detail = ""
+        self.retry_at = None
+
+    def next_due(self):
+        """次に時刻で起こすべき時刻（なければ None）"""
+        if self.state == WAITING:
+            return self.deadline
+        if self.state == RETRY:
+            return self.retry_at
+        return None
 
-    # ─── ログ記録 ───
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    log_file = LOG_DIR / f"watchdog_{now.strftime('%Y%m%d')}.log"
-    entry = {
-        "ts": now.isoformat(),
-        "issues": issues,
-        "recovered": recovered,
-        "info": info,
-    }
-    with open(log_file, 'a') as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
-    # ─── Slack通知（問題がある場合のみ） ───
-    if issues:
-        slack_notify(
-            f"*[Watchdog v2.0] アラート*\n\n"
-            + "\n".join(f"- {i}" for i in issues)
-            + ("\n\n" + "\n".join(f"+ {r}" for r in recovered)
-               if recovered else "")
-        )
-    elif recovered:
-        slack_notify(
-            f"*[Watchdog v2.0] 自動復旧*\n\n"
-            + "\n".join(f"+ {r}" for r in recovered)
+def _fixed_check(name, hour, minute, max_dur):
+    def check():
+        status = check_heartbeat(name, hour, minute, max_dur)
+        return status, f"ハートビート {status}"
+    return check
+
+
+def build_jobs(now):
+    """その日のジョブ表（期限を前計算）。日曜は空"""
+    if now.weekday() == 6:
+        return {}
+    day = now.replace(second=0, microsecond=0)
+    jobs = {}
+    for name, (hour, minute, max_dur, script, safe) in FIXED_SCHEDULE_JOBS.items():
+        expected = day.replace(hour=hour, minute=minute)
+        jobs[name] = Job(
+            name, expected, expected + timedelta(minutes=max_dur),
+            _fixed_check(name, hour, minute, max_dur),
+            lambda name=name, script=script, safe=safe: attempt_recovery(
+                name, script, safe_to_recover=safe),
         )
+    schedule = get_today_sns_schedule()
+    if schedule is not None:
+        expected = day.replace(hour=schedule[0], minute=schedule[1])
+        jobs["sns_post"] = Job("sns_post", expected, expected + timedelta(minutes=20),
+                               check_sns_post_heartbeat, attempt_sns_post_recovery)
+    jobs["instagram_engage"] = Job(
+        "instagram_engage", day.replace(hour=12, minute=0), day.replace(hour=13, minute=30),
+        check_instagram_engage_heartbeat, attempt_instagram_engage_recovery)
+    return jobs
+
+
+class WatchdogDaemon:
+    """ハートビートのイベントと前計算した期限で動く常駐ウォッチドッグ"""
+
+    def __init__(self, force_poll=False):
+        self.watcher = HeartbeatWatcher(HEARTBEAT_DIR, force_poll=force_poll)
+        self.pool = ThreadPoolExecutor(max_workers=RECOVERY_WORKERS,
+                                       thread_name_prefix="recovery")
+        self.results = queue.Queue()
+        self._build(datetime.now())
+
+    def _build(self, now):
+        self.day = now.date()
+        self.jobs = build_jobs(now)
+        self._schedule_source = posting_schedule()
+        # TikTok乖離チェック（cron と同じく日曜以外。起動した時間帯のものは即実行）
+        self.tiktok_checks = [] if now.weekday() == 6 else [
+            now.replace(hour=h, minute=0, second=0, microsecond=0)
+            for h in TIKTOK_CHECK_HOURS if h >= now.hour
+        ]
+        print(f"[{now:%H:%M:%S}] ジョブ表 {self.day}: "
+              + (", ".join(f"{j.name}≤{j.deadline:%H:%M}" for j in self.jobs.values())
+                 or "なし（日曜）"))
+
+    def _refresh_schedule(self, now):
+        """posting_schedule.json が変わった時だけ sns_post の期限を作り直す"""
+        if posting_schedule() is self._schedule_source:
+            return
+        old = self.jobs.get("sns_post")
+        fresh = build_jobs(now).get("sns_post")
+        self._schedule_source = posting_schedule()
+        if fresh is None:
+            self.jobs.pop("sns_post", None)
+        elif old is None or (old.expected != fresh.expected and old.state == WAITING):
+            self.jobs["sns_post"] = fresh
+
+    # ─── 判定 ───
+
+    def on_heartbeat(self, name, now):
+        """ハートビートが書かれた: 今日の exit_code で即判定"""
+        job = self.jobs.get(name)
+        if job is None or job.state in (RECOVERING, GAVE_UP):
+            return
+        try:
+            hb = json.loads((HEARTBEAT_DIR / f"{name}.json").read_text())
+        except Exception:
+            return
+        if hb.get("date") != now.strftime("%Y-%m-%d"):
+            return
+        exit_code = hb.get("exit_code", 0)
+        if exit_code == 0:
+            job.state, job.detail = OK, "完了"
+            return
+        self.recover(job, "failed", f"失敗（exit_code={exit_code}）", now)
+
+    def on_deadline(self, job, now):
+        """期限到達: cron と同じ判定で最終確認"""
+        status, detail = job.check()
+        if status in ("missing", "stale", "failed"):
+            self.recover(job, status, detail, now)
+        elif status in ("not_due_yet", "possibly_running"):
+            job.deadline = now + timedelta(seconds=POLL_INTERVAL * 5)
+        else:
+            job.state, job.detail = OK, detail
 
+    def recover(self, job, status, detail, now):
+        job.state, job.detail = RECOVERING, detail
+        print(f"[{now:%H:%M:%S}] {job.name}: {status} → リカバリ開始")
+
+        def run():
+            try:
+                result = job.recover()
+            except Exception as e:
+                result = f"error: {e}"
+            self.results.put((job, result))
+            self.watcher.wake()
+
+        self.pool.submit(run)
+
+    def on_result(self, job, result, now):
+        issues, recovered = [], []
+        if result == "recovered":
+            job.state = OK
+            recovered.append(f"{job.name}: 自動復旧成功（{job.detail}）")
+        elif result in ("retry_failed", "timeout") or result.startswith("error"):
+            job.state, job.retry_at = RETRY, now + timedelta(seconds=RECOVERY_RETRY_DELAY)
+            issues.append(f"{job.name}: 復旧失敗 ({result}) — {job.detail}"
+                          f" — {RECOVERY_RETRY_DELAY}秒後に再試行")
+        else:
+            job.state = GAVE_UP
+            issues.append(f"{job.name}: {job.detail} — リカバリ不可 ({result})")
+        print(f"[{now:%H:%M:%S}] {job.name}: {result}")
+        report(now, issues, recovered, [])
+
+    # ─── ループ ───
+
+    def _next_wakeup(self, now):
+        midnight = datetime.combine(self.day + timedelta(days=1), datetime.min.time())
+        candidates = [midnight] + self.tiktok_checks
+        candidates += [t for t in (j.next_due() for j in self.jobs.values()) if t]
+        return (min(candidates) - now).total_seconds()
+
+    def tick(self, now):
+        """時刻で起きるもの（日付の切り替え・期限・再試行・TikTokチェック）を処理"""
+        if now.date() != self.day:
+            self._build(now)
+        self._refresh_schedule(now)
+        for job in list(self.jobs.values()):
+            if job.state == WAITING and now >= job.deadline:
+                self.on_deadline(job, now)
+            elif job.state == RETRY and now >= job.retry_at:
+                self.recover(job, "retry", job.detail, now)
+        while self.tiktok_checks and now >= self.tiktok_checks[0]:
+            self.tiktok_checks.pop(0)
+            issues, info = run_tiktok_discrepancy_check(now)
+            report(now, issues, [], info)
+
+    def run(self):
+        print(f"Watchdog 常駐モード起動（{self.watcher.mode}）: {HEARTBEAT_DIR}")
+        # 起動前に書かれた今日のハートビートを取り込む
+        now = datetime.now()
+        for name in list(self.jobs):
+            self.on_heartbeat(name, now)
+        while True:
+            now = datetime.now()
+            self.tick(now)
+            changed = self.watcher.wait(self._next_wakeup(now))
+            now = datetime.now()
+            while not self.results.empty():
+                self.on_result(*self.results.get(), now)
+            for name in sorted(changed):
+                self.on_heartbeat(name, now)
+
+
+def daemon_running():
+    """常駐モードがロックを保持しているか"""
+    if not DAEMON_LOCK.exists():
+        return False
+    with open(DAEMON_LOCK, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return False
+
+
+def run_daemon(force_poll=False):
+    DAEMON_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    # "w" で開くとロックを取る前に動いている常駐の pid を消してしまうので、取ってから書き直す
+    lock = open(DAEMON_LOCK, "a+")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.seek(0)
+        pid = lock.read().strip()
+        print(f"既に常駐モードが動いています（pid {pid or '?'}）")
+        sys.exit(1)
+    lock.seek(0)
+    lock.truncate()
+    lock.write(str(os.getpid()))
+    lock.flush()
+    try:
+        WatchdogDaemon(force_poll=force_poll).run()
+    except KeyboardInterrupt:
+        print("\nWatchdog 終了")
+    finally:
+        slack_client.flush()
+
+
+# ============================================================
+# メイン
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="自己修復ウォッチドッグ v2.0")
+    parser.add_argument("--daemon", action="store_true",
+                        help="常駐モード（ハートビートのイベント駆動）")
+    parser.add_argument("--poll", action="store_true",
+                        help="常駐モードで inotify を使わずポーリングする")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     load_env()
-    run_watchdog()
+    if args.daemon:
+        run_daemon(force_poll=args.poll)
+    elif daemon_running():
+        # 常駐モードが動いていれば cron 起動は何もしない
+        return
+    else:
+        run_watchdog()
+
+
+if __name__ == "__main__":
+    main()